@@ -0,0 +1,108 @@
+"""
+Benchmark do tempo de inicialização de main.py.
+
+Mede, em processos novos, o tempo de importação de main com `python -X importtime`
+e o tempo até a janela inicial (StartupDialog) ser exibida. Falha se a mediana
+passar do alvo ou se algum módulo pesado for importado antes da janela inicial.
+
+Uso:
+    python benchmark_startup.py [--runs 5] [--target-ms 300] [--dialog-target-ms 600]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos que devem ser carregados apenas sob demanda (ou pelo pré-carregamento)
+LAZY_MODULES = ("scipy", "openpyxl", "concurrent.futures.process", "multiprocessing")
+
+DIALOG_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+dialog = main.StartupDialog()
+dialog.show()
+app.processEvents()
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure_import():
+    """
+    Importa main em um processo novo com -X importtime.
+
+    Returns:
+        (tempo acumulado de main em ms, conjunto de módulos importados)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    total_us = None
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # Cabeçalho da tabela
+        modules.add(name)
+        if name == "main":
+            total_us = int(cumulative)
+    if total_us is None:
+        raise RuntimeError("Saída do -X importtime não contém o módulo main")
+    return total_us / 1000, modules
+
+
+def measure_dialog():
+    """Tempo em ms do início do processo até a janela inicial ser exibida"""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    result = subprocess.run([sys.executable, "-c", DIALOG_SCRIPT], cwd=HERE, env=env,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do aplicativo")
+    parser.add_argument("--runs", type=int, default=5, help="Execuções medidas (mediana)")
+    parser.add_argument("--target-ms", type=float, default=300.0,
+                        help="Alvo para o tempo de importação de main (ms)")
+    parser.add_argument("--dialog-target-ms", type=float, default=600.0,
+                        help="Alvo para o tempo até a janela inicial (ms)")
+    args = parser.parse_args()
+
+    measure_import()  # Aquece o cache de arquivos do sistema operacional
+    import_times = []
+    eager = set()
+    for _ in range(args.runs):
+        elapsed, modules = measure_import()
+        import_times.append(elapsed)
+        eager |= {name for name in modules
+                  if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)}
+    dialog_times = [measure_dialog() for _ in range(args.runs)]
+
+    import_ms = statistics.median(import_times)
+    dialog_ms = statistics.median(dialog_times)
+    print(f"Importação de main:  mediana {import_ms:7.1f} ms (alvo {args.target_ms:.0f} ms)")
+    print(f"Janela inicial:      mediana {dialog_ms:7.1f} ms (alvo {args.dialog_target_ms:.0f} ms)")
+
+    failed = False
+    if eager:
+        print("Módulos pesados importados na inicialização: " + ", ".join(sorted(eager)))
+        failed = True
+    if import_ms > args.target_ms:
+        print("Tempo de importação acima do alvo")
+        failed = True
+    if dialog_ms > args.dialog_target_ms:
+        print("Tempo até a janela inicial acima do alvo")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,98 @@
+import os
 import sys
+import re
+import csv
+import unicodedata
+import sqlite3
+import json
+import time
+import zipfile
+import importlib
+import threading
 import numpy as np
-import traceback
-from scipy.interpolate import interp1d
-from openpyxl import Workbook
-from openpyxl.chart import ScatterChart, Reference, Series
-import openpyxl.styles
-import openpyxl.utils
+import logging
+# SciPy, openpyxl e o executor de processos são importados nas funções que os usam
+# (e aquecidos em segundo plano por warm_up_imports) para a janela inicial abrir logo
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QLabel, QPushButton, QFileDialog, QLineEdit, QMessageBox,
                             QGroupBox, QScrollArea, QInputDialog, QDialog, QDialogButtonBox,
                             QTabWidget, QTableWidget, QTableWidgetItem, QAbstractItemView,
-                            QHeaderView, QComboBox)
+                            QHeaderView, QComboBox, QCheckBox)
 from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QColor, QPainterPath, QDoubleValidator
-from PyQt5.QtCore import Qt, QPoint, QRect
+from PyQt5.QtCore import Qt, QPoint, QRect, QBuffer, QIODevice, QTimer, pyqtSignal
+
+logger = logging.getLogger("curvas_bomba")
+
+# Registro de mensagens: nível e arquivo também podem vir das variáveis de ambiente
+LOG_LEVEL_ENV = "CURVAS_BOMBA_LOG"
+LOG_FILE_ENV = "CURVAS_BOMBA_LOG_FILE"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+LOG_FILE_MAX_BYTES = 5 * 1024 * 1024  # Tamanho de cada arquivo antes da rotação
+LOG_FILE_BACKUPS = 3  # Arquivos antigos mantidos na rotação
+
+# Pasta de dados do aplicativo (catálogo de bombas e diário de edições)
+APP_DATA_DIR = os.path.join(os.path.expanduser("~"), ".curvas_bomba")
+
+
+def configure_logging(level=None, log_file=None):
+    """
+    Configura o registro de mensagens do aplicativo.
+    
+    As mensagens usam formatação preguiçosa (logger.debug("... %s", valor)), então
+    com o nível padrão (WARNING) as mensagens de depuração dos laços de cálculo não
+    são formatadas nem escritas.
+    
+    Args:
+        level: Nível ('DEBUG', 'INFO', 'WARNING', 'ERROR'); se None usa CURVAS_BOMBA_LOG ou WARNING
+        log_file: Arquivo com rotação por tamanho; se None usa CURVAS_BOMBA_LOG_FILE ou apenas o console
+    """
+    level = (level or os.environ.get(LOG_LEVEL_ENV) or "WARNING").upper()
+    log_file = log_file or os.environ.get(LOG_FILE_ENV)
+    
+    if log_file:
+        import logging.handlers
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+        old.close()
+    logger.addHandler(handler)
+    logger.setLevel(getattr(logging, level, logging.WARNING))
+    logger.propagate = False
+
+
+# Módulos pesados usados apenas nos cálculos e relatórios
+WARM_UP_MODULES = ("scipy.interpolate", "scipy.optimize", "openpyxl", "openpyxl.chart",
+                   "openpyxl.styles", "openpyxl.utils")
+
+
+def warm_up_imports(modules=WARM_UP_MODULES):
+    """
+    Importa em segundo plano os módulos pesados enquanto a janela inicial é exibida.
+    
+    As funções continuam importando o que usam; se o aquecimento ainda não terminou,
+    a importação apenas aguarda o término do módulo em andamento.
+    
+    Returns:
+        A thread de aquecimento (daemon)
+    """
+    def run():
+        start = time.perf_counter()
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logger.warning("Não foi possível pré-carregar %s: %s", name, e)
+        logger.debug("Módulos pré-carregados em %.3f s", time.perf_counter() - start)
+
+    thread = threading.Thread(target=run, name="pre-carregamento", daemon=True)
+    thread.start()
+    return thread
+
 
 class ImageWidget(QWidget):
     def __init__(self, parent=None):
@@ -28,6 +108,11 @@ class ImageWidget(QWidget):
         self.rotor_rpm = {}  # Dicionário para armazenar RPM de cada rotor
         self.current_rotor = None
         self.scale_values = {}
+        # Camada do NPSHr: área própria (opcional) e pontos em pixel por rotor
+        self.drawing_npsh_scale = False
+        self.drawing_npsh = False
+        self.npsh_rect = QRect()
+        self.npsh_points = {}
 
     def reset_data(self):
         self.drawing_scale = False
@@ -39,6 +124,14 @@ class ImageWidget(QWidget):
         self.rotor_rpm = {}  # Resetar também os RPMs
         self.current_rotor = None
         self.scale_values = {}
+        self.drawing_npsh_scale = False
+        self.drawing_npsh = False
+        self.npsh_rect = QRect()
+        self.npsh_points = {}
+
+    def npsh_area(self):
+        """Área usada para os pontos de NPSHr: a própria, se definida, ou a área do gráfico"""
+        return self.npsh_rect if self.npsh_rect.isValid() else self.scale_rect
 
     def load_image(self, path):
         self.image = QImage(path)
@@ -53,12 +146,19 @@ class ImageWidget(QWidget):
         if self.drawing_scale and not self.scale_rect.isNull():
             painter.setPen(QPen(Qt.red, 2, Qt.DashLine))
             painter.drawRect(self.scale_rect)
+        if (self.drawing_npsh_scale or self.drawing_npsh) and not self.npsh_rect.isNull():
+            painter.setPen(QPen(Qt.darkCyan, 2, Qt.DashLine))
+            painter.drawRect(self.npsh_rect)
 
         for rotor, points in self.rotor_points.items():
             color = QColor(*self.get_color_for_rotor(rotor))
             painter.setPen(QPen(color, 8))
             for point in points:
                 painter.drawEllipse(point['pos'], 3, 3)
+            # Pontos do NPSHr desenhados como quadrados na cor do rotor
+            painter.setPen(QPen(color, 2))
+            for point in self.npsh_points.get(rotor, []):
+                painter.drawRect(point.x() - 3, point.y() - 3, 6, 6)
 
     def get_color_for_rotor(self, rotor):
         rotors = list(self.rotor_points.keys())
@@ -72,6 +172,11 @@ class ImageWidget(QWidget):
         if self.drawing_scale:
             self.start_point = event.pos()
             self.scale_rect = QRect(self.start_point, self.start_point)
+        elif self.drawing_npsh_scale:
+            self.start_point = event.pos()
+            self.npsh_rect = QRect(self.start_point, self.start_point)
+        elif self.drawing_npsh:
+            self.add_npsh_point(event.pos())
         elif self.drawing_points:
             self.add_efficiency_point(event.pos())
 
@@ -79,12 +184,33 @@ class ImageWidget(QWidget):
         if self.drawing_scale and not self.start_point.isNull():
             self.scale_rect = QRect(self.start_point, event.pos()).normalized()
             self.update()
+        elif self.drawing_npsh_scale and not self.start_point.isNull():
+            self.npsh_rect = QRect(self.start_point, event.pos()).normalized()
+            self.update()
 
     def mouseReleaseEvent(self, event):
         if self.drawing_scale:
             self.drawing_scale = False
             if self.main_window:
                 self.main_window.update_scale_inputs(self.scale_rect)
+        elif self.drawing_npsh_scale:
+            self.drawing_npsh_scale = False
+            if self.main_window:
+                self.main_window.update_npsh_area(self.npsh_rect)
+
+    def add_npsh_point(self, point):
+        if not self.current_rotor:
+            QMessageBox.warning(self, "Erro", "Selecione um rotor primeiro!")
+            return
+
+        if not self.npsh_area().contains(point):
+            QMessageBox.warning(self, "Erro", "Ponto fora da área do NPSHr!")
+            return
+
+        self.npsh_points.setdefault(self.current_rotor, []).append(point)
+        if self.main_window:
+            self.main_window.journal.record('add_npsh_point', rotor=self.current_rotor, x=point.x(), y=point.y())
+        self.update()
 
     def add_efficiency_point(self, point):
         if not self.current_rotor:
@@ -108,6 +234,10 @@ class ImageWidget(QWidget):
                 'pos': point,
                 'efficiency': efficiency
             })
+            if self.main_window:
+                self.main_window.journal.record('add_point', rotor=self.current_rotor,
+                                                x=point.x(), y=point.y(), efficiency=efficiency)
+                self.main_window.refresh_preview(self.current_rotor)
             self.update()
 
 class PumpAnalyzer(QMainWindow):
@@ -121,7 +251,65 @@ class PumpAnalyzer(QMainWindow):
         # Adicionar variáveis para a segunda curva do sistema
         self.manual_system_points_2 = None
         self.direct_equation_params_2 = None
+        self.speed_families = {}  # Famílias de rotação geradas pelas leis de afinidade
+        self.energy_series = None  # Série temporal de operação para a simulação de energia
+        self.tank_settings = None  # Reservatório e demanda para a simulação de período estendido
+        self.pipe_network = None  # Trechos da tubulação usados para gerar a curva do sistema
+        self.uncertainty_settings = None  # Parâmetros da análise de incerteza (Monte Carlo)
+        self.npsh_settings = None  # Condições de sucção para o NPSH disponível
+        self.fluid_settings = None  # Fluido bombeado do projeto (None para água a 25 °C)
         self.setup_ui()
+        _start_journal(self, "imagem", self.replay_journal)
+        
+    def closeEvent(self, event):
+        self.journal.discard()
+        super().closeEvent(event)
+
+    def replay_journal(self, events):
+        """Reaplica as edições recuperadas do diário de uma sessão interrompida"""
+        for event in events:
+            kind = event['type']
+            if kind == 'project':
+                self.load_project_file(event['path'])
+            elif kind == 'load_image':
+                self.image_widget.reset_data()
+                self.speed_families = {}
+                self.image_widget.load_image(event['path'])
+            elif kind == 'scale':
+                self.image_widget.scale_rect = QRect(*event['rect'])
+                self.scale_values.update(event['values'])
+                for axis, inp in {**self.scale_inputs, **self.npsh_inputs}.items():
+                    inp.setText(str(self.scale_values.get(axis, 0)).replace('.', ','))
+            elif kind == 'add_rotor':
+                self.image_widget.rotor_points[event['name']] = []
+                self.image_widget.rotor_rpm[event['name']] = event['rpm']
+            elif kind == 'add_point':
+                self.image_widget.rotor_points.setdefault(event['rotor'], []).append(
+                    {'pos': QPoint(event['x'], event['y']), 'efficiency': event['efficiency']})
+            elif kind == 'set_rotor':
+                self.image_widget.rotor_rpm[event['name']] = event['rpm']
+                self.image_widget.rotor_points[event['name']] = [
+                    {'pos': QPoint(x, y), 'efficiency': e} for x, y, e in event['points']]
+                if event.get('npsh'):
+                    self.image_widget.npsh_points[event['name']] = [QPoint(x, y) for x, y in event['npsh']]
+            elif kind == 'npsh_scale':
+                self.image_widget.npsh_rect = QRect(*event['rect']) if event['rect'] else QRect()
+                self.scale_values.update(event['values'])
+                for axis, inp in self.npsh_inputs.items():
+                    inp.setText(str(self.scale_values.get(axis, 0)).replace('.', ','))
+            elif kind == 'add_npsh_point':
+                self.image_widget.npsh_points.setdefault(event['rotor'], []).append(QPoint(event['x'], event['y']))
+            elif kind == 'clear_npsh':
+                self.image_widget.npsh_points.pop(event['rotor'], None)
+        self.update_rotor_list()
+        self.image_widget.update()
+
+    def _record_rotor(self, rotor_name):
+        """Registra no diário o estado completo de um rotor criado a partir de outro"""
+        self.journal.record('set_rotor', name=rotor_name, rpm=self.image_widget.rotor_rpm.get(rotor_name, 1750),
+                            points=[[p['pos'].x(), p['pos'].y(), p['efficiency']]
+                                    for p in self.image_widget.rotor_points[rotor_name]],
+                            npsh=[[p.x(), p.y()] for p in self.image_widget.npsh_points.get(rotor_name, [])])
         
     def setup_ui(self):
         main_widget = QWidget()
@@ -134,12 +322,27 @@ class PumpAnalyzer(QMainWindow):
         control_content = QWidget()
         control_layout = QVBoxLayout(control_content)
 
+        # Pré-visualização das curvas digitalizadas (o tamanho da imagem não muda: os pontos
+        # são guardados em pixels da área da imagem)
+        preview_group = QGroupBox("Pré-visualização")
+        preview_layout = QVBoxLayout()
+        self.preview = CurvePreview(lambda max_q: _window_system_curves(self, max_q))
+        preview_layout.addWidget(self.preview)
+        preview_group.setLayout(preview_layout)
+        control_layout.addWidget(preview_group)
+
         # Grupo de arquivo
         file_group = QGroupBox("Arquivo")
         file_layout = QVBoxLayout()
         btn_load = QPushButton("Carregar Imagem")
         btn_load.clicked.connect(self.load_image)
         file_layout.addWidget(btn_load)
+        btn_open_project = QPushButton("Abrir Projeto")
+        btn_open_project.clicked.connect(self.open_project)
+        file_layout.addWidget(btn_open_project)
+        btn_save_project = QPushButton("Salvar Projeto")
+        btn_save_project.clicked.connect(self.save_project)
+        file_layout.addWidget(btn_save_project)
         file_group.setLayout(file_layout)
         control_layout.addWidget(file_group)
 
@@ -167,6 +370,35 @@ class PumpAnalyzer(QMainWindow):
         scale_group.setLayout(scale_layout)
         control_layout.addWidget(scale_group)
 
+        # Grupo da camada de NPSHr (eixo próprio, mesma escala de vazão)
+        npsh_group = QGroupBox("Camada NPSHr")
+        npsh_layout = QVBoxLayout()
+        self.npsh_inputs = {}
+        for axis, label in [('npsh_y0', "NPSHr y0 (m):"), ('npsh_y1', "NPSHr y1 (m):")]:
+            layout = QHBoxLayout()
+            inp = QLineEdit()
+            inp.setPlaceholderText("Valor real")
+            layout.addWidget(QLabel(label))
+            layout.addWidget(inp)
+            npsh_layout.addLayout(layout)
+            self.npsh_inputs[axis] = inp
+        
+        btn_save_npsh = QPushButton("Salvar Escala do NPSHr")
+        btn_save_npsh.clicked.connect(self.save_npsh_scale)
+        npsh_layout.addWidget(btn_save_npsh)
+        
+        btn_npsh_area = QPushButton("Definir Área do NPSHr")
+        btn_npsh_area.clicked.connect(self.start_npsh_area_selection)
+        npsh_layout.addWidget(btn_npsh_area)
+        btn_npsh_points = QPushButton("Selecionar Pontos NPSHr")
+        btn_npsh_points.clicked.connect(self.start_npsh_point_selection)
+        npsh_layout.addWidget(btn_npsh_points)
+        btn_clear_npsh = QPushButton("Limpar NPSHr do Rotor")
+        btn_clear_npsh.clicked.connect(self.clear_rotor_npsh)
+        npsh_layout.addWidget(btn_clear_npsh)
+        npsh_group.setLayout(npsh_layout)
+        control_layout.addWidget(npsh_group)
+
         # Grupo de rotores
         rotor_group = QGroupBox("Gerenciamento de Rotores")
         rotor_layout = QVBoxLayout()
@@ -191,6 +423,26 @@ class PumpAnalyzer(QMainWindow):
         btn_change_rpm.clicked.connect(self.change_rotor_rpm)
         rotor_layout.addWidget(btn_change_rpm)
         
+        # Adicionar botão para gerar família de rotações
+        btn_speed_family = QPushButton("Gerar Família de Rotações")
+        btn_speed_family.clicked.connect(self.create_speed_family)
+        rotor_layout.addWidget(btn_speed_family)
+        
+        # Adicionar botão para calcular a rotação necessária para um ponto de trabalho
+        btn_required_speed = QPushButton("Calcular Rotação Necessária")
+        btn_required_speed.clicked.connect(self.calculate_required_speed)
+        rotor_layout.addWidget(btn_required_speed)
+        
+        # Adicionar botão para calcular o corte do rotor (diâmetro necessário)
+        btn_trim = QPushButton("Corte de Rotor (Diâmetro)")
+        btn_trim.clicked.connect(self.calculate_trim_diameter)
+        rotor_layout.addWidget(btn_trim)
+        
+        # Adicionar botão para resolver a estação de bombeamento com ramais individuais
+        btn_station = QPushButton("Estação de Bombeamento (Ramais Individuais)")
+        btn_station.clicked.connect(self.solve_pump_station)
+        rotor_layout.addWidget(btn_station)
+        
         btn_select_points = QPushButton("Selecionar Pontos")
         btn_select_points.clicked.connect(self.start_point_selection)
         rotor_layout.addWidget(btn_select_points)
@@ -205,8 +457,10 @@ class PumpAnalyzer(QMainWindow):
         export_layout.addWidget(QLabel("Curva do Sistema 1:"))
         self.system_curve_mode = QComboBox()
         self.system_curve_mode.addItems(["Pontos Manual", "Equação Direta"])
+        self.system_curve_mode.currentIndexChanged.connect(lambda _: self.preview.refresh_systems())
         btn_set_curve = QPushButton("Configurar Curva do Sistema 1")
         btn_set_curve.clicked.connect(self.configure_system_curve)
+        btn_set_curve.clicked.connect(lambda: self.preview.refresh_systems())
         
         export_layout.addWidget(QLabel("Método da Curva do Sistema 1:"))
         export_layout.addWidget(self.system_curve_mode)
@@ -216,13 +470,49 @@ class PumpAnalyzer(QMainWindow):
         export_layout.addWidget(QLabel("Curva do Sistema 2:"))
         self.system_curve_mode_2 = QComboBox()
         self.system_curve_mode_2.addItems(["Nenhuma", "Pontos Manual", "Equação Direta"])
+        self.system_curve_mode_2.currentIndexChanged.connect(lambda _: self.preview.refresh_systems())
         btn_set_curve_2 = QPushButton("Configurar Curva do Sistema 2")
         btn_set_curve_2.clicked.connect(self.configure_system_curve_2)
+        btn_set_curve_2.clicked.connect(lambda: self.preview.refresh_systems())
         
         export_layout.addWidget(QLabel("Método da Curva do Sistema 2:"))
         export_layout.addWidget(self.system_curve_mode_2)
         export_layout.addWidget(btn_set_curve_2)
         
+        btn_pipe_network = QPushButton("Curva pela Rede de Tubulações")
+        btn_pipe_network.clicked.connect(self.configure_pipe_network)
+        btn_pipe_network.clicked.connect(lambda: self.preview.refresh_systems())
+        export_layout.addWidget(btn_pipe_network)
+        
+        # Ajuste das curvas dos rotores
+        export_layout.addWidget(QLabel("Ajuste das Curvas dos Rotores:"))
+        self.curve_fit_mode = QComboBox()
+        self.curve_fit_mode.addItems([label for label, _, _ in CURVE_FIT_OPTIONS])
+        export_layout.addWidget(self.curve_fit_mode)
+        export_layout.addWidget(QLabel("Unidades do Relatório:"))
+        self.report_units_mode = QComboBox()
+        self.report_units_mode.addItems([label for label, _ in REPORT_UNIT_PRESETS])
+        export_layout.addWidget(self.report_units_mode)
+        
+        btn_energy = QPushButton("Simulação de Energia (Série Temporal)")
+        btn_energy.clicked.connect(self.configure_energy_simulation)
+        export_layout.addWidget(btn_energy)
+        btn_tank = QPushButton("Simulação do Reservatório (Liga/Desliga)")
+        btn_tank.clicked.connect(self.configure_tank_simulation)
+        export_layout.addWidget(btn_tank)
+        btn_uncertainty = QPushButton("Análise de Incerteza (Monte Carlo)")
+        btn_uncertainty.clicked.connect(self.configure_uncertainty_analysis)
+        export_layout.addWidget(btn_uncertainty)
+        btn_fluid = QPushButton("Fluido Bombeado (Propriedades e Viscosidade)")
+        btn_fluid.clicked.connect(self.configure_fluid)
+        export_layout.addWidget(btn_fluid)
+        btn_npsh = QPushButton("Análise de NPSH (Cavitação)")
+        btn_npsh.clicked.connect(self.configure_npsh_analysis)
+        export_layout.addWidget(btn_npsh)
+        btn_plots = QPushButton("Exportar Gráficos (PNG/SVG/PDF)")
+        btn_plots.clicked.connect(self.export_plots)
+        export_layout.addWidget(btn_plots)
+        
         btn_export = QPushButton("Gerar Relatório Excel")
         btn_export.clicked.connect(self.export_to_excel)
         export_layout.addWidget(btn_export)
@@ -230,6 +520,21 @@ class PumpAnalyzer(QMainWindow):
         export_group.setLayout(export_layout)
         control_layout.addWidget(export_group)
 
+        # Grupo do catálogo de bombas
+        catalog_group = QGroupBox("Catálogo de Bombas")
+        catalog_layout = QVBoxLayout()
+        btn_save_catalog = QPushButton("Salvar Rotores no Catálogo")
+        btn_save_catalog.clicked.connect(self.save_to_catalog)
+        catalog_layout.addWidget(btn_save_catalog)
+        btn_search_catalog = QPushButton("Buscar no Catálogo")
+        btn_search_catalog.clicked.connect(self.open_catalog)
+        catalog_layout.addWidget(btn_search_catalog)
+        btn_select_catalog = QPushButton("Seleção pela Curva do Sistema")
+        btn_select_catalog.clicked.connect(self.select_from_catalog)
+        catalog_layout.addWidget(btn_select_catalog)
+        catalog_group.setLayout(catalog_layout)
+        control_layout.addWidget(catalog_group)
+
         control_panel.setWidget(control_content)
         main_layout.addWidget(self.image_widget, 70)
         main_layout.addWidget(control_panel, 30)
@@ -241,9 +546,107 @@ class PumpAnalyzer(QMainWindow):
         )
         if path:
             self.image_widget.reset_data()
+            self.speed_families = {}
             self.image_widget.load_image(path)
+            self.journal.record('load_image', path=path)
+            self.refresh_preview()
             QMessageBox.information(self, "Sucesso", "Imagem carregada com sucesso!")
 
+    def save_project(self):
+        """Grava imagem, calibração, rotores e curvas do sistema em um arquivo de projeto"""
+        if self.image_widget.image.isNull():
+            QMessageBox.warning(self, "Erro", "Carregue uma imagem primeiro!")
+            return
+        filename, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "Projeto.bproj", PROJECT_FILE_FILTER)
+        if not filename:
+            return
+        
+        rect = self.image_widget.scale_rect
+        rotors, points = _pack_project_rotors([
+            ({'name': rotor, 'rpm': self.image_widget.rotor_rpm.get(rotor, 1750)},
+             [(p['pos'].x(), p['pos'].y(), p['efficiency']) for p in rotor_points])
+            for rotor, rotor_points in self.image_widget.rotor_points.items()
+        ])
+        for entry in rotors:
+            layer = self.image_widget.npsh_points.get(entry['name'])
+            if layer:
+                entry['npsh'] = [[p.x(), p.y()] for p in layer]
+        npsh_rect = self.image_widget.npsh_rect
+        arrays = {"rotores.npy": points}
+        manifest = {
+            'mode': 'import',
+            'rotors': rotors,
+            'scale_rect': [rect.x(), rect.y(), rect.width(), rect.height()] if not rect.isNull() else None,
+            'npsh_rect': ([npsh_rect.x(), npsh_rect.y(), npsh_rect.width(), npsh_rect.height()]
+                          if not npsh_rect.isNull() else None),
+            'scale_values': self.scale_values,
+            'system_curves': _system_curve_state(self),
+            'fluid': self.fluid_settings,
+            'speed_families': _speed_families_state(self.speed_families),
+        }
+        
+        # Imagem original reempacotada como PNG dentro do projeto
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        self.image_widget.image.save(buffer, "PNG")
+        
+        try:
+            save_project(filename, manifest, arrays, image_png=bytes(buffer.data()))
+            self.journal.start(base={'type': 'project', 'path': filename})
+            QMessageBox.information(self, "Sucesso", f"Projeto salvo em:\n{filename}")
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao salvar projeto: {str(e)}")
+
+    def open_project(self):
+        """Carrega um arquivo de projeto salvo no modo imagem"""
+        filename, _ = QFileDialog.getOpenFileName(self, "Abrir Projeto", "", PROJECT_FILE_FILTER)
+        if not filename:
+            return
+        if self.load_project_file(filename):
+            self.journal.start(base={'type': 'project', 'path': filename})
+            QMessageBox.information(self, "Sucesso",
+                f"Projeto carregado com {len(self.image_widget.rotor_points)} rotor(es)!")
+
+    def load_project_file(self, filename):
+        """Substitui a sessão atual pelo conteúdo do arquivo de projeto; retorna True se carregado"""
+        try:
+            with ProjectFile(filename) as project:
+                manifest = project.manifest
+                if manifest.get('mode') != 'import':
+                    raise ValueError("O projeto foi criado no modo de entrada manual")
+                image = QImage.fromData(project.read("imagem.png"), "PNG")
+                
+                self.image_widget.reset_data()
+                self.image_widget.image = image
+                if manifest.get('scale_rect'):
+                    self.image_widget.scale_rect = QRect(*manifest['scale_rect'])
+                if manifest.get('npsh_rect'):
+                    self.image_widget.npsh_rect = QRect(*manifest['npsh_rect'])
+                self.scale_values.update(manifest.get('scale_values', {}))
+                for axis, inp in {**self.scale_inputs, **self.npsh_inputs}.items():
+                    inp.setText(str(self.scale_values.get(axis, 0)).replace('.', ','))
+                
+                for rotor in manifest['rotors']:
+                    self.image_widget.rotor_rpm[rotor['name']] = rotor['rpm']
+                    self.image_widget.rotor_points[rotor['name']] = [
+                        {'pos': QPoint(int(x), int(y)), 'efficiency': float(e)}
+                        for x, y, e in project.rotor_rows(rotor)
+                    ]
+                    if rotor.get('npsh'):
+                        self.image_widget.npsh_points[rotor['name']] = [QPoint(int(x), int(y))
+                                                                        for x, y in rotor['npsh']]
+                
+                _restore_system_curve_state(self, manifest.get('system_curves', {}))
+                self.fluid_settings = manifest.get('fluid')
+                self.speed_families = _load_speed_families(project)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao abrir projeto: {str(e)}")
+            return False
+        
+        self.update_rotor_list()
+        self.image_widget.update()
+        return True
+
     def start_scale_selection(self):
         if self.image_widget.image.isNull():
             QMessageBox.warning(self, "Erro", "Carregue uma imagem primeiro!")
@@ -265,10 +668,82 @@ class PumpAnalyzer(QMainWindow):
         try:
             for axis in self.scale_inputs:
                 self.scale_values[axis] = self.convert_br_float(self.scale_inputs[axis].text())
+            rect = self.image_widget.scale_rect
+            self.journal.record('scale', rect=[rect.x(), rect.y(), rect.width(), rect.height()],
+                                values=dict(self.scale_values))
+            self.refresh_preview()
             QMessageBox.information(self, "Sucesso", "Escala configurada!")
         except ValueError:
             QMessageBox.critical(self, "Erro", "Valores de escala inválidos")
 
+    def start_npsh_area_selection(self):
+        if self.image_widget.image.isNull():
+            QMessageBox.warning(self, "Erro", "Carregue uma imagem primeiro!")
+            return
+        self.image_widget.drawing_npsh_scale = True
+        QMessageBox.information(self, "Instruções",
+            "Selecione a área do gráfico de NPSHr arrastando o mouse da origem até o extremo. "
+            "As vazões usam os mesmos x0 e x1 do gráfico principal.")
+
+    def update_npsh_area(self, rect):
+        self.image_widget.npsh_rect = rect
+        QMessageBox.information(self, "Área Selecionada",
+            "Área do NPSHr definida! Insira os valores reais de NPSHr y0 e y1 e clique em 'Salvar Escala do NPSHr'.")
+
+    def save_npsh_scale(self):
+        try:
+            values = {axis: float(inp.text().replace(',', '.')) for axis, inp in self.npsh_inputs.items()}
+        except ValueError:
+            QMessageBox.critical(self, "Erro", "Valores de escala do NPSHr inválidos")
+            return
+        if values['npsh_y1'] == values['npsh_y0']:
+            QMessageBox.critical(self, "Erro", "NPSHr y0 e y1 devem ser diferentes")
+            return
+        self.scale_values.update(values)
+        rect = self.image_widget.npsh_rect
+        self.journal.record('npsh_scale', values=values,
+                            rect=[rect.x(), rect.y(), rect.width(), rect.height()] if not rect.isNull() else None)
+        QMessageBox.information(self, "Sucesso", "Escala do NPSHr configurada!")
+
+    def start_npsh_point_selection(self):
+        if not self.image_widget.npsh_area().isValid():
+            QMessageBox.warning(self, "Erro", "Defina a escala primeiro!")
+            return
+        if 'npsh_y0' not in self.scale_values:
+            QMessageBox.warning(self, "Erro", "Salve a escala do NPSHr primeiro!")
+            return
+        self.image_widget.drawing_points = False
+        self.image_widget.drawing_npsh = True
+        QMessageBox.information(self, "Instruções",
+            "Clique nos pontos da curva de NPSHr do rotor atual")
+
+    def clear_rotor_npsh(self):
+        rotor = self.image_widget.current_rotor
+        if not rotor or rotor not in self.image_widget.npsh_points:
+            QMessageBox.warning(self, "Erro", "O rotor atual não possui pontos de NPSHr!")
+            return
+        del self.image_widget.npsh_points[rotor]
+        self.journal.record('clear_npsh', rotor=rotor)
+        self.image_widget.update()
+
+    def convert_npsh_to_real(self, pixel_pos):
+        """Converte um ponto da camada de NPSHr em (vazão, NPSHr)"""
+        rect = self.image_widget.npsh_area()
+        if not rect.isValid() or rect.width() == 0 or rect.height() == 0:
+            return 0.0, 0.0
+        v = self.scale_values
+        flow = v['x0'] + (pixel_pos.x() - rect.left()) * (v['x1'] - v['x0']) / rect.width()
+        npsh = v['npsh_y1'] - (pixel_pos.y() - rect.top()) * (v['npsh_y1'] - v['npsh_y0']) / rect.height()
+        return flow, npsh
+
+    def convert_npsh_from_real(self, flow, npsh):
+        """Converte (vazão, NPSHr) em um ponto da camada de NPSHr"""
+        rect = self.image_widget.npsh_area()
+        v = self.scale_values
+        x = rect.left() + (flow - v['x0']) * rect.width() / (v['x1'] - v['x0'])
+        y = rect.top() + (v['npsh_y1'] - npsh) * rect.height() / (v['npsh_y1'] - v['npsh_y0'])
+        return QPoint(int(round(x)), int(round(y)))
+
     def add_rotor(self):
         rotor_name, ok = QInputDialog.getText(self, "Novo Rotor", "Nome do rotor:")
         if ok and rotor_name:
@@ -281,6 +756,7 @@ class PumpAnalyzer(QMainWindow):
             if rpm_ok:
                 self.image_widget.rotor_points[rotor_name] = []
                 self.image_widget.rotor_rpm[rotor_name] = rpm
+                self.journal.record('add_rotor', name=rotor_name, rpm=rpm)
                 self.update_rotor_list()
                 self.image_widget.current_rotor = rotor_name
                 self.rotor_selector.setCurrentText(rotor_name)
@@ -301,6 +777,16 @@ class PumpAnalyzer(QMainWindow):
             elif rotors:
                 self.rotor_selector.setCurrentText(rotors[0])
                 self.image_widget.current_rotor = rotors[0]
+        self.refresh_preview()
+
+    def refresh_preview(self, rotor=None):
+        """Atualiza a pré-visualização: apenas as linhas do rotor informado ou todos os rotores"""
+        def points(name):
+            return (self.get_rotor_data(name) if self.image_widget.scale_rect.isValid() else None) or []
+        if rotor is not None:
+            self.preview.set_rotor(rotor, points(rotor))
+        else:
+            self.preview.set_rotors({name: points(name) for name in self.image_widget.rotor_points})
 
     def select_current_rotor(self, rotor_name):
         """Seleciona o rotor atual"""
@@ -376,6 +862,14 @@ class PumpAnalyzer(QMainWindow):
         self.image_widget.rotor_points[new_rotor_name] = new_points
         self.image_widget.rotor_rpm[new_rotor_name] = new_rpm
         
+        # NPSHr2/NPSHr1 = (N2/N1)², com a vazão escalada como na curva de altura
+        if self.image_widget.npsh_points.get(rotor):
+            self.image_widget.npsh_points[new_rotor_name] = [
+                self.convert_npsh_from_real(flow * rpm_ratio, npsh * rpm_ratio ** NPSH_AFFINITY_EXPONENT)
+                for flow, npsh in map(self.convert_npsh_to_real, self.image_widget.npsh_points[rotor])
+            ]
+        self._record_rotor(new_rotor_name)
+        
         # Atualizar interface
         if hasattr(self, 'rotor_selector'):
             self.rotor_selector.addItem(new_rotor_name)
@@ -383,12 +877,241 @@ class PumpAnalyzer(QMainWindow):
         
         self.image_widget.current_rotor = new_rotor_name
         self.image_widget.update()
+        self.refresh_preview(new_rotor_name)
         
         QMessageBox.information(
             self, "Sucesso", 
             f"Rotor '{new_rotor_name}' criado com RPM {new_rpm}!"
         )
             
+    def get_rotor_data(self, rotor_name):
+        """Obter os pontos de um rotor em coordenadas reais (vazão, altura, eficiência)"""
+        points = self.image_widget.rotor_points.get(rotor_name)
+        if not points:
+            return None
+        data = [{
+            'vazao': self.convert_to_real(point['pos'], 'x'),
+            'altura': self.convert_to_real(point['pos'], 'y'),
+            'efficiency': point['efficiency']
+        } for point in points]
+        
+        # NPSHr da camada própria interpolado nas vazões dos pontos dentro da faixa digitalizada
+        layer = self.image_widget.npsh_points.get(rotor_name, [])
+        if len(layer) >= 2:
+            npsh_q, npsh_n = np.array([self.convert_npsh_to_real(p) for p in layer]).T
+            order = np.argsort(npsh_q)
+            npsh_q, npsh_n = npsh_q[order], npsh_n[order]
+            for point in data:
+                if npsh_q[0] <= point['vazao'] <= npsh_q[-1]:
+                    point['npshr'] = float(np.interp(point['vazao'], npsh_q, npsh_n))
+        return data
+
+    def create_speed_family(self):
+        """Gera uma família de curvas para várias rotações de um rotor"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        selection = _show_speed_family_dialog(self, list(self.image_widget.rotor_points.keys()),
+                                              self.image_widget.rotor_rpm, self.speed_families)
+        if selection is None:
+            return
+        rotor, rpms = selection
+        
+        points = self.get_rotor_data(rotor)
+        if not points or len(points) < 2:
+            QMessageBox.warning(self, "Erro", f"O rotor '{rotor}' precisa de pelo menos 2 pontos!")
+            return
+        
+        try:
+            generate_speed_family(points, self.image_widget.rotor_rpm.get(rotor, 1750), rpms, _fluid_density(self))
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro", f"Não foi possível gerar a família: {str(e)}")
+            return
+        
+        # Apenas a especificação: as curvas são refeitas do rotor base atual em cada relatório
+        family_name = f"{rotor} ({rpms[0]:.0f}-{rpms[-1]:.0f} RPM)"
+        self.speed_families[family_name] = {'rotor': rotor, 'rpms': np.asarray(rpms, dtype=float)}
+        QMessageBox.information(self, "Sucesso",
+            f"Família '{family_name}' criada com {len(rpms)} rotações.\n"
+            f"Os pontos de operação de cada rotação serão incluídos no relatório.")
+            
+    def calculate_required_speed(self):
+        """Calcula a rotação de cada rotor que atinge o ponto de trabalho desejado"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        _show_required_speed_dialog(self, rotor_data, self.image_widget.rotor_rpm,
+                                    _system_curve_settings(self))
+            
+    def solve_pump_station(self):
+        """Resolve as vazões de bombas em paralelo com perdas individuais nos ramais"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        _show_pump_station_dialog(self, rotor_data, _system_curve_settings(self))
+            
+    def configure_energy_simulation(self):
+        """Carrega a série temporal de operação e simula o consumo de energia dos rotores"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        self.energy_series = _show_energy_simulation_dialog(self, rotor_data, _system_curve_settings(self),
+                                                            self.energy_series)
+
+    def configure_tank_simulation(self):
+        """Configura e simula o reservatório elevado com controle liga/desliga por nível"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        self.tank_settings = _show_tank_simulation_dialog(self, rotor_data, _system_curve_settings(self),
+                                                          self.tank_settings)
+            
+    def configure_uncertainty_analysis(self):
+        """Configura a análise de incerteza dos pontos de operação por Monte Carlo"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        self.uncertainty_settings = _show_uncertainty_dialog(self, rotor_data, _system_curve_settings(self),
+                                                             self.uncertainty_settings, self.curve_fit_mode)
+            
+    def configure_npsh_analysis(self):
+        """Configura as condições de sucção e avalia a margem de NPSH nos pontos de operação"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        self.npsh_settings = _show_npsh_dialog(self, rotor_data, _system_curve_settings(self), self.npsh_settings)
+            
+    def export_plots(self):
+        """Exporta gráficos estáticos (PNG/SVG/PDF) das curvas dos rotores e das curvas do sistema"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        _show_plot_export_dialog(self, rotor_data, self.image_widget.rotor_rpm, self.speed_families,
+                                 self.curve_fit_mode)
+            
+    def configure_fluid(self):
+        """Escolhe o fluido bombeado do projeto e mostra os fatores de correção de viscosidade"""
+        rotor_data = {}
+        if self.image_widget.scale_rect:
+            rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points
+                          if self.image_widget.rotor_points[rotor]}
+        self.fluid_settings = _show_fluid_dialog(self, rotor_data, self.image_widget.rotor_rpm, self.fluid_settings)
+            
+    def configure_pipe_network(self):
+        """Monta a curva do sistema a partir dos trechos da tubulação"""
+        rotor_data = {}
+        if self.image_widget.scale_rect:
+            rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        network = _show_pipe_network_dialog(self, rotor_data, self.pipe_network)
+        if network is not None:
+            _apply_pipe_network(self, network)
+            
+    def calculate_trim_diameter(self):
+        """Calcula o diâmetro de rotor que atinge o ponto de trabalho e adiciona sua curva"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        selection = _show_trim_dialog(self, rotor_data, self.image_widget.rotor_points.keys())
+        if selection is None:
+            return
+        new_rotor_name, points = selection
+        
+        # Corte a rotação constante: usar o RPM dos rotores existentes
+        base_rotor = next(iter(self.image_widget.rotor_points))
+        self.add_real_rotor(new_rotor_name, points, self.image_widget.rotor_rpm.get(base_rotor, 1750))
+        QMessageBox.information(self, "Sucesso", f"Rotor '{new_rotor_name}' adicionado!")
+
+    def add_real_rotor(self, rotor_name, points, rpm):
+        """Adiciona um rotor a partir de pontos em coordenadas reais, convertidos para pixels"""
+        self.image_widget.rotor_rpm[rotor_name] = rpm
+        self.image_widget.rotor_points[rotor_name] = [{
+            'pos': QPoint(self.convert_from_real_axis(point['vazao'], 'x'),
+                          self.convert_from_real_axis(point['altura'], 'y')),
+            'efficiency': point['efficiency']
+        } for point in points]
+        self._record_rotor(rotor_name)
+        self.update_rotor_list()
+        self.image_widget.update()
+
+    def save_to_catalog(self):
+        """Grava os rotores atuais no catálogo de bombas"""
+        if not self.image_widget.rotor_points:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico primeiro!")
+            return
+        rotor_data = {rotor: self.get_rotor_data(rotor) for rotor in self.image_widget.rotor_points}
+        _save_to_catalog(self, rotor_data, self.image_widget.rotor_rpm, self.curve_fit_mode)
+
+    def open_catalog(self):
+        """Busca rotores no catálogo e importa os selecionados"""
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico antes de importar rotores!")
+            return
+        self.import_catalog_rotors(_show_catalog_dialog(self))
+
+    def select_from_catalog(self):
+        """Classifica os rotores do catálogo pela curva do sistema 1 e importa os selecionados"""
+        if not self.image_widget.scale_rect:
+            QMessageBox.warning(self, "Erro", "Defina a escala do gráfico antes de importar rotores!")
+            return
+        self.import_catalog_rotors(_show_selection_dialog(self, _system_curve_settings(self)))
+
+    def import_catalog_rotors(self, selection):
+        """Adiciona os rotores retornados pelos diálogos do catálogo"""
+        if selection is None:
+            return
+        rotor_data, rotor_rpm = selection
+        imported = 0
+        for rotor, points in rotor_data.items():
+            if rotor in self.image_widget.rotor_points:
+                continue
+            self.add_real_rotor(rotor, points, rotor_rpm.get(rotor, 1750))
+            imported += 1
+        QMessageBox.information(self, "Catálogo", f"{imported} rotor(es) importado(s).")
+            
     def change_rotor_rpm_manual(self, rotor, parent_dialog):
         # Verificar se o rotor selecionado é válido
         if not rotor or rotor not in self.image_widget.rotor_points:
@@ -471,6 +1194,9 @@ class PumpAnalyzer(QMainWindow):
                         'efficiency': new_eff
                     })
                 
+                self._record_rotor(new_rotor_name)
+                self.refresh_preview(new_rotor_name)
+                
                 # Atualizar a interface
                 QMessageBox.information(self, "Sucesso", 
                     f"Rotor {rotor} com novo RPM de {new_rpm} adicionado como {new_rotor_name}")
@@ -612,6 +1338,7 @@ class PumpAnalyzer(QMainWindow):
         if not self.image_widget.scale_rect.isValid():
             QMessageBox.warning(self, "Erro", "Defina a escala primeiro!")
             return
+        self.image_widget.drawing_npsh = False
         self.image_widget.drawing_points = True
         QMessageBox.information(self, "Instruções", 
             "Clique nos pontos da curva de eficiência conhecida")
@@ -851,7 +1578,7 @@ class PumpAnalyzer(QMainWindow):
                       self.manual_system_points = None # Limpar pontos se não houver suficientes válidos
                  else:
                       self.manual_system_points = points_buffer # Armazenar pontos válidos
-                      print("Pontos manuais da curva do sistema atualizados:", self.manual_system_points)
+                      logger.debug("Pontos manuais da curva do sistema atualizados: %s", self.manual_system_points)
             else:
                  # Se a entrada foi inválida, manter os pontos antigos (ou None se não existiam)
                  QMessageBox.information(self, "Entrada Inválida", "Os pontos da curva do sistema não foram atualizados devido a erros na entrada.")
@@ -947,7 +1674,7 @@ class PumpAnalyzer(QMainWindow):
                       self.manual_system_points_2 = None 
                  else:
                       self.manual_system_points_2 = points_buffer 
-                      print("Pontos manuais da segunda curva do sistema atualizados:", self.manual_system_points_2)
+                      logger.debug("Pontos manuais da segunda curva do sistema atualizados: %s", self.manual_system_points_2)
             else:
                  
                  QMessageBox.information(self, "Entrada Inválida", "Os pontos da segunda curva do sistema não foram atualizados devido a erros na entrada.")
@@ -975,39 +1702,22 @@ class PumpAnalyzer(QMainWindow):
             QMessageBox.warning(self, "Erro", "Nenhum rotor foi definido!")
             return
         
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Salvar Relatório", "Curvas_Bomba.xlsx", "Excel Files (*.xlsx)"
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self, "Salvar Relatório", "Curvas_Bomba.xlsx", REPORT_FILE_FILTERS
         )
         
         if not filename:
             return
+        filename = _report_file_name(filename, selected_filter)
         
         try:
-            # Convert image points to real-world coordinates for system curve
-            rotor_data = {}
-            max_rotor_q_overall = 0.0 # Initialize max flow
-            for rotor, points in self.image_widget.rotor_points.items():
-                rotor_data[rotor] = []
-                current_max_q = 0.0
-                for point in points:
-                    try:
-                        real_x = self.convert_to_real(point['pos'], 'x') # Vazão (Flow)
-                        real_y = self.convert_to_real(point['pos'], 'y') # Altura (Head)
-                        rotor_data[rotor].append({
-                            'vazao': real_x,
-                            'altura': real_y,
-                            'efficiency': point['efficiency']
-                        })
-                        if real_x > current_max_q:
-                             current_max_q = real_x
-                    except Exception as e:
-                        QMessageBox.critical(self, "Erro de Conversão",
-                                          f"Erro ao converter ponto do rotor {rotor}:\n{str(e)}")
-                        return # Stop export on conversion error
-                
-                # Update overall max flow if this rotor's max is higher
-                if current_max_q > max_rotor_q_overall:
-                     max_rotor_q_overall = current_max_q
+            # Pontos reais dos rotores, com o NPSHr da camada própria (ver get_rotor_data)
+            try:
+                rotor_data = {rotor: self.get_rotor_data(rotor) or [] for rotor in self.image_widget.rotor_points}
+            except Exception as e:
+                QMessageBox.critical(self, "Erro de Conversão", f"Erro ao converter os pontos dos rotores:\n{str(e)}")
+                return
+            max_rotor_q_overall = max((p['vazao'] for points in rotor_data.values() for p in points), default=0.0)
 
             # Get system curve parameters for first curve
             mode = self.system_curve_mode.currentIndex()
@@ -1031,6 +1741,9 @@ class PumpAnalyzer(QMainWindow):
             elif mode_2 == 2 and not equation_params_2:
                  QMessageBox.warning(self, "Aviso", "Modo 'Equação Direta' selecionado para Curva 2, mas os parâmetros H0 e K não foram configurados.")
 
+            # Modelo de ajuste das curvas dos rotores
+            _, curve_model, curve_degree = CURVE_FIT_OPTIONS[self.curve_fit_mode.currentIndex()]
+
             # Generate the report with system curves, passing the calculated max flow and both curve parameters
             _generate_excel_report(rotor_data, filename=filename, system_curve_mode=mode,
                                  manual_points=manual_points,
@@ -1038,94 +1751,4298 @@ class PumpAnalyzer(QMainWindow):
                                  max_rotor_q=max_rotor_q_overall,
                                  system_curve_mode_2=mode_2,
                                  manual_points_2=manual_points_2,
-                                 equation_params_2=equation_params_2)
+                                 equation_params_2=equation_params_2,
+                                 curve_model=curve_model,
+                                 curve_degree=curve_degree,
+                                 speed_families=self.speed_families,
+                                 energy_series=self.energy_series,
+                                 tank_settings=self.tank_settings,
+                                 uncertainty_settings=self.uncertainty_settings,
+                                 npsh_settings=self.npsh_settings,
+                                 fluid_settings=self.fluid_settings,
+                                 rotor_rpm=self.image_widget.rotor_rpm,
+                                 report_units=REPORT_UNIT_PRESETS[self.report_units_mode.currentIndex()][1])
                                  
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao salvar relatório: {str(e)}")
 
-def _calculate_system_curve(manual_points=None, equation_params=None, max_rotor_q=None):
-    """Calcula os pontos da curva do sistema com base nos parâmetros fornecidos."""
-    if manual_points is None and equation_params is None:
-        return None
-    
-    # Verificar se temos vazão máxima definida
-    if max_rotor_q is None or max_rotor_q <= 0:
-        print("Aviso: Vazão máxima não definida ou inválida.")
-        max_rotor_q = 50.0  # Valor padrão se não for fornecido
-    
-    print(f"DEBUG - max_rotor_q recebido: {max_rotor_q}, tipo: {type(max_rotor_q)}")
-    
-    # Caso 1: Pontos manuais
-    if manual_points and len(manual_points) >= 2:
-        # Ordenar pontos por vazão (Q)
-        sorted_points = sorted(manual_points, key=lambda p: p[0])
-        
-        # Extrair vazões e alturas
-        q_values = [p[0] for p in sorted_points]
-        h_values = [p[1] for p in sorted_points]
-        
-        # Verificar se o último ponto tem vazão menor que a vazão máxima dos rotores
-        last_q = q_values[-1]
-        print(f"DEBUG - Último ponto manual Q: {last_q}, max_rotor_q: {max_rotor_q}")
-        
-        if last_q < max_rotor_q:
-            # Extrapolar a curva até a vazão máxima dos rotores
-            # Usamos os dois últimos pontos para calcular a inclinação
-            if len(q_values) >= 2:
-                # Calcular a inclinação com base nos dois últimos pontos
-                slope = (h_values[-1] - h_values[-2]) / (q_values[-1] - q_values[-2])
-                
-                # Adicionar um ponto extrapolado na vazão máxima
-                extrapolated_h = h_values[-1] + slope * (max_rotor_q - q_values[-1])
-                
-                # Garantir que a altura não seja negativa
-                if extrapolated_h > 0:
-                    q_values.append(max_rotor_q)
-                    h_values.append(extrapolated_h)
-                    print(f"DEBUG - Ponto extrapolado adicionado: Q={max_rotor_q}, H={extrapolated_h}")
-        
-        # Criar função de interpolação
-        try:
-            interp_func = interp1d(q_values, h_values, kind='linear', bounds_error=False, fill_value='extrapolate')
-            
-            # Gerar pontos para a curva do sistema
-            num_points = 100
-            q_curve = np.linspace(0, max_rotor_q, num_points)
-            h_curve = interp_func(q_curve)
-            
-            # Garantir que não haja alturas negativas
-            h_curve = np.maximum(h_curve, 0)
-            
-            # Criar lista de pontos (Q, H)
-            curve_points = [(q, h) for q, h in zip(q_curve, h_curve)]
-            
-            print(f"DEBUG - Curva do sistema gerada com {len(curve_points)} pontos, de Q=0 até Q={max_rotor_q}")
-            
-            # Calcular parâmetros da equação H = H0 + K*Q^2 para exibição
-            Q = np.array(q_values)
-            H = np.array(h_values)
-            A = np.vstack([Q**2, np.ones(len(Q))]).T
-            try:
-                result, residuals, rank, s = np.linalg.lstsq(A, H, rcond=None)
-                K, H0 = result
-                equation = f"H = {H0:.2f} + {K:.4f} × Q²"
-            except np.linalg.LinAlgError:
-                equation = "Não foi possível calcular a equação"
-                K, H0 = 0, h_values[0]  # Valores padrão
-            
-            return {
-                'static_head': float(H0),
-                'k_factor': float(K),
-                'equation': equation,
-                'points': curve_points,
-                'Q': np.array([q for q, _ in curve_points]),
-                'H': np.array([h for _, h in curve_points]),
-                'type': 'manual'
-            }
-        except Exception as e:
-            QMessageBox.warning(None, "Erro de Interpolação", f"Não foi possível interpolar a curva do sistema: {str(e)}")
-            return None
-    elif manual_points and len(manual_points) < 2:
+# Opções de ajuste das curvas oferecidas na interface: (rótulo, modelo, grau)
+CURVE_FIT_OPTIONS = [
+    ("Interpolação Linear", 'linear', None),
+    ("Polinômio Grau 2", 'poly', 2),
+    ("Polinômio Grau 3", 'poly', 3),
+    ("Polinômio Grau 4", 'poly', 4),
+    ("Monótona (Isotônica)", 'monotone', None),
+]
+
+def _is_combined_efficiency(efficiency):
+    """Indica se a eficiência é a string combinada ("a%:b%") de bombas em paralelo."""
+    return isinstance(efficiency, str) and ":" in efficiency
+
+def _pack_rotor_arrays(rotor_data):
+    """
+    Empacota os pontos dos rotores em arrays retangulares preenchidos com NaN.
+
+    Os pontos de cada rotor são ordenados por vazão e, em caso de vazões repetidas,
+    apenas o primeiro ponto é mantido (mesmo critério do relatório). Rotores
+    combinados (eficiência como string) e rotores com menos de 2 vazões distintas
+    são ignorados.
+
+    Args:
+        rotor_data: Dicionário {rotor: [{'vazao', 'altura', 'efficiency'}, ...]}
+
+    Returns:
+        Tupla (nomes, Q, H, E, counts), com Q, H e E de forma (n_rotores, max_pontos)
+    """
+    names = []
+    rows = []
+    for rotor, points in rotor_data.items():
+        if not points:
+            continue
+        if not all(isinstance(p['efficiency'], (int, float)) for p in points):
+            continue
+
+        q = np.array([p['vazao'] for p in points], dtype=float)
+        h = np.array([p['altura'] for p in points], dtype=float)
+        e = np.array([p['efficiency'] for p in points], dtype=float)
+
+        order = np.argsort(q, kind='stable')
+        q_unique, first_idx = np.unique(q[order], return_index=True)
+        if len(q_unique) < 2:
+            continue
+
+        names.append(rotor)
+        rows.append((q_unique, h[order][first_idx], e[order][first_idx]))
+
+    n = len(rows)
+    m = max((len(r[0]) for r in rows), default=0)
+    Q = np.full((n, m), np.nan)
+    H = np.full((n, m), np.nan)
+    E = np.full((n, m), np.nan)
+    counts = np.zeros(n, dtype=int)
+    for i, (q, h, e) in enumerate(rows):
+        k = len(q)
+        Q[i, :k] = q
+        H[i, :k] = h
+        E[i, :k] = e
+        counts[i] = k
+
+    return names, Q, H, E, counts
+
+def _batch_polyfit(x, y, valid, degree):
+    """
+    Ajuste polinomial por mínimos quadrados de vários rotores de uma só vez.
+
+    Args:
+        x: Vazões normalizadas, forma (n, m)
+        y: Valores a ajustar, forma (n, m)
+        valid: Máscara dos pontos válidos (não preenchidos), forma (n, m)
+        degree: Grau máximo do polinômio; rotores com poucos pontos usam grau menor
+
+    Returns:
+        Coeficientes em ordem crescente de potência, forma (n, degree + 1)
+    """
+    powers = np.arange(degree + 1)
+    xz = np.where(valid, x, 0.0)
+    yz = np.where(valid, y, 0.0)
+
+    # Matriz de Vandermonde em lote; linhas de preenchimento ficam zeradas
+    V = xz[..., None] ** powers * valid[..., None]
+
+    # Grau efetivo limitado pelo número de pontos de cada rotor (colunas excedentes zeradas)
+    effective_degree = np.minimum(degree, valid.sum(axis=1) - 1)
+    active = powers[None, :] <= effective_degree[:, None]
+    V = V * active[:, None, :]
+
+    # Pseudo-inversa em lote: colunas zeradas resultam em coeficiente zero
+    return np.einsum('nkm,nm->nk', np.linalg.pinv(V), yz)
+
+def _batch_polyval(coefs, x):
+    """Avalia em lote polinômios (coeficientes em potência crescente) pelo método de Horner."""
+    x = np.asarray(x, dtype=float)
+    c = coefs.reshape(coefs.shape[:1] + (1,) * (x.ndim - 1) + coefs.shape[1:])
+    result = np.broadcast_to(c[..., -1], x.shape).copy()
+    for k in range(coefs.shape[1] - 2, -1, -1):
+        result = result * x + c[..., k]
+    return result
+
+def _batch_interp(x, xp, fp, counts, extrapolate=True):
+    """
+    Interpolação linear por linha em lote (equivalente a aplicar np.interp em cada rotor).
+
+    Args:
+        x: Pontos de avaliação, forma (n, g)
+        xp: Abscissas ordenadas de cada linha, preenchidas com NaN, forma (n, m)
+        fp: Ordenadas correspondentes, forma (n, m)
+        counts: Número de pontos válidos de cada linha
+        extrapolate: Se True extrapola linearmente pelos segmentos extremos,
+            caso contrário retorna NaN fora do domínio
+
+    Returns:
+        Valores interpolados, forma (n, g)
+    """
+    n, m = xp.shape
+    rows = np.arange(n)
+    x_first = xp[rows, 0]
+    x_last = xp[rows, counts - 1]
+    span = np.where(x_last > x_first, x_last - x_first, 1.0)
+
+    # Normaliza cada linha para [0, 1] e desloca as linhas para faixas disjuntas,
+    # permitindo uma única busca binária sobre todos os rotores
+    u = np.clip((x - x_first[:, None]) / span[:, None], -0.5, 1.5) + 4.0 * rows[:, None]
+    up = (xp - x_first[:, None]) / span[:, None]
+    up = np.where(np.isnan(up), 1.75, up) + 4.0 * rows[:, None]
+
+    pos = np.searchsorted(up.ravel(), u.ravel(), side='right').reshape(x.shape)
+    seg = np.clip(pos - m * rows[:, None], 1, (counts - 1)[:, None])
+
+    x0 = np.take_along_axis(xp, seg - 1, axis=1)
+    x1 = np.take_along_axis(xp, seg, axis=1)
+    f0 = np.take_along_axis(fp, seg - 1, axis=1)
+    f1 = np.take_along_axis(fp, seg, axis=1)
+    result = f0 + (x - x0) * (f1 - f0) / (x1 - x0)
+
+    if not extrapolate:
+        outside = (x < x_first[:, None]) | (x > x_last[:, None])
+        result = np.where(outside, np.nan, result)
+    return result
+
+def _pava(y):
+    """
+    Regressão isotônica crescente (mínimos quadrados) de uma sequência pelo algoritmo
+    pool-adjacent-violators, em tempo linear.
+
+    Returns:
+        Tupla (valores ajustados, soma dos quadrados dos resíduos do ajuste de cada
+        prefixo y[:i+1], forma (len(y),))
+    """
+    means, weights, squares, sizes = [], [], [], []
+    prefix_sse = np.empty(len(y))
+    total = 0.0
+    for i, value in enumerate(np.asarray(y, dtype=float).tolist()):
+        mean, weight, square, size = value, 1.0, value * value, 1
+        # Junta os blocos anteriores que violam a ordem com o novo ponto
+        while means and means[-1] > mean:
+            prev_mean, prev_weight = means.pop(), weights.pop()
+            prev_square = squares.pop()
+            total -= prev_square - prev_weight * prev_mean * prev_mean
+            mean = (prev_mean * prev_weight + mean * weight) / (prev_weight + weight)
+            weight += prev_weight
+            square += prev_square
+            size += sizes.pop()
+        means.append(mean)
+        weights.append(weight)
+        squares.append(square)
+        sizes.append(size)
+        total += max(square - weight * mean * mean, 0.0)
+        prefix_sse[i] = total
+    return np.repeat(means, sizes), prefix_sse
+
+def _batch_isotonic(y, valid, start, stop, increasing=True):
+    """
+    Regressão isotônica (mínimos quadrados) de vários rotores, pelo PAVA em cada linha
+    (tempo linear no número de pontos).
+
+    Args:
+        y: Valores a ajustar, forma (n, m)
+        valid: Máscara dos pontos válidos, forma (n, m)
+        start: Primeiro índice do trecho ajustado em cada linha, forma (n,)
+        stop: Último índice (inclusivo) do trecho ajustado em cada linha, forma (n,)
+        increasing: True para curva não decrescente, False para não crescente
+
+    Returns:
+        Valores ajustados, forma (n, m), com NaN fora do trecho [start, stop]
+    """
+    n, m = y.shape
+    fitted = np.full((n, m), np.nan)
+    idx = np.arange(m)
+    for r in range(n):
+        cols = idx[valid[r] & (idx >= start[r]) & (idx <= stop[r])]
+        if len(cols) == 0:
+            continue
+        if increasing:
+            fitted[r, cols] = _pava(y[r, cols])[0]
+        else:
+            fitted[r, cols] = -_pava(-y[r, cols])[0]
+    return fitted
+
+def _batch_unimodal(y, valid, counts):
+    """
+    Regressão unimodal (crescente até o pico e decrescente depois) de vários rotores.
+
+    Os erros dos ajustes crescentes de todos os prefixos e decrescentes de todos os
+    sufixos saem de uma única passada do PAVA em cada sentido; o pico é o de menor
+    soma dos quadrados dos resíduos.
+
+    Returns:
+        Valores ajustados, forma (n, m)
+    """
+    n, m = y.shape
+    best = np.where(valid, y, np.nan)
+    idx = np.arange(m)
+    for r in range(n):
+        cols = idx[valid[r] & (idx < counts[r])]
+        if len(cols) == 0:
+            continue
+        values = y[r, cols]
+        _, left_sse = _pava(values)
+        _, right_sse = _pava(values[::-1])
+        # Erro do trecho decrescente depois de cada pico (vazio após o último ponto)
+        suffix_sse = np.append(right_sse[::-1][1:], 0.0)
+        peak = int(np.argmin(left_sse + suffix_sse))
+        best[r, cols[:peak + 1]] = _pava(values[:peak + 1])[0]
+        if peak + 1 < len(cols):
+            best[r, cols[peak + 1:]] = -_pava(-values[peak + 1:])[0]
+    return best
+
+def fit_rotor_curves(rotor_data, model='poly', degree=3):
+    """
+    Ajusta as curvas H(Q) e η(Q) de todos os rotores em uma única etapa vetorizada.
+
+    Args:
+        rotor_data: Dicionário com os dados dos rotores
+        model: 'linear' (interpolação entre os pontos), 'poly' (mínimos quadrados) ou
+            'monotone' (altura não crescente e eficiência unimodal, por regressão isotônica)
+        degree: Grau do polinômio (2 a 4) quando model='poly'
+
+    Returns:
+        Dicionário com os nomes dos rotores, domínio de vazão, dados empacotados,
+        coeficientes ajustados e resíduos por rotor
+    """
+    names, Q, H, E, counts = _pack_rotor_arrays(rotor_data)
+    fit = _fit_rotor_arrays(names, Q, H, E, counts, model, degree)
+    fit['npsh_Q'], fit['npsh_N'], fit['npsh_counts'] = _pack_npsh_arrays(rotor_data, names)
+    return fit
+
+def _pack_npsh_arrays(rotor_data, names):
+    """
+    Empacota a curva NPSHr (pontos com a chave 'npshr') dos rotores em arrays
+    preenchidos com NaN, na ordem de names.
+
+    Rotores com menos de 2 pontos de NPSHr ficam com counts 0 e abscissas fictícias
+    crescentes, para que a interpolação em lote não precise de casos especiais.
+
+    Returns:
+        Tupla (Q, NPSHr, counts), com Q e NPSHr de forma (n_rotores, max_pontos)
+    """
+    rows = []
+    for rotor in names:
+        pairs = sorted((p['vazao'], p['npshr']) for p in rotor_data[rotor] if p.get('npshr') is not None)
+        q, first_idx = np.unique([q for q, _ in pairs], return_index=True)
+        rows.append((q, np.array([n for _, n in pairs], dtype=float)[first_idx]) if len(q) >= 2 else None)
+
+    m = max([len(r[0]) for r in rows if r is not None] + [2])
+    Q = np.tile(np.arange(m, dtype=float), (len(names), 1))
+    N = np.full((len(names), m), np.nan)
+    counts = np.zeros(len(names), dtype=int)
+    for i, row in enumerate(rows):
+        if row is None:
+            continue
+        k = len(row[0])
+        Q[i] = np.nan
+        Q[i, :k], N[i, :k] = row
+        counts[i] = k
+    return Q, N, counts
+
+def _fit_rotor_arrays(names, Q, H, E, counts, model='poly', degree=3):
+    """
+    Ajusta as curvas a partir dos arrays empacotados por _pack_rotor_arrays (vazões
+    crescentes em cada linha, preenchidas com NaN). Ver fit_rotor_curves.
+    """
+    if model == 'poly' and not 2 <= degree <= 4:
+        raise ValueError(f"Grau do polinômio deve estar entre 2 e 4 (recebido {degree})")
+    if model not in ('linear', 'poly', 'monotone'):
+        raise ValueError(f"Modelo de ajuste desconhecido: {model}")
+
+    n = len(names)
+    rows = np.arange(n)
+    valid = ~np.isnan(Q)
+
+    fit = {
+        'names': names,
+        'index': {name: i for i, name in enumerate(names)},
+        'model': model,
+        'degree': degree if model == 'poly' else 1,
+        'Q': Q,
+        'H': H,
+        'E': E,
+        'counts': counts,
+        'q_min': Q[rows, 0] if n else np.zeros(0),
+        'q_max': Q[rows, counts - 1] if n else np.zeros(0),
+    }
+
+    if model == 'poly' and n:
+        # Vazão normalizada pela vazão máxima de cada rotor para melhor condicionamento
+        q_scale = np.where(fit['q_max'] > 0, fit['q_max'], 1.0)
+        x = Q / q_scale[:, None]
+        fit['q_scale'] = q_scale
+        fit['head_coefs'] = _batch_polyfit(x, H, valid, degree)
+        fit['eff_coefs'] = _batch_polyfit(x, E, valid, degree)
+        head_fitted = _batch_polyval(fit['head_coefs'], np.where(valid, x, 0.0))
+        eff_fitted = _batch_polyval(fit['eff_coefs'], np.where(valid, x, 0.0))
+    elif model == 'monotone' and n:
+        # Altura não crescente e eficiência unimodal, interpoladas linearmente entre os pontos
+        head_fitted = _batch_isotonic(H, valid, np.zeros(n, dtype=int), counts - 1, increasing=False)
+        eff_fitted = _batch_unimodal(E, valid, counts)
+        fit['head_knots'] = head_fitted
+        fit['eff_knots'] = eff_fitted
+    else:
+        # A interpolação linear passa exatamente pelos pontos
+        fit['head_knots'] = H
+        fit['eff_knots'] = E
+        head_fitted, eff_fitted = H, E
+
+    head_res = np.where(valid, head_fitted - H, 0.0)
+    eff_res = np.where(valid, eff_fitted - E, 0.0)
+    safe_counts = np.maximum(counts, 1)
+    fit['head_rmse'] = np.sqrt((head_res ** 2).sum(axis=1) / safe_counts)
+    fit['eff_rmse'] = np.sqrt((eff_res ** 2).sum(axis=1) / safe_counts)
+    fit['head_max_residual'] = np.abs(head_res).max(axis=1, initial=0.0)
+    fit['eff_max_residual'] = np.abs(eff_res).max(axis=1, initial=0.0)
+
+    return fit
+
+def evaluate_rotor_curves(fit, q, quantity='head', rows=None, extrapolate=True):
+    """
+    Avalia as curvas ajustadas de vários rotores de uma só vez.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        q: Vazões de avaliação, forma (n,) ou (n, g), uma linha por rotor selecionado
+        quantity: 'head' para altura, 'efficiency' para eficiência ou 'npsh' para NPSHr
+            (sempre por interpolação linear; NaN nos rotores sem curva NPSHr)
+        rows: Índices dos rotores a avaliar (padrão: todos)
+        extrapolate: Se False retorna NaN fora do domínio de vazão de cada rotor
+
+    Returns:
+        Array com a mesma forma de q
+    """
+    if rows is None:
+        rows = np.arange(len(fit['names']))
+    rows = np.asarray(rows, dtype=int)
+    q = np.asarray(q, dtype=float)
+    q2d = q.reshape(len(rows), -1)
+
+    if quantity == 'npsh':
+        if 'npsh_counts' not in fit:
+            return np.full(q.shape, np.nan)
+        counts = fit['npsh_counts'][rows]
+        values = _batch_interp(q2d, fit['npsh_Q'][rows], fit['npsh_N'][rows], np.maximum(counts, 2),
+                               extrapolate=extrapolate)
+        return np.where(counts[:, None] >= 2, values, np.nan).reshape(q.shape)
+
+    if fit['model'] == 'poly':
+        key = 'head_coefs' if quantity == 'head' else 'eff_coefs'
+        values = _batch_polyval(fit[key][rows], q2d / fit['q_scale'][rows, None])
+        if not extrapolate:
+            outside = (q2d < fit['q_min'][rows, None]) | (q2d > fit['q_max'][rows, None])
+            values = np.where(outside, np.nan, values)
+    else:
+        key = 'head_knots' if quantity == 'head' else 'eff_knots'
+        values = _batch_interp(q2d, fit['Q'][rows], fit[key][rows], fit['counts'][rows],
+                               extrapolate=extrapolate)
+
+    return values.reshape(q.shape)
+
+def polynomial_coefficients(fit, rotor, quantity='head'):
+    """Retorna os coeficientes do polinômio ajustado em unidades reais de vazão (potência crescente)."""
+    i = fit['index'][rotor]
+    key = 'head_coefs' if quantity == 'head' else 'eff_coefs'
+    return fit[key][i] / fit['q_scale'][i] ** np.arange(fit[key].shape[1])
+
+def _format_polynomial(coefs, symbol):
+    """Formata coeficientes (potência crescente) como equação legível, ex.: H = a + b×Q + c×Q²."""
+    superscripts = {2: "²", 3: "³", 4: "⁴"}
+    terms = [f"{coefs[0]:.4g}"]
+    for k, c in enumerate(coefs[1:], start=1):
+        sign = "-" if c < 0 else "+"
+        power = "Q" if k == 1 else f"Q{superscripts[k]}"
+        terms.append(f"{sign} {abs(c):.4g} × {power}")
+    return f"{symbol} = " + " ".join(terms)
+
+class FittedCurve:
+    """
+    Curva ajustada de um único rotor com a mesma interface usada de interp1d
+    (objeto chamável com o atributo x contendo o domínio dos dados).
+    """
+    def __init__(self, fit, rotor, quantity='head', extrapolate=True):
+        self.fit = fit
+        self.row = fit['index'][rotor]
+        self.quantity = quantity
+        self.extrapolate = extrapolate
+        self.x = fit['Q'][self.row, :fit['counts'][self.row]]
+
+    def __call__(self, q):
+        q = np.asarray(q, dtype=float)
+        values = evaluate_rotor_curves(self.fit, q.reshape(1, -1), self.quantity,
+                                       rows=[self.row], extrapolate=self.extrapolate)
+        return values.reshape(q.shape)
+
+# Faixa de operação preferencial (POR) como fração da vazão do BEP
+PREFERRED_OPERATING_REGION = (0.7, 1.2)
+
+def find_best_efficiency_points(fit, grid_points=512, por_range=PREFERRED_OPERATING_REGION):
+    """
+    Localiza o ponto de melhor eficiência (BEP) na curva ajustada de todos os rotores.
+
+    A eficiência é avaliada em uma grade no domínio de cada rotor (todas as linhas de
+    uma só vez) e o máximo é refinado pelo vértice da parábola que passa pelo ponto da
+    grade e seus dois vizinhos, exato para curvas quadráticas.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        grid_points: Número de pontos da grade de busca
+        por_range: Limites da faixa preferencial como fração da vazão do BEP
+
+    Returns:
+        Dicionário com arrays por rotor: vazão, altura e eficiência do BEP, limites
+        da faixa preferencial e indicação de máximo no limite dos dados
+    """
+    names = fit['names']
+    n = len(names)
+    if n == 0:
+        empty = np.zeros(0)
+        return {'names': names, 'index': {}, 'q_bep': empty, 'h_bep': empty, 'eff_bep': empty,
+                'por_min': empty, 'por_max': empty, 'at_boundary': np.zeros(0, dtype=bool)}
+
+    rows = np.arange(n)
+    t = np.linspace(0.0, 1.0, grid_points)
+    span = fit['q_max'] - fit['q_min']
+    q_grid = fit['q_min'][:, None] + span[:, None] * t
+    eff = evaluate_rotor_curves(fit, q_grid, 'efficiency')
+
+    i_max = np.argmax(eff, axis=1)
+    at_boundary = (i_max == 0) | (i_max == grid_points - 1)
+
+    # Vértice da parábola pelos três pontos vizinhos (deslocamento em passos da grade)
+    i_c = np.clip(i_max, 1, grid_points - 2)
+    e0 = eff[rows, i_c - 1]
+    e1 = eff[rows, i_c]
+    e2 = eff[rows, i_c + 1]
+    denom = e0 - 2.0 * e1 + e2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        offset = np.where(denom < 0, 0.5 * (e0 - e2) / denom, 0.0)
+    offset = np.clip(offset, -1.0, 1.0)
+
+    step = span / (grid_points - 1)
+    q_bep = np.where(at_boundary, q_grid[rows, i_max], q_grid[rows, i_c] + offset * step)
+
+    eff_bep = evaluate_rotor_curves(fit, q_bep, 'efficiency')
+    h_bep = evaluate_rotor_curves(fit, q_bep, 'head')
+
+    return {
+        'names': names,
+        'index': fit['index'],
+        'q_bep': q_bep,
+        'h_bep': h_bep,
+        'eff_bep': eff_bep,
+        'por_min': q_bep * por_range[0],
+        'por_max': q_bep * por_range[1],
+        'at_boundary': at_boundary,
+    }
+
+def _annotate_intersections_with_bep(intersections, bep):
+    """Acrescenta a cada ponto de operação a fração da vazão do BEP e se está na faixa preferencial."""
+    for point in intersections:
+        i = bep['index'].get(point['rotor'])
+        if i is None or bep['q_bep'][i] <= 0:
+            point['fracao_bep'] = None
+            point['dentro_por'] = None
+            continue
+        point['fracao_bep'] = point['vazao'] / float(bep['q_bep'][i])
+        point['dentro_por'] = bool(bep['por_min'][i] <= point['vazao'] <= bep['por_max'][i])
+    return intersections
+
+# Massa específica da água (kg/m³) e aceleração da gravidade (m/s²)
+WATER_DENSITY = 997.0
+GRAVITY = 9.81
+
+# Potências nominais padronizadas de motores IEC (kW) e rendimento nominal IE3, 4 polos (%)
+IEC_MOTOR_SIZES_KW = (0.12, 0.18, 0.25, 0.37, 0.55, 0.75, 1.1, 1.5, 2.2, 3.0, 4.0, 5.5, 7.5, 11.0, 15.0,
+                      18.5, 22.0, 30.0, 37.0, 45.0, 55.0, 75.0, 90.0, 110.0, 132.0, 160.0, 200.0, 250.0,
+                      315.0, 355.0, 400.0, 450.0, 500.0)
+IEC_MOTOR_EFFICIENCY = (64.8, 69.9, 73.5, 77.3, 80.8, 82.5, 84.1, 85.3, 86.7, 87.7, 88.6, 89.6, 90.4, 91.4,
+                        92.1, 92.6, 93.0, 93.6, 93.9, 94.2, 94.6, 95.0, 95.2, 95.4, 95.6, 95.8, 96.0, 96.0,
+                        96.0, 96.0, 96.0, 96.0, 96.0)
+# Rendimento do motor em carga parcial, relativo ao nominal (carga = P_eixo / P_nominal)
+MOTOR_LOAD_POINTS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.25)
+MOTOR_PART_LOAD_FACTOR = (0.78, 0.92, 0.98, 1.0, 1.0, 0.99)
+# Fator de serviço do motor: a potência no eixo pode chegar a P_nominal × fator em toda a curva
+MOTOR_SERVICE_FACTOR = 1.15
+# Pontos da curva de potência de cada rotor no relatório
+POWER_CURVE_POINTS = 50
+
+def pump_power(q, h, efficiency, density=WATER_DENSITY):
+    """
+    Potências hidráulica e no eixo em lote: P = ρ·g·Q·H e P_eixo = P / η.
+
+    Args:
+        q: Vazões (m³/h)
+        h: Alturas (m)
+        efficiency: Eficiências da bomba (%)
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Tupla (potência hidráulica, potência no eixo) em W, com a forma comum das entradas;
+        a potência no eixo é NaN onde a eficiência não é positiva
+    """
+    q, h, efficiency = np.broadcast_arrays(np.asarray(q, dtype=float), np.asarray(h, dtype=float),
+                                           np.asarray(efficiency, dtype=float))
+    hydraulic = density * GRAVITY * (q / 3600) * h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shaft = np.where(efficiency > 0, hydraulic / (efficiency / 100), np.nan)
+    return hydraulic, shaft
+
+def motor_efficiency(shaft_power, rated_kw):
+    """
+    Rendimento do motor (fração) na carga dada pela potência no eixo (W), a partir do
+    rendimento nominal do tamanho IEC e da curva de carga parcial.
+    """
+    rated_kw = np.asarray(rated_kw, dtype=float)
+    nominal = np.interp(rated_kw, IEC_MOTOR_SIZES_KW, IEC_MOTOR_EFFICIENCY) / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        load = np.asarray(shaft_power, dtype=float) / (rated_kw * 1000)
+    return nominal * np.interp(load, MOTOR_LOAD_POINTS, MOTOR_PART_LOAD_FACTOR)
+
+def motor_input_power(shaft_power, rated_kw):
+    """Potência elétrica absorvida pelo motor (W); NaN onde a potência no eixo ou o motor não existem"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.asarray(shaft_power, dtype=float) / motor_efficiency(shaft_power, rated_kw)
+
+def select_motor_size(peak_shaft_power, service_factor=MOTOR_SERVICE_FACTOR):
+    """
+    Menor motor IEC cuja potência nominal × fator de serviço cobre a potência máxima no eixo.
+
+    Args:
+        peak_shaft_power: Potência máxima no eixo de cada rotor em toda a faixa de vazão (W)
+        service_factor: Fator de serviço do motor (>= 1)
+
+    Returns:
+        Array de potências nominais (kW); NaN se nenhum tamanho padronizado atende
+    """
+    if service_factor < 1:
+        raise ValueError("O fator de serviço deve ser maior ou igual a 1")
+    sizes = np.asarray(IEC_MOTOR_SIZES_KW)
+    required = np.asarray(peak_shaft_power, dtype=float) / 1000 / service_factor
+    index = np.searchsorted(sizes, np.nan_to_num(required, nan=np.inf) * (1 - 1e-9))
+    return np.where(index < len(sizes), sizes[np.minimum(index, len(sizes) - 1)], np.nan)
+
+def compute_power_curves(fit, points=POWER_CURVE_POINTS, service_factor=MOTOR_SERVICE_FACTOR,
+                         density=WATER_DENSITY):
+    """
+    Curvas de potência e dimensionamento do motor de todos os rotores ajustados em lote.
+
+    O motor é escolhido pela potência máxima no eixo em toda a faixa de vazão de cada
+    rotor (não apenas no ponto de operação), para que a bomba não sobrecarregue o motor
+    ao operar à direita do ponto de projeto.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        points: Número de vazões por rotor
+        service_factor: Fator de serviço do motor
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com 'names', as curvas 'vazao', 'altura', 'eficiencia', 'hidraulica',
+        'eixo' e 'motor' (W) de forma (n_rotores, points) e, por rotor, 'pico' (W),
+        'vazao_pico', 'motor_kw', 'carga_max' (fração) e 'rendimento_motor' na carga máxima
+    """
+    n = len(fit['names'])
+    q = fit['q_min'][:, None] + (fit['q_max'] - fit['q_min'])[:, None] * np.linspace(0, 1, points)[None, :]
+    h = np.maximum(evaluate_rotor_curves(fit, q, 'head'), 0)
+    eff = np.clip(evaluate_rotor_curves(fit, q, 'efficiency'), 0, 100)
+    hydraulic, shaft = pump_power(q, h, eff, density)
+
+    # Potência máxima no eixo de cada rotor (rotores sem eficiência válida ficam com NaN)
+    valid = ~np.isnan(shaft)
+    peak_index = np.where(valid, shaft, -np.inf).argmax(axis=1) if n else np.zeros(0, dtype=int)
+    peak = np.where(valid.any(axis=1), shaft[np.arange(n), peak_index], np.nan)
+    rated_kw = select_motor_size(peak, service_factor)
+    return {
+        'names': fit['names'],
+        'vazao': q, 'altura': h, 'eficiencia': eff,
+        'hidraulica': hydraulic, 'eixo': shaft,
+        'motor': motor_input_power(shaft, rated_kw[:, None]),
+        'pico': peak,
+        'vazao_pico': np.where(np.isnan(peak), np.nan, q[np.arange(n), peak_index]),
+        'motor_kw': rated_kw,
+        'carga_max': peak / (rated_kw * 1000),
+        'rendimento_motor': motor_efficiency(peak, rated_kw) * 100,
+        'fator_servico': service_factor,
+    }
+
+def _combined_equivalent_efficiency(efficiency):
+    """
+    Eficiência equivalente (%) de um ponto de bombas combinadas em paralelo ("a%:b% (eq%)"),
+    ou NaN para textos sem o valor equivalente (projetos anteriores).
+    """
+    match = re.search(r"\(([\d.,]+)%\)", efficiency)
+    return float(match.group(1).replace(',', '.')) if match else np.nan
+
+def _numeric_efficiencies(efficiencies):
+    """Eficiências (%) como array: equivalente nos pontos combinados e NaN nos valores inválidos"""
+    values = []
+    for efficiency in efficiencies:
+        if _is_combined_efficiency(efficiency):
+            values.append(_combined_equivalent_efficiency(efficiency))
+        elif isinstance(efficiency, (int, float)):
+            values.append(float(efficiency))
+        else:
+            values.append(np.nan)
+    return np.array(values, dtype=float)
+
+# Fluidos: propriedades relativas à água na mesma temperatura (massa específica e viscosidade
+# cinemática); "Personalizado" usa os valores informados. A temperatura padrão de 25 °C
+# reproduz os 997 kg/m³ usados antes do modelo de fluido.
+FLUID_PRESETS = {
+    "Água": {'densidade_relativa': 1.0, 'viscosidade_relativa': 1.0},
+    "Salmoura (NaCl 20%)": {'densidade_relativa': 1.15, 'viscosidade_relativa': 1.9},
+    "Água com Glicol (30%)": {'densidade_relativa': 1.04, 'viscosidade_relativa': 2.4},
+    "Lama Leve (10% sólidos em volume)": {'densidade_relativa': 1.16, 'viscosidade_relativa': 3.0},
+    "Personalizado": None,
+}
+FLUID_DEFAULTS = {'fluido': "Água", 'temperatura': 25.0, 'densidade': 1000.0, 'viscosidade': 1.0,
+                  'correcao_viscosidade': True}
+FLUID_FIELDS = [
+    ('temperatura', "Temperatura (°C)"),
+    ('densidade', "Massa específica - Personalizado (kg/m³)"),
+    ('viscosidade', "Viscosidade cinemática - Personalizado (cSt)"),
+]
+# Correção de viscosidade (ANSI/HI 9.6.7): sem correção para B <= 1, método válido até B = 40
+VISCOSITY_B_MIN = 1.0
+VISCOSITY_B_MAX = 40.0
+
+def water_density(temperature):
+    """Massa específica da água (kg/m³) pela equação de Kell (0 a 100 °C)"""
+    t = np.asarray(temperature, dtype=float)
+    return ((999.83952 + 16.945176 * t - 7.9870401e-3 * t ** 2 - 46.170461e-6 * t ** 3
+             + 105.56302e-9 * t ** 4 - 280.54253e-12 * t ** 5) / (1 + 16.879850e-3 * t))
+
+def water_viscosity(temperature):
+    """Viscosidade cinemática da água (cSt) pela equação de Vogel para a viscosidade dinâmica"""
+    t = np.asarray(temperature, dtype=float)
+    dynamic = np.exp(-3.7188 + 578.919 / (t + 273.15 - 137.546))  # mPa·s
+    return dynamic / (water_density(t) / 1000)
+
+def fluid_properties(settings=None):
+    """
+    Massa específica e viscosidade cinemática do fluido bombeado.
+
+    Args:
+        settings: Fluido do projeto (ver FLUID_DEFAULTS); None para água a 25 °C (WATER_DENSITY)
+
+    Returns:
+        Dicionário com 'densidade' (kg/m³) e 'viscosidade' (cSt)
+    """
+    if not settings:
+        return {'densidade': WATER_DENSITY, 'viscosidade': float(water_viscosity(FLUID_DEFAULTS['temperatura']))}
+    settings = {**FLUID_DEFAULTS, **settings}
+    if settings['fluido'] not in FLUID_PRESETS:
+        raise ValueError(f"Fluido desconhecido: {settings['fluido']}")
+    preset = FLUID_PRESETS[settings['fluido']]
+    if preset is None:
+        density, viscosity = float(settings['densidade']), float(settings['viscosidade'])
+    else:
+        temperature = settings['temperatura']
+        density = float(water_density(temperature)) * preset['densidade_relativa']
+        viscosity = float(water_viscosity(temperature)) * preset['viscosidade_relativa']
+    if density <= 0 or viscosity <= 0:
+        raise ValueError("Massa específica e viscosidade devem ser positivas")
+    return {'densidade': density, 'viscosidade': viscosity}
+
+def viscosity_correction_factors(q, h, q_bep, h_bep, rpm, viscosity):
+    """
+    Fatores de correção de vazão, altura e eficiência para líquidos viscosos
+    (ANSI/HI 9.6.7), a partir das curvas com água.
+
+    B = 26,6·ν^0,5·H_bep^0,0625 / (Q_bep^0,375·N^0,25), com Q em m³/h, H em m e ν em cSt;
+    C_Q = 2,71^(-0,165·(log B)^3,15), C_H = 1 - (1 - C_Q)·(Q/Q_bep)^0,75 e
+    C_η = B^(-0,0547·B^0,69). Abaixo de B = 1 os fatores são 1; acima de 40 o B é
+    limitado ao máximo do método.
+
+    Args:
+        q, h: Vazões (m³/h) e alturas (m) com água, forma (n, m)
+        q_bep, h_bep, rpm: BEP com água e rotação de cada rotor, forma (n,)
+        viscosity: Viscosidade cinemática (cSt)
+
+    Returns:
+        Tupla (C_Q, C_H, C_η, B), os três primeiros com a forma de q e B de forma (n,)
+    """
+    q_bep, h_bep, rpm = (np.asarray(a, dtype=float) for a in (q_bep, h_bep, rpm))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        b = 26.6 * viscosity ** 0.5 * h_bep ** 0.0625 / (q_bep ** 0.375 * rpm ** 0.25)
+    b = np.where(np.isfinite(b), np.clip(b, VISCOSITY_B_MIN, VISCOSITY_B_MAX), VISCOSITY_B_MIN)
+    c_q = 2.71 ** (-0.165 * np.log10(b) ** 3.15)
+    c_eta = b ** (-(0.0547 * b ** 0.69))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        flow_ratio = np.where(q_bep[:, None] > 0, np.asarray(q, dtype=float) / q_bep[:, None], 0.0)
+    c_h = 1 - (1 - c_q[:, None]) * np.maximum(flow_ratio, 0) ** 0.75
+    shape = np.shape(q)
+    return (np.broadcast_to(c_q[:, None], shape), c_h, np.broadcast_to(c_eta[:, None], shape), b)
+
+def correct_rotor_data_for_viscosity(rotor_data, rotor_rpm, viscosity):
+    """
+    Converte as curvas de água de todos os rotores para o fluido viscoso em lote.
+
+    O BEP de cada rotor vem das curvas com água (ajuste linear dos pontos); os fatores
+    são aplicados ponto a ponto e o NPSHr é mantido. Rotores combinados e rotores sem
+    BEP permanecem inalterados.
+
+    Args:
+        rotor_data: Dicionário com os dados dos rotores com água
+        rotor_rpm: Dicionário {rotor: RPM} (1750 para rotores ausentes)
+        viscosity: Viscosidade cinemática (cSt)
+
+    Returns:
+        Tupla (rotor_data corrigido, dicionário {rotor: (B, C_Q, C_η)} dos rotores corrigidos)
+    """
+    fit = fit_rotor_curves(rotor_data, model='linear')
+    bep = find_best_efficiency_points(fit)
+    names = bep['names']
+    if not names:
+        return rotor_data, {}
+
+    # Pontos originais de cada rotor (inclusive vazões repetidas) em um array retangular
+    counts = np.array([len(rotor_data[name]) for name in names])
+    m = int(counts.max())
+    Q = np.zeros((len(names), m))
+    H = np.zeros((len(names), m))
+    for i, name in enumerate(names):
+        Q[i, :counts[i]] = [p['vazao'] for p in rotor_data[name]]
+        H[i, :counts[i]] = [p['altura'] for p in rotor_data[name]]
+    rpm = np.array([rotor_rpm.get(name, 1750) for name in names], dtype=float)
+    c_q, c_h, c_eta, b = viscosity_correction_factors(Q, H, bep['q_bep'], bep['h_bep'],
+                                                      rpm, viscosity)
+
+    corrected = dict(rotor_data)
+    factors = {}
+    for i, name in enumerate(names):
+        corrected[name] = [dict(p, vazao=float(p['vazao'] * c_q[i, k]), altura=float(p['altura'] * c_h[i, k]),
+                                efficiency=float(p['efficiency'] * c_eta[i, k]))
+                           for k, p in enumerate(rotor_data[name])]
+        factors[name] = (float(b[i]), float(c_q[i, 0]), float(c_eta[i, 0]))
+    return corrected, factors
+
+def fluid_rotor_data(rotor_data, rotor_rpm, fluid_settings):
+    """
+    Curvas dos rotores para o fluido do projeto: as curvas de água corrigidas pela
+    viscosidade quando a correção está ativa, ou as próprias curvas de água.
+
+    Ponto único de entrada da correção para o relatório, os gráficos e as análises,
+    para que todos partam dos mesmos pontos de operação.
+
+    Returns:
+        Tupla (rotor_data, dicionário {rotor: (B, C_Q, C_η)} dos rotores corrigidos,
+        propriedades do fluido de fluid_properties)
+
+    Raises:
+        ValueError: Fluido inválido
+    """
+    fluid = fluid_properties(fluid_settings)
+    if fluid_settings and fluid_settings.get('correcao_viscosidade', True):
+        rotor_data, factors = correct_rotor_data_for_viscosity(rotor_data, rotor_rpm or {}, fluid['viscosidade'])
+        return rotor_data, factors, fluid
+    return rotor_data, {}, fluid
+
+def _fluid_density(window):
+    """Massa específica do fluido do projeto da janela (água a 25 °C sem configuração)"""
+    return fluid_properties(getattr(window, 'fluid_settings', None))['densidade']
+
+def _fluid_rotor_data(window, rotor_data):
+    """Curvas dos rotores da janela para o fluido do projeto (ver fluid_rotor_data)"""
+    widget = getattr(window, 'image_widget', None)
+    rotor_rpm = widget.rotor_rpm if widget is not None else getattr(window, 'rotor_rpm', {})
+    return fluid_rotor_data(rotor_data, rotor_rpm, getattr(window, 'fluid_settings', None))[0]
+
+def _show_fluid_dialog(parent, rotor_data, rotor_rpm, fluid_settings):
+    """
+    Diálogo do fluido bombeado do projeto, com as propriedades na temperatura informada e
+    os fatores de correção de viscosidade de cada rotor.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores com água (pode ser vazio)
+        rotor_rpm: Dicionário {rotor: RPM}
+        fluid_settings: Configuração atual (ou None para água)
+
+    Returns:
+        Fluido para o projeto, None para voltar à água a 25 °C, ou fluid_settings se cancelado
+    """
+    settings = {**FLUID_DEFAULTS, **(fluid_settings or {})}
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Fluido Bombeado")
+    dlg.setMinimumSize(700, 500)
+    layout = QVBoxLayout()
+
+    row = QHBoxLayout()
+    row.addWidget(QLabel("Fluido"), 1)
+    fluid_combo = QComboBox()
+    fluid_combo.addItems(list(FLUID_PRESETS))
+    fluid_combo.setCurrentText(settings['fluido'])
+    row.addWidget(fluid_combo, 1)
+    layout.addLayout(row)
+
+    inputs = {}
+    for key, label in FLUID_FIELDS:
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label), 1)
+        inputs[key] = QLineEdit(f"{settings[key]:g}".replace('.', ','))
+        inputs[key].setValidator(QDoubleValidator(0, 100000, 6))
+        row.addWidget(inputs[key], 1)
+        layout.addLayout(row)
+
+    correction_check = QCheckBox("Corrigir as curvas pela viscosidade (ANSI/HI 9.6.7)")
+    correction_check.setChecked(bool(settings['correcao_viscosidade']))
+    layout.addWidget(correction_check)
+
+    btn_calculate = QPushButton("Calcular Propriedades e Fatores")
+    layout.addWidget(btn_calculate)
+    summary_label = QLabel()
+    layout.addWidget(summary_label)
+
+    headers = ["Rotor", "RPM", "Parâmetro B", "C_Q", "C_H no BEP", "C_η"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def read_settings():
+        values = {key: float(field.text().replace(',', '.')) for key, field in inputs.items()}
+        if not 0 <= values['temperatura'] <= 100:
+            raise ValueError("A temperatura deve estar entre 0 e 100 °C")
+        values['fluido'] = fluid_combo.currentText()
+        values['correcao_viscosidade'] = correction_check.isChecked()
+        fluid_properties(values)  # Valida massa específica e viscosidade
+        return values
+
+    def calculate():
+        try:
+            values = read_settings()
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+        fluid = fluid_properties(values)
+        summary_label.setText(f"Massa específica: {fluid['densidade']:.1f} kg/m³; "
+                              f"viscosidade cinemática: {fluid['viscosidade']:.3f} cSt")
+        if not rotor_data:
+            table.setRowCount(0)
+            return
+        _, factors = correct_rotor_data_for_viscosity(rotor_data, rotor_rpm, fluid['viscosidade'])
+        table.setRowCount(len(factors))
+        for i, (name, (b, c_q, c_eta)) in enumerate(factors.items()):
+            row_values = [name, f"{rotor_rpm.get(name, 1750):.0f}", f"{b:.2f}", f"{c_q:.3f}", f"{c_q:.3f}",
+                          f"{c_eta:.3f}"]
+            for col, value in enumerate(row_values):
+                table.setItem(i, col, QTableWidgetItem(value))
+
+    btn_calculate.clicked.connect(calculate)
+
+    layout.addWidget(QLabel("A massa específica vale para todas as potências do projeto; a correção de "
+                            "viscosidade é aplicada às curvas de água no relatório."))
+    buttons = QDialogButtonBox()
+    btn_remove = buttons.addButton("Usar Água (Padrão)", QDialogButtonBox.DestructiveRole)
+    buttons.addButton(QDialogButtonBox.Ok)
+    buttons.addButton(QDialogButtonBox.Cancel)
+    removed = []
+    btn_remove.clicked.connect(lambda: (removed.append(True), dlg.accept()))
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return fluid_settings
+    if removed:
+        return None
+    try:
+        return read_settings()
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Valores inválidos: {str(e)}")
+        return fluid_settings
+
+# NPSH: expoente da lei de afinidade (NPSHr ∝ rotação²), valores padrão do cálculo do NPSH
+# disponível (pressão absoluta na superfície do reservatório de sucção, temperatura da água,
+# cota da superfície acima do eixo da bomba e perda na sucção h = K·Q²) e margens mínimas
+# (em metros e como razão NPSHa/NPSHr, na linha da ANSI/HI 9.6.1)
+NPSH_AFFINITY_EXPONENT = 2
+NPSH_DEFAULTS = {'pressao_kpa': 101.325, 'temperatura': 20.0, 'cota_succao': 0.0,
+                 'k_succao': 0.0, 'margem_min': 0.5, 'razao_min': 1.1}
+NPSH_FIELDS = [
+    ('pressao_kpa', "Pressão absoluta na superfície (kPa)"),
+    ('temperatura', "Temperatura da água (°C)"),
+    ('cota_succao', "Cota da superfície acima do eixo (m, negativa em sucção negativa)"),
+    ('k_succao', "Perda na sucção K (m/(m³/h)²)"),
+    ('margem_min', "Margem mínima NPSHa - NPSHr (m)"),
+    ('razao_min', "Razão mínima NPSHa / NPSHr"),
+]
+
+def water_vapor_pressure(temperature):
+    """Pressão de vapor da água (kPa) pela equação de Antoine (válida de 1 a 100 °C)"""
+    temperature = np.asarray(temperature, dtype=float)
+    return 10 ** (8.07131 - 1730.63 / (233.426 + temperature)) * 0.133322
+
+def npsh_available(q, settings, density=WATER_DENSITY):
+    """
+    NPSH disponível na sucção para várias vazões.
+
+    NPSHa = (p - p_vapor) / (ρ·g) + z - K·Q²
+
+    Args:
+        q: Vazões (m³/h), qualquer forma
+        settings: Condições de sucção (ver NPSH_DEFAULTS)
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Array de NPSHa (m) com a forma de q
+    """
+    settings = {**NPSH_DEFAULTS, **settings}
+    q = np.asarray(q, dtype=float)
+    pressure_head = ((settings['pressao_kpa'] - water_vapor_pressure(settings['temperatura'])) * 1000
+                     / (density * GRAVITY))
+    return pressure_head + settings['cota_succao'] - settings['k_succao'] * q ** 2
+
+def npsh_margin(npshr, npsha, settings):
+    """
+    Margem de NPSH nos pontos de operação.
+
+    Returns:
+        Tupla (margem NPSHa - NPSHr em m, razão NPSHa/NPSHr, máscara de margem suficiente);
+        NaN/False onde não há NPSHr
+    """
+    settings = {**NPSH_DEFAULTS, **settings}
+    margin = npsha - npshr
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = np.where(npshr > 0, npsha / npshr, np.nan)
+        ok = (margin >= settings['margem_min']) & (ratio >= settings['razao_min'])
+    return margin, ratio, ok
+
+def _annotate_intersections_with_npsh(intersections, fit, npsh_settings, density=WATER_DENSITY):
+    """
+    Acrescenta a cada ponto de operação o NPSHr, o NPSHa e a margem, avaliados para
+    todos os pontos em uma única chamada (None nos rotores sem curva NPSHr).
+    """
+    if not intersections:
+        return intersections
+    rows = np.array([fit['index'][point['rotor']] for point in intersections])
+    q = np.array([point['vazao'] for point in intersections], dtype=float)
+    npshr = evaluate_rotor_curves(fit, q, 'npsh', rows=rows)
+    npsha = npsh_available(q, npsh_settings, density)
+    margin, ratio, ok = npsh_margin(npshr, npsha, npsh_settings)
+    for k, point in enumerate(intersections):
+        has_curve = not np.isnan(npshr[k])
+        point['npshr'] = float(npshr[k]) if has_curve else None
+        point['npsha'] = float(npsha[k])
+        point['margem_npsh'] = float(margin[k]) if has_curve else None
+        point['razao_npsh'] = float(ratio[k]) if has_curve and not np.isnan(ratio[k]) else None
+        point['npsh_ok'] = bool(ok[k]) if has_curve else None
+    return intersections
+
+def _show_npsh_dialog(parent, rotor_data, system_curve_settings, npsh_settings):
+    """
+    Diálogo das condições de sucção para o cálculo do NPSH disponível, com a margem
+    de NPSH no ponto de operação de cada rotor na curva do sistema 1.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores (NPSHr na chave 'npshr')
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+        npsh_settings: Configuração atual (ou None)
+
+    Returns:
+        Condições de sucção para o relatório, None para remover, ou npsh_settings se cancelado
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return npsh_settings
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return npsh_settings
+    settings = {**NPSH_DEFAULTS, **(npsh_settings or {})}
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("NPSH Disponível e Margem de Cavitação")
+    dlg.setMinimumSize(900, 550)
+    layout = QVBoxLayout()
+
+    inputs = {}
+    for key, label in NPSH_FIELDS:
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label), 1)
+        inputs[key] = QLineEdit(f"{settings[key]:g}".replace('.', ','))
+        inputs[key].setValidator(QDoubleValidator(-1000, 100000, 6))
+        row.addWidget(inputs[key], 1)
+        layout.addLayout(row)
+
+    missing = [name for i, name in enumerate(fit['names']) if fit['npsh_counts'][i] < 2]
+    if missing:
+        layout.addWidget(QLabel("Rotores sem curva NPSHr (mínimo de 2 pontos): " + ", ".join(missing)))
+
+    btn_calculate = QPushButton("Calcular na Curva do Sistema 1")
+    layout.addWidget(btn_calculate)
+    summary_label = QLabel()
+    layout.addWidget(summary_label)
+
+    headers = ["Rotor", "Vazão (m³/h)", "NPSHr (m)", "NPSHa (m)", "Margem (m)", "NPSHa / NPSHr", "Situação"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def read_settings():
+        values = {key: float(field.text().replace(',', '.')) for key, field in inputs.items()}
+        if not 1 <= values['temperatura'] <= 100:
+            raise ValueError("A temperatura deve estar entre 1 e 100 °C")
+        if values['pressao_kpa'] <= 0 or values['k_succao'] < 0:
+            raise ValueError("A pressão deve ser positiva e a perda na sucção não negativa")
+        return values
+
+    def calculate():
+        try:
+            values = read_settings()
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+        summary_label.setText(f"Pressão de vapor: {float(water_vapor_pressure(values['temperatura'])):.3f} kPa; "
+                              f"NPSHa sem vazão: {float(npsh_available(0.0, values)):.2f} m")
+        if not system_curve_settings:
+            QMessageBox.warning(dlg, "Erro", "Configure a Curva do Sistema 1 para avaliar os pontos de operação!")
+            return
+        system_curve = _calculate_system_curve(max_rotor_q=float(fit['q_max'].max()) * 1.1,
+                                               **system_curve_settings)
+        if system_curve is None:
+            return
+        operating = solve_operating_points(fit, system_curve, refine_points=SELECTION_REFINE_POINTS)
+        npsha = npsh_available(operating['vazao'], values, _fluid_density(parent))
+        margin, ratio, ok = npsh_margin(operating['npshr'], npsha, values)
+        table.setRowCount(len(fit['names']))
+        for i, name in enumerate(fit['names']):
+            if np.isnan(operating['vazao'][i]):
+                row_values = [name, "Sem interseção", "-", "-", "-", "-", "-"]
+            elif np.isnan(operating['npshr'][i]):
+                row_values = [name, f"{operating['vazao'][i]:.2f}", "-", f"{npsha[i]:.2f}", "-", "-",
+                              "Sem curva NPSHr"]
+            else:
+                row_values = [name, f"{operating['vazao'][i]:.2f}", f"{operating['npshr'][i]:.2f}",
+                              f"{npsha[i]:.2f}", f"{margin[i]:.2f}", f"{ratio[i]:.2f}",
+                              "OK" if ok[i] else "Risco de cavitação"]
+            for col, value in enumerate(row_values):
+                table.setItem(i, col, QTableWidgetItem(value))
+
+    btn_calculate.clicked.connect(calculate)
+
+    layout.addWidget(QLabel("A margem de NPSH é incluída na aba de interseções do relatório para as duas curvas."))
+    buttons = QDialogButtonBox()
+    btn_remove = buttons.addButton("Remover do Relatório", QDialogButtonBox.DestructiveRole)
+    buttons.addButton(QDialogButtonBox.Ok)
+    buttons.addButton(QDialogButtonBox.Cancel)
+    removed = []
+    btn_remove.clicked.connect(lambda: (removed.append(True), dlg.accept()))
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return npsh_settings
+    if removed:
+        return None
+    try:
+        return read_settings()
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Valores inválidos: {str(e)}")
+        return npsh_settings
+
+def _first_crossing(q_grid, diff, has_range):
+    """
+    Localiza a primeira mudança de sinal de cada linha de diff e refina a raiz por
+    interpolação linear dentro do segmento encontrado.
+
+    Returns:
+        Tupla (vazão da raiz com NaN onde não há cruzamento, máscara de cruzamento encontrado)
+    """
+    crossing = diff[:, :-1] * diff[:, 1:] <= 0
+    found = crossing.any(axis=1) & has_range
+    i = np.argmax(crossing, axis=1)
+    line = np.arange(len(diff))
+
+    q1, q2 = q_grid[line, i], q_grid[line, i + 1]
+    d1, d2 = diff[line, i], diff[line, i + 1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        q_root = np.where(np.abs(d1 - d2) < 1e-10, q1, q1 - d1 * (q2 - q1) / (d2 - d1))
+    return np.where(found, q_root, np.nan), found
+
+def _all_crossings(q_grid, diff):
+    """
+    Localiza todas as raízes de cada linha de diff: os nós em que diff é zero e as
+    mudanças de sinal estritas entre nós vizinhos, refinadas por interpolação linear.
+    Uma raiz exatamente sobre um nó da grade é contada uma única vez.
+
+    Returns:
+        Tupla (linhas, vazões das raízes), ordenada por linha e vazão crescente
+    """
+    zero = diff == 0
+    d1, d2 = diff[:, :-1], diff[:, 1:]
+    strict = ((d1 < 0) & (d2 > 0)) | ((d1 > 0) & (d2 < 0))
+
+    zero_rows, zero_cols = np.nonzero(zero)
+    cross_rows, cross_cols = np.nonzero(strict)
+    q1, q2 = q_grid[cross_rows, cross_cols], q_grid[cross_rows, cross_cols + 1]
+    f1, f2 = d1[cross_rows, cross_cols], d2[cross_rows, cross_cols]
+
+    rows = np.concatenate([zero_rows, cross_rows])
+    q_root = np.concatenate([q_grid[zero_rows, zero_cols], q1 - f1 * (q2 - q1) / (f2 - f1)])
+    order = np.lexsort((q_root, rows))
+    return rows[order], q_root[order]
+
+def solve_operating_points(fit, system_curve_data, grid_points=1000, rows=None, refine_points=0,
+                           system_scale=None):
+    """
+    Resolve em lote o ponto de operação (primeira interseção com a curva do sistema)
+    de vários rotores de uma só vez.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        system_curve_data: Dicionário da curva do sistema (chaves 'Q' e 'H')
+        grid_points: Número de pontos da grade de busca de cada rotor
+        rows: Índices dos rotores a resolver (padrão: todos)
+        refine_points: Se maior que zero, a raiz é refinada em uma segunda grade com
+            esse número de pontos em torno do segmento encontrado (permite uma grade
+            inicial grossa em catálogos grandes)
+        system_scale: Tupla (fator da altura estática, fator da parcela dinâmica), arrays
+            com um valor por rotor, para uma curva do sistema diferente em cada linha:
+            H = a·H(0) + b·(H(Q) - H(0)) (padrão: a mesma curva para todos)
+
+    Returns:
+        Dicionário com arrays 'vazao', 'altura', 'eficiencia' e 'npshr' por rotor
+        (NaN sem interseção ou sem curva NPSHr)
+    """
+    if rows is None:
+        rows = np.arange(len(fit['names']))
+    rows = np.asarray(rows, dtype=int)
+    n = len(rows)
+    result = {key: np.full(n, np.nan) for key in ('vazao', 'altura', 'eficiencia', 'npshr')}
+    if n == 0:
+        return result
+
+    system_q = np.asarray(system_curve_data['Q'], dtype=float)
+    system_h = np.asarray(system_curve_data['H'], dtype=float)
+
+    # Intervalo comum entre cada rotor e a curva do sistema
+    q_lo = np.maximum(fit['q_min'][rows], system_q.min())
+    q_hi = np.minimum(fit['q_max'][rows], system_q.max())
+    has_range = q_hi > q_lo
+
+    def head_difference(q_grid):
+        system = np.interp(q_grid.ravel(), system_q, system_h).reshape(q_grid.shape)
+        if system_scale is not None:
+            static = np.interp(0.0, system_q, system_h)
+            system = (system_scale[0][:, None] * static
+                      + system_scale[1][:, None] * (system - static))
+        return evaluate_rotor_curves(fit, q_grid, 'head', rows=rows) - system
+
+    t = np.linspace(0.0, 1.0, grid_points)
+    q_grid = q_lo[:, None] + (q_hi - q_lo)[:, None] * t
+    q_op, found = _first_crossing(q_grid, head_difference(q_grid), has_range)
+
+    if refine_points > 0 and found.any():
+        # Segunda grade restrita aos segmentos vizinhos da raiz aproximada
+        step = (q_hi - q_lo) / (grid_points - 1)
+        center = np.where(found, q_op, q_lo)
+        lo = np.maximum(center - step, q_lo)
+        hi = np.minimum(center + step, q_hi)
+        q_fine = lo[:, None] + (hi - lo)[:, None] * np.linspace(0.0, 1.0, refine_points)
+        q_refined, found_refined = _first_crossing(q_fine, head_difference(q_fine), found)
+        q_op = np.where(found_refined, q_refined, q_op)
+
+    result['vazao'] = q_op
+    result['altura'] = evaluate_rotor_curves(fit, np.nan_to_num(q_op), 'head', rows=rows)
+    result['eficiencia'] = evaluate_rotor_curves(fit, np.nan_to_num(q_op), 'efficiency', rows=rows)
+    result['altura'] = np.where(found, result['altura'], np.nan)
+    result['eficiencia'] = np.where(found, result['eficiencia'], np.nan)
+    result['npshr'] = evaluate_rotor_curves(fit, np.nan_to_num(q_op), 'npsh', rows=rows)
+    result['npshr'] = np.where(found, result['npshr'], np.nan)
+    return result
+
+def generate_speed_family(points, base_rpm, rpms, density=WATER_DENSITY):
+    """
+    Gera uma família de curvas por rotação aplicando as leis de afinidade em uma
+    única operação vetorizada (Q·r, H·r², P·r³, NPSHr·r², eficiência constante).
+
+    Os pontos são ordenados por vazão e vazões repetidas mantêm apenas o primeiro
+    ponto (mesmo critério de _pack_rotor_arrays), de modo que cada linha dos arrays
+    pode ser ajustada diretamente por _fit_rotor_arrays.
+
+    Args:
+        points: Pontos do rotor na rotação base [{'vazao', 'altura', 'efficiency'}, ...],
+            com 'npshr' opcional
+        base_rpm: Rotação dos pontos fornecidos
+        rpms: Sequência de rotações da família
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com as rotações, razões e arrays (n_rotações, n_pontos) de vazão,
+        altura, eficiência, potência mecânica e NPSHr (NaN onde não informado)
+    """
+    if base_rpm <= 0:
+        raise ValueError("RPM base deve ser maior que zero")
+    rpms = np.asarray(rpms, dtype=float)
+    if rpms.size == 0 or np.any(rpms <= 0):
+        raise ValueError("As rotações da família devem ser maiores que zero")
+    if not all(isinstance(p['efficiency'], (int, float)) for p in points):
+        raise ValueError("O rotor base precisa de eficiência numérica (rotores combinados não são aceitos)")
+
+    q = np.array([p['vazao'] for p in points], dtype=float)
+    order = np.argsort(q, kind='stable')
+    q, first_idx = np.unique(q[order], return_index=True)
+    if len(q) < 2:
+        raise ValueError("O rotor base precisa de pelo menos 2 vazões distintas")
+    keep = order[first_idx]
+    h = np.array([points[i]['altura'] for i in keep], dtype=float)
+    eff = np.array([points[i]['efficiency'] for i in keep], dtype=float)
+    npshr = np.array([np.nan if points[i].get('npshr') is None else points[i]['npshr'] for i in keep],
+                     dtype=float)
+
+    # Potência mecânica na rotação base: P = ρ·g·Q·H / η
+    power = pump_power(q, h, eff, density)[1]
+
+    r = (rpms / base_rpm)[:, None]
+    return {
+        'base_rpm': float(base_rpm),
+        'rpms': rpms,
+        'ratios': r[:, 0],
+        'vazao': q[None, :] * r,
+        'altura': h[None, :] * r ** 2,
+        'efficiency': np.broadcast_to(eff, (len(rpms), len(eff))).copy(),
+        'potencia_mecanica': power[None, :] * r ** 3,
+        'npshr': npshr[None, :] * r ** NPSH_AFFINITY_EXPONENT,
+    }
+
+def speed_family_arrays(speed_families, rotor_data, rotor_rpm, density=WATER_DENSITY):
+    """
+    Regenera as famílias de rotação a partir das curvas atuais dos rotores base.
+
+    As famílias são guardadas apenas como especificação {'rotor', 'rpms'}; os arrays
+    são refeitos a cada relatório ou gráfico, para acompanhar edições do rotor base,
+    da sua rotação e do fluido. Famílias cujo rotor base não existe mais ou não tem
+    pontos suficientes são ignoradas.
+
+    Args:
+        speed_families: Dicionário {família: {'rotor', 'rpms'}}
+        rotor_data: Dicionário com os dados dos rotores (já corrigidos para o fluido)
+        rotor_rpm: Dicionário {rotor: rpm} das rotações base
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário {família: arrays de generate_speed_family}
+    """
+    families = {}
+    for family_name, spec in (speed_families or {}).items():
+        points = rotor_data.get(spec['rotor'])
+        if not points:
+            logger.warning("Família '%s' ignorada: rotor base '%s' não encontrado", family_name, spec['rotor'])
+            continue
+        try:
+            families[family_name] = generate_speed_family(points, (rotor_rpm or {}).get(spec['rotor'], 1750),
+                                                          spec['rpms'], density)
+        except ValueError as e:
+            logger.warning("Família '%s' ignorada: %s", family_name, e)
+    return families
+
+def speed_family_labels(family_name, family):
+    """Nomes dos rotores de uma família, um por rotação."""
+    return [f"{family_name} @ {rpm:.0f} RPM" for rpm in family['rpms']]
+
+def fit_speed_family(family_name, family, model='poly', degree=3):
+    """
+    Ajusta as curvas de todas as rotações de uma família diretamente sobre os arrays
+    de generate_speed_family (sem passar pelo formato rotor_data). Ver fit_rotor_curves.
+    """
+    counts = np.full(len(family['rpms']), family['vazao'].shape[1], dtype=int)
+    return _fit_rotor_arrays(speed_family_labels(family_name, family), family['vazao'], family['altura'],
+                             family['efficiency'], counts, model, degree)
+
+def speed_family_rotor_data(family_name, family):
+    """Converte uma família de rotações no formato rotor_data, um rotor por rotação."""
+    rotor_data = {}
+    for k, label in enumerate(speed_family_labels(family_name, family)):
+        rotor_data[label] = [
+            {'vazao': float(q), 'altura': float(h), 'efficiency': float(e),
+             'npshr': None if np.isnan(n) else float(n)}
+            for q, h, e, n in zip(family['vazao'][k], family['altura'][k], family['efficiency'][k],
+                                  family['npshr'][k])
+        ]
+    return rotor_data
+
+def _show_speed_family_dialog(parent, rotor_names, rotor_rpm, speed_families):
+    """
+    Diálogo para gerar uma família de rotações de um rotor.
+
+    Returns:
+        Tupla (rotor, lista de rotações) ou None se cancelado
+    """
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Família de Rotações (Leis de Afinidade)")
+    layout = QVBoxLayout()
+
+    layout.addWidget(QLabel("Rotor base:"))
+    rotor_combo = QComboBox()
+    rotor_combo.addItems(rotor_names)
+    layout.addWidget(rotor_combo)
+
+    base_label = QLabel()
+    layout.addWidget(base_label)
+
+    inputs = {}
+    for key, label, default in [('start', "RPM inicial:", "900"),
+                                ('stop', "RPM final:", "1800"),
+                                ('step', "Passo (RPM):", "50")]:
+        row_layout = QHBoxLayout()
+        row_layout.addWidget(QLabel(label))
+        inp = QLineEdit(default)
+        inp.setValidator(QDoubleValidator(1, 100000, 1))
+        row_layout.addWidget(inp)
+        layout.addLayout(row_layout)
+        inputs[key] = inp
+
+    def update_base_label(rotor):
+        base_label.setText(f"RPM base do rotor: {rotor_rpm.get(rotor, 1750):.0f}")
+    rotor_combo.currentTextChanged.connect(update_base_label)
+    update_base_label(rotor_combo.currentText())
+
+    if speed_families:
+        layout.addWidget(QLabel("Famílias existentes: " + ", ".join(speed_families.keys())))
+        btn_clear = QPushButton("Remover Famílias Existentes")
+        def clear_families():
+            speed_families.clear()
+            btn_clear.setEnabled(False)
+            QMessageBox.information(dlg, "Famílias Removidas", "Todas as famílias de rotação foram removidas.")
+        btn_clear.clicked.connect(clear_families)
+        layout.addWidget(btn_clear)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+
+    if dlg.exec_() != QDialog.Accepted:
+        return None
+
+    try:
+        start, stop, step = (float(inputs[key].text().replace(',', '.')) for key in ('start', 'stop', 'step'))
+        if start <= 0 or stop < start or step <= 0:
+            raise ValueError("Use RPM inicial > 0, RPM final >= inicial e passo > 0")
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Faixa de rotações inválida: {str(e)}")
+        return None
+
+    # Inclui o RPM final mesmo quando a faixa não é múltipla do passo
+    rpms = np.arange(start, stop + step * 1e-9, step)
+    if rpms[-1] < stop:
+        rpms = np.append(rpms, stop)
+    return rotor_combo.currentText(), rpms
+
+def solve_required_speed(fit, q_target, h_target=None, system_curve_data=None, base_rpms=None,
+                         grid_points=1000, rows=None, density=WATER_DENSITY):
+    """
+    Calcula, em lote para vários rotores, a rotação necessária para atingir um ponto de trabalho.
+
+    Pelas leis de afinidade, um ponto (Q, H) da curva na rotação base se desloca sobre a
+    parábola H = (Ht / Qt²)·Q² ao variar a rotação. A interseção dessa parábola com a
+    curva ajustada de cada rotor fornece Q1 e a razão de rotação é r = Qt / Q1.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        q_target: Vazão desejada (m³/h)
+        h_target: Altura desejada (m); se None é obtida da curva do sistema em q_target
+        system_curve_data: Curva do sistema (chaves 'Q' e 'H') usada quando h_target é None
+        base_rpms: Dicionário {rotor: RPM base} (padrão 1750 RPM)
+        grid_points: Número de pontos da grade de busca de cada rotor
+        rows: Índices dos rotores a resolver (padrão: todos)
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com arrays por rotor (razão, RPM necessário, eficiência, potência mecânica,
+        ponto equivalente na rotação base) e a ordem de classificação por menor rotação e potência
+    """
+    if h_target is None:
+        if system_curve_data is None:
+            raise ValueError("Informe a altura desejada ou uma curva do sistema")
+        h_target = float(np.interp(q_target, system_curve_data['Q'], system_curve_data['H']))
+    if q_target <= 0 or h_target <= 0:
+        raise ValueError("Vazão e altura desejadas devem ser maiores que zero")
+
+    if rows is None:
+        rows = np.arange(len(fit['names']))
+    rows = np.asarray(rows, dtype=int)
+    names = [fit['names'][i] for i in rows]
+    base_rpms = base_rpms or {}
+    base_rpm = np.array([base_rpms.get(name, 1750) for name in names], dtype=float)
+
+    # Parábola de afinidade que passa pelo ponto desejado
+    c = h_target / q_target ** 2
+    t = np.linspace(0.0, 1.0, grid_points)
+    q_lo, q_hi = fit['q_min'][rows], fit['q_max'][rows]
+    q_grid = q_lo[:, None] + (q_hi - q_lo)[:, None] * t
+    diff = evaluate_rotor_curves(fit, q_grid, 'head', rows=rows) - c * q_grid ** 2
+
+    q_base, found = _first_crossing(q_grid, diff, (q_hi > q_lo) & (q_hi > 0))
+    found &= q_base > 0
+    q_base = np.where(found, q_base, np.nan)
+    q_safe = np.where(found, q_base, 0.0)
+
+    ratio = q_target / q_base
+    eff = np.where(found, evaluate_rotor_curves(fit, q_safe, 'efficiency', rows=rows), np.nan)
+    power = pump_power(q_target, h_target, eff, density)[1]
+
+    return {
+        'names': names,
+        'q_target': float(q_target),
+        'h_target': float(h_target),
+        'vazao_base': q_base,
+        'altura_base': np.where(found, c * q_safe ** 2, np.nan),
+        'base_rpm': base_rpm,
+        'razao': ratio,
+        'rpm': base_rpm * ratio,
+        'eficiencia': eff,
+        'potencia_mecanica': power,
+        'encontrado': found,
+        # Menor rotação primeiro, desempate pela menor potência; sem solução ao final
+        'ordem': np.lexsort((power, ratio)),
+    }
+
+# Menor diâmetro de corte como fração do menor diâmetro conhecido
+MIN_TRIM_FRACTION = 0.7
+
+def rotor_diameter_from_name(rotor_name):
+    """Extrai o diâmetro (mm) do nome do rotor, ex.: '150' ou 'Rotor 152,5'. Retorna None se ausente."""
+    match = re.search(r"\d+(?:[.,]\d+)?", rotor_name)
+    return float(match.group().replace(',', '.')) if match else None
+
+def interpolate_diameter_curves(fit, rotor_diameters, diameters, grid_points=100):
+    """
+    Gera as curvas de vários diâmetros de rotor em uma única operação vetorizada.
+
+    Cada curva conhecida é amostrada em posições normalizadas do seu domínio de vazão e
+    escalada para o diâmetro desejado pelas leis de corte (Q ∝ D, H ∝ D²). Entre dois
+    diâmetros conhecidos as curvas escaladas são combinadas linearmente; abaixo do menor
+    (corte) ou acima do maior (extrapolação) usa-se apenas a curva mais próxima.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        rotor_diameters: Dicionário {rotor: diâmetro} dos rotores conhecidos
+        diameters: Sequência de diâmetros desejados
+        grid_points: Número de pontos de cada curva gerada
+
+    Returns:
+        Dicionário com os diâmetros, o método de cada um ('Interpolação', 'Corte' ou
+        'Extrapolação') e arrays (n_diâmetros, grid_points) de vazão, altura e eficiência
+    """
+    known = sorted((d, fit['index'][rotor]) for rotor, d in rotor_diameters.items()
+                   if d and d > 0 and rotor in fit['index'])
+    if not known:
+        raise ValueError("Nenhum rotor com diâmetro conhecido e curva ajustada")
+    diameters = np.asarray(diameters, dtype=float)
+    if diameters.size == 0 or np.any(diameters <= 0):
+        raise ValueError("Os diâmetros devem ser maiores que zero")
+
+    d_known = np.array([d for d, _ in known])
+    rows = np.array([i for _, i in known])
+
+    # Curvas conhecidas amostradas nas mesmas posições relativas do domínio de vazão
+    s = np.linspace(0.0, 1.0, grid_points)
+    q_lo, q_hi = fit['q_min'][rows], fit['q_max'][rows]
+    q_known = q_lo[:, None] + (q_hi - q_lo)[:, None] * s
+    h_known = evaluate_rotor_curves(fit, q_known, 'head', rows=rows)
+    e_known = evaluate_rotor_curves(fit, q_known, 'efficiency', rows=rows)
+
+    # Par de diâmetros vizinhos e peso da interpolação de cada diâmetro desejado
+    b = np.clip(np.searchsorted(d_known, diameters), 0, len(d_known) - 1)
+    a = np.maximum(b - 1, 0)
+    span = d_known[b] - d_known[a]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        w = np.where(span > 0, np.clip((diameters - d_known[a]) / span, 0.0, 1.0), 0.0)
+    w, ra, rb = w[:, None], (diameters / d_known[a])[:, None], (diameters / d_known[b])[:, None]
+
+    method = np.where(diameters < d_known[0], 'Corte',
+                      np.where(diameters > d_known[-1], 'Extrapolação', 'Interpolação'))
+    return {
+        'diametros': diameters,
+        'metodo': method,
+        'vazao': (1 - w) * q_known[a] * ra + w * q_known[b] * rb,
+        'altura': (1 - w) * h_known[a] * ra ** 2 + w * h_known[b] * rb ** 2,
+        'efficiency': (1 - w) * e_known[a] + w * e_known[b],
+    }
+
+def solve_trim_diameter(fit, rotor_diameters, q_target, h_target, sweep_points=400,
+                        min_fraction=MIN_TRIM_FRACTION, density=WATER_DENSITY):
+    """
+    Calcula o diâmetro de rotor cuja curva passa pelo ponto de trabalho desejado.
+
+    Uma varredura de diâmetros, do menor corte admissível ao maior diâmetro conhecido, é
+    gerada de uma só vez por interpolate_diameter_curves; a altura de cada curva na vazão
+    desejada é comparada com a altura desejada e a raiz é refinada linearmente.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        rotor_diameters: Dicionário {rotor: diâmetro} dos rotores conhecidos
+        q_target: Vazão desejada (m³/h)
+        h_target: Altura desejada (m)
+        sweep_points: Número de diâmetros da varredura
+        min_fraction: Menor diâmetro da varredura como fração do menor diâmetro conhecido
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com o diâmetro encontrado (NaN se fora da faixa), o método, a eficiência,
+        a potência mecânica no ponto e a curva completa do diâmetro encontrado
+    """
+    if q_target <= 0 or h_target <= 0:
+        raise ValueError("Vazão e altura desejadas devem ser maiores que zero")
+    known = [d for rotor, d in rotor_diameters.items() if d and d > 0 and rotor in fit['index']]
+    if not known:
+        raise ValueError("Nenhum rotor com diâmetro conhecido e curva ajustada")
+
+    sweep = np.linspace(min(known) * min_fraction, max(known), sweep_points)
+    curves = interpolate_diameter_curves(fit, rotor_diameters, sweep)
+    counts = np.full(sweep_points, curves['vazao'].shape[1])
+    h_at_q = _batch_interp(np.full((sweep_points, 1), float(q_target)), curves['vazao'],
+                           curves['altura'], counts, extrapolate=False)[:, 0]
+
+    d_root, found = _first_crossing(sweep[None, :], (h_at_q - h_target)[None, :], np.array([True]))
+    result = {
+        'q_target': float(q_target),
+        'h_target': float(h_target),
+        'diametro': float(d_root[0]),
+        'encontrado': bool(found[0]),
+        'metodo': None,
+        'eficiencia': np.nan,
+        'potencia_mecanica': np.nan,
+        'curva': None,
+    }
+    if not found[0]:
+        return result
+
+    curve = interpolate_diameter_curves(fit, rotor_diameters, [d_root[0]])
+    eff = float(np.interp(q_target, curve['vazao'][0], curve['efficiency'][0]))
+    result['metodo'] = str(curve['metodo'][0])
+    result['eficiencia'] = eff
+    if eff > 0:
+        result['potencia_mecanica'] = float(pump_power(q_target, h_target, eff, density)[1])
+    result['curva'] = {key: curve[key][0] for key in ('vazao', 'altura', 'efficiency')}
+    return result
+
+def _show_trim_dialog(parent, rotor_data, existing_names):
+    """
+    Diálogo de corte de rotor: diâmetros dos rotores conhecidos, ponto de trabalho e
+    cálculo do diâmetro necessário.
+
+    Returns:
+        Tupla (nome do novo rotor, pontos [{'vazao', 'altura', 'efficiency'}]) para adicionar
+        a curva do diâmetro calculado, ou None
+    """
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return None
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return None
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Corte de Rotor (Diâmetro Necessário)")
+    dlg.setMinimumSize(600, 450)
+    layout = QVBoxLayout()
+
+    layout.addWidget(QLabel("Diâmetros dos rotores conhecidos (mm):"))
+    diameter_table = QTableWidget(len(fit['names']), 2)
+    diameter_table.setHorizontalHeaderLabels(["Rotor", "Diâmetro (mm)"])
+    diameter_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    for row, name in enumerate(fit['names']):
+        name_item = QTableWidgetItem(name)
+        name_item.setFlags(name_item.flags() & ~Qt.ItemIsEditable)
+        diameter_table.setItem(row, 0, name_item)
+        diameter = rotor_diameter_from_name(name)
+        diameter_table.setItem(row, 1, QTableWidgetItem(f"{diameter:g}".replace('.', ',') if diameter else ""))
+    layout.addWidget(diameter_table)
+
+    input_layout = QHBoxLayout()
+    inputs = {}
+    for key, label in [('q', "Vazão desejada (m³/h):"), ('h', "Altura desejada (m):")]:
+        input_layout.addWidget(QLabel(label))
+        inp = QLineEdit()
+        inp.setValidator(QDoubleValidator(0, 1000000, 4))
+        input_layout.addWidget(inp)
+        inputs[key] = inp
+    btn_calculate = QPushButton("Calcular Diâmetro")
+    input_layout.addWidget(btn_calculate)
+    layout.addLayout(input_layout)
+
+    result_label = QLabel()
+    layout.addWidget(result_label)
+
+    btn_add = QPushButton("Adicionar Rotor com o Diâmetro Calculado")
+    btn_add.setEnabled(False)
+    layout.addWidget(btn_add)
+
+    state = {'result': None, 'selection': None}
+
+    def calculate():
+        state['result'] = None
+        btn_add.setEnabled(False)
+        try:
+            rotor_diameters = {}
+            for row, name in enumerate(fit['names']):
+                text = diameter_table.item(row, 1).text().strip() if diameter_table.item(row, 1) else ""
+                if text:
+                    rotor_diameters[name] = float(text.replace(',', '.'))
+            q_target = float(inputs['q'].text().replace(',', '.'))
+            h_target = float(inputs['h'].text().replace(',', '.'))
+            result = solve_trim_diameter(fit, rotor_diameters, q_target, h_target,
+                                         density=_fluid_density(parent))
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+
+        if not result['encontrado']:
+            result_label.setText("Nenhum diâmetro na faixa de corte atinge o ponto de trabalho.")
+            return
+        result_label.setText(
+            f"Diâmetro necessário: {result['diametro']:.1f} mm ({result['metodo']})\n"
+            f"Eficiência no ponto: {result['eficiencia']:.2f}%   "
+            f"Potência mecânica: {result['potencia_mecanica']:.0f} W")
+        state['result'] = result
+        btn_add.setEnabled(True)
+
+    def add_rotor():
+        result = state['result']
+        name = f"{result['diametro']:.1f} (Corte)"
+        if name in existing_names:
+            QMessageBox.warning(dlg, "Aviso", f"O rotor '{name}' já existe.")
+            return
+        # Curva do diâmetro calculado reduzida a pontos igualmente espaçados
+        curve = result['curva']
+        idx = np.linspace(0, len(curve['vazao']) - 1, 11).round().astype(int)
+        state['selection'] = (name, [{'vazao': float(curve['vazao'][i]), 'altura': float(curve['altura'][i]),
+                                      'efficiency': float(curve['efficiency'][i])} for i in idx])
+        dlg.accept()
+
+    btn_calculate.clicked.connect(calculate)
+    btn_add.clicked.connect(add_rotor)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    dlg.exec_()
+    return state['selection']
+
+# Catálogo persistente de rotores (versões anteriores o gravavam direto na pasta do usuário)
+CATALOG_PATH = os.path.join(APP_DATA_DIR, "catalogo_bombas.db")
+LEGACY_CATALOG_PATH = os.path.join(os.path.expanduser("~"), "Catalogo_Bombas.db")
+
+# Região de seleção indexada como fração da vazão do BEP
+CATALOG_BEP_ENVELOPE = (0.8, 1.1)
+
+# Número máximo de coeficientes armazenados (polinômio de grau 4)
+_CATALOG_COEFS = 5
+
+def _to_blob(values):
+    return np.ascontiguousarray(values, dtype=np.float64).tobytes()
+
+def _from_blob(blob):
+    return np.frombuffer(blob, dtype=np.float64) if blob is not None else None
+
+def _blob_matrix(blobs, width):
+    """Junta os BLOBs de mesmo tamanho das linhas em uma única matriz (n, width)"""
+    return np.frombuffer(b''.join(blobs), dtype=np.float64).reshape(len(blobs), width)
+
+def _catalog_fit(columns, model):
+    """
+    Reconstrói um ajuste no formato de fit_rotor_curves a partir das colunas do catálogo
+    ({coluna: valores das linhas}, ver _catalog_columns).
+
+    Os coeficientes polinomiais (tamanho fixo) são decodificados em bloco e dispensam os
+    pontos originais; os modelos por pontos (linear e monótono) precisam deles.
+    """
+    n = len(columns['id'])
+    fit = {
+        'names': list(columns['id']),  # Linhas identificadas pelo id do catálogo
+        'model': model,
+        'q_min': np.array(columns['q_min'], dtype=float),
+        'q_max': np.array(columns['q_max'], dtype=float),
+    }
+    if model == 'poly':
+        fit['Q'] = np.column_stack([fit['q_min'], fit['q_max']])
+        fit['counts'] = np.full(n, 2)
+        fit['q_scale'] = np.array(columns['q_scale'], dtype=float)
+        head = _blob_matrix(columns['head_coefs'], _CATALOG_COEFS)
+        eff = _blob_matrix(columns['eff_coefs'], _CATALOG_COEFS)
+        # Descarta as potências mais altas zeradas em todo o grupo (grau menor que 4)
+        used = np.flatnonzero((head != 0).any(axis=0) | (eff != 0).any(axis=0))
+        width = int(used[-1]) + 1 if used.size else 1
+        fit['head_coefs'], fit['eff_coefs'] = head[:, :width], eff[:, :width]
+        return fit
+
+    points = [_from_blob(blob).reshape(3, -1) for blob in columns['points']]
+    m = max(p.shape[1] for p in points)
+    Q = np.full((n, m), np.nan)
+    counts = np.array([p.shape[1] for p in points])
+    for i, p in enumerate(points):
+        Q[i, :counts[i]] = p[0]
+    fit['Q'] = Q
+    fit['counts'] = counts
+    for key in ('head_knots', 'eff_knots'):
+        fit[key] = np.full((n, m), np.nan)
+        for i, blob in enumerate(columns[key]):
+            fit[key][i, :counts[i]] = _from_blob(blob)
+    return fit
+
+def _catalog_columns(cursor):
+    """Resultado de uma consulta como {coluna: tupla de valores}, na ordem das linhas"""
+    rows = cursor.fetchall()
+    names = [d[0] for d in cursor.description]
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    return dict(zip(names, values))
+
+class PumpCatalog:
+    """
+    Catálogo local de rotores em SQLite com as curvas ajustadas, RPM, diâmetro e BEP.
+
+    Cada rotor é identificado pelo par (bomba, nome), de modo que rotores homônimos de
+    bombas diferentes ("150", "Rotor 1") convivem no catálogo.
+
+    A região de seleção de cada rotor (vazão entre 80% e 110% do BEP e a faixa de altura
+    correspondente) é armazenada em um índice espacial R*Tree, de modo que a busca por
+    um ponto de trabalho consulta apenas os retângulos que o contêm e avalia as curvas
+    somente dos candidatos.
+    """
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path == CATALOG_PATH and not os.path.exists(path) and os.path.exists(LEGACY_CATALOG_PATH):
+            os.replace(LEGACY_CATALOG_PATH, path)  # Catálogo do local antigo
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rotors (
+                id INTEGER PRIMARY KEY,
+                pump TEXT NOT NULL DEFAULT '',
+                name TEXT NOT NULL,
+                rpm REAL,
+                diameter REAL,
+                model TEXT NOT NULL,
+                q_min REAL, q_max REAL, q_scale REAL,
+                q_bep REAL, h_bep REAL, eff_bep REAL,
+                points BLOB NOT NULL,
+                head_coefs BLOB, eff_coefs BLOB,
+                head_knots BLOB, eff_knots BLOB,
+                UNIQUE (pump, name)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS rotor_envelope USING rtree(id, q_min, q_max, h_min, h_max);
+        """)
+        self._migrate_pump_column()
+
+    def _migrate_pump_column(self):
+        """Converte catálogos antigos (nome único) para a chave (bomba, nome), mantendo os ids."""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(rotors)")]
+        if 'pump' in columns:
+            return
+        create = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'rotors'").fetchone()[0]
+        create = create.replace("name TEXT NOT NULL UNIQUE", "pump TEXT NOT NULL DEFAULT '', name TEXT NOT NULL")
+        create = create.rstrip().rstrip(')') + ", UNIQUE (pump, name))"
+        with self.conn:
+            self.conn.execute("ALTER TABLE rotors RENAME TO rotors_old")
+            self.conn.execute(create)
+            self.conn.execute(f"INSERT INTO rotors ({', '.join(columns)}) SELECT {', '.join(columns)} FROM rotors_old")
+            self.conn.execute("DROP TABLE rotors_old")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM rotors").fetchone()[0]
+
+    def add_rotors(self, rotor_data, rotor_rpm=None, rotor_diameters=None, model='poly', degree=3, pump=''):
+        """
+        Ajusta e grava os rotores da bomba no catálogo, substituindo os rotores de mesmo
+        nome dessa bomba (os de outras bombas não são alterados).
+
+        Args:
+            rotor_data: Dicionário com os dados dos rotores
+            rotor_rpm: Dicionário {rotor: RPM} (padrão 1750 RPM)
+            rotor_diameters: Dicionário {rotor: diâmetro}; padrão: extraído do nome
+            model, degree: Modelo de ajuste das curvas (ver fit_rotor_curves)
+            pump: Bomba/modelo a que os rotores pertencem
+
+        Returns:
+            Lista com os nomes dos rotores gravados
+        """
+        fit = fit_rotor_curves(rotor_data, model=model, degree=degree)
+        names = fit['names']
+        if not names:
+            return []
+        bep = find_best_efficiency_points(fit)
+        rotor_rpm = rotor_rpm or {}
+        rotor_diameters = rotor_diameters or {}
+
+        # Faixa de altura de cada rotor na região indexada em torno do BEP
+        band = np.linspace(*CATALOG_BEP_ENVELOPE, 17)
+        q_band = bep['q_bep'][:, None] * band
+        h_band = evaluate_rotor_curves(fit, q_band, 'head')
+
+        records = []
+        envelopes = []
+        with self.conn:
+            self._delete([(pump, name) for name in names])
+            next_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM rotors").fetchone()[0] + 1
+
+            for i, name in enumerate(names):
+                k = fit['counts'][i]
+                points = np.vstack([fit['Q'][i, :k], fit['H'][i, :k], fit['E'][i, :k]])
+                if model == 'poly':
+                    coefs = np.zeros((2, _CATALOG_COEFS))
+                    coefs[0, :fit['head_coefs'].shape[1]] = fit['head_coefs'][i]
+                    coefs[1, :fit['eff_coefs'].shape[1]] = fit['eff_coefs'][i]
+                    curve = (float(fit['q_scale'][i]), _to_blob(coefs[0]), _to_blob(coefs[1]), None, None)
+                else:
+                    curve = (None, None, None, _to_blob(fit['head_knots'][i, :k]), _to_blob(fit['eff_knots'][i, :k]))
+                diameter = rotor_diameters.get(name) or rotor_diameter_from_name(name)
+                records.append((next_id + i, pump, name, float(rotor_rpm.get(name, 1750)), diameter, model,
+                                float(fit['q_min'][i]), float(fit['q_max'][i]), curve[0],
+                                float(bep['q_bep'][i]), float(bep['h_bep'][i]), float(bep['eff_bep'][i]),
+                                _to_blob(points)) + curve[1:])
+                envelopes.append((next_id + i, float(q_band[i, 0]), float(q_band[i, -1]),
+                                  float(h_band[i].min()), float(h_band[i].max())))
+
+            self.conn.executemany(
+                "INSERT INTO rotors (id, pump, name, rpm, diameter, model, q_min, q_max, q_scale, q_bep, h_bep, "
+                "eff_bep, points, head_coefs, eff_coefs, head_knots, eff_knots) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+            self.conn.executemany("INSERT INTO rotor_envelope VALUES (?, ?, ?, ?, ?)", envelopes)
+        return list(names)
+
+    def _delete(self, keys):
+        """Apaga os rotores e seus retângulos do índice pelos pares (bomba, nome), sem commit."""
+        self.conn.executemany(
+            "DELETE FROM rotor_envelope WHERE id IN (SELECT id FROM rotors WHERE pump = ? AND name = ?)", keys)
+        self.conn.executemany("DELETE FROM rotors WHERE pump = ? AND name = ?", keys)
+
+    def remove_rotors(self, keys):
+        """Remove do catálogo os rotores informados como pares (bomba, nome)."""
+        with self.conn:
+            self._delete(list(keys))
+
+    def existing_rotors(self, pump, names):
+        """Nomes, entre os informados, que a bomba já tem no catálogo."""
+        return [name for name in names
+                if self.conn.execute("SELECT 1 FROM rotors WHERE pump = ? AND name = ?", (pump, name)).fetchone()]
+
+    def list_rotors(self):
+        """Lista os rotores do catálogo com bomba, RPM, diâmetro e BEP."""
+        keys = ('pump', 'name', 'rpm', 'diameter', 'q_bep', 'h_bep', 'eff_bep')
+        rows = self.conn.execute(
+            f"SELECT {', '.join(keys)} FROM rotors ORDER BY pump, name").fetchall()
+        return [dict(zip(keys, row)) for row in rows]
+
+    def id_bounds(self):
+        """Retorna (menor id, maior id, número de rotores) do catálogo."""
+        return self.conn.execute("SELECT MIN(id), MAX(id), COUNT(*) FROM rotors").fetchone()
+
+    def max_flow(self):
+        """Maior vazão entre as curvas do catálogo (0 se vazio)."""
+        return self.conn.execute("SELECT COALESCE(MAX(q_max), 0) FROM rotors").fetchone()[0]
+
+    def operating_points(self, system_curve_data, id_range=None, lifecycle=None, labels=True):
+        """
+        Resolve em lote o ponto de operação de todos os rotores (ou de uma faixa de ids)
+        contra a curva do sistema e calcula os critérios de seleção.
+
+        Args:
+            system_curve_data: Curva do sistema (chaves 'Q' e 'H')
+            id_range: Tupla (id inicial, id final) inclusiva; padrão: todo o catálogo
+            lifecycle: Parâmetros do custo de energia (ver LIFECYCLE_DEFAULTS)
+            labels: Se False, omite bomba, nome, RPM e diâmetro (ver rotor_labels), que
+                custam a leitura de todas as linhas e só interessam aos melhores candidatos
+
+        Returns:
+            Dicionário de arrays dos rotores com ponto de operação: id, bomba, nome, RPM,
+            diâmetro, vazão, altura, eficiência, fração e distância do BEP, potência e
+            custo de energia
+        """
+        lifecycle = dict(LIFECYCLE_DEFAULTS, **(lifecycle or {}))
+        # Os pontos originais só são lidos para os modelos que interpolam entre eles
+        sql = ("SELECT id, model, q_min, q_max, q_scale, q_bep, head_coefs, eff_coefs, head_knots, eff_knots, "
+               "CASE WHEN model = 'poly' THEN NULL ELSE points END AS points FROM rotors")
+        if id_range is None:
+            columns = _catalog_columns(self.conn.execute(sql))
+        else:
+            columns = _catalog_columns(self.conn.execute(sql + " WHERE id BETWEEN ? AND ?", id_range))
+
+        parts = []
+        models = np.array(columns['model'], dtype=object)
+        for model in set(columns['model']):
+            rows = np.flatnonzero(models == model)
+            group = columns if len(rows) == len(models) else {
+                key: [values[i] for i in rows.tolist()] for key, values in columns.items()}
+            ops = solve_operating_points(_catalog_fit(group, model), system_curve_data,
+                                         grid_points=SELECTION_GRID_POINTS,
+                                         refine_points=SELECTION_REFINE_POINTS)
+            keep = ~np.isnan(ops['vazao']) & (ops['eficiencia'] > 0)
+            parts.append({
+                'id': np.array(group['id'], dtype=int)[keep],
+                'q_bep': np.array(group['q_bep'], dtype=float)[keep],
+                'vazao': ops['vazao'][keep],
+                'altura': ops['altura'][keep],
+                'eficiencia': ops['eficiencia'][keep],
+            })
+
+        keys = ('id', 'q_bep', 'vazao', 'altura', 'eficiencia')
+        result = {key: np.concatenate([p[key] for p in parts]) if parts else np.zeros(0) for key in keys}
+        if labels:
+            found = self.rotor_labels(result['id'].tolist())
+            for k, key in enumerate(('pump', 'name', 'rpm', 'diameter')):
+                result[key] = np.array([found[i][k] for i in result['id'].tolist()],
+                                       dtype=object if k < 2 else float)
+        result['fracao_bep'] = result['vazao'] / result['q_bep']
+        result['distancia_bep'] = np.abs(result['fracao_bep'] - 1.0)
+        result['potencia'] = pump_power(result['vazao'], result['altura'], result['eficiencia'])[1]
+        result['custo_energia'] = (result['potencia'] / 1000 * lifecycle['horas_ano']
+                                   * lifecycle['anos'] * lifecycle['tarifa'])
+        return result
+
+    def rotor_labels(self, ids):
+        """Bomba, nome, RPM e diâmetro dos rotores informados pelo id: {id: (bomba, nome, rpm, diâmetro)}"""
+        labels = {}
+        ids = list(ids)
+        for start in range(0, len(ids), 900):  # Limite de parâmetros por consulta do SQLite
+            chunk = ids[start:start + 900]
+            rows = self.conn.execute(
+                f"SELECT id, pump, name, rpm, diameter FROM rotors WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk).fetchall()
+            labels.update((row[0], row[1:]) for row in rows)
+        return labels
+
+    def load_rotor_data(self, keys):
+        """
+        Carrega os pontos originais dos rotores informados como pares (bomba, nome).
+
+        Rotores homônimos de bombas diferentes recebem o nome da bomba entre parênteses.
+
+        Returns:
+            Tupla (rotor_data, rotor_rpm) no formato usado pelas janelas e pelo relatório
+        """
+        keys = list(keys)
+        names = [name for _, name in keys]
+        rotor_data = {}
+        rotor_rpm = {}
+        for pump, name in keys:
+            row = self.conn.execute("SELECT rpm, points FROM rotors WHERE pump = ? AND name = ?",
+                                    (pump, name)).fetchone()
+            if row is None:
+                continue
+            if names.count(name) > 1 and pump:
+                name = f"{name} ({pump})"
+            q, h, e = _from_blob(row[1]).reshape(3, -1)
+            rotor_data[name] = [{'vazao': float(a), 'altura': float(b), 'efficiency': float(c)}
+                                for a, b, c in zip(q, h, e)]
+            rotor_rpm[name] = row[0]
+        return rotor_data, rotor_rpm
+
+    def query_duty_point(self, q, h, bep_range=CATALOG_BEP_ENVELOPE, head_tolerance=0.1):
+        """
+        Busca os rotores que entregam a vazão q com altura entre h e h·(1 + head_tolerance),
+        operando dentro da faixa bep_range da vazão do BEP.
+
+        Args:
+            q: Vazão desejada (m³/h)
+            h: Altura desejada (m)
+            bep_range: Faixa admissível como fração da vazão do BEP (contida na faixa indexada)
+            head_tolerance: Excesso de altura admissível como fração de h
+
+        Returns:
+            Lista de dicionários (nome, RPM, diâmetro, BEP, altura e eficiência no ponto,
+            fração da vazão do BEP), do ponto mais próximo ao BEP para o mais distante
+        """
+        # Apenas as colunas do ajuste e do resultado; os pontos originais só para os modelos
+        # que interpolam entre eles
+        columns = _catalog_columns(self.conn.execute(
+            "SELECT r.id, r.pump, r.name, r.rpm, r.diameter, r.model, r.q_min, r.q_max, r.q_scale, "
+            "r.q_bep, r.h_bep, r.eff_bep, "
+            "r.head_coefs, r.eff_coefs, r.head_knots, r.eff_knots, "
+            "CASE WHEN r.model = 'poly' THEN NULL ELSE r.points END AS points "
+            "FROM rotor_envelope e JOIN rotors r ON r.id = e.id "
+            "WHERE e.q_min <= ? AND e.q_max >= ? AND e.h_min <= ? AND e.h_max >= ?",
+            (q, q, h * (1 + head_tolerance), h)))
+
+        # Filtro exato das curvas dos candidatos, agrupados por modelo de ajuste
+        passed = []
+        models = np.array(columns['model'], dtype=object)
+        for model in set(columns['model']):
+            rows = np.flatnonzero(models == model)
+            group = columns if len(rows) == len(models) else {
+                key: [values[i] for i in rows.tolist()] for key, values in columns.items()}
+            fit = _catalog_fit(group, model)
+            q_eval = np.full((len(rows), 1), float(q))
+            head = evaluate_rotor_curves(fit, q_eval, 'head')[:, 0]
+            eff = evaluate_rotor_curves(fit, q_eval, 'efficiency')[:, 0]
+            fraction = q / np.array(group['q_bep'], dtype=float)
+            keep = np.flatnonzero((head >= h) & (head <= h * (1 + head_tolerance))
+                                  & (fraction >= bep_range[0]) & (fraction <= bep_range[1]))
+            passed += [(rows[i], head[i], eff[i], fraction[i]) for i in keep]
+
+        # Dicionários de resultado apenas dos rotores aprovados
+        keys = ('pump', 'name', 'rpm', 'diameter', 'q_bep', 'h_bep', 'eff_bep')
+        results = [dict({key: columns[key][row] for key in keys},
+                        altura=float(head), eficiencia=float(eff), fracao_bep=float(fraction))
+                   for row, head, eff, fraction in passed]
+        results.sort(key=lambda r: abs(r['fracao_bep'] - 1.0))
+        return results
+
+# Critérios de classificação da seleção: (rótulo, chave, maior é melhor)
+SELECTION_CRITERIA = [
+    ("Custo de Energia no Ciclo de Vida", 'custo_energia', False),
+    ("Eficiência no Ponto de Operação", 'eficiencia', True),
+    ("Distância do BEP", 'distancia_bep', False),
+    ("Potência no Eixo", 'potencia', False),
+]
+
+# Parâmetros padrão do custo de energia: horas de operação por ano, anos e tarifa (R$/kWh)
+LIFECYCLE_DEFAULTS = {'horas_ano': 6000, 'anos': 10, 'tarifa': 0.75}
+
+# Pontos da grade grossa e da grade de refinamento do ponto de operação na seleção
+SELECTION_GRID_POINTS = 64
+SELECTION_REFINE_POINTS = 16
+
+# Rotores por bloco e tamanho mínimo do catálogo para usar vários processos: em série,
+# 100 mil rotores levam ~0,85 s e o pool acrescenta ~0,4 s (criação dos processos e
+# transferência dos resultados), só compensando com várias CPUs em catálogos maiores
+SELECTION_CHUNK_SIZE = 5000
+SELECTION_POOL_THRESHOLD = 200000
+
+def _top_k_candidates(candidates, criterion, top_k):
+    """Seleciona os top_k candidatos pelo critério, retornando uma lista de dicionários ordenada."""
+    descending = {key: desc for _, key, desc in SELECTION_CRITERIA}[criterion]
+    score = -candidates[criterion] if descending else candidates[criterion]
+    if len(score) > top_k:
+        idx = np.argpartition(score, top_k - 1)[:top_k]
+    else:
+        idx = np.arange(len(score))
+    idx = idx[np.argsort(score[idx], kind='stable')]
+    return [{key: (values[i] if key in ('pump', 'name') else int(values[i]) if key == 'id' else float(values[i]))
+             for key, values in candidates.items()} for i in idx]
+
+def _rank_catalog_chunk(path, id_range, system_curve_data, criterion, top_k, lifecycle):
+    """Classifica um bloco de ids do catálogo (executado em um processo separado para catálogos grandes)."""
+    with PumpCatalog(path) as catalog:
+        candidates = catalog.operating_points(system_curve_data, id_range, lifecycle, labels=False)
+        best = _top_k_candidates(candidates, criterion, top_k)
+        # Bomba, nome, RPM e diâmetro lidos só para os melhores do bloco
+        labels = catalog.rotor_labels([c['id'] for c in best])
+    for candidate in best:
+        candidate['pump'], candidate['name'], candidate['rpm'], candidate['diameter'] = labels[candidate['id']]
+        candidate['diameter'] = float('nan') if candidate['diameter'] is None else candidate['diameter']
+    return best
+
+def rank_catalog_selection(system_curve_data, criterion='custo_energia', top_k=10, lifecycle=None,
+                           path=CATALOG_PATH, workers=None):
+    """
+    Classifica os rotores do catálogo para a curva do sistema informada.
+
+    O catálogo é dividido em blocos de ids; em cada bloco os pontos de operação de
+    todos os rotores são resolvidos de uma só vez e apenas os top_k melhores são
+    mantidos. Catálogos acima de SELECTION_POOL_THRESHOLD rotores são processados
+    em paralelo por um ProcessPoolExecutor quando há mais de uma CPU.
+
+    Args:
+        system_curve_data: Curva do sistema (chaves 'Q' e 'H'), ver _calculate_system_curve
+        criterion: Chave do critério de classificação (ver SELECTION_CRITERIA)
+        top_k: Número de candidatos retornados
+        lifecycle: Parâmetros do custo de energia (ver LIFECYCLE_DEFAULTS)
+        path: Arquivo do catálogo
+        workers: Número de processos (padrão: número de CPUs); 1 desativa o paralelismo
+
+    Returns:
+        Lista dos top_k candidatos (dicionários) do melhor para o pior
+    """
+    if criterion not in {key for _, key, _ in SELECTION_CRITERIA}:
+        raise ValueError(f"Critério de seleção desconhecido: {criterion}")
+    if top_k < 1:
+        raise ValueError("O número de candidatos deve ser pelo menos 1")
+
+    with PumpCatalog(path) as catalog:
+        id_min, id_max, count = catalog.id_bounds()
+    if not count:
+        return []
+
+    n_chunks = max(1, -(-count // SELECTION_CHUNK_SIZE))
+    edges = np.linspace(id_min, id_max + 1, n_chunks + 1).astype(int)
+    id_ranges = [(int(lo), int(hi) - 1) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+    args = (system_curve_data, criterion, top_k, lifecycle)
+
+    if count >= SELECTION_POOL_THRESHOLD and (workers or os.cpu_count() or 1) > 1 and len(id_ranges) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_rank_catalog_chunk, path, id_range, *args) for id_range in id_ranges]
+            partial = [future.result() for future in futures]
+    else:
+        partial = [_rank_catalog_chunk(path, id_range, *args) for id_range in id_ranges]
+
+    # Junção dos melhores de cada bloco
+    merged = [candidate for chunk in partial for candidate in chunk]
+    descending = {key: desc for _, key, desc in SELECTION_CRITERIA}[criterion]
+    merged.sort(key=lambda c: -c[criterion] if descending else c[criterion])
+    return merged[:top_k]
+
+def _save_to_catalog(parent, rotor_data, rotor_rpm, curve_fit_mode):
+    """Grava os rotores da janela no catálogo, sob a bomba informada, com o modelo de ajuste selecionado."""
+    _, model, degree = CURVE_FIT_OPTIONS[curve_fit_mode.currentIndex()]
+    pump, ok = QInputDialog.getText(parent, "Gravar no Catálogo", "Bomba / modelo dos rotores:")
+    pump = pump.strip()
+    if not ok or not pump:
+        return
+    try:
+        with PumpCatalog() as catalog:
+            existing = catalog.existing_rotors(pump, list(rotor_data))
+            if existing:
+                reply = QMessageBox.question(
+                    parent, "Substituir",
+                    f"A bomba '{pump}' já tem no catálogo o(s) rotor(es): {', '.join(existing)}.\n"
+                    "Substituir as curvas gravadas?", QMessageBox.Yes | QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    return
+            saved = catalog.add_rotors(rotor_data, rotor_rpm, model=model, degree=degree, pump=pump)
+            path = catalog.path
+    except (sqlite3.Error, ValueError) as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível gravar no catálogo: {str(e)}")
+        return
+    if not saved:
+        QMessageBox.warning(parent, "Aviso", "Nenhum rotor com pelo menos 2 pontos válidos para gravar.")
+        return
+    QMessageBox.information(parent, "Catálogo", f"{len(saved)} rotor(es) gravado(s) em:\n{path}")
+
+def _show_catalog_dialog(parent):
+    """
+    Diálogo de busca no catálogo por ponto de trabalho (ou listagem completa).
+
+    Returns:
+        Tupla (rotor_data, rotor_rpm) dos rotores selecionados para importar, ou None
+    """
+    try:
+        catalog = PumpCatalog()
+    except sqlite3.Error as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível abrir o catálogo: {str(e)}")
+        return None
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle(f"Catálogo de Bombas ({len(catalog)} rotores)")
+    dlg.setMinimumSize(800, 500)
+    layout = QVBoxLayout()
+
+    input_layout = QHBoxLayout()
+    inputs = {}
+    for key, label, default in [('q', "Vazão (m³/h):", ""), ('h', "Altura (m):", ""),
+                                ('tol', "Excesso de altura (%):", "10")]:
+        input_layout.addWidget(QLabel(label))
+        inp = QLineEdit(default)
+        inp.setValidator(QDoubleValidator(0, 1000000, 4))
+        input_layout.addWidget(inp)
+        inputs[key] = inp
+    btn_search = QPushButton("Buscar")
+    input_layout.addWidget(btn_search)
+    layout.addLayout(input_layout)
+
+    info_label = QLabel("Deixe vazão e altura em branco para listar todo o catálogo. "
+                        f"A busca considera de {CATALOG_BEP_ENVELOPE[0]:.0%} a "
+                        f"{CATALOG_BEP_ENVELOPE[1]:.0%} da vazão do BEP.")
+    info_label.setWordWrap(True)
+    layout.addWidget(info_label)
+
+    headers = ["Bomba", "Rotor", "RPM", "Diâmetro (mm)", "Vazão BEP (m³/h)", "Altura BEP (m)",
+               "Eficiência BEP (%)", "Altura no Ponto (m)", "Eficiência no Ponto (%)", "Vazão / Vazão BEP (%)"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    def search():
+        try:
+            q_text = inputs['q'].text().replace(',', '.')
+            h_text = inputs['h'].text().replace(',', '.')
+            if q_text and h_text:
+                tolerance = float(inputs['tol'].text().replace(',', '.') or 0) / 100
+                results = catalog.query_duty_point(float(q_text), float(h_text), head_tolerance=tolerance)
+            else:
+                results = catalog.list_rotors()
+        except (ValueError, sqlite3.Error) as e:
+            QMessageBox.critical(dlg, "Erro", f"Erro na busca: {str(e)}")
+            return
+        table.setRowCount(len(results))
+        for row, r in enumerate(results):
+            values = [r['pump'], r['name'], fmt(r['rpm'], '.0f'), fmt(r['diameter'], 'g'), fmt(r['q_bep'], '.2f'),
+                      fmt(r['h_bep'], '.2f'), fmt(r['eff_bep'], '.2f'), fmt(r.get('altura'), '.2f'),
+                      fmt(r.get('eficiencia'), '.2f'),
+                      fmt(r['fracao_bep'] * 100 if 'fracao_bep' in r else None, '.1f')]
+            for col, value in enumerate(values):
+                table.setItem(row, col, QTableWidgetItem(value))
+
+    btn_search.clicked.connect(search)
+
+    buttons_layout = QHBoxLayout()
+    btn_import = QPushButton("Importar Selecionados")
+    btn_remove = QPushButton("Remover Selecionados do Catálogo")
+    buttons_layout.addWidget(btn_import)
+    buttons_layout.addWidget(btn_remove)
+    layout.addLayout(buttons_layout)
+
+    state = {'selection': None}
+
+    def selected_keys():
+        return [(table.item(index.row(), 0).text(), table.item(index.row(), 1).text())
+                for index in table.selectionModel().selectedRows()]
+
+    def import_selected():
+        keys = selected_keys()
+        if not keys:
+            QMessageBox.warning(dlg, "Aviso", "Selecione pelo menos um rotor.")
+            return
+        state['selection'] = catalog.load_rotor_data(keys)
+        dlg.accept()
+
+    def remove_selected():
+        keys = selected_keys()
+        if not keys:
+            return
+        reply = QMessageBox.question(dlg, "Remover", f"Remover {len(keys)} rotor(es) do catálogo?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            catalog.remove_rotors(keys)
+            search()
+
+    btn_import.clicked.connect(import_selected)
+    btn_remove.clicked.connect(remove_selected)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    try:
+        dlg.exec_()
+    finally:
+        catalog.close()
+    return state['selection']
+
+def _show_selection_dialog(parent, system_curve_settings):
+    """
+    Diálogo de seleção de bombas do catálogo pela curva do sistema 1.
+
+    Returns:
+        Tupla (rotor_data, rotor_rpm) dos rotores selecionados para importar, ou None
+    """
+    if not system_curve_settings:
+        QMessageBox.warning(parent, "Aviso", "Configure a Curva do Sistema 1 antes da seleção.")
+        return None
+    try:
+        with PumpCatalog() as catalog:
+            max_flow = catalog.max_flow()
+    except sqlite3.Error as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível abrir o catálogo: {str(e)}")
+        return None
+    if max_flow <= 0:
+        QMessageBox.warning(parent, "Aviso", "O catálogo está vazio.")
+        return None
+    system_curve = _calculate_system_curve(max_rotor_q=max_flow, **system_curve_settings)
+    if system_curve is None:
+        return None
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Seleção de Bombas pela Curva do Sistema")
+    dlg.setMinimumSize(900, 500)
+    layout = QVBoxLayout()
+    layout.addWidget(QLabel(f"Curva do sistema: {system_curve['equation']}"))
+
+    input_layout = QHBoxLayout()
+    input_layout.addWidget(QLabel("Critério:"))
+    criterion_combo = QComboBox()
+    criterion_combo.addItems([label for label, _, _ in SELECTION_CRITERIA])
+    input_layout.addWidget(criterion_combo)
+    inputs = {}
+    for key, label, default in [('top_k', "Candidatos:", "10"),
+                                ('horas_ano', "Horas/ano:", str(LIFECYCLE_DEFAULTS['horas_ano'])),
+                                ('anos', "Anos:", str(LIFECYCLE_DEFAULTS['anos'])),
+                                ('tarifa', "Tarifa (R$/kWh):", str(LIFECYCLE_DEFAULTS['tarifa']).replace('.', ','))]:
+        input_layout.addWidget(QLabel(label))
+        inp = QLineEdit(default)
+        inp.setValidator(QDoubleValidator(0, 1000000, 4))
+        input_layout.addWidget(inp)
+        inputs[key] = inp
+    btn_rank = QPushButton("Classificar")
+    input_layout.addWidget(btn_rank)
+    layout.addLayout(input_layout)
+
+    headers = ["Posição", "Bomba", "Rotor", "RPM", "Diâmetro (mm)", "Vazão (m³/h)", "Altura (m)", "Eficiência (%)",
+               "Vazão / Vazão BEP (%)", "Potência no Eixo (W)", "Custo de Energia (R$)"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def rank():
+        try:
+            values = {key: float(inp.text().replace(',', '.')) for key, inp in inputs.items()}
+            lifecycle = {key: values[key] for key in ('horas_ano', 'anos', 'tarifa')}
+            criterion = SELECTION_CRITERIA[criterion_combo.currentIndex()][1]
+            QApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                results = rank_catalog_selection(system_curve, criterion, int(values['top_k']), lifecycle)
+            finally:
+                QApplication.restoreOverrideCursor()
+        except (ValueError, sqlite3.Error) as e:
+            QMessageBox.critical(dlg, "Erro", f"Erro na seleção: {str(e)}")
+            return
+        table.setRowCount(len(results))
+        for row, r in enumerate(results):
+            diameter = f"{r['diameter']:g}" if not np.isnan(r['diameter']) else "-"
+            cells = [str(row + 1), r['pump'], r['name'], f"{r['rpm']:.0f}", diameter, f"{r['vazao']:.2f}",
+                     f"{r['altura']:.2f}", f"{r['eficiencia']:.2f}", f"{r['fracao_bep'] * 100:.1f}",
+                     f"{r['potencia']:.0f}", f"{r['custo_energia']:.2f}"]
+            for col, value in enumerate(cells):
+                table.setItem(row, col, QTableWidgetItem(value))
+        if not results:
+            QMessageBox.information(dlg, "Seleção", "Nenhum rotor do catálogo cruza a curva do sistema.")
+
+    btn_rank.clicked.connect(rank)
+
+    state = {'selection': None}
+
+    def import_selected():
+        keys = [(table.item(index.row(), 1).text(), table.item(index.row(), 2).text())
+                for index in table.selectionModel().selectedRows()]
+        if not keys:
+            QMessageBox.warning(dlg, "Aviso", "Selecione pelo menos um rotor.")
+            return
+        with PumpCatalog() as catalog:
+            state['selection'] = catalog.load_rotor_data(keys)
+        dlg.accept()
+
+    btn_import = QPushButton("Importar Selecionados")
+    btn_import.clicked.connect(import_selected)
+    layout.addWidget(btn_import)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    dlg.exec_()
+    return state['selection']
+
+def _system_curve_settings(window):
+    """Retorna os parâmetros configurados da curva do sistema 1 da janela ou None."""
+    mode = window.system_curve_mode.currentIndex()
+    manual_points = getattr(window, 'manual_system_points', None)
+    equation_params = getattr(window, 'direct_equation_params', None)
+    if mode == 0 and manual_points:
+        return {'manual_points': manual_points}
+    if mode == 1 and equation_params:
+        return {'equation_params': equation_params}
+    return None
+
+def _show_required_speed_dialog(parent, rotor_data, rotor_rpm, system_curve_settings=None):
+    """
+    Diálogo que calcula a rotação necessária de todos os rotores para um ponto de trabalho
+    e exibe a classificação por menor rotação e potência.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        rotor_rpm: Dicionário {rotor: RPM base}
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Rotação Necessária para o Ponto de Trabalho")
+    dlg.setMinimumSize(800, 450)
+    layout = QVBoxLayout()
+
+    input_layout = QHBoxLayout()
+    input_layout.addWidget(QLabel("Vazão desejada (m³/h):"))
+    q_input = QLineEdit()
+    q_input.setValidator(QDoubleValidator(0, 1000000, 4))
+    input_layout.addWidget(q_input)
+
+    input_layout.addWidget(QLabel("Altura:"))
+    head_source = QComboBox()
+    head_source.addItem("Informada")
+    if system_curve_settings:
+        head_source.addItem("Curva do Sistema 1")
+    input_layout.addWidget(head_source)
+
+    h_input = QLineEdit()
+    h_input.setPlaceholderText("Altura desejada (m)")
+    h_input.setValidator(QDoubleValidator(0, 100000, 4))
+    input_layout.addWidget(h_input)
+    head_source.currentIndexChanged.connect(lambda index: h_input.setEnabled(index == 0))
+
+    btn_calculate = QPushButton("Calcular")
+    input_layout.addWidget(btn_calculate)
+    layout.addLayout(input_layout)
+
+    target_label = QLabel()
+    layout.addWidget(target_label)
+
+    headers = ["Posição", "Rotor", "RPM Base", "RPM Necessário", "Razão de Rotação",
+               "Vazão na Rotação Base (m³/h)", "Eficiência (%)", "Potência Mecânica (W)"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def calculate():
+        try:
+            q_target = float(q_input.text().replace(',', '.'))
+            system_curve = None
+            h_target = None
+            if head_source.currentIndex() == 0:
+                h_target = float(h_input.text().replace(',', '.'))
+            else:
+                system_curve = _calculate_system_curve(max_rotor_q=q_target * 1.1, **system_curve_settings)
+                if system_curve is None:
+                    return
+            result = solve_required_speed(fit, q_target, h_target, system_curve, base_rpms=rotor_rpm,
+                                          density=_fluid_density(parent))
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+
+        target_label.setText(f"Ponto de trabalho: Q = {result['q_target']:.2f} m³/h, "
+                             f"H = {result['h_target']:.2f} m")
+        table.setRowCount(len(result['names']))
+        for position, i in enumerate(result['ordem']):
+            if result['encontrado'][i]:
+                values = [str(position + 1), result['names'][i], f"{result['base_rpm'][i]:.0f}",
+                          f"{result['rpm'][i]:.0f}", f"{result['razao'][i]:.3f}",
+                          f"{result['vazao_base'][i]:.2f}", f"{result['eficiencia'][i]:.2f}",
+                          f"{result['potencia_mecanica'][i]:.0f}"]
+            else:
+                values = ["-", result['names'][i], f"{result['base_rpm'][i]:.0f}",
+                          "Não atinge", "-", "-", "-", "-"]
+            for col, value in enumerate(values):
+                table.setItem(position, col, QTableWidgetItem(value))
+
+    btn_calculate.clicked.connect(calculate)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    dlg.exec_()
+
+# Camada de unidades: fator que converte um valor na unidade externa para a unidade interna.
+# Os cálculos usam sempre m³/h, m e W; arquivos importados e relatórios exportados podem usar
+# outras unidades, convertidas uma única vez por coluna (multiplicação do array inteiro).
+UNIT_FACTORS = {
+    'vazao': {'m³/h': 1.0, 'L/s': 3.6, 'm³/s': 3600.0, 'gpm': 0.227124707},
+    'altura': {'m': 1.0, 'ft': 0.3048},
+    'potencia': {'W': 1.0, 'kW': 1000.0, 'hp': 745.699872, 'cv': 735.49875},
+}
+INTERNAL_UNITS = {'vazao': 'm³/h', 'altura': 'm', 'potencia': 'W'}
+# Grafias aceitas nos cabeçalhos (minúsculas, sem acentos, '³' como '3') -> (grandeza, unidade)
+_UNIT_ALIASES = {
+    'm3/h': ('vazao', 'm³/h'), 'm3h': ('vazao', 'm³/h'),
+    'l/s': ('vazao', 'L/s'), 'lps': ('vazao', 'L/s'),
+    'm3/s': ('vazao', 'm³/s'),
+    'gpm': ('vazao', 'gpm'), 'usgpm': ('vazao', 'gpm'), 'gal/min': ('vazao', 'gpm'),
+    'm': ('altura', 'm'), 'mca': ('altura', 'm'),
+    'ft': ('altura', 'ft'), 'pe': ('altura', 'ft'), 'pes': ('altura', 'ft'),
+    'w': ('potencia', 'W'), 'kw': ('potencia', 'kW'), 'hp': ('potencia', 'hp'), 'cv': ('potencia', 'cv'),
+}
+# Conjuntos de unidades do relatório Excel (rótulo, unidade de cada grandeza)
+REPORT_UNIT_PRESETS = [
+    ("SI (m³/h, m, W)", INTERNAL_UNITS),
+    ("SI (L/s, m, kW)", {'vazao': 'L/s', 'altura': 'm', 'potencia': 'kW'}),
+    ("EUA (gpm, ft, hp)", {'vazao': 'gpm', 'altura': 'ft', 'potencia': 'hp'}),
+]
+ROTOR_CURVE_FILE_FILTER = "Curvas de Rotores (*.csv *.txt *.xlsx)"
+
+def unit_factor(quantity, unit):
+    """
+    Fator de conversão de uma unidade para a unidade interna da grandeza.
+
+    Raises:
+        ValueError: Unidade desconhecida para a grandeza
+    """
+    try:
+        return UNIT_FACTORS[quantity][unit]
+    except KeyError:
+        raise ValueError(f"Unidade '{unit}' inválida para {quantity}")
+
+def to_internal_units(values, quantity, unit):
+    """Converte um array da unidade informada para a unidade interna"""
+    return np.asarray(values, dtype=float) * unit_factor(quantity, unit)
+
+def from_internal_units(values, quantity, unit):
+    """Converte um array da unidade interna para a unidade informada"""
+    return np.asarray(values, dtype=float) / unit_factor(quantity, unit)
+
+def _header_unit(header, quantity):
+    """
+    Unidade indicada entre parênteses ou colchetes no cabeçalho de uma coluna,
+    ex. 'Vazão (gpm)' ou 'H0 [ft]'.
+
+    Returns:
+        Unidade normalizada (chave de UNIT_FACTORS[quantity]); a unidade interna quando
+        o cabeçalho não traz unidade
+
+    Raises:
+        ValueError: Unidade desconhecida ou incompatível com a grandeza da coluna
+    """
+    found = re.findall(r'\(([^()]*)\)|\[([^\[\]]*)\]', str(header or ''))
+    if not found:
+        return INTERNAL_UNITS[quantity]
+    text = ''.join(found[-1]).replace('³', '3')
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    alias = _UNIT_ALIASES.get(text.replace(' ', '').lower())
+    if alias is None or alias[0] != quantity:
+        raise ValueError(f"Unidade '{''.join(found[-1])}' inválida na coluna '{header}'")
+    return alias[1]
+
+# Simulação de energia: níveis da tabela Q_op(ΔH0), pontos da grade de busca e da curva de duração
+ENERGY_LEVELS = 1024
+ENERGY_GRID_POINTS = 400
+LOAD_DURATION_POINTS = 101
+TIME_SERIES_FILE_FILTER = "Séries Temporais (*.csv *.txt *.xlsx)"
+
+def _normalize_header(text):
+    """Cabeçalho em minúsculas, sem acentos e sem a unidade entre parênteses"""
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode()
+    return re.sub(r'\(.*?\)|\[.*?\]', '', text).strip().lower()
+
+def _time_series_column(header):
+    """Identifica a grandeza de uma coluna da série temporal pelo cabeçalho"""
+    name = _normalize_header(header)
+    if name in ('h0', 'hest') or name.startswith('altura estatica'):
+        return 'h0'
+    if name == 'q' or name.startswith('vazao') or name.startswith('demanda'):
+        return 'vazao'
+    if name in ('dt', 'horas') or name.startswith('duracao'):
+        return 'horas'
+    return None
+
+def _read_table_rows(filename):
+    """
+    Lê as linhas de um arquivo tabular: CSV (vírgula, ponto e vírgula ou tabulação,
+    aceitando vírgula decimal) ou Excel (primeira planilha).
+
+    Returns:
+        Tupla (linhas como listas de células, True se o CSV usa vírgula decimal)
+
+    Raises:
+        ValueError: Arquivo vazio
+    """
+    if filename.lower().endswith('.xlsx'):
+        from openpyxl import load_workbook
+        wb = load_workbook(filename, read_only=True, data_only=True)
+        try:
+            rows = [list(row) for row in wb.worksheets[0].iter_rows(values_only=True)]
+        finally:
+            wb.close()
+        decimal_comma = False
+    else:
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            text = f.read()
+        first_line = text.split('\n', 1)[0]
+        delimiter = ';' if ';' in first_line else '\t' if '\t' in first_line else ','
+        rows = list(csv.reader(text.splitlines(), delimiter=delimiter))
+        decimal_comma = delimiter != ','
+    if not rows:
+        raise ValueError("Arquivo vazio")
+    return rows, decimal_comma
+
+def _table_float(rows, line, col, decimal_comma):
+    """Valor numérico de uma célula (linha numerada a partir de 1, como na planilha)"""
+    row = rows[line - 1]
+    cell = row[col] if col < len(row) else None
+    if isinstance(cell, str):
+        cell = cell.strip().replace(',', '.') if decimal_comma else cell.strip()
+    try:
+        return float(cell)
+    except (TypeError, ValueError):
+        raise ValueError(f"Valor inválido na linha {line}, coluna '{rows[0][col]}': {row[col] if col < len(row) else ''}")
+
+def load_time_series(filename):
+    """
+    Lê uma série temporal de operação em CSV (vírgula, ponto e vírgula ou tabulação,
+    aceitando vírgula decimal) ou Excel (primeira planilha).
+
+    A primeira linha é o cabeçalho. Colunas reconhecidas (demais são ignoradas):
+        'H0' ou 'Altura Estática' - altura estática do sistema em cada passo (m)
+        'Q', 'Vazão' ou 'Demanda' - vazão requerida em cada passo (m³/h)
+        'Horas', 'Duração' ou 'dt' - duração de cada passo (h); padrão 1 h
+    H0 e vazão aceitam outra unidade no cabeçalho, ex. 'H0 (ft)' ou 'Vazão (gpm)'; a
+    coluna é convertida para m e m³/h na leitura.
+
+    Returns:
+        Dicionário com 'horas' e, quando presentes, 'h0' e 'vazao' (arrays por passo)
+
+    Raises:
+        ValueError: Arquivo sem colunas reconhecidas ou com valores inválidos
+    """
+    rows, decimal_comma = _read_table_rows(filename)
+    columns = {}
+    for col, header in enumerate(rows[0]):
+        key = _time_series_column(header)
+        if key and key not in columns:
+            columns[key] = col
+    if 'h0' not in columns and 'vazao' not in columns:
+        raise ValueError("A série precisa de uma coluna 'H0' (altura estática) ou 'Vazão' (demanda)")
+
+    quantities = {'h0': 'altura', 'vazao': 'vazao'}
+    units = {key: _header_unit(rows[0][columns[key]], quantities[key])
+             for key in columns if key in quantities}
+
+    values = {key: [] for key in columns}
+    for line, row in enumerate(rows[1:], start=2):
+        if not row or all(cell in (None, '') for cell in row):
+            continue
+        for key, col in columns.items():
+            values[key].append(_table_float(rows, line, col, decimal_comma))
+
+    steps = len(next(iter(values.values())))
+    if steps == 0:
+        raise ValueError("A série não possui passos de tempo")
+    series = {key: np.asarray(vals, dtype=float) for key, vals in values.items()}
+    for key, unit in units.items():
+        series[key] = to_internal_units(series[key], quantities[key], unit)
+    series.setdefault('horas', np.ones(steps))
+    if np.any(series['horas'] < 0):
+        raise ValueError("A duração dos passos não pode ser negativa")
+    return series
+
+def _rotor_curve_column(header):
+    """Identifica a grandeza de uma coluna do arquivo de curvas pelo cabeçalho"""
+    name = _normalize_header(header)
+    if name.startswith('rotor') or name.startswith('diametro') or name == 'd':
+        return 'rotor'
+    if name == 'q' or name.startswith('vazao'):
+        return 'vazao'
+    if name == 'h' or name.startswith('altura'):
+        return 'altura'
+    if name in ('eta', 'eff') or name.startswith('eficiencia') or name.startswith('rendimento'):
+        return 'eficiencia'
+    if name.startswith('npsh'):
+        return 'npshr'
+    return None
+
+def load_rotor_curves(filename):
+    """
+    Lê curvas de rotores de um arquivo CSV ou Excel (formato de _read_table_rows).
+
+    A primeira linha é o cabeçalho. Colunas reconhecidas:
+        'Rotor' ou 'Diâmetro' - identificação do rotor de cada ponto (opcional; sem ela
+                                o arquivo é um único rotor com o nome do arquivo)
+        'Q' ou 'Vazão'        - vazão (m³/h, ou a unidade do cabeçalho: L/s, m³/s, gpm)
+        'H' ou 'Altura'       - altura manométrica (m, ou ft)
+        'Eficiência'          - eficiência (%)
+        'NPSHr'               - NPSH requerido (m, ou ft); opcional
+    Cada coluna é convertida para a unidade interna de uma vez, como array.
+
+    Returns:
+        Dicionário {rotor: {'vazao': [...], 'altura': [...], 'eficiencia': [...]}}, com
+        'npshr' quando presente, pontos ordenados por vazão
+
+    Raises:
+        ValueError: Arquivo sem as colunas obrigatórias, unidade ou valores inválidos
+    """
+    rows, decimal_comma = _read_table_rows(filename)
+    columns = {}
+    for col, header in enumerate(rows[0]):
+        key = _rotor_curve_column(header)
+        if key and key not in columns:
+            columns[key] = col
+    missing = [name for key, name in (('vazao', 'Vazão'), ('altura', 'Altura'), ('eficiencia', 'Eficiência'))
+               if key not in columns]
+    if missing:
+        raise ValueError("O arquivo precisa das colunas: " + ", ".join(missing))
+
+    quantities = {'vazao': 'vazao', 'altura': 'altura', 'npshr': 'altura'}
+    units = {key: _header_unit(rows[0][columns[key]], quantities[key])
+             for key in columns if key in quantities}
+    numeric = [key for key in ('vazao', 'altura', 'eficiencia', 'npshr') if key in columns]
+
+    names, values = [], []
+    default_name = os.path.splitext(os.path.basename(filename))[0]
+    for line, row in enumerate(rows[1:], start=2):
+        if not row or all(cell in (None, '') for cell in row):
+            continue
+        if 'rotor' in columns:
+            cell = row[columns['rotor']] if columns['rotor'] < len(row) else None
+            if isinstance(cell, float) and cell.is_integer():
+                cell = int(cell)
+            name = str(cell).strip() if cell not in (None, '') else ''
+            if not name:
+                raise ValueError(f"Rotor não informado na linha {line}")
+        else:
+            name = default_name
+        names.append(name)
+        values.append([_table_float(rows, line, columns[key], decimal_comma) for key in numeric])
+    if not values:
+        raise ValueError("O arquivo não possui pontos")
+
+    table = np.asarray(values, dtype=float)
+    arrays = {key: table[:, i] for i, key in enumerate(numeric)}
+    for key, unit in units.items():
+        arrays[key] = to_internal_units(arrays[key], quantities[key], unit)
+
+    names = np.asarray(names, dtype=object)
+    rotor_data = {}
+    for name in dict.fromkeys(names):
+        mask = names == name
+        order = np.argsort(arrays['vazao'][mask], kind='stable')
+        rotor_data[name] = {key: arrays[key][mask][order].tolist() for key in numeric}
+        if len(rotor_data[name]['vazao']) < 2:
+            raise ValueError(f"O rotor '{name}' precisa de pelo menos 2 pontos")
+    return rotor_data
+
+def _operating_flow_table(fit, system_curve_data, rows, grid_points, levels):
+    """
+    Tabela Q_op(ΔH0) de cada rotor: vazão de operação (primeira interseção, como em
+    solve_operating_points) quando a curva do sistema é deslocada de ΔH0.
+
+    Returns:
+        Tupla (níveis ΔH0 crescentes (n, levels), vazões de operação (n, levels))
+    """
+    system_q = np.asarray(system_curve_data['Q'], dtype=float)
+    system_h = np.asarray(system_curve_data['H'], dtype=float)
+    q_lo = np.maximum(fit['q_min'][rows], system_q.min())
+    q_hi = np.minimum(fit['q_max'][rows], system_q.max())
+
+    t = np.linspace(0.0, 1.0, grid_points)
+    q_grid = q_lo[:, None] + (q_hi - q_lo)[:, None] * t
+    margin = (evaluate_rotor_curves(fit, q_grid, 'head', rows=rows)
+              - np.interp(q_grid.ravel(), system_q, system_h).reshape(q_grid.shape))
+
+    shifts = np.full((len(rows), levels), np.nan)
+    q_table = np.full((len(rows), levels), np.nan)
+    for k in range(len(rows)):
+        if not q_hi[k] > q_lo[k]:
+            continue
+        shifts[k] = np.linspace(margin[k].min(), margin[k].max(), levels)
+        diff = margin[k][None, :] - shifts[k][:, None]
+        q_table[k], _ = _first_crossing(np.broadcast_to(q_grid[k], diff.shape), diff,
+                                        np.ones(levels, dtype=bool))
+    return shifts, q_table
+
+def simulate_energy(fit, system_curve_data, series, rows=None, tarifa=LIFECYCLE_DEFAULTS['tarifa'],
+                    grid_points=ENERGY_GRID_POINTS, levels=ENERGY_LEVELS, density=WATER_DENSITY):
+    """
+    Simula, para cada passo da série temporal e cada rotor, o ponto de operação, a
+    eficiência, a potência no eixo e a energia consumida.
+
+    Com 'h0', a curva do sistema é deslocada verticalmente para a altura estática de cada
+    passo e a vazão vem da tabela Q_op(ΔH0) de cada rotor, calculada uma única vez.
+    Com 'vazao', a bomba opera na vazão requerida e o excesso de altura é estrangulado
+    na válvula; o passo não é atendido se a vazão está fora da curva do rotor ou se a
+    altura do rotor é menor que a do sistema. Vazão requerida nula desliga a bomba.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        system_curve_data: Curva do sistema de referência (chaves 'Q' e 'H')
+        series: Série temporal de load_time_series
+        rows: Índices dos rotores a simular (padrão: todos)
+        tarifa: Tarifa de energia (R$/kWh)
+        grid_points: Pontos da grade de busca do ponto de operação
+        levels: Níveis da tabela Q_op(ΔH0)
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com arrays (rotor, passo) de vazão, altura, eficiência, potência (W),
+        energia (kWh) e atendimento, e os totais por rotor
+    """
+    if rows is None:
+        rows = np.arange(len(fit['names']))
+    rows = np.asarray(rows, dtype=int)
+    n = len(rows)
+    hours = np.asarray(series['horas'], dtype=float)
+    steps = len(hours)
+
+    system_q = np.asarray(system_curve_data['Q'], dtype=float)
+    system_h = np.asarray(system_curve_data['H'], dtype=float)
+    if 'h0' in series:
+        shift = np.asarray(series['h0'], dtype=float) - np.interp(0.0, system_q, system_h)
+    else:
+        shift = np.zeros(steps)
+
+    if 'vazao' in series:
+        demand = np.broadcast_to(np.asarray(series['vazao'], dtype=float), (n, steps))
+        running = demand > 0
+        q_op = np.where(running, demand, 0.0)
+        in_curve = (q_op >= fit['q_min'][rows, None]) & (q_op <= fit['q_max'][rows, None])
+        head = evaluate_rotor_curves(fit, q_op, 'head', rows=rows)
+        system_head = np.interp(q_op.ravel(), system_q, system_h).reshape(q_op.shape) + shift
+        met = ~running | (in_curve & (head >= system_head))
+    else:
+        shifts, q_table = _operating_flow_table(fit, system_curve_data, rows, grid_points, levels)
+        q_op = np.full((n, steps), np.nan)
+        for k in range(n):
+            if not np.isnan(shifts[k, 0]):
+                q_op[k] = np.interp(shift, shifts[k], q_table[k], left=np.nan, right=np.nan)
+        running = np.ones((n, steps), dtype=bool)
+        met = ~np.isnan(q_op)
+        q_op = np.where(met, q_op, 0.0)
+        head = evaluate_rotor_curves(fit, q_op, 'head', rows=rows)
+
+    eff = evaluate_rotor_curves(fit, q_op, 'efficiency', rows=rows)
+    met &= ~running | (eff > 0)
+    on = running & met
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hydraulic = density * GRAVITY * (q_op / 3600) * head
+        power = np.where(on, hydraulic / (eff / 100), 0.0)
+    energy = power * hours / 1000
+
+    total_energy = energy.sum(axis=1)
+    volume = np.where(on, q_op * hours, 0.0).sum(axis=1)
+    hydraulic_energy = np.where(on, hydraulic * hours / 1000, 0.0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        specific = np.where(volume > 0, total_energy / volume, np.nan)
+        mean_eff = np.where(total_energy > 0, 100 * hydraulic_energy / total_energy, np.nan)
+
+    return {
+        'names': [fit['names'][i] for i in rows],
+        'horas': hours,
+        'vazao': np.where(on, q_op, np.where(met, 0.0, np.nan)),
+        'altura': np.where(on, head, np.nan),
+        'eficiencia': np.where(on, eff, np.nan),
+        'potencia': power,
+        'energia': energy,
+        'atendido': met,
+        'energia_total': total_energy,
+        'volume': volume,
+        'energia_especifica': specific,
+        'eficiencia_media': mean_eff,
+        'potencia_maxima': power.max(axis=1, initial=0.0),
+        'horas_nao_atendidas': np.where(met, 0.0, hours).sum(axis=1),
+        'custo': total_energy * tarifa,
+        'tarifa': float(tarifa),
+    }
+
+def load_duration_curve(power, hours, points=LOAD_DURATION_POINTS):
+    """
+    Curva de duração de carga: potência excedida em cada fração do tempo.
+
+    Args:
+        power: Potência por rotor e passo (n, passos)
+        hours: Duração de cada passo (h)
+        points: Número de frações do tempo entre 0 e 100%
+
+    Returns:
+        Tupla (porcentagem do tempo (points,), potência excedida (n, points))
+    """
+    power = np.atleast_2d(power)
+    hours = np.asarray(hours, dtype=float)
+    order = np.argsort(-power, axis=1, kind='stable')
+    sorted_power = np.take_along_axis(power, order, axis=1)
+    total = hours.sum()
+    # Fração do tempo no meio de cada passo ordenado
+    cumulative = np.cumsum(hours[order], axis=1) - hours[order] / 2
+    fraction = 100 * cumulative / total if total > 0 else cumulative
+    percent = np.linspace(0.0, 100.0, points)
+    curve = np.array([np.interp(percent, fraction[k], sorted_power[k]) for k in range(len(power))])
+    return percent, curve.reshape(len(power), points)
+
+# Simulação do reservatório: parâmetros padrão (m, m², m³/h, minutos, dias) e pontos da tabela Q_op(nível)
+TANK_DEFAULTS = {
+    'area': 50.0,
+    'nivel_min': 0.5,
+    'nivel_max': 5.0,
+    'nivel_liga': 1.5,
+    'nivel_desliga': 4.5,
+    'nivel_inicial': 3.0,
+    'demanda': 30.0,
+    'passo_min': 1.0,
+    'dias': 365.0,
+}
+TANK_LEVEL_POINTS = 256
+
+def _validate_tank(tank):
+    """Confere a consistência dos níveis e parâmetros do reservatório"""
+    if tank['area'] <= 0 or tank['passo_min'] <= 0 or tank['dias'] <= 0:
+        raise ValueError("Área, passo e duração devem ser maiores que zero")
+    if not tank['nivel_min'] < tank['nivel_liga'] < tank['nivel_desliga'] <= tank['nivel_max']:
+        raise ValueError("Os níveis devem obedecer: mínimo < liga < desliga ≤ máximo")
+    if not tank['nivel_min'] <= tank['nivel_inicial'] <= tank['nivel_max']:
+        raise ValueError("O nível inicial deve estar entre o mínimo e o máximo")
+
+def _tank_demand_steps(tank, demand, steps, dt_h):
+    """
+    Demanda (m³/h) de cada passo do simulador; uma série mais curta que a simulação
+    (por exemplo, um padrão diário de 24 horas) é repetida ciclicamente.
+    """
+    if demand is None or 'vazao' not in demand:
+        return np.full(steps, float(tank['demanda']))
+    bounds = np.cumsum(demand['horas'])
+    period = bounds[-1]
+    if period <= 0:
+        raise ValueError("A série de demanda não possui duração")
+    t = np.mod((np.arange(steps) + 0.5) * dt_h, period)
+    index = np.minimum(np.searchsorted(bounds, t, side='right'), len(bounds) - 1)
+    return np.maximum(np.asarray(demand['vazao'], dtype=float)[index], 0.0)
+
+def simulate_tank(fit, system_curve_data, tank, demand=None, rows=None, tarifa=LIFECYCLE_DEFAULTS['tarifa'],
+                  level_points=TANK_LEVEL_POINTS, density=WATER_DENSITY):
+    """
+    Simulação de período estendido de um reservatório elevado abastecido por uma bomba
+    com controle liga/desliga por nível, repetida para cada rotor.
+
+    A altura estática cresce com o nível: H = Hsistema(Q) + nível. O ponto de operação
+    de cada nível vem de uma tabela Q_op(nível) calculada uma única vez por rotor
+    (mesma busca de solve_operating_points). Com a bomba desligada o nível só depende
+    da demanda, então o instante em que atinge o nível de partida é localizado
+    diretamente na demanda acumulada (searchsorted); apenas os passos com a bomba
+    ligada são integrados passo a passo.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        system_curve_data: Curva do sistema com o reservatório no nível zero (chaves 'Q' e 'H')
+        tank: Parâmetros do reservatório (chaves de TANK_DEFAULTS)
+        demand: Série de demanda de load_time_series (coluna de vazão) ou None para demanda constante
+        rows: Índices dos rotores a simular (padrão: todos)
+        tarifa: Tarifa de energia (R$/kWh)
+        level_points: Pontos da tabela Q_op(nível)
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com o nível de cada passo (rotor, passo) e, por rotor, partidas,
+        horas ligada, energia, custo, volume bombeado, déficit de abastecimento e níveis extremos
+    """
+    tank = {**TANK_DEFAULTS, **tank}
+    _validate_tank(tank)
+    if rows is None:
+        rows = np.arange(len(fit['names']))
+    rows = np.asarray(rows, dtype=int)
+    n = len(rows)
+
+    dt_h = tank['passo_min'] / 60
+    steps = int(round(tank['dias'] * 24 / dt_h))
+    area = tank['area']
+    l_min, l_max = tank['nivel_min'], tank['nivel_max']
+    l_on, l_off = tank['nivel_liga'], tank['nivel_desliga']
+
+    demand_flow = _tank_demand_steps(tank, demand, steps, dt_h)
+    demand_volume = demand_flow * dt_h
+    cumulative = np.concatenate(([0.0], np.cumsum(demand_volume)))
+
+    # Tabelas Q_op(nível) e potência(nível) de todos os rotores
+    levels = np.linspace(l_min, l_max, level_points)
+    shifts, q_table = _operating_flow_table(fit, system_curve_data, rows, ENERGY_GRID_POINTS, ENERGY_LEVELS)
+    q_level = np.zeros((n, level_points))
+    for k in range(n):
+        if not np.isnan(shifts[k, 0]):
+            # Abaixo do menor deslocamento a bomba opera no fim da curva; acima dela não há vazão
+            q_level[k] = np.interp(levels, shifts[k], q_table[k], left=q_table[k, 0], right=0.0)
+    head_level = evaluate_rotor_curves(fit, q_level, 'head', rows=rows)
+    eff_level = evaluate_rotor_curves(fit, q_level, 'efficiency', rows=rows)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        power_level = np.where((q_level > 0) & (eff_level > 0),
+                               density * GRAVITY * (q_level / 3600) * head_level / (eff_level / 100), 0.0)
+
+    inv_step = (level_points - 1) / (l_max - l_min)
+    last = level_points - 2
+    level_trace = np.empty((n, steps), dtype=np.float32)
+    result = {key: np.zeros(n) for key in ('partidas', 'horas_ligada', 'energia', 'volume_bombeado',
+                                           'deficit', 'horas_sem_vazao', 'partidas_hora_max')}
+
+    for r in range(n):
+        q_tab = q_level[r].tolist()
+        p_tab = power_level[r].tolist()
+        trace = level_trace[r]
+        level = tank['nivel_inicial']
+        running = level <= l_on
+        starts = [0] if running else []
+        on_steps = energy = pumped = deficit = dry_steps = 0.0
+        k = 0
+        while k < steps:
+            if not running:
+                # Bomba desligada: próximo passo em que a demanda acumulada leva o nível à partida
+                target = cumulative[k] + (level - l_on) * area
+                stop = min(int(np.searchsorted(cumulative, target, side='left')), steps)
+                if stop > k:
+                    trace[k:stop] = level - (cumulative[k + 1:stop + 1] - cumulative[k]) / area
+                    level = float(trace[stop - 1])
+                k = stop
+                if k < steps:
+                    running = True
+                    starts.append(k)
+                continue
+
+            # Bomba ligada: integração passo a passo com interpolação na tabela
+            while k < steps:
+                x = (level - l_min) * inv_step
+                i = min(max(int(x), 0), last)
+                f = x - i
+                q = q_tab[i] + (q_tab[i + 1] - q_tab[i]) * f
+                p = p_tab[i] + (p_tab[i + 1] - p_tab[i]) * f
+                level += (q * dt_h - demand_volume[k]) / area
+                if level < l_min:
+                    deficit += (l_min - level) * area
+                    level = l_min
+                if q <= 0:
+                    dry_steps += 1
+                pumped += q
+                energy += p
+                on_steps += 1
+                trace[k] = level
+                k += 1
+                if level >= l_off:
+                    running = False
+                    break
+
+        result['partidas'][r] = len(starts)
+        result['horas_ligada'][r] = on_steps * dt_h
+        result['energia'][r] = energy * dt_h / 1000
+        result['volume_bombeado'][r] = pumped * dt_h
+        result['deficit'][r] = deficit
+        result['horas_sem_vazao'][r] = dry_steps * dt_h
+        if starts:
+            result['partidas_hora_max'][r] = np.bincount((np.asarray(starts) * dt_h).astype(int)).max()
+
+    result.update({
+        'names': [fit['names'][i] for i in rows],
+        'passos': steps,
+        'passo_horas': dt_h,
+        'nivel': level_trace,
+        'nivel_minimo': level_trace.min(axis=1) if steps else np.zeros(n),
+        'nivel_maximo': level_trace.max(axis=1) if steps else np.zeros(n),
+        'demanda_total': float(demand_volume.sum()),
+        'custo': result['energia'] * tarifa,
+        'tarifa': float(tarifa),
+    })
+    return result
+
+# Campos do diálogo do reservatório: (chave, rótulo)
+TANK_FIELDS = [
+    ('area', "Área do reservatório (m²)"),
+    ('nivel_min', "Nível mínimo (m)"),
+    ('nivel_max', "Nível máximo (m)"),
+    ('nivel_liga', "Nível para ligar a bomba (m)"),
+    ('nivel_desliga', "Nível para desligar a bomba (m)"),
+    ('nivel_inicial', "Nível inicial (m)"),
+    ('demanda', "Demanda constante (m³/h)"),
+    ('passo_min', "Passo de tempo (min)"),
+    ('dias', "Duração (dias)"),
+]
+
+def _show_tank_simulation_dialog(parent, rotor_data, system_curve_settings, tank_settings):
+    """
+    Diálogo da simulação de período estendido do reservatório com controle liga/desliga.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+            (altura do sistema com o reservatório no nível zero)
+        tank_settings: Configuração atual (ou None)
+
+    Returns:
+        Configuração {'tanque', 'demanda', 'tarifa'} para o relatório, None para remover,
+        ou tank_settings se cancelado
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    if not system_curve_settings:
+        QMessageBox.warning(parent, "Erro", "Configure a Curva do Sistema 1 primeiro!")
+        return tank_settings
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return tank_settings
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return tank_settings
+
+    current = tank_settings or {}
+    tank = {**TANK_DEFAULTS, **current.get('tanque', {})}
+    state = {'demand': current.get('demanda')}
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Simulação do Reservatório (Liga/Desliga por Nível)")
+    dlg.setMinimumSize(900, 550)
+    layout = QVBoxLayout()
+
+    inputs = {}
+    for key, label in TANK_FIELDS + [('tarifa', "Tarifa (R$/kWh)")]:
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label), 1)
+        value = current.get('tarifa', LIFECYCLE_DEFAULTS['tarifa']) if key == 'tarifa' else tank[key]
+        inputs[key] = QLineEdit(f"{value:g}".replace('.', ','))
+        inputs[key].setValidator(QDoubleValidator(0, 1000000, 4))
+        row.addWidget(inputs[key], 1)
+        layout.addLayout(row)
+
+    demand_layout = QHBoxLayout()
+    demand_label = QLabel()
+    demand_layout.addWidget(demand_label, 1)
+    btn_demand = QPushButton("Carregar Padrão de Demanda")
+    demand_layout.addWidget(btn_demand)
+    btn_constant = QPushButton("Usar Demanda Constante")
+    demand_layout.addWidget(btn_constant)
+    layout.addLayout(demand_layout)
+
+    btn_simulate = QPushButton("Simular")
+    layout.addWidget(btn_simulate)
+
+    headers = ["Rotor", "Partidas", "Máx. Partidas/Hora", "Horas Ligada", "Energia (kWh)", "Custo (R$)",
+               "Volume Bombeado (m³)", "Déficit (m³)", "Nível Mín. (m)", "Nível Máx. (m)"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def describe():
+        demand = state['demand']
+        if demand is None:
+            demand_label.setText("Demanda constante")
+        else:
+            demand_label.setText(f"Padrão de demanda: {os.path.basename(demand['arquivo'])} "
+                                 f"({len(demand['horas'])} passos, {demand['horas'].sum():g} h, repetido)")
+        inputs['demanda'].setEnabled(demand is None)
+
+    def load_demand():
+        filename, _ = QFileDialog.getOpenFileName(dlg, "Carregar Padrão de Demanda", "", TIME_SERIES_FILE_FILTER)
+        if not filename:
+            return
+        try:
+            demand = load_time_series(filename)
+            if 'vazao' not in demand:
+                raise ValueError("A série precisa de uma coluna 'Vazão' (demanda)")
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(dlg, "Erro", f"Não foi possível ler a demanda: {str(e)}")
+            return
+        demand['arquivo'] = filename
+        state['demand'] = demand
+        describe()
+
+    def use_constant():
+        state['demand'] = None
+        describe()
+
+    def read_settings():
+        values = {key: float(field.text().replace(',', '.')) for key, field in inputs.items()}
+        tarifa = values.pop('tarifa')
+        _validate_tank(values)
+        return {'tanque': values, 'demanda': state['demand'], 'tarifa': tarifa}
+
+    def simulate():
+        try:
+            settings = read_settings()
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+        system_curve = _calculate_system_curve(max_rotor_q=float(fit['q_max'].max()) * 1.1,
+                                               **system_curve_settings)
+        if system_curve is None:
+            return
+        result = simulate_tank(fit, system_curve, settings['tanque'], settings['demanda'],
+                               tarifa=settings['tarifa'], density=_fluid_density(parent))
+        table.setRowCount(len(result['names']))
+        for i, name in enumerate(result['names']):
+            values = [name, f"{result['partidas'][i]:.0f}", f"{result['partidas_hora_max'][i]:.0f}",
+                      f"{result['horas_ligada'][i]:.1f}", f"{result['energia'][i]:.0f}",
+                      f"{result['custo'][i]:.2f}", f"{result['volume_bombeado'][i]:.0f}",
+                      f"{result['deficit'][i]:.1f}", f"{result['nivel_minimo'][i]:.2f}",
+                      f"{result['nivel_maximo'][i]:.2f}"]
+            for col, value in enumerate(values):
+                table.setItem(i, col, QTableWidgetItem(value))
+
+    btn_demand.clicked.connect(load_demand)
+    btn_constant.clicked.connect(use_constant)
+    btn_simulate.clicked.connect(simulate)
+    describe()
+
+    layout.addWidget(QLabel("A configuração é simulada no relatório para cada curva do sistema "
+                            "(altura do sistema somada ao nível do reservatório)."))
+    buttons = QDialogButtonBox()
+    btn_remove = buttons.addButton("Remover do Relatório", QDialogButtonBox.DestructiveRole)
+    buttons.addButton(QDialogButtonBox.Ok)
+    buttons.addButton(QDialogButtonBox.Cancel)
+    removed = []
+    btn_remove.clicked.connect(lambda: (removed.append(True), dlg.accept()))
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return tank_settings
+    if removed:
+        return None
+    try:
+        return read_settings()
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Valores inválidos: {str(e)}")
+        return tank_settings
+
+def _show_energy_simulation_dialog(parent, rotor_data, system_curve_settings, energy_series):
+    """
+    Diálogo que carrega a série temporal de operação, simula o consumo de energia de
+    todos os rotores na curva do sistema 1 e guarda a série para o relatório.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+        energy_series: Série atualmente configurada (ou None)
+
+    Returns:
+        Série configurada (com arquivo e tarifa), None para remover, ou energy_series se cancelado
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    if not system_curve_settings:
+        QMessageBox.warning(parent, "Erro", "Configure a Curva do Sistema 1 primeiro!")
+        return energy_series
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return energy_series
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return energy_series
+
+    state = {'series': energy_series}
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Simulação de Consumo de Energia")
+    dlg.setMinimumSize(850, 450)
+    layout = QVBoxLayout()
+
+    file_layout = QHBoxLayout()
+    file_label = QLabel()
+    file_layout.addWidget(file_label, 1)
+    btn_load = QPushButton("Carregar Série Temporal")
+    file_layout.addWidget(btn_load)
+    btn_clear = QPushButton("Remover Série")
+    file_layout.addWidget(btn_clear)
+    layout.addLayout(file_layout)
+
+    tariff_layout = QHBoxLayout()
+    tariff_layout.addWidget(QLabel("Tarifa (R$/kWh):"))
+    tariff_input = QLineEdit(f"{(energy_series or {}).get('tarifa', LIFECYCLE_DEFAULTS['tarifa']):g}".replace('.', ','))
+    tariff_input.setValidator(QDoubleValidator(0, 100, 4))
+    tariff_layout.addWidget(tariff_input)
+    btn_simulate = QPushButton("Simular")
+    tariff_layout.addWidget(btn_simulate)
+    layout.addLayout(tariff_layout)
+
+    headers = ["Rotor", "Energia (kWh)", "Custo (R$)", "Volume (m³)", "Energia Específica (kWh/m³)",
+               "Eficiência Média (%)", "Potência Máxima (W)", "Horas Não Atendidas"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def describe():
+        series = state['series']
+        if series is None:
+            file_label.setText("Nenhuma série carregada")
+            return
+        kinds = [label for key, label in (('h0', "altura estática"), ('vazao', "vazão requerida")) if key in series]
+        file_label.setText(f"{os.path.basename(series['arquivo'])}: {len(series['horas'])} passos, "
+                           f"{series['horas'].sum():.0f} h ({', '.join(kinds)})")
+
+    def load():
+        filename, _ = QFileDialog.getOpenFileName(dlg, "Carregar Série Temporal", "", TIME_SERIES_FILE_FILTER)
+        if not filename:
+            return
+        try:
+            series = load_time_series(filename)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(dlg, "Erro", f"Não foi possível ler a série: {str(e)}")
+            return
+        series['arquivo'] = filename
+        state['series'] = series
+        describe()
+        simulate()
+
+    def clear():
+        state['series'] = None
+        table.setRowCount(0)
+        describe()
+
+    def simulate():
+        series = state['series']
+        if series is None:
+            return
+        # A tarifa só é gravada na série quando o diálogo é confirmado
+        try:
+            tarifa = float(tariff_input.text().replace(',', '.'))
+        except ValueError:
+            QMessageBox.critical(dlg, "Erro", "Tarifa inválida")
+            return
+        max_q = max(float(fit['q_max'].max()), float(np.max(series.get('vazao', 0))))
+        system_curve = _calculate_system_curve(max_rotor_q=max_q * 1.1, **system_curve_settings)
+        if system_curve is None:
+            return
+        result = simulate_energy(fit, system_curve, series, tarifa=tarifa, density=_fluid_density(parent))
+        table.setRowCount(len(result['names']))
+        for i, name in enumerate(result['names']):
+            values = [name, f"{result['energia_total'][i]:.0f}", f"{result['custo'][i]:.2f}",
+                      f"{result['volume'][i]:.0f}", f"{result['energia_especifica'][i]:.4f}",
+                      f"{result['eficiencia_media'][i]:.1f}", f"{result['potencia_maxima'][i]:.0f}",
+                      f"{result['horas_nao_atendidas'][i]:.0f}"]
+            for col, value in enumerate(values):
+                table.setItem(i, col, QTableWidgetItem(value))
+
+    btn_load.clicked.connect(load)
+    btn_clear.clicked.connect(clear)
+    btn_simulate.clicked.connect(simulate)
+    describe()
+    if energy_series is not None:
+        simulate()
+
+    layout.addWidget(QLabel("A série configurada é simulada no relatório para cada curva do sistema."))
+    buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return energy_series
+    if state['series'] is None:
+        return None
+    try:
+        tarifa = float(tariff_input.text().replace(',', '.'))
+    except ValueError:
+        tarifa = state['series'].get('tarifa', LIFECYCLE_DEFAULTS['tarifa'])
+    # Cópia: a série da janela só muda pelo valor retornado
+    return dict(state['series'], tarifa=tarifa)
+
+# Estação de bombeamento: tolerância do resíduo (m), limites de iterações de Newton e de
+# reduções do passo, e número máximo de bombas para enumerar as combinações liga/desliga
+STATION_TOLERANCE = 1e-8
+STATION_MAX_ITER = 50
+STATION_BACKTRACK = 20
+STATION_MAX_PUMPS = 8
+
+def _station_pump_heads(fit, rows, q):
+    """
+    Altura e derivada dH/dQ (diferença central) das bombas da estação.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        rows: Rotor de cada bomba, forma (n,) (o mesmo rotor pode aparecer várias vezes)
+        q: Vazões, forma (cenários, n)
+
+    Returns:
+        Tupla (alturas, derivadas), ambas com a forma de q
+    """
+    step = 1e-4 * np.maximum(fit['q_max'][rows], 1.0)[:, None]
+    q_rows = q.T  # Uma linha por bomba
+    head = evaluate_rotor_curves(fit, q_rows, 'head', rows=rows)
+    slope = (evaluate_rotor_curves(fit, q_rows + step, 'head', rows=rows)
+             - evaluate_rotor_curves(fit, q_rows - step, 'head', rows=rows)) / (2 * step)
+    return head.T, slope.T
+
+def solve_pump_station(fit, rows, branch_k, static_head, system_k, active=None, q0=None,
+                       tol=STATION_TOLERANCE, max_iter=STATION_MAX_ITER, density=WATER_DENSITY):
+    """
+    Resolve as vazões de bombas em paralelo com perdas individuais nos ramais (sucção e
+    recalque de cada bomba) até um coletor comum, para vários cenários de uma só vez.
+
+    Para cada bomba ligada: H_i(Q_i) - k_i·Q_i·|Q_i| = H0 + K·Qt·|Qt|, com Qt = ΣQ_i.
+    O Jacobiano é diagonal mais uma matriz de posto 1 (o coletor acopla todas as bombas),
+    então cada passo de Newton é resolvido pela fórmula de Sherman-Morrison em O(n) por
+    cenário, sem montar a matriz. Cada bomba tem válvula de retenção: se a altura de
+    shutoff não vence o coletor, ela fica fechada com vazão zero.
+
+    Args:
+        fit: Resultado de fit_rotor_curves
+        rows: Rotor de cada bomba (índices de fit), forma (n,)
+        branch_k: Coeficiente de perda do ramal de cada bomba (m/(m³/h)²), forma (n,) ou (m, n)
+        static_head: Altura estática no coletor por cenário (m), escalar ou forma (m,)
+        system_k: Coeficiente de perda da linha comum (m/(m³/h)²), escalar ou forma (m,)
+        active: Bombas ligadas em cada cenário, forma (m, n) (padrão: todas)
+        q0: Estimativa inicial das vazões, forma (m, n)
+        tol: Tolerância do resíduo
+        max_iter: Máximo de iterações de Newton
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com arrays (cenário, bomba) de vazão, altura, eficiência, potência (W)
+        e estado, e por cenário vazão total, altura no coletor, potência total,
+        iterações e convergência
+    """
+    rows = np.asarray(rows, dtype=int)
+    n = len(rows)
+    static_head = np.atleast_1d(np.asarray(static_head, dtype=float))
+    system_k = np.atleast_1d(np.asarray(system_k, dtype=float))
+    m = max(len(static_head), len(system_k), 1 if active is None else np.shape(active)[0])
+    static_head = np.broadcast_to(static_head, (m,))
+    system_k = np.broadcast_to(system_k, (m,))
+    branch_k = np.broadcast_to(np.asarray(branch_k, dtype=float), (m, n))
+    active = np.ones((m, n), dtype=bool) if active is None else np.broadcast_to(active, (m, n))
+    shutoff = evaluate_rotor_curves(fit, np.zeros(n), 'head', rows=rows)
+
+    def residual(q):
+        total = q.sum(axis=1)
+        header = static_head + system_k * total * np.abs(total)
+        head, slope = _station_pump_heads(fit, rows, q)
+        # Válvula de retenção: a bomba só abre se vence a altura do coletor
+        open_ = active & ((q > 0) | (shutoff[None, :] > header[:, None]))
+        f = np.where(open_, head - branch_k * q * np.abs(q) - header[:, None], q)
+        return f, slope, open_, total, header
+
+    if q0 is None:
+        q0 = np.broadcast_to(0.5 * (fit['q_min'][rows] + fit['q_max'][rows]), (m, n))
+    q = np.where(active, np.maximum(q0, 0.0), 0.0)
+    iterations = np.zeros(m, dtype=int)
+    for _ in range(max_iter):
+        f, slope, open_, total, header = residual(q)
+        error = np.abs(f).max(axis=1, initial=0.0)
+        done = error < tol
+        if done.all():
+            break
+        iterations += ~done
+
+        # Passo de Newton: J = D - s·u·uᵀ, com u indicando as bombas abertas
+        d = np.where(open_, np.minimum(slope - 2 * branch_k * np.abs(q), -1e-9), 1.0)
+        s = 2 * system_k * np.abs(total)
+        u = open_.astype(float)
+        d_f = f / d
+        d_u = u / d
+        coupling = s * (u * d_f).sum(axis=1) / (1.0 - s * d_u.sum(axis=1))
+        step = d_f + coupling[:, None] * d_u
+
+        # Redução do passo por cenário até o resíduo diminuir
+        scale = np.ones(m)
+        pending = ~done
+        q_next = q.copy()
+        for _ in range(STATION_BACKTRACK):
+            trial = np.where(active, np.maximum(q - scale[:, None] * step, 0.0), 0.0)
+            accepted = pending & (np.abs(residual(trial)[0]).max(axis=1, initial=0.0) < error)
+            q_next[accepted] = trial[accepted]
+            pending &= ~accepted
+            if not pending.any():
+                break
+            scale = np.where(pending, scale / 2, scale)
+        q_next[pending] = trial[pending]
+        q = q_next
+
+    f, _, open_, total, header = residual(q)
+    converged = np.abs(f).max(axis=1, initial=0.0) < tol
+    q = np.where(open_, q, 0.0)
+    head = evaluate_rotor_curves(fit, q.T, 'head', rows=rows).T
+    eff = evaluate_rotor_curves(fit, q.T, 'efficiency', rows=rows).T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        power = np.where(open_ & (q > 0), density * GRAVITY * (q / 3600) * head / (eff / 100), 0.0)
+    outside = open_ & ((q < fit['q_min'][rows]) | (q > fit['q_max'][rows]))
+
+    return {
+        'names': [fit['names'][i] for i in rows],
+        'vazao': q,
+        'altura': np.where(open_, head, np.nan),
+        'eficiencia': np.where(open_, eff, np.nan),
+        'potencia': power,
+        'aberta': open_,
+        'fora_da_curva': outside,
+        'vazao_total': total,
+        'altura_coletor': header,
+        'potencia_total': power.sum(axis=1),
+        'iteracoes': iterations,
+        'convergiu': converged,
+    }
+
+def _station_combinations(n):
+    """Todas as combinações liga/desliga de n bombas com pelo menos uma ligada, forma (2ⁿ-1, n)"""
+    codes = np.arange(1, 2 ** n)
+    return (codes[:, None] >> np.arange(n)[None, :]) & 1 == 1
+
+def _show_pump_station_dialog(parent, rotor_data, system_curve_settings):
+    """
+    Diálogo da estação de bombeamento: bombas em paralelo com perdas próprias nos ramais
+    e linha comum, resolvidas para todas as combinações liga/desliga e vários níveis
+    de altura estática.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+            (usado apenas como valor inicial de H0 e K da linha comum), ou None
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    try:
+        fit = fit_rotor_curves(rotor_data, model='linear')
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Não foi possível ajustar as curvas: {str(e)}")
+        return
+    if not fit['names']:
+        QMessageBox.warning(parent, "Erro", "Nenhum rotor com pelo menos 2 pontos válidos!")
+        return
+
+    static_head, line_k = 20.0, 0.001
+    if system_curve_settings:
+        system_curve = _calculate_system_curve(max_rotor_q=float(fit['q_max'].max()) * 1.1,
+                                               **system_curve_settings)
+        if system_curve is not None:
+            static_head, line_k = system_curve['static_head'], max(system_curve['k_factor'], 0.0)
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Estação de Bombeamento (Ramais Individuais)")
+    dlg.setMinimumSize(1000, 650)
+    layout = QVBoxLayout()
+
+    layout.addWidget(QLabel("Bombas em paralelo (perda no ramal: h = K × Q², Q em m³/h):"))
+    pump_table = QTableWidget(0, 2)
+    pump_table.setHorizontalHeaderLabels(["Rotor", "K do Ramal (m/(m³/h)²)"])
+    pump_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(pump_table)
+
+    pump_buttons = QHBoxLayout()
+    btn_add = QPushButton("Adicionar Bomba")
+    btn_remove = QPushButton("Remover Bomba Selecionada")
+    pump_buttons.addWidget(btn_add)
+    pump_buttons.addWidget(btn_remove)
+    layout.addLayout(pump_buttons)
+
+    inputs = {}
+    for key, label, value in [('h0_min', "Altura estática mínima (m)", static_head),
+                              ('h0_max', "Altura estática máxima (m)", static_head),
+                              ('niveis', "Níveis de altura estática", 1),
+                              ('k_linha', "K do coletor e da linha comum (m/(m³/h)²)", line_k)]:
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label), 1)
+        inputs[key] = QLineEdit(f"{value:g}".replace('.', ','))
+        inputs[key].setValidator(QDoubleValidator(0, 1000000, 8))
+        row.addWidget(inputs[key], 1)
+        layout.addLayout(row)
+
+    btn_solve = QPushButton("Resolver Todas as Combinações")
+    layout.addWidget(btn_solve)
+    summary_label = QLabel()
+    layout.addWidget(summary_label)
+
+    result_table = QTableWidget(0, 0)
+    result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    layout.addWidget(result_table)
+
+    def add_pump():
+        row = pump_table.rowCount()
+        pump_table.insertRow(row)
+        combo = QComboBox()
+        combo.addItems(fit['names'])
+        combo.setCurrentIndex(min(row, len(fit['names']) - 1))
+        pump_table.setCellWidget(row, 0, combo)
+        pump_table.setItem(row, 1, QTableWidgetItem("0,001"))
+
+    def solve():
+        n = pump_table.rowCount()
+        if not 1 <= n <= STATION_MAX_PUMPS:
+            QMessageBox.warning(dlg, "Erro", f"Configure de 1 a {STATION_MAX_PUMPS} bombas.")
+            return
+        try:
+            rows = np.array([pump_table.cellWidget(i, 0).currentIndex() for i in range(n)])
+            branch_k = np.array([float(pump_table.item(i, 1).text().replace(',', '.')) for i in range(n)])
+            values = {key: float(field.text().replace(',', '.')) for key, field in inputs.items()}
+            if np.any(branch_k < 0) or values['k_linha'] < 0 or values['niveis'] < 1:
+                raise ValueError("Coeficientes não podem ser negativos e é preciso pelo menos 1 nível")
+        except (ValueError, AttributeError) as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+
+        # Cenários: combinações liga/desliga × níveis de altura estática
+        combos = _station_combinations(n)
+        levels = np.linspace(values['h0_min'], values['h0_max'], int(values['niveis']))
+        active = np.repeat(combos, len(levels), axis=0)
+        h0 = np.tile(levels, len(combos))
+        start = time.perf_counter()
+        result = solve_pump_station(fit, rows, branch_k, h0, values['k_linha'], active=active,
+                                    density=_fluid_density(parent))
+        elapsed = time.perf_counter() - start
+
+        summary_label.setText(f"{len(h0)} cenários resolvidos em {elapsed * 1000:.0f} ms; "
+                              f"{int((~result['convergiu']).sum())} sem convergência; "
+                              f"máximo de {int(result['iteracoes'].max(initial=0))} iterações")
+        pump_labels = [f"B{i + 1} ({name})" for i, name in enumerate(result['names'])]
+        headers = (["Bombas Ligadas", "H0 (m)", "Vazão Total (m³/h)", "Altura no Coletor (m)",
+                    "Potência Total (kW)"] + [f"Q {label} (m³/h)" for label in pump_labels])
+        result_table.clear()
+        result_table.setColumnCount(len(headers))
+        result_table.setHorizontalHeaderLabels(headers)
+        result_table.setRowCount(len(h0))
+        for k in range(len(h0)):
+            on = [f"B{i + 1}" for i in range(n) if active[k, i]]
+            values_row = [" + ".join(on), f"{h0[k]:.2f}", f"{result['vazao_total'][k]:.2f}",
+                          f"{result['altura_coletor'][k]:.2f}", f"{result['potencia_total'][k] / 1000:.2f}"]
+            for i in range(n):
+                if not active[k, i]:
+                    values_row.append("-")
+                elif not result['aberta'][k, i]:
+                    values_row.append("Retenção fechada")
+                else:
+                    flag = " *" if result['fora_da_curva'][k, i] else ""
+                    values_row.append(f"{result['vazao'][k, i]:.2f}{flag}")
+            for col, value in enumerate(values_row):
+                result_table.setItem(k, col, QTableWidgetItem(value))
+        result_table.resizeColumnsToContents()
+
+    btn_add.clicked.connect(add_pump)
+    btn_remove.clicked.connect(lambda: pump_table.removeRow(pump_table.currentRow()))
+    btn_solve.clicked.connect(solve)
+    for _ in range(min(2, len(fit['names']))):
+        add_pump()
+
+    layout.addWidget(QLabel("* vazão fora da faixa de dados do rotor (curva extrapolada)"))
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    dlg.exec_()
+
+# Análise de incerteza (Monte Carlo): as incertezas são percentuais (desvio padrão na
+# distribuição normal, meia largura na uniforme) aplicados a cada ponto dos rotores e
+# à altura estática e à parcela dinâmica da curva do sistema
+UNCERTAINTY_DISTRIBUTIONS = [("Normal", 'normal'), ("Uniforme", 'uniforme')]
+UNCERTAINTY_DEFAULTS = {'amostras': 20000, 'semente': 12345, 'distribuicao': 'normal',
+                        'vazao_pct': 2.0, 'altura_pct': 2.0, 'eficiencia_pct': 2.0,
+                        'h0_pct': 5.0, 'k_pct': 10.0}
+UNCERTAINTY_FIELDS = [
+    ('amostras', "Número de amostras"),
+    ('semente', "Semente (reprodutibilidade)"),
+    ('vazao_pct', "Incerteza da vazão dos pontos (%)"),
+    ('altura_pct', "Incerteza da altura dos pontos (%)"),
+    ('eficiencia_pct', "Incerteza da eficiência dos pontos (%)"),
+    ('h0_pct', "Incerteza da altura estática H0 (%)"),
+    ('k_pct', "Incerteza da perda de carga K (%)"),
+]
+UNCERTAINTY_PERCENTILES = (5, 25, 50, 75, 95)
+UNCERTAINTY_QUANTITIES = [('vazao', "Vazão (m³/h)"), ('altura', "Altura (m)"),
+                          ('eficiencia', "Eficiência (%)"), ('potencia', "Potência (kW)")]
+
+# Amostras por bloco (fixo, para o resultado não depender do número de processos), tamanho
+# mínimo da análise (amostras × rotores) para usar vários processos e pontos da grade de busca
+UNCERTAINTY_CHUNK_SIZE = 2000
+UNCERTAINTY_POOL_THRESHOLD = 50000
+UNCERTAINTY_GRID_POINTS = 64
+
+def _uncertainty_factors(rng, shape, pct, distribution):
+    """Fatores multiplicativos 1 + ε sorteados com a distribuição escolhida"""
+    spread = pct / 100
+    if distribution == 'normal':
+        return 1.0 + spread * rng.standard_normal(shape)
+    return 1.0 + spread * rng.uniform(-1.0, 1.0, shape)
+
+def _operating_power(q, h, eff, density=WATER_DENSITY):
+    """Potência no eixo (kW) dos pontos de operação, NaN sem interseção ou eficiência nula"""
+    return pump_power(q, h, eff, density)[1] / 1000
+
+def _uncertainty_chunk(packed, system_curve_data, settings, model, degree, density, seed, samples):
+    """
+    Resolve um bloco de amostras da análise de incerteza (executado em um processo
+    separado para análises grandes).
+
+    Returns:
+        Dicionário com arrays (amostra, rotor) de vazão, altura, eficiência e potência
+    """
+    names, Q, H, E, counts = packed
+    n, m = Q.shape
+    rng = np.random.default_rng(seed)
+    distribution = settings['distribuicao']
+    q = Q[None] * _uncertainty_factors(rng, (samples, n, m), settings['vazao_pct'], distribution)
+    h = H[None] * _uncertainty_factors(rng, (samples, n, m), settings['altura_pct'], distribution)
+    e = np.minimum(E[None] * _uncertainty_factors(rng, (samples, n, m), settings['eficiencia_pct'],
+                                                   distribution), 100.0)
+
+    # Mantém as vazões crescentes em cada rotor (o preenchimento NaN continua no final)
+    order = np.argsort(q, axis=2, kind='stable')
+    q, h, e = (np.take_along_axis(a, order, axis=2).reshape(samples * n, m) for a in (q, h, e))
+    fit = _fit_rotor_arrays(list(names) * samples, q, h, e, np.tile(counts, samples), model, degree)
+
+    h0_scale = np.repeat(_uncertainty_factors(rng, samples, settings['h0_pct'], distribution), n)
+    k_scale = np.repeat(_uncertainty_factors(rng, samples, settings['k_pct'], distribution), n)
+    operating = solve_operating_points(fit, system_curve_data, grid_points=UNCERTAINTY_GRID_POINTS,
+                                       refine_points=SELECTION_REFINE_POINTS,
+                                       system_scale=(h0_scale, k_scale))
+    operating['potencia'] = _operating_power(operating['vazao'], operating['altura'],
+                                             operating['eficiencia'], density)
+    return {key: operating[key].reshape(samples, n).astype(np.float32) for key, _ in UNCERTAINTY_QUANTITIES}
+
+def run_uncertainty_analysis(rotor_data, system_curve_data, settings=None, model='linear', degree=3,
+                             workers=None, density=WATER_DENSITY):
+    """
+    Análise de incerteza dos pontos de operação por Monte Carlo.
+
+    Em cada amostra os pontos de todos os rotores, a altura estática e a parcela dinâmica
+    da curva do sistema são perturbados; as curvas são reajustadas e os pontos de
+    operação de todas as amostras de um bloco são resolvidos de uma só vez. Cada bloco
+    tem sua própria semente derivada de SeedSequence, então a mesma semente reproduz o
+    resultado com qualquer número de processos.
+
+    Args:
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curve_data: Curva do sistema nominal (chaves 'Q' e 'H')
+        settings: Parâmetros da análise (ver UNCERTAINTY_DEFAULTS)
+        model: Modelo de ajuste das curvas (ver fit_rotor_curves)
+        degree: Grau do polinômio quando model='poly'
+        workers: Número de processos (padrão: número de CPUs); 1 desativa o paralelismo
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário com os nomes dos rotores, os valores nominais e as faixas de percentis
+        (percentil, rotor) de cada grandeza e a fração de amostras com interseção
+    """
+    settings = {**UNCERTAINTY_DEFAULTS, **(settings or {})}
+    samples = int(settings['amostras'])
+    if samples < 1:
+        raise ValueError("O número de amostras deve ser pelo menos 1")
+    if settings['distribuicao'] not in {key for _, key in UNCERTAINTY_DISTRIBUTIONS}:
+        raise ValueError(f"Distribuição desconhecida: {settings['distribuicao']}")
+    if any(settings[key] < 0 for key, _ in UNCERTAINTY_FIELDS[2:]):
+        raise ValueError("As incertezas não podem ser negativas")
+
+    packed = _pack_rotor_arrays(rotor_data)
+    names = packed[0]
+    if not names:
+        raise ValueError("Nenhum rotor com pelo menos 2 pontos válidos")
+
+    sizes = [UNCERTAINTY_CHUNK_SIZE] * (samples // UNCERTAINTY_CHUNK_SIZE)
+    if samples % UNCERTAINTY_CHUNK_SIZE:
+        sizes.append(samples % UNCERTAINTY_CHUNK_SIZE)
+    seeds = np.random.SeedSequence(int(settings['semente'])).spawn(len(sizes))
+    args = (packed, system_curve_data, settings, model, degree, density)
+
+    if samples * len(names) >= UNCERTAINTY_POOL_THRESHOLD and workers != 1 and len(sizes) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_uncertainty_chunk, *args, seed, size) for seed, size in zip(seeds, sizes)]
+            partial = [future.result() for future in futures]
+    else:
+        partial = [_uncertainty_chunk(*args, seed, size) for seed, size in zip(seeds, sizes)]
+    merged = {key: np.concatenate([chunk[key] for chunk in partial]) for key, _ in UNCERTAINTY_QUANTITIES}
+
+    nominal = solve_operating_points(_fit_rotor_arrays(*packed, model, degree), system_curve_data,
+                                     refine_points=SELECTION_REFINE_POINTS)
+    nominal['potencia'] = _operating_power(nominal['vazao'], nominal['altura'], nominal['eficiencia'], density)
+
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Rotores sem nenhuma interseção
+        bands = {key: np.nanpercentile(merged[key], UNCERTAINTY_PERCENTILES, axis=0)
+                 for key, _ in UNCERTAINTY_QUANTITIES}
+
+    return {
+        'names': names,
+        'amostras': samples,
+        'semente': int(settings['semente']),
+        'percentis': UNCERTAINTY_PERCENTILES,
+        'nominal': {key: nominal[key] for key, _ in UNCERTAINTY_QUANTITIES},
+        'faixas': bands,
+        'taxa_intersecao': np.mean(~np.isnan(merged['vazao']), axis=0),
+    }
+
+def _show_uncertainty_dialog(parent, rotor_data, system_curve_settings, uncertainty_settings,
+                             curve_fit_mode):
+    """
+    Diálogo da análise de incerteza por Monte Carlo, com execução de teste na curva 1.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curve_settings: Dicionário com 'manual_points' ou 'equation_params' da curva 1
+        uncertainty_settings: Configuração atual (ou None)
+        curve_fit_mode: Combo com o modelo de ajuste das curvas (CURVE_FIT_OPTIONS)
+
+    Returns:
+        Configuração para o relatório, None para remover, ou uncertainty_settings se cancelado
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    if not system_curve_settings:
+        QMessageBox.warning(parent, "Erro", "Configure a Curva do Sistema 1 primeiro!")
+        return uncertainty_settings
+    settings = {**UNCERTAINTY_DEFAULTS, **(uncertainty_settings or {})}
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Análise de Incerteza (Monte Carlo)")
+    dlg.setMinimumSize(900, 600)
+    layout = QVBoxLayout()
+
+    inputs = {}
+    for key, label in UNCERTAINTY_FIELDS:
+        row = QHBoxLayout()
+        row.addWidget(QLabel(label), 1)
+        inputs[key] = QLineEdit(f"{settings[key]:g}".replace('.', ','))
+        inputs[key].setValidator(QDoubleValidator(0, 100000000, 4))
+        row.addWidget(inputs[key], 1)
+        layout.addLayout(row)
+    distribution_row = QHBoxLayout()
+    distribution_row.addWidget(QLabel("Distribuição"), 1)
+    distribution_combo = QComboBox()
+    distribution_combo.addItems([label for label, _ in UNCERTAINTY_DISTRIBUTIONS])
+    distribution_combo.setCurrentIndex([key for _, key in UNCERTAINTY_DISTRIBUTIONS].index(settings['distribuicao']))
+    distribution_row.addWidget(distribution_combo, 1)
+    layout.addLayout(distribution_row)
+
+    btn_run = QPushButton("Executar na Curva do Sistema 1")
+    layout.addWidget(btn_run)
+    summary_label = QLabel()
+    layout.addWidget(summary_label)
+
+    percentile_headers = [f"P{p}" for p in UNCERTAINTY_PERCENTILES]
+    headers = ["Rotor", "Grandeza", "Nominal"] + percentile_headers + ["Interseção (%)"]
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    def read_settings():
+        values = {key: float(field.text().replace(',', '.')) for key, field in inputs.items()}
+        values['amostras'] = int(values['amostras'])
+        values['semente'] = int(values['semente'])
+        values['distribuicao'] = UNCERTAINTY_DISTRIBUTIONS[distribution_combo.currentIndex()][1]
+        return values
+
+    def run():
+        try:
+            values = read_settings()
+            fit = fit_rotor_curves(rotor_data, model='linear')
+            system_curve = _calculate_system_curve(max_rotor_q=float(fit['q_max'].max()) * 1.1,
+                                                   **system_curve_settings)
+            if system_curve is None:
+                return
+            _, model, degree = CURVE_FIT_OPTIONS[curve_fit_mode.currentIndex()]
+            start = time.perf_counter()
+            result = run_uncertainty_analysis(rotor_data, system_curve, values, model, degree,
+                                              density=_fluid_density(parent))
+        except ValueError as e:
+            QMessageBox.critical(dlg, "Erro", f"Valores inválidos: {str(e)}")
+            return
+        summary_label.setText(f"{result['amostras']} amostras × {len(result['names'])} rotores "
+                              f"em {time.perf_counter() - start:.1f} s (semente {result['semente']})")
+        table.setRowCount(len(result['names']) * len(UNCERTAINTY_QUANTITIES))
+        row = 0
+        for i, name in enumerate(result['names']):
+            for key, label in UNCERTAINTY_QUANTITIES:
+                values_row = ([name, label, f"{result['nominal'][key][i]:.2f}"]
+                              + [f"{v:.2f}" for v in result['faixas'][key][:, i]]
+                              + [f"{100 * result['taxa_intersecao'][i]:.1f}"])
+                for col, value in enumerate(values_row):
+                    table.setItem(row, col, QTableWidgetItem(value))
+                row += 1
+
+    btn_run.clicked.connect(run)
+
+    layout.addWidget(QLabel("A análise é incluída no relatório para cada curva do sistema, "
+                            "com o modelo de ajuste selecionado."))
+    buttons = QDialogButtonBox()
+    btn_remove = buttons.addButton("Remover do Relatório", QDialogButtonBox.DestructiveRole)
+    buttons.addButton(QDialogButtonBox.Ok)
+    buttons.addButton(QDialogButtonBox.Cancel)
+    removed = []
+    btn_remove.clicked.connect(lambda: (removed.append(True), dlg.accept()))
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return uncertainty_settings
+    if removed:
+        return None
+    try:
+        return read_settings()
+    except ValueError as e:
+        QMessageBox.critical(parent, "Erro", f"Valores inválidos: {str(e)}")
+        return uncertainty_settings
+
+# Diário de edições para recuperação após falhas
+JOURNAL_DIR = APP_DATA_DIR
+JOURNAL_SYNC_EVERY = 20  # Edições entre sincronizações com o disco
+JOURNAL_SYNC_INTERVAL = 2.0  # Segundos máximos sem sincronizar
+
+class EditJournal:
+    """
+    Diário de edições somente de acréscimo (uma linha JSON por edição).
+
+    Cada edição é gravada e enviada ao sistema operacional imediatamente, de modo que
+    sobrevive ao encerramento abrupto do programa; a sincronização com o disco (fsync)
+    é feita em lotes, a cada JOURNAL_SYNC_EVERY edições ou JOURNAL_SYNC_INTERVAL
+    segundos. O custo por edição é constante: o diário só é reescrito em um ponto de
+    verificação (projeto salvo ou aberto), quando passa a conter apenas a referência
+    ao projeto.
+    """
+    def __init__(self, name):
+        self.path = os.path.join(JOURNAL_DIR, f"autosave_{name}.jsonl")
+        self.file = None
+        self.paused = False
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def pending_events(self):
+        """Lê as edições de uma sessão anterior não encerrada normalmente."""
+        if not os.path.exists(self.path):
+            return []
+        events = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break  # Última linha incompleta de uma gravação interrompida
+        return events
+
+    def start(self, base=None):
+        """Inicia um diário novo, opcionalmente com um evento base (ponto de verificação)."""
+        self.close()
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        self.file = open(self.path, "w", encoding="utf-8")
+        if base is not None:
+            self.file.write(json.dumps(base, ensure_ascii=False) + "\n")
+        self.sync(force=True)
+
+    def resume(self):
+        """Continua acrescentando ao diário existente (após a recuperação)."""
+        self.close()
+        os.makedirs(JOURNAL_DIR, exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def record(self, kind, **data):
+        """Acrescenta uma edição ao diário."""
+        if self.file is None or self.paused:
+            return
+        self.file.write(json.dumps(dict(type=kind, **data), ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+        if (self.unsynced >= JOURNAL_SYNC_EVERY
+                or time.monotonic() - self.last_sync >= JOURNAL_SYNC_INTERVAL):
+            self.sync()
+
+    def sync(self, force=False):
+        """Sincroniza com o disco as edições ainda não sincronizadas."""
+        if self.file is None or not (self.unsynced or force):
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def discard(self):
+        """Encerramento normal: o diário não é mais necessário."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def _start_journal(window, name, replay):
+    """
+    Cria o diário da janela e oferece a recuperação de uma sessão interrompida.
+
+    Args:
+        window: Janela principal
+        name: Nome do diário (um por modo de entrada)
+        replay: Função que aplica a lista de edições recuperadas na janela
+    """
+    window.journal = EditJournal(name)
+
+    # Sincroniza periodicamente as últimas edições mesmo sem novas edições
+    window.journal_timer = QTimer(window)
+    window.journal_timer.timeout.connect(window.journal.sync)
+    window.journal_timer.start(int(JOURNAL_SYNC_INTERVAL * 1000))
+
+    events = window.journal.pending_events()
+    if events:
+        reply = QMessageBox.question(
+            window, "Recuperar Sessão",
+            f"A sessão anterior não foi encerrada normalmente ({len(events)} edições registradas).\n"
+            "Deseja recuperá-la?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes)
+        if reply == QMessageBox.Yes:
+            window.journal.paused = True
+            try:
+                replay(events)
+            finally:
+                window.journal.paused = False
+            window.journal.resume()
+            return
+    window.journal.start()
+
+# Arquivo de projeto: zip com manifesto JSON e arrays numéricos no formato .npy
+PROJECT_FORMAT = "projeto-curvas-bomba"
+PROJECT_VERSION = 1
+PROJECT_FILE_FILTER = "Projeto de Bomba (*.bproj)"
+
+def save_project(filename, manifest, arrays, image_png=None):
+    """
+    Grava um arquivo de projeto.
+
+    O arquivo é escrito em um temporário e renomeado ao final, de modo que uma falha
+    durante a gravação não corrompe um projeto existente.
+
+    Args:
+        filename: Caminho do arquivo de projeto
+        manifest: Dicionário serializável em JSON com o estado da sessão
+        arrays: Dicionário {nome do membro: array numérico}
+        image_png: Bytes da imagem do gráfico (modo imagem) ou None
+    """
+    manifest = dict(manifest, format=PROJECT_FORMAT, version=PROJECT_VERSION)
+    temp_filename = filename + ".tmp"
+    with zipfile.ZipFile(temp_filename, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=1))
+        for name, values in arrays.items():
+            with zf.open(name, 'w') as f:
+                np.lib.format.write_array(f, np.ascontiguousarray(values), allow_pickle=False)
+        if image_png is not None:
+            # PNG já é comprimido
+            zf.writestr("imagem.png", image_png, compress_type=zipfile.ZIP_STORED)
+    os.replace(temp_filename, filename)
+
+class ProjectFile:
+    """
+    Arquivo de projeto aberto para leitura sob demanda.
+
+    Apenas o manifesto é lido na abertura; cada array é descomprimido somente no
+    primeiro acesso e mantido em cache.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.zip = zipfile.ZipFile(filename)
+        try:
+            self.manifest = json.loads(self.zip.read("manifest.json").decode("utf-8"))
+        except (KeyError, ValueError) as e:
+            self.zip.close()
+            raise ValueError(f"Arquivo de projeto inválido: {str(e)}")
+        if self.manifest.get('format') != PROJECT_FORMAT:
+            self.zip.close()
+            raise ValueError("O arquivo não é um projeto de curvas de bomba")
+        if self.manifest.get('version', 0) > PROJECT_VERSION:
+            self.zip.close()
+            raise ValueError(f"Versão do projeto não suportada: {self.manifest.get('version')}")
+        self._arrays = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    def array(self, name):
+        if name not in self._arrays:
+            with self.zip.open(name) as f:
+                self._arrays[name] = np.lib.format.read_array(f, allow_pickle=False)
+        return self._arrays[name]
+
+    def read(self, name):
+        return self.zip.read(name)
+
+    def rotor_rows(self, rotor):
+        """Retorna as linhas do array de pontos pertencentes ao rotor descrito no manifesto."""
+        return self.array("rotores.npy")[rotor['start']:rotor['start'] + rotor['count']]
+
+def _pack_project_rotors(rotors):
+    """
+    Empacota os pontos de todos os rotores em um único array.
+
+    Args:
+        rotors: Lista de tuplas (entrada do manifesto, array de pontos (n, 3))
+
+    Returns:
+        Tupla (entradas do manifesto com 'start' e 'count', array concatenado)
+    """
+    entries = []
+    blocks = []
+    start = 0
+    for entry, values in rotors:
+        values = np.asarray(values, dtype=float).reshape(-1, 3)
+        entries.append(dict(entry, start=start, count=len(values)))
+        blocks.append(values)
+        start += len(values)
+    return entries, (np.concatenate(blocks) if blocks else np.zeros((0, 3)))
+
+def _apply_pipe_network(window, network):
+    """
+    Usa a curva gerada pela rede de tubulações como pontos manuais da curva do sistema
+    escolhida, para que ela siga o mesmo caminho de interseção das demais curvas.
+    """
+    window.pipe_network = network
+    points = [tuple(p) for p in network['pontos']]
+    if network['curva'] == 1:
+        window.manual_system_points = points
+        window.system_curve_mode.setCurrentIndex(0)  # Pontos Manual
+    else:
+        window.manual_system_points_2 = points
+        window.system_curve_mode_2.setCurrentIndex(1)  # Pontos Manual
+    logger.debug("Curva do sistema %d gerada pela rede de tubulações (%d trechos)",
+                 network['curva'], len(network['trechos']))
+
+def _system_curve_state(window):
+    """Estado das curvas do sistema e do ajuste de curvas da janela, serializável em JSON."""
+    def points(value):
+        return [list(p) for p in value] if value else None
+    return {
+        'mode_1': window.system_curve_mode.currentIndex(),
+        'manual_points_1': points(window.manual_system_points),
+        'equation_1': window.direct_equation_params,
+        'mode_2': window.system_curve_mode_2.currentIndex(),
+        'manual_points_2': points(window.manual_system_points_2),
+        'equation_2': window.direct_equation_params_2,
+        'curve_fit': window.curve_fit_mode.currentIndex(),
+        'report_units': window.report_units_mode.currentIndex(),
+        'pipe_network': getattr(window, 'pipe_network', None),
+    }
+
+def _restore_system_curve_state(window, state):
+    """Restaura na janela o estado salvo por _system_curve_state."""
+    def points(value):
+        return [tuple(p) for p in value] if value else None
+    window.system_curve_mode.setCurrentIndex(state.get('mode_1', 0))
+    window.manual_system_points = points(state.get('manual_points_1'))
+    window.direct_equation_params = state.get('equation_1')
+    window.system_curve_mode_2.setCurrentIndex(state.get('mode_2', 0))
+    window.manual_system_points_2 = points(state.get('manual_points_2'))
+    window.direct_equation_params_2 = state.get('equation_2')
+    window.curve_fit_mode.setCurrentIndex(state.get('curve_fit', 0))
+    window.report_units_mode.setCurrentIndex(state.get('report_units', 0))
+    window.pipe_network = state.get('pipe_network')
+
+def _speed_families_state(speed_families):
+    """Converte as famílias de rotação (especificações rotor + rotações) em entradas do manifesto."""
+    return [{'name': name, 'rotor': spec['rotor'], 'rpms': [float(rpm) for rpm in spec['rpms']]}
+            for name, spec in speed_families.items()]
+
+def _load_speed_families(project):
+    """
+    Reconstrói as especificações das famílias de rotação gravadas por _speed_families_state.
+
+    Projetos antigos gravavam os arrays da família; deles só se aproveitam as rotações
+    e o rotor base, obtido do nome da família ("rotor (início-fim RPM)").
+    """
+    speed_families = {}
+    for entry in project.manifest.get('speed_families', []):
+        if 'rotor' in entry:
+            rotor, rpms = entry['rotor'], entry['rpms']
+        else:
+            rotor, rpms = entry['name'].rsplit(" (", 1)[0], project.array(entry['array'])[0, :, 0]
+        speed_families[entry['name']] = {'rotor': rotor, 'rpms': np.asarray(rpms, dtype=float)}
+    return speed_families
+
+def _calculate_system_curve(manual_points=None, equation_params=None, max_rotor_q=None):
+    """Calcula os pontos da curva do sistema com base nos parâmetros fornecidos."""
+    if manual_points is None and equation_params is None:
+        return None
+    
+    # Verificar se temos vazão máxima definida
+    if max_rotor_q is None or max_rotor_q <= 0:
+        logger.warning("Vazão máxima não definida ou inválida.")
+        max_rotor_q = 50.0  # Valor padrão se não for fornecido
+    
+    logger.debug("max_rotor_q recebido: %s, tipo: %s", max_rotor_q, type(max_rotor_q))
+    
+    # Caso 1: Pontos manuais
+    if manual_points and len(manual_points) >= 2:
+        # Ordenar pontos por vazão (Q)
+        sorted_points = sorted(manual_points, key=lambda p: p[0])
+        
+        # Extrair vazões e alturas
+        q_values = [p[0] for p in sorted_points]
+        h_values = [p[1] for p in sorted_points]
+        
+        # Verificar se o último ponto tem vazão menor que a vazão máxima dos rotores
+        last_q = q_values[-1]
+        logger.debug("Último ponto manual Q: %s, max_rotor_q: %s", last_q, max_rotor_q)
+        
+        if last_q < max_rotor_q:
+            # Extrapolar a curva até a vazão máxima dos rotores
+            # Usamos os dois últimos pontos para calcular a inclinação
+            if len(q_values) >= 2:
+                # Calcular a inclinação com base nos dois últimos pontos
+                slope = (h_values[-1] - h_values[-2]) / (q_values[-1] - q_values[-2])
+                
+                # Adicionar um ponto extrapolado na vazão máxima
+                extrapolated_h = h_values[-1] + slope * (max_rotor_q - q_values[-1])
+                
+                # Garantir que a altura não seja negativa
+                if extrapolated_h > 0:
+                    q_values.append(max_rotor_q)
+                    h_values.append(extrapolated_h)
+                    logger.debug("Ponto extrapolado adicionado: Q=%s, H=%s", max_rotor_q, extrapolated_h)
+        
+        # Criar função de interpolação
+        try:
+            from scipy.interpolate import interp1d
+            interp_func = interp1d(q_values, h_values, kind='linear', bounds_error=False, fill_value='extrapolate')
+            
+            # Gerar pontos para a curva do sistema
+            num_points = 100
+            q_curve = np.linspace(0, max_rotor_q, num_points)
+            h_curve = interp_func(q_curve)
+            
+            # Garantir que não haja alturas negativas
+            h_curve = np.maximum(h_curve, 0)
+            
+            # Criar lista de pontos (Q, H)
+            curve_points = [(q, h) for q, h in zip(q_curve, h_curve)]
+            
+            logger.debug("Curva do sistema gerada com %s pontos, de Q=0 até Q=%s", len(curve_points), max_rotor_q)
+            
+            # Calcular parâmetros da equação H = H0 + K*Q^2 para exibição
+            Q = np.array(q_values)
+            H = np.array(h_values)
+            A = np.vstack([Q**2, np.ones(len(Q))]).T
+            try:
+                result, residuals, rank, s = np.linalg.lstsq(A, H, rcond=None)
+                K, H0 = result
+                equation = f"H = {H0:.2f} + {K:.4f} × Q²"
+            except np.linalg.LinAlgError:
+                equation = "Não foi possível calcular a equação"
+                K, H0 = 0, h_values[0]  # Valores padrão
+            
+            return {
+                'static_head': float(H0),
+                'k_factor': float(K),
+                'equation': equation,
+                'points': curve_points,
+                'Q': np.array([q for q, _ in curve_points]),
+                'H': np.array([h for _, h in curve_points]),
+                'type': 'manual'
+            }
+        except Exception as e:
+            QMessageBox.warning(None, "Erro de Interpolação", f"Não foi possível interpolar a curva do sistema: {str(e)}")
+            return None
+    elif manual_points and len(manual_points) < 2:
         QMessageBox.warning(None, "Erro de Entrada", "São necessários pelo menos 2 pontos manuais para calcular a curva do sistema.")
         return None
     
@@ -1147,7 +6064,7 @@ def _calculate_system_curve(manual_points=None, equation_params=None, max_rotor_
             # Criar lista de pontos (Q, H)
             curve_points = [(q, h) for q, h in zip(q_curve, h_curve)]
             
-            print(f"DEBUG - Curva do sistema por equação gerada com {len(curve_points)} pontos, de Q=0 até Q={max_rotor_q}")
+            logger.debug("Curva do sistema por equação gerada com %s pontos, de Q=0 até Q=%s", len(curve_points), max_rotor_q)
             
             return {
                 'static_head': float(H0),
@@ -1167,9 +6084,1021 @@ def _calculate_system_curve(manual_points=None, equation_params=None, max_rotor_
     
     return None
 
-def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=None):
+# Rede de tubulações: viscosidade cinemática da água a 20 °C (m²/s) e limites do regime de transição
+WATER_VISCOSITY = 1.004e-6
+LAMINAR_REYNOLDS = 2000.0
+TURBULENT_REYNOLDS = 4000.0
+PIPE_HEAD_METHODS = [("Darcy-Weisbach (Colebrook)", 'darcy'), ("Hazen-Williams", 'hazen')]
+
+# Colunas da tabela de trechos: (chave, cabeçalho, valor padrão)
+PIPE_FIELDS = [
+    ('comprimento', "Comprimento (m)", 100.0),
+    ('diametro', "Diâmetro Interno (mm)", 100.0),
+    ('rugosidade', "Rugosidade (mm)", 0.05),
+    ('c_hw', "C Hazen-Williams", 130.0),
+    ('k_local', "Soma dos K Locais", 0.0),
+    ('desnivel', "Desnível (m)", 0.0),
+]
+
+def colebrook_friction(reynolds, relative_roughness, tol=1e-10, max_iter=50):
+    """
+    Fator de atrito de Darcy resolvido de forma vetorizada para todos os pontos.
+
+    No regime turbulento a equação de Colebrook-White é resolvida por iteração de ponto
+    fixo em x = 1/√f, partindo da aproximação de Swamee-Jain (converge em poucas
+    iterações). No laminar f = 64/Re; entre Re 2000 e 4000 os dois são interpolados
+    linearmente para a curva do sistema não ter descontinuidade.
+
+    Args:
+        reynolds: Números de Reynolds (qualquer forma)
+        relative_roughness: Rugosidade relativa ε/D (mesma forma ou escalar)
+
+    Returns:
+        Array de fatores de atrito (zero onde Re = 0)
+    """
+    reynolds = np.asarray(reynolds, dtype=float)
+    rr = np.broadcast_to(np.asarray(relative_roughness, dtype=float), reynolds.shape)
+    re_turb = np.maximum(reynolds, TURBULENT_REYNOLDS)
+
+    # Estimativa inicial de Swamee-Jain e iteração de Colebrook
+    x = -2.0 * np.log10(rr / 3.7 + 5.74 / re_turb ** 0.9)
+    for _ in range(max_iter):
+        x_new = -2.0 * np.log10(rr / 3.7 + 2.51 * x / re_turb)
+        converged = np.max(np.abs(x_new - x), initial=0.0) < tol
+        x = x_new
+        if converged:
+            break
+    f_turbulent = 1.0 / x ** 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_laminar = np.where(reynolds > 0, 64.0 / reynolds, 0.0)
+    f_transition = 64.0 / LAMINAR_REYNOLDS
+    f_transition_turbulent = 1.0 / (-2.0 * np.log10(rr / 3.7 + 2.51 * x / TURBULENT_REYNOLDS)) ** 2
+    blend = np.clip((reynolds - LAMINAR_REYNOLDS) / (TURBULENT_REYNOLDS - LAMINAR_REYNOLDS), 0.0, 1.0)
+    f = np.where(reynolds >= TURBULENT_REYNOLDS, f_turbulent,
+                 np.where(reynolds <= LAMINAR_REYNOLDS, f_laminar,
+                          f_transition + blend * (f_transition_turbulent - f_transition)))
+    return f
+
+def pipe_network_head(segments, q, method='darcy', viscosity=WATER_VISCOSITY):
+    """
+    Altura do sistema de uma linha de trechos em série para várias vazões.
+
+    H(Q) = Σ desníveis + Σ (perda distribuída + K·v²/2g) de cada trecho, com a perda
+    distribuída por Darcy-Weisbach (atrito de Colebrook) ou Hazen-Williams, calculada
+    de uma só vez para todos os trechos e vazões.
+
+    Args:
+        segments: Lista de dicionários com as chaves de PIPE_FIELDS
+        q: Vazões (m³/h)
+        method: 'darcy' ou 'hazen'
+        viscosity: Viscosidade cinemática do fluido (m²/s)
+
+    Returns:
+        Array de alturas (m) com a forma de q
+    """
+    if not segments:
+        raise ValueError("A rede precisa de pelo menos um trecho")
+    if method not in ('darcy', 'hazen'):
+        raise ValueError(f"Método de perda de carga desconhecido: {method}")
+    q = np.asarray(q, dtype=float)
+    length = np.array([s['comprimento'] for s in segments], dtype=float)[:, None]
+    diameter = np.array([s['diametro'] for s in segments], dtype=float)[:, None] / 1000
+    if np.any(diameter <= 0) or np.any(length < 0):
+        raise ValueError("Diâmetros devem ser positivos e comprimentos não negativos")
+    k_local = np.array([s['k_local'] for s in segments], dtype=float)[:, None]
+    static = float(sum(s['desnivel'] for s in segments))
+
+    flow = np.abs(q.ravel())[None, :] / 3600  # m³/s
+    area = np.pi * diameter ** 2 / 4
+    velocity_head = (flow / area) ** 2 / (2 * GRAVITY)
+
+    if method == 'darcy':
+        roughness = np.array([s['rugosidade'] for s in segments], dtype=float)[:, None] / 1000
+        reynolds = (flow / area) * diameter / viscosity
+        friction = colebrook_friction(reynolds, roughness / diameter)
+        major = friction * length / diameter * velocity_head
+    else:
+        c_hw = np.array([s['c_hw'] for s in segments], dtype=float)[:, None]
+        if np.any(c_hw <= 0):
+            raise ValueError("O coeficiente C de Hazen-Williams deve ser positivo")
+        major = 10.67 * length * flow ** 1.852 / (c_hw ** 1.852 * diameter ** 4.87)
+
+    losses = (major + k_local * velocity_head).sum(axis=0)
+    return (static + losses).reshape(q.shape)
+
+def _show_pipe_network_dialog(parent, rotor_data, network):
+    """
+    Diálogo para montar a curva do sistema a partir dos trechos da tubulação, com os
+    pontos de operação de todos os rotores atualizados a cada alteração.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores (pode ser vazio)
+        network: Rede configurada anteriormente ({'trechos', 'metodo', 'curva'}) ou None
+
+    Returns:
+        Rede configurada com os pontos 'pontos' (Q, H) da curva gerada, ou None se cancelado
+    """
+    rotor_data = _fluid_rotor_data(parent, rotor_data)
+    # Viscosidade cinemática do fluido do projeto (cSt -> m²/s) para o número de Reynolds
+    viscosity = fluid_properties(getattr(parent, 'fluid_settings', None))['viscosidade'] * 1e-6
+    fit = None
+    if rotor_data:
+        try:
+            fit = fit_rotor_curves(rotor_data, model='linear')
+        except ValueError:
+            fit = None
+    q_max = float(fit['q_max'].max()) * 1.5 if fit is not None and fit['names'] else 100.0
+    network = network or {'trechos': [{key: default for key, _, default in PIPE_FIELDS}],
+                          'metodo': 'darcy', 'curva': 1}
+
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Curva do Sistema pela Rede de Tubulações")
+    dlg.setMinimumSize(900, 600)
+    layout = QVBoxLayout()
+
+    options_layout = QHBoxLayout()
+    options_layout.addWidget(QLabel("Perda de carga:"))
+    method_combo = QComboBox()
+    method_combo.addItems([label for label, _ in PIPE_HEAD_METHODS])
+    method_combo.setCurrentIndex([key for _, key in PIPE_HEAD_METHODS].index(network['metodo']))
+    options_layout.addWidget(method_combo)
+    options_layout.addWidget(QLabel("Aplicar em:"))
+    target_combo = QComboBox()
+    target_combo.addItems(["Curva do Sistema 1", "Curva do Sistema 2"])
+    target_combo.setCurrentIndex(network['curva'] - 1)
+    options_layout.addWidget(target_combo)
+    layout.addLayout(options_layout)
+
+    layout.addWidget(QLabel("Trechos em série (o desnível total é a altura estática):"))
+    table = QTableWidget(0, len(PIPE_FIELDS))
+    table.setHorizontalHeaderLabels([header for _, header, _ in PIPE_FIELDS])
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(table)
+
+    segment_buttons = QHBoxLayout()
+    btn_add = QPushButton("Adicionar Trecho")
+    btn_remove = QPushButton("Remover Trecho Selecionado")
+    segment_buttons.addWidget(btn_add)
+    segment_buttons.addWidget(btn_remove)
+    layout.addLayout(segment_buttons)
+
+    curve_label = QLabel()
+    layout.addWidget(curve_label)
+
+    result_headers = ["Rotor", "Vazão (m³/h)", "Altura (m)", "Eficiência (%)"]
+    result_table = QTableWidget(0, len(result_headers))
+    result_table.setHorizontalHeaderLabels(result_headers)
+    result_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    result_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    layout.addWidget(result_table)
+
+    state = {'network': None}
+
+    def read_segments():
+        segments = []
+        for row in range(table.rowCount()):
+            segment = {}
+            for col, (key, header, default) in enumerate(PIPE_FIELDS):
+                item = table.item(row, col)
+                text = item.text().strip() if item else ''
+                segment[key] = float(text.replace(',', '.')) if text else default
+            segments.append(segment)
+        return segments
+
+    def add_segment(segment):
+        table.blockSignals(True)
+        row = table.rowCount()
+        table.insertRow(row)
+        for col, (key, _, _) in enumerate(PIPE_FIELDS):
+            table.setItem(row, col, QTableWidgetItem(f"{segment[key]:g}".replace('.', ',')))
+        table.blockSignals(False)
+
+    def update():
+        """Recalcula a curva e os pontos de operação com a rede atual"""
+        try:
+            segments = read_segments()
+            method = PIPE_HEAD_METHODS[method_combo.currentIndex()][1]
+            q_curve = np.linspace(0.0, q_max, 60)
+            h_curve = pipe_network_head(segments, q_curve, method, viscosity=viscosity)
+        except ValueError as e:
+            state['network'] = None
+            curve_label.setText(f"Rede inválida: {str(e)}")
+            result_table.setRowCount(0)
+            return
+        state['network'] = {
+            'trechos': segments,
+            'metodo': method,
+            'curva': target_combo.currentIndex() + 1,
+            'pontos': [(float(q), float(h)) for q, h in zip(q_curve, h_curve)],
+        }
+        # Equação equivalente H = H0 + K·Q² apenas para referência
+        k_equiv = np.linalg.lstsq(q_curve[:, None] ** 2, h_curve - h_curve[0], rcond=None)[0][0]
+        curve_label.setText(f"Altura estática {h_curve[0]:.2f} m; H({q_max:.0f} m³/h) = {h_curve[-1]:.2f} m; "
+                            f"equivalente H ≈ {h_curve[0]:.2f} + {k_equiv:.6f} × Q²")
+        if fit is None or not fit['names']:
+            return
+        operating = solve_operating_points(fit, {'Q': q_curve, 'H': h_curve}, refine_points=SELECTION_REFINE_POINTS)
+        result_table.setRowCount(len(fit['names']))
+        for i, name in enumerate(fit['names']):
+            found = not np.isnan(operating['vazao'][i])
+            values = [name] + ([f"{operating[key][i]:.2f}" for key in ('vazao', 'altura', 'eficiencia')]
+                               if found else ["Sem interseção", "-", "-"])
+            for col, value in enumerate(values):
+                result_table.setItem(i, col, QTableWidgetItem(value))
+
+    for segment in network['trechos']:
+        add_segment(segment)
+    btn_add.clicked.connect(lambda: (add_segment({key: default for key, _, default in PIPE_FIELDS}), update()))
+    btn_remove.clicked.connect(lambda: (table.removeRow(table.currentRow()), update()))
+    table.itemChanged.connect(lambda item: update())
+    method_combo.currentIndexChanged.connect(lambda index: update())
+    target_combo.currentIndexChanged.connect(lambda index: update())
+    update()
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+    buttons.accepted.connect(dlg.accept)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    if dlg.exec_() != QDialog.Accepted:
+        return None
+    if state['network'] is None:
+        QMessageBox.warning(parent, "Erro", "A rede de tubulações é inválida; a curva do sistema não foi alterada.")
+    return state['network']
+
+# Gráficos estáticos (Matplotlib, backend Agg sem interface): formatos, resolução, tamanho
+# da figura (polegadas), pontos das curvas ajustadas e conjuntos a partir dos quais a
+# renderização é distribuída em processos
+PLOT_FORMATS = [("PNG", 'png'), ("SVG", 'svg'), ("PDF", 'pdf')]
+PLOT_DPI = 200
+PLOT_FIGURE_SIZE = (8.0, 10.0)
+PLOT_CURVE_POINTS = 200
+PLOT_POOL_THRESHOLD = 4
+PLOT_SYSTEM_STYLES = ('--', '-.', ':')
+# Eficiência mínima (%) para desenhar a potência no eixo: abaixo dela Q·H/η diverge nas
+# extremidades da curva e esmaga a escala do gráfico
+PLOT_MIN_EFFICIENCY = 5.0
+_PLOT_TEMPLATES = {}  # Modelo de figura de cada processo, criado no primeiro conjunto
+
+def prepare_plot_set(title, rotor_data, system_curves=(), model='linear', degree=3, density=WATER_DENSITY):
+    """
+    Prepara os arrays de um conjunto de rotores para render_plot_sets.
+
+    Args:
+        title: Título da figura (também usado no nome dos arquivos)
+        rotor_data: Dicionário com os dados reais dos rotores
+        system_curves: Lista de (rótulo, curva do sistema com chaves 'Q' e 'H')
+        model: Modelo de ajuste das curvas (ver fit_rotor_curves)
+        degree: Grau do polinômio quando model='poly'
+        density: Massa específica do fluido (kg/m³)
+
+    Returns:
+        Dicionário serializável com as curvas ajustadas (rotor, ponto), os pontos medidos,
+        as curvas do sistema e os pontos de operação em cada uma
+
+    Raises:
+        ValueError: Nenhum rotor com pelo menos 2 pontos válidos
+    """
+    fit = fit_rotor_curves(rotor_data, model, degree)
+    if not fit['names']:
+        raise ValueError("Nenhum rotor com pelo menos 2 pontos válidos")
+    power = compute_power_curves(fit, PLOT_CURVE_POINTS, density=density)
+    systems = []
+    for label, system_curve in system_curves:
+        operating = solve_operating_points(fit, system_curve, refine_points=SELECTION_REFINE_POINTS)
+        operating['potencia'] = _operating_power(operating['vazao'], operating['altura'],
+                                                 operating['eficiencia'], density)
+        systems.append({
+            'rotulo': label,
+            'Q': np.asarray(system_curve['Q'], dtype=float),
+            'H': np.asarray(system_curve['H'], dtype=float),
+            'operacao': {key: operating[key] for key in ('vazao', 'altura', 'eficiencia', 'potencia')},
+        })
+    return {
+        'titulo': title,
+        'names': list(fit['names']),
+        'vazao': power['vazao'],
+        'altura': power['altura'],
+        'eficiencia': power['eficiencia'],
+        'eixo': np.where(power['eficiencia'] >= PLOT_MIN_EFFICIENCY, power['eixo'] / 1000, np.nan),
+        'pontos': (fit['Q'], fit['H'], fit['E'], fit['counts']),
+        'sistemas': systems,
+    }
+
+def _plot_upper_limit(*arrays):
+    """Limite superior de eixo com folga de 5% acima do maior valor finito (1 se não houver)"""
+    values = np.concatenate([np.ravel(a) for a in arrays]) if arrays else np.zeros(0)
+    values = values[np.isfinite(values)]
+    top = float(values.max()) if values.size else 0.0
+    return top * 1.05 if top > 0 else 1.0
+
+class _PlotTemplate:
+    """
+    Figura Agg reutilizada entre conjuntos de rotores.
+
+    Eixos, rótulos, grade e linhas são criados uma única vez; cada conjunto apenas troca
+    os dados das linhas (set_data), esconde as linhas que sobram e ajusta os limites
+    antes de salvar, sem recriar a figura.
+    """
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        # Margens fixas: um layout automático redesenharia a figura inteira a cada arquivo
+        self.figure = Figure(figsize=PLOT_FIGURE_SIZE)
+        FigureCanvasAgg(self.figure)
+        self.ax_head, self.ax_eff, self.ax_power = self.figure.subplots(
+            3, 1, sharex=True, gridspec_kw={'height_ratios': (2, 1, 1)})
+        self.figure.subplots_adjust(left=0.1, right=0.97, bottom=0.06, top=0.94, hspace=0.08)
+        self.ax_head.set_ylabel("Altura (m)")
+        self.ax_eff.set_ylabel("Eficiência (%)")
+        self.ax_power.set_ylabel("Potência no Eixo (kW)")
+        self.ax_power.set_xlabel("Vazão (m³/h)")
+        for ax in (self.ax_head, self.ax_eff, self.ax_power):
+            ax.grid(True, linestyle=':', linewidth=0.6)
+        self.title = self.figure.suptitle("", fontweight='bold')
+        self.rotor_lines = []   # Curva e pontos de altura, curva e pontos de eficiência, potência
+        self.system_lines = []  # Curva do sistema e pontos de operação em cada eixo
+
+    def _ensure_lines(self, n_rotors, n_systems):
+        """Cria as linhas que faltam; as existentes são reaproveitadas"""
+        while len(self.rotor_lines) < n_rotors:
+            color = f"C{len(self.rotor_lines) % 10}"
+            self.rotor_lines.append((
+                self.ax_head.plot([], [], color=color, linewidth=1.6)[0],
+                self.ax_head.plot([], [], 'o', color=color, markersize=3.5)[0],
+                self.ax_eff.plot([], [], color=color, linewidth=1.4)[0],
+                self.ax_eff.plot([], [], 'o', color=color, markersize=3)[0],
+                self.ax_power.plot([], [], color=color, linewidth=1.4)[0],
+            ))
+        while len(self.system_lines) < n_systems:
+            style = PLOT_SYSTEM_STYLES[len(self.system_lines) % len(PLOT_SYSTEM_STYLES)]
+            marker = dict(linestyle='none', marker='D', markersize=5, color='black', fillstyle='none')
+            self.system_lines.append((
+                self.ax_head.plot([], [], color='black', linestyle=style, linewidth=1.3)[0],
+                self.ax_head.plot([], [], **marker)[0],
+                self.ax_eff.plot([], [], **marker)[0],
+                self.ax_power.plot([], [], **marker)[0],
+            ))
+
+    def render(self, plot_set, path_base, formats, dpi=PLOT_DPI):
+        """
+        Atualiza as linhas com um conjunto de prepare_plot_set e salva em cada formato.
+
+        Returns:
+            Lista dos arquivos gravados
+        """
+        n = len(plot_set['names'])
+        systems = plot_set['sistemas']
+        self._ensure_lines(n, len(systems))
+        Q, H, E, counts = plot_set['pontos']
+
+        for i, lines in enumerate(self.rotor_lines):
+            for line in lines:
+                line.set_visible(i < n)
+            if i >= n:
+                continue
+            head, head_points, eff, eff_points, power = lines
+            q = plot_set['vazao'][i]
+            k = counts[i]
+            head.set_data(q, plot_set['altura'][i])
+            head.set_label(str(plot_set['names'][i]))
+            head_points.set_data(Q[i, :k], H[i, :k])
+            eff.set_data(q, plot_set['eficiencia'][i])
+            eff_points.set_data(Q[i, :k], E[i, :k])
+            power.set_data(q, plot_set['eixo'][i])
+
+        for j, lines in enumerate(self.system_lines):
+            for line in lines:
+                line.set_visible(j < len(systems))
+            if j >= len(systems):
+                continue
+            curve, head_marks, eff_marks, power_marks = lines
+            system = systems[j]
+            operating = system['operacao']
+            curve.set_data(system['Q'], system['H'])
+            curve.set_label(system['rotulo'])
+            head_marks.set_data(operating['vazao'], operating['altura'])
+            eff_marks.set_data(operating['vazao'], operating['eficiencia'])
+            power_marks.set_data(operating['vazao'], operating['potencia'])
+
+        # Limites calculados direto dos arrays, sem relim/autoscale sobre todas as linhas;
+        # a curva do sistema é cortada na faixa de vazão dos rotores do conjunto
+        q_top = _plot_upper_limit(plot_set['vazao'], Q)
+        system_h = [system['H'][system['Q'] <= q_top] for system in systems]
+        self.ax_power.set_xlim(0, q_top)
+        self.ax_head.set_ylim(0, _plot_upper_limit(plot_set['altura'], H, *system_h))
+        self.ax_eff.set_ylim(0, min(_plot_upper_limit(plot_set['eficiencia'], E), 105.0))
+        self.ax_power.set_ylim(0, _plot_upper_limit(plot_set['eixo']))
+
+        handles = [lines[0] for lines in self.rotor_lines[:n]] + [lines[0] for lines in self.system_lines[:len(systems)]]
+        self.ax_head.legend(handles=handles, loc='best', fontsize='small', frameon=False)
+        self.title.set_text(plot_set['titulo'])
+
+        paths = []
+        for fmt in formats:
+            path = f"{path_base}.{fmt}"
+            self.figure.savefig(path, format=fmt, dpi=dpi)
+            paths.append(path)
+        return paths
+
+def _render_plot_chunk(jobs, formats, dpi):
+    """Renderiza uma lista de (conjunto, caminho sem extensão) com o modelo de figura do processo"""
+    if 'figura' not in _PLOT_TEMPLATES:
+        _PLOT_TEMPLATES['figura'] = _PlotTemplate()
+    template = _PLOT_TEMPLATES['figura']
+    return [path for plot_set, path_base in jobs for path in template.render(plot_set, path_base, formats, dpi)]
+
+def _plot_file_name(title):
+    """Nome de arquivo seguro (ASCII, sem espaços) a partir do título do conjunto"""
+    text = unicodedata.normalize('NFKD', str(title)).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^A-Za-z0-9.-]+', '_', text).strip('_.') or "grafico"
+
+def render_plot_sets(plot_sets, directory, formats=('png',), dpi=PLOT_DPI, workers=None):
+    """
+    Renderiza gráficos estáticos de altura, eficiência e potência, com as curvas do
+    sistema e os pontos de operação, de vários conjuntos de rotores.
+
+    Cada processo cria um único modelo de figura (_PlotTemplate) e o reaproveita em todos
+    os seus conjuntos. A partir de PLOT_POOL_THRESHOLD conjuntos eles são divididos entre
+    processos de um ProcessPoolExecutor.
+
+    Args:
+        plot_sets: Lista de conjuntos de prepare_plot_set
+        directory: Pasta de destino (criada se não existir)
+        formats: Extensões dos arquivos (ver PLOT_FORMATS)
+        dpi: Resolução das imagens PNG
+        workers: Número de processos (padrão: número de CPUs); 1 desativa o paralelismo
+
+    Returns:
+        Lista ordenada dos arquivos gravados
+
+    Raises:
+        ValueError: Nenhum formato ou formato desconhecido
+    """
+    formats = [fmt.lower() for fmt in formats]
+    if not formats:
+        raise ValueError("Escolha pelo menos um formato")
+    unknown = set(formats) - {key for _, key in PLOT_FORMATS}
+    if unknown:
+        raise ValueError("Formato desconhecido: " + ", ".join(sorted(unknown)))
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(plot_set, os.path.join(directory, f"{i + 1:02d}_{_plot_file_name(plot_set['titulo'])}"))
+            for i, plot_set in enumerate(plot_sets)]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if len(jobs) >= PLOT_POOL_THRESHOLD and workers > 1:
+        # Um bloco por processo, intercalado para equilibrar conjuntos grandes e pequenos
+        chunks = [jobs[k::workers] for k in range(workers)]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_plot_chunk, chunk, formats, dpi) for chunk in chunks]
+            partial = [future.result() for future in futures]
+    else:
+        partial = [_render_plot_chunk(jobs, formats, dpi)]
+    return sorted(path for chunk in partial for path in chunk)
+
+def _window_system_curves(window, max_q):
+    """Curvas do sistema 1 e 2 configuradas na janela, como lista de (rótulo, curva)"""
+    settings = [_system_curve_settings(window)]
+    mode_2 = window.system_curve_mode_2.currentIndex()
+    if mode_2 == 1 and getattr(window, 'manual_system_points_2', None):
+        settings.append({'manual_points': window.manual_system_points_2})
+    elif mode_2 == 2 and getattr(window, 'direct_equation_params_2', None):
+        settings.append({'equation_params': window.direct_equation_params_2})
+    else:
+        settings.append(None)
+    curves = []
+    for number, curve_settings in enumerate(settings, 1):
+        if curve_settings:
+            system_curve = _calculate_system_curve(max_rotor_q=max_q, **curve_settings)
+            if system_curve is not None:
+                curves.append((f"Curva do Sistema {number}", system_curve))
+    return curves
+
+def _show_plot_export_dialog(parent, rotor_data, rotor_rpm, speed_families, curve_fit_mode):
+    """
+    Diálogo de exportação dos gráficos estáticos (PNG/SVG/PDF) dos rotores da janela.
+
+    Args:
+        parent: Janela principal
+        rotor_data: Dicionário com os dados reais dos rotores
+        rotor_rpm: Dicionário {rotor: rpm} (correção de viscosidade)
+        speed_families: Famílias de rotação configuradas (ou None)
+        curve_fit_mode: Combo com o modelo de ajuste das curvas (CURVE_FIT_OPTIONS)
+    """
+    dlg = QDialog(parent)
+    dlg.setWindowTitle("Exportar Gráficos (PNG/SVG/PDF)")
+    dlg.setMinimumSize(500, 300)
+    layout = QVBoxLayout()
+
+    format_row = QHBoxLayout()
+    format_row.addWidget(QLabel("Formatos"), 1)
+    format_checks = {}
+    for label, key in PLOT_FORMATS:
+        format_checks[key] = QCheckBox(label)
+        format_checks[key].setChecked(key == 'png')
+        format_row.addWidget(format_checks[key])
+    layout.addLayout(format_row)
+    dpi_row = QHBoxLayout()
+    dpi_row.addWidget(QLabel("Resolução PNG (dpi)"), 1)
+    dpi_input = QLineEdit(str(PLOT_DPI))
+    dpi_input.setValidator(QDoubleValidator(30, 1200, 0))
+    dpi_row.addWidget(dpi_input, 1)
+    layout.addLayout(dpi_row)
+    per_rotor_check = QCheckBox("Também um gráfico para cada rotor")
+    per_rotor_check.setChecked(True)
+    layout.addWidget(per_rotor_check)
+    families_check = QCheckBox("Incluir as famílias de rotação")
+    families_check.setChecked(bool(speed_families))
+    families_check.setEnabled(bool(speed_families))
+    layout.addWidget(families_check)
+
+    btn_export = QPushButton("Escolher Pasta e Gerar")
+    layout.addWidget(btn_export)
+    summary_label = QLabel()
+    summary_label.setWordWrap(True)
+    layout.addWidget(summary_label)
+
+    def export():
+        formats = [key for _, key in PLOT_FORMATS if format_checks[key].isChecked()]
+        if not formats:
+            QMessageBox.warning(dlg, "Erro", "Escolha pelo menos um formato!")
+            return
+        directory = QFileDialog.getExistingDirectory(dlg, "Pasta dos Gráficos")
+        if not directory:
+            return
+        try:
+            dpi = float(dpi_input.text().replace(',', '.'))
+            _, model, degree = CURVE_FIT_OPTIONS[curve_fit_mode.currentIndex()]
+            data, _, fluid = fluid_rotor_data(rotor_data, rotor_rpm, getattr(parent, 'fluid_settings', None))
+
+            groups = [("Todos os Rotores", data)]
+            if per_rotor_check.isChecked() and len(data) > 1:
+                groups += [(f"Rotor {rotor}", {rotor: points}) for rotor, points in data.items()]
+            if families_check.isChecked():
+                families = speed_family_arrays(speed_families, data, rotor_rpm, fluid['densidade'])
+                groups += [(f"Família {name}", speed_family_rotor_data(name, family))
+                           for name, family in families.items()]
+            max_q = max((p['vazao'] for _, group in groups for points in group.values() for p in points),
+                        default=0) * 1.1
+            system_curves = _window_system_curves(parent, max_q)
+
+            start = time.perf_counter()
+            plot_sets = []
+            for title, group in groups:
+                try:
+                    plot_sets.append(prepare_plot_set(title, group, system_curves, model, degree,
+                                                      fluid['densidade']))
+                except ValueError:
+                    continue  # Rotor combinado ou com menos de 2 pontos
+            if not plot_sets:
+                raise ValueError("Nenhum rotor com pelo menos 2 pontos válidos")
+            paths = render_plot_sets(plot_sets, directory, formats, dpi)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(dlg, "Erro", f"Não foi possível gerar os gráficos: {str(e)}")
+            return
+        summary_label.setText(f"{len(paths)} arquivo(s) de {len(plot_sets)} conjunto(s) gravados em "
+                              f"{directory} em {time.perf_counter() - start:.1f} s")
+
+    btn_export.clicked.connect(export)
+
+    buttons = QDialogButtonBox(QDialogButtonBox.Close)
+    buttons.rejected.connect(dlg.reject)
+    layout.addWidget(buttons)
+    dlg.setLayout(layout)
+    dlg.exec_()
+
+# Pré-visualização dos gráficos nas janelas: atraso (ms) entre a última edição e o cálculo
+# das interseções, folga dos limites dos eixos e fração abaixo da qual os eixos encolhem
+PREVIEW_SOLVE_DELAY_MS = 300
+PREVIEW_HEADROOM = 1.1
+PREVIEW_SHRINK = 0.6
+
+def _preview_arrays(points):
+    """Vazão, altura e eficiência (%) de uma lista de pontos, ordenados por vazão"""
+    if not points:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    q = np.array([p['vazao'] for p in points], dtype=float)
+    h = np.array([p['altura'] for p in points], dtype=float)
+    e = _numeric_efficiencies([p['efficiency'] for p in points])
+    order = np.argsort(q, kind='stable')
+    return q[order], h[order], e[order]
+
+def _solve_preview_intersections(rotors, systems):
+    """
+    Interseções da pré-visualização (ajuste linear, como nos pontos digitados).
+
+    Args:
+        rotors: Dicionário {rotor: (vazão, altura, eficiência)}
+        systems: Lista de (rótulo, Q, H) das curvas do sistema
+
+    Returns:
+        Lista com (nomes, vazões, alturas) de cada curva do sistema
+    """
+    rotor_data = {name: [{'vazao': q, 'altura': h, 'efficiency': e} for q, h, e in zip(*arrays)]
+                  for name, arrays in rotors.items()}
+    fit = fit_rotor_curves(rotor_data, model='linear')
+    result = []
+    for _, system_q, system_h in systems:
+        operating = solve_operating_points(fit, {'Q': system_q, 'H': system_h})
+        result.append((list(fit['names']), operating['vazao'], operating['altura']))
+    return result
+
+class CurvePreview(QWidget):
+    """
+    Gráficos de altura e eficiência dos rotores, com as curvas do sistema e as interseções,
+    atualizados enquanto os dados são editados.
+
+    As linhas são animadas: uma edição troca apenas os dados das linhas do rotor alterado
+    (set_data) e o quadro é recomposto por blitting sobre o fundo em cache (eixos, grade e
+    rótulos). A figura só é redesenhada quando os limites dos eixos ou a legenda mudam.
+    As interseções são resolvidas em uma thread PREVIEW_SOLVE_DELAY_MS após a última
+    edição; resultados de edições anteriores são descartados. O Matplotlib só é importado
+    quando o painel aparece pela primeira vez.
+    """
+    solved = pyqtSignal(int, object)
+
+    def __init__(self, system_source, parent=None):
+        """
+        Args:
+            system_source: Função (vazão máxima) -> lista de (rótulo, curva do sistema)
+            parent: Widget pai
+        """
+        super().__init__(parent)
+        self.system_source = system_source
+        self.rotors = {}        # rotor -> (vazão, altura, eficiência)
+        self.systems = []       # (rótulo, Q, H) de cada curva do sistema
+        self.intersections = []
+        self.system_q_max = 0.0
+        self.canvas = None
+        self.rotor_lines = {}   # rotor -> (linha de altura, linha de eficiência)
+        self.system_lines = []  # (curva do sistema, marcadores das interseções)
+        self.background = None
+        self.limits = None
+        self.colors = {}
+        self.generation = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        self.setMinimumHeight(380)
+
+        self.solve_timer = QTimer(self)
+        self.solve_timer.setSingleShot(True)
+        self.solve_timer.setInterval(PREVIEW_SOLVE_DELAY_MS)
+        self.solve_timer.timeout.connect(self._start_solve)
+        self.solved.connect(self._apply_solution)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.canvas is None:
+            self._build()
+
+    def _build(self):
+        """Cria a figura e as linhas de todos os rotores já conhecidos"""
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+        self.figure = Figure(figsize=(5, 6))
+        self.canvas = FigureCanvasQTAgg(self.figure)
+        self.ax_head, self.ax_eff = self.figure.subplots(2, 1, sharex=True,
+                                                         gridspec_kw={'height_ratios': (3, 2)})
+        self.ax_head.set_ylabel("Altura (m)")
+        self.ax_eff.set_ylabel("Eficiência (%)")
+        self.ax_eff.set_xlabel("Vazão (m³/h)")
+        for ax in (self.ax_head, self.ax_eff):
+            ax.grid(True, linestyle=':', linewidth=0.6)
+        self.figure.subplots_adjust(left=0.14, right=0.97, bottom=0.09, top=0.97, hspace=0.08)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.layout().insertWidget(0, self.canvas, 1)
+        for name in self.rotors:
+            self._create_rotor_lines(name)
+        self._sync_system_lines()
+        self._full_redraw()
+
+    # --- Dados ---
+
+    def set_rotor(self, name, points):
+        """Atualiza os pontos de um rotor; apenas as linhas dele são alteradas"""
+        arrays = _preview_arrays(points)
+        is_new = name not in self.rotors
+        self.rotors[name] = arrays
+        self.solve_timer.start()
+        if self.canvas is not None:
+            if is_new:
+                self._create_rotor_lines(name)
+            else:
+                head, eff = self.rotor_lines[name]
+                head.set_data(arrays[0], arrays[1])
+                eff.set_data(arrays[0], arrays[2])
+        if len(arrays[0]) and arrays[0].max() * PREVIEW_HEADROOM > self.system_q_max:
+            self.refresh_systems()  # A curva do sistema precisa cobrir a nova faixa de vazão
+        elif self.canvas is not None:
+            if is_new:
+                self._full_redraw()
+            else:
+                self._update_view()
+
+    def remove_rotor(self, name):
+        """Remove um rotor do gráfico"""
+        if self.rotors.pop(name, None) is None:
+            return
+        for line in self.rotor_lines.pop(name, ()):
+            line.remove()
+        self.solve_timer.start()
+        if self.canvas is not None:
+            self._full_redraw()
+
+    def set_rotors(self, rotor_data):
+        """Substitui todos os rotores (projeto aberto ou dados reiniciados)"""
+        for lines in self.rotor_lines.values():
+            for line in lines:
+                line.remove()
+        self.rotor_lines = {}
+        self.colors = {}
+        self.rotors = {name: _preview_arrays(points) for name, points in rotor_data.items()}
+        if self.canvas is not None:
+            for name in self.rotors:
+                self._create_rotor_lines(name)
+        self.refresh_systems()
+
+    def refresh_systems(self):
+        """Recalcula as curvas do sistema configuradas na janela"""
+        q_max = max((float(arrays[0].max()) for arrays in self.rotors.values() if len(arrays[0])), default=0.0)
+        self.system_q_max = q_max * PREVIEW_HEADROOM
+        try:
+            curves = self.system_source(self.system_q_max) if q_max > 0 else []
+        except Exception:
+            logger.exception("Erro ao calcular a curva do sistema da pré-visualização")
+            curves = []
+        self.systems = [(label, np.asarray(curve['Q'], dtype=float), np.asarray(curve['H'], dtype=float))
+                        for label, curve in curves]
+        self.intersections = []
+        self.solve_timer.start()
+        if self.canvas is not None:
+            self._sync_system_lines()
+            self._full_redraw()
+
+    # --- Interseções em segundo plano ---
+
+    def _start_solve(self):
+        self.generation += 1
+        rotors = {name: arrays for name, arrays in self.rotors.items() if len(arrays[0]) >= 2}
+        if not rotors or not self.systems:
+            self._apply_solution(self.generation, [])
+            return
+        threading.Thread(target=self._solve, args=(self.generation, rotors, list(self.systems)),
+                         daemon=True).start()
+
+    def _solve(self, generation, rotors, systems):
+        try:
+            result = _solve_preview_intersections(rotors, systems)
+        except Exception:
+            logger.exception("Erro ao calcular as interseções da pré-visualização")
+            result = []
+        try:
+            self.solved.emit(generation, result)
+        except RuntimeError:
+            pass  # Janela fechada durante o cálculo
+
+    def _apply_solution(self, generation, result):
+        if generation != self.generation:
+            return  # Resultado de uma edição já substituída
+        self.intersections = result
+        parts = []
+        for (label, _, _), (names, q, h) in zip(self.systems, result):
+            found = [f"{name}: {qi:.1f} m³/h, {hi:.1f} m" for name, qi, hi in zip(names, q, h) if np.isfinite(qi)]
+            parts.append(f"{label} - " + ("; ".join(found) if found else "sem interseção"))
+        self.status_label.setText("\n".join(parts))
+        if self.canvas is None:
+            return
+        for (_, marks), (_, q, h) in zip(self.system_lines, result):
+            marks.set_data(q, h)
+        self._update_view()
+
+    # --- Desenho ---
+
+    def _create_rotor_lines(self, name):
+        color = self.colors.setdefault(name, f"C{len(self.colors) % 10}")
+        q, h, e = self.rotors[name]
+        self.rotor_lines[name] = (
+            self.ax_head.plot(q, h, 'o-', color=color, markersize=3, linewidth=1.4, label=str(name),
+                              animated=True)[0],
+            self.ax_eff.plot(q, e, 'o-', color=color, markersize=3, linewidth=1.2, animated=True)[0],
+        )
+
+    def _sync_system_lines(self):
+        for curve, marks in self.system_lines:
+            curve.remove()
+            marks.remove()
+        self.system_lines = []
+        for i, (label, system_q, system_h) in enumerate(self.systems):
+            style = PLOT_SYSTEM_STYLES[i % len(PLOT_SYSTEM_STYLES)]
+            self.system_lines.append((
+                self.ax_head.plot(system_q, system_h, color='black', linestyle=style, linewidth=1.2,
+                                  label=label, animated=True)[0],
+                self.ax_head.plot([], [], linestyle='none', marker='D', markersize=6, color='black',
+                                  fillstyle='none', animated=True)[0],
+            ))
+
+    def _data_limits(self):
+        """Maiores vazão, altura e eficiência dos dados (curva do sistema na faixa dos rotores)"""
+        arrays = [a for a in self.rotors.values() if len(a[0])]
+        q_max = max((np.nanmax(a[0]) for a in arrays), default=0.0)
+        h_max = max((np.nanmax(a[1]) for a in arrays), default=0.0)
+        e_max = max((np.nanmax(a[2]) if np.isfinite(a[2]).any() else 0.0 for a in arrays), default=0.0)
+        for _, system_q, system_h in self.systems:
+            inside = system_h[system_q <= q_max]
+            if inside.size:
+                h_max = max(h_max, float(np.nanmax(inside)))
+        return tuple(value if value > 0 else 1.0 for value in (q_max, h_max, e_max))
+
+    def _update_view(self):
+        """Blitting das linhas; redesenho completo só se os limites precisarem mudar"""
+        limits = self._data_limits()
+        if self.limits is None or any(new > old or new < PREVIEW_SHRINK * old
+                                      for new, old in zip(limits, self.limits)):
+            self._full_redraw(limits)
+        elif self.background is not None:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+            self.canvas.blit(self.figure.bbox)
+
+    def _full_redraw(self, limits=None):
+        limits = limits or self._data_limits()
+        self.limits = tuple(value * PREVIEW_HEADROOM for value in limits)
+        self.ax_eff.set_xlim(0, self.limits[0])
+        self.ax_head.set_ylim(0, self.limits[1])
+        self.ax_eff.set_ylim(0, min(self.limits[2], 105.0))
+        handles = [lines[0] for lines in self.rotor_lines.values()] + [curve for curve, _ in self.system_lines]
+        legend = self.ax_head.get_legend()
+        if legend is not None:
+            legend.remove()
+        if handles:
+            self.ax_head.legend(handles=handles, loc='upper right', fontsize='small', frameon=False)
+        self.background = None
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        """Depois de cada redesenho completo guarda o fundo e desenha as linhas animadas"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for lines in self.rotor_lines.values():
+            for line in lines:
+                line.axes.draw_artist(line)
+        for curve, marks in self.system_lines:
+            self.ax_head.draw_artist(curve)
+            self.ax_head.draw_artist(marks)
+
+# Instrumentação do relatório: relatório de tempos em JSON e perfil opcional ('cprofile' ou 'pyinstrument')
+REPORT_INSTRUMENTATION = {
+    'tempos': bool(os.environ.get("CURVAS_BOMBA_TEMPOS")),
+    'perfil': os.environ.get("CURVAS_BOMBA_PERFIL") or None,
+}
+REPORT_PROFILE_TOP = 30  # Funções mais custosas incluídas no relatório de tempos (cProfile)
+
+
+class ReportTimer:
+    """
+    Cronômetro das etapas da geração do relatório, com contadores e perfil opcional.
+    
+    As etapas são sequenciais: begin() encerra a etapa em andamento e inicia a
+    próxima, de modo que a soma das etapas cobre todo o relatório. Ao final, o
+    relatório de tempos é gravado em '<planilha>_tempos.json' se
+    REPORT_INSTRUMENTATION['tempos'] estiver ativo ou se houver perfil.
+    """
+
+    def __init__(self, filename, enabled=None, profiler=None):
+        self.filename = filename
+        self.enabled = REPORT_INSTRUMENTATION['tempos'] if enabled is None else enabled
+        self.profiler_name = REPORT_INSTRUMENTATION['perfil'] if profiler is None else profiler
+        self.stages = {}
+        self.counters = {}
+        self.current = None
+        self.stage_start = None
+        self.profile_file = None
+        self.profile_top = []
+        self._profiler = None
+
+    def begin(self, stage):
+        """Encerra a etapa em andamento e inicia a etapa informada"""
+        now = time.perf_counter()
+        self._close(now)
+        self.current = stage
+        self.stage_start = now
+
+    def end(self):
+        self._close(time.perf_counter())
+        self.current = None
+
+    def _close(self, now):
+        if self.current is None:
+            return
+        elapsed = now - self.stage_start
+        entry = self.stages.setdefault(self.current, {'segundos': 0.0, 'vezes': 0})
+        entry['segundos'] += elapsed
+        entry['vezes'] += 1
+        logger.debug("Etapa '%s' do relatório: %.4f s", self.current, elapsed)
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + int(amount)
+
+    def start_profiler(self):
+        """Inicia o perfil escolhido; pyinstrument é opcional e recai no cProfile se ausente"""
+        if not self.profiler_name:
+            return
+        if self.profiler_name == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument não está instalado; usando cProfile")
+                self.profiler_name = 'cprofile'
+            else:
+                self._profiler = Profiler()
+                self._profiler.start()
+                return
+        if self.profiler_name != 'cprofile':
+            logger.warning("Perfil '%s' desconhecido; use 'cprofile' ou 'pyinstrument'", self.profiler_name)
+            self.profiler_name = None
+            return
+        import cProfile
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stop_profiler(self):
+        if self._profiler is None:
+            return
+        base = os.path.splitext(self.filename)[0]
+        try:
+            if self.profiler_name == 'pyinstrument':
+                self._profiler.stop()
+                self.profile_file = base + "_perfil.html"
+                with open(self.profile_file, 'w', encoding='utf-8') as f:
+                    f.write(self._profiler.output_html())
+            else:
+                import pstats
+                self._profiler.disable()
+                self.profile_file = base + "_perfil.prof"
+                self._profiler.dump_stats(self.profile_file)
+                stats = pstats.Stats(self._profiler).stats
+                top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:REPORT_PROFILE_TOP]
+                self.profile_top = [{
+                    'funcao': f"{name} ({os.path.basename(path)}:{line})",
+                    'chamadas': calls,
+                    'tempo_proprio': own,
+                    'tempo_acumulado': cumulative,
+                } for (path, line, name), (_, calls, own, cumulative, _) in top]
+        except OSError as e:
+            logger.warning("Não foi possível gravar o perfil do relatório: %s", e)
+            self.profile_file = None
+        self._profiler = None
+
+    def report(self):
+        return {
+            'planilha': self.filename,
+            'total_segundos': sum(entry['segundos'] for entry in self.stages.values()),
+            'etapas': self.stages,
+            'contadores': self.counters,
+            'perfil': self.profile_file,
+            'funcoes_mais_custosas': self.profile_top,
+        }
+
+    def finish(self):
+        """
+        Encerra as medições e grava o relatório de tempos ao lado da planilha.
+        
+        Returns:
+            Caminho do JSON gravado, ou None se a instrumentação estiver desativada
+        """
+        self.end()
+        self.stop_profiler()
+        report = self.report()
+        logger.info("Relatório '%s' gerado em %.3f s", self.filename, report['total_segundos'])
+        if not (self.enabled or self.profile_file):
+            return None
+        path = os.path.splitext(self.filename)[0] + "_tempos.json"
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.warning("Não foi possível gravar o relatório de tempos: %s", e)
+            return None
+        return path
+
+
+def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=None, timer=None):
     """Cria os gráficos de desempenho e rendimento no workbook."""
+    timer = timer or ReportTimer(None, enabled=False, profiler='')
+    from openpyxl.chart import ScatterChart, Reference, Series
+    import openpyxl.styles
     try:
+        timer.begin("graficos: configuracao")
         ws_chart = wb.create_sheet("Gráficos")        # Gráfico principal (Altura x Vazão)
         main_chart = ScatterChart()
         main_chart.title = "Curvas de Desempenho"
@@ -1245,12 +7174,13 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
         ]
 
         if "Interpolados" not in wb.sheetnames:
-            print("Aviso: Planilha 'Interpolados' não encontrada para criar gráficos.")
+            logger.warning("Planilha 'Interpolados' não encontrada para criar gráficos.")
             return # Não pode criar gráficos sem dados interpolados
 
         ws_interp = wb["Interpolados"]
 
         # Mapear nomes de rotor para seus intervalos de linhas na planilha "Interpolados"
+        timer.begin("graficos: intervalos")
         rotor_row_ranges = {}
         current_rotor = None
         start_row = None
@@ -1287,9 +7217,10 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
                 rotor_row_ranges[current_rotor] = (start_row, end_row)
 
         # Adicionar séries de rotores ao gráfico principal e de eficiência
+        timer.begin("graficos: series dos rotores")
         for idx, rotor in enumerate(rotor_names):
             if rotor not in rotor_row_ranges:
-                print(f"Aviso: Não foi possível encontrar o intervalo de dados para o rotor '{rotor}' na planilha Interpolados.")
+                logger.warning("Não foi possível encontrar o intervalo de dados para o rotor '%s' na planilha Interpolados.", rotor)
                 continue
 
             start_row, end_row = rotor_row_ranges[rotor]
@@ -1312,12 +7243,12 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
                                 eff_value_str = str(eff_cell.value)
                                 if isinstance(eff_cell.value, str) and ":" in eff_value_str:
                                     is_combined = True
-                                    print(f"Debug: '{rotor}' identificado como rotor combinado para gráfico")
+                                    logger.debug("'%s' identificado como rotor combinado para gráfico", rotor)
                             break
                 
                 if is_combined:
                     series.graphicalProperties.line.dashStyle = "dash"
-                    print(f"Debug: aplicada linha tracejada para rotor combinado '{rotor}'")
+                    logger.debug("aplicada linha tracejada para rotor combinado '%s'", rotor)
                 
                 main_chart.series.append(series)
 
@@ -1332,11 +7263,12 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
                 # Aplicar linha tracejada no gráfico de eficiência também
                 if is_combined:
                     eff_series.graphicalProperties.line.dashStyle = "dash"
-                    print(f"Debug: aplicada linha tracejada na eficiência para rotor combinado '{rotor}'")
+                    logger.debug("aplicada linha tracejada na eficiência para rotor combinado '%s'", rotor)
 
                 eff_chart.series.append(eff_series)
 
         # Adiciona curvas do sistema (se existirem)
+        timer.begin("graficos: curvas do sistema")
         if "Curva do Sistema" in wb.sheetnames:
             ws_system = wb["Curva do Sistema"]
             
@@ -1359,7 +7291,7 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
                     system_series.graphicalProperties.line.width = 30000 # Thicker line
                     main_chart.series.append(system_series)
                 else:
-                    print("Aviso: Não há dados suficientes ou válidos para a primeira curva do sistema.")
+                    logger.warning("Não há dados suficientes ou válidos para a primeira curva do sistema.")
             
             # Segunda curva do sistema
             if system_curve_2:
@@ -1380,15 +7312,17 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
                     system_series2.graphicalProperties.line.width = 30000 # Thicker line
                     main_chart.series.append(system_series2)
                 else:
-                    print("Aviso: Não há dados suficientes ou válidos para a segunda curva do sistema.")
+                    logger.warning("Não há dados suficientes ou válidos para a segunda curva do sistema.")
 
         # Adiciona os gráficos à planilha "Gráficos"
+        timer.begin("graficos: insercao")
+        timer.count('series', len(main_chart.series) + len(eff_chart.series))
         ws_chart.add_chart(main_chart, "B2") # Main chart position
 
         if eff_chart.series:
             ws_chart.add_chart(eff_chart, "B20") # Efficiency chart position
         else:
-            print("Aviso: Nenhum dado de rendimento para plotar o gráfico de eficiência.")
+            logger.warning("Nenhum dado de rendimento para plotar o gráfico de eficiência.")
 
         # Adicionar equações das curvas do sistema (se existirem)
         eq_row = 40 # Position for the equation text
@@ -1405,8 +7339,7 @@ def _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=Non
 
     except Exception as e:
         QMessageBox.critical(None, "Erro nos Gráficos", f"Erro ao criar os gráficos: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao criar os gráficos")
 
 # FIX THE INDENTATION - THIS FUNCTION WAS NESTED INSIDE _create_charts_in_workbook
 def find_intersection(rotor_func, eff_func, system_curve_data, rotor_name, system_curve_num):
@@ -1423,24 +7356,25 @@ def find_intersection(rotor_func, eff_func, system_curve_data, rotor_name, syste
     Returns:
         Lista de dicionários com os pontos de interseção
     """
-    print(f"DEBUG - Buscando interseções para Rotor {rotor_name} e Curva {system_curve_num}")
+    logger.debug("Buscando interseções para Rotor %s e Curva %s", rotor_name, system_curve_num)
     
     # Extrair pontos da curva do sistema
     system_q = [point[0] for point in system_curve_data['points']]
     system_h = [point[1] for point in system_curve_data['points']]
     
     if not system_q or not system_h:
-        print(f"DEBUG - Curva do sistema {system_curve_num} não tem pontos suficientes")
+        logger.debug("Curva do sistema %s não tem pontos suficientes", system_curve_num)
         return None
         
     # Criar função de interpolação para a curva do sistema
+    from scipy.interpolate import interp1d
     system_func = interp1d(system_q, system_h, kind='linear', bounds_error=False, fill_value=np.nan)
     
     # Encontrar os zeros da função de diferença (pontos de interseção)
     q_min = max(min(system_q), min(rotor_func.x))
     q_max = min(max(system_q), max(rotor_func.x))
     
-    print(f"DEBUG - Intervalo de busca: {q_min:.2f} a {q_max:.2f}")
+    logger.debug("Intervalo de busca: %.2f a %.2f", q_min, q_max)
     
     # Importar método de Brent para encontrar raízes
     from scipy import optimize
@@ -1475,7 +7409,7 @@ def find_intersection(rotor_func, eff_func, system_curve_data, rotor_name, syste
                 # Verificar se o ponto está dentro dos limites válidos
                 if (q_min <= q_intersect <= q_max and 
                     h_intersect >= 0 and 0 <= eff_intersect <= 100):
-                    print(f"DEBUG - Interseção encontrada: Q={q_intersect:.2f}, H={h_intersect:.2f}, Eff={eff_intersect:.2f}")
+                    logger.debug("Interseção encontrada: Q=%.2f, H=%.2f, Eff=%.2f", q_intersect, h_intersect, eff_intersect)
                     intersections.append({
                         'vazao': q_intersect,
                         'altura': h_intersect,
@@ -1483,23 +7417,26 @@ def find_intersection(rotor_func, eff_func, system_curve_data, rotor_name, syste
                     })
             except ValueError as e:
                 # Pode ocorrer se não houver raiz no intervalo
-                print(f"DEBUG - Erro ao buscar interseção no segmento [{seg_start:.2f}, {seg_end:.2f}]: {e}")
-            except Exception as e:                print(f"DEBUG - Erro inesperado: {e}")
+                logger.debug("Erro ao buscar interseção no segmento [%.2f, %.2f]: %s", seg_start, seg_end, e)
+            except Exception as e:
+                logger.warning("Erro inesperado ao buscar interseção: %s", e)
     
     if not intersections:
-        print(f"DEBUG - Nenhuma interseção encontrada para rotor {rotor_name} e curva {system_curve_num}")
+        logger.debug("Nenhuma interseção encontrada para rotor %s e curva %s", rotor_name, system_curve_num)
     else:
-        print(f"DEBUG - Encontradas {len(intersections)} interseções para rotor {rotor_name} e curva {system_curve_num}")
+        logger.debug("Encontradas %s interseções para rotor %s e curva %s", len(intersections), rotor_name, system_curve_num)
     
     return intersections
 
-def find_intersection_points(rotor_data, system_curve_data):
+def find_intersection_points(rotor_data, system_curve_data, rotor_fit=None, density=WATER_DENSITY):
     """
     Encontra os pontos de interseção entre as curvas dos rotores e a curva do sistema.
     
     Args:
         rotor_data: Dicionário com os dados dos rotores
         system_curve_data: Dicionário com os dados da curva do sistema
+        rotor_fit: Curvas ajustadas (fit_rotor_curves); se None usa interpolação linear
+        density: Massa específica do fluido (kg/m³)
         
     Returns:
         Lista de dicionários com os pontos de interseção
@@ -1508,109 +7445,619 @@ def find_intersection_points(rotor_data, system_curve_data):
     
     # Verificar se temos dados válidos
     if not system_curve_data or 'points' not in system_curve_data or not system_curve_data['points']:
-        print("DEBUG - Dados da curva do sistema inválidos")
+        logger.debug("Dados da curva do sistema inválidos")
         return intersections
     
     # Extrair pontos da curva do sistema
-    system_points = system_curve_data['points']
-    system_q = [point[0] for point in system_points]
-    system_h = [point[1] for point in system_points]
+    system_q = np.array([point[0] for point in system_curve_data['points']], dtype=float)
+    system_h = np.array([point[1] for point in system_curve_data['points']], dtype=float)
     
-    # Criar função de interpolação para a curva do sistema
-    try:
-        system_func = interp1d(system_q, system_h, kind='linear', bounds_error=False, fill_value=np.nan)
-    except Exception as e:
-        print(f"DEBUG - Erro ao criar interpolação para curva do sistema: {e}")
+    if rotor_fit is None:
+        rotor_fit = fit_rotor_curves(rotor_data, model='linear')
+
+    # Rotores com curva ajustada (pontos suficientes e eficiência numérica), na ordem de rotor_data
+    rows = np.array([rotor_fit['index'][rotor] for rotor in rotor_data if rotor in rotor_fit['index']], dtype=int)
+    if rows.size == 0:
+        return intersections
+
+    # Mesma grade de solve_operating_points, mas mantendo todas as interseções de cada rotor
+    q_lo = np.maximum(rotor_fit['q_min'][rows], system_q.min())
+    q_hi = np.minimum(rotor_fit['q_max'][rows], system_q.max())
+    q_grid = q_lo[:, None] + (q_hi - q_lo)[:, None] * np.linspace(0.0, 1.0, 1000)
+    diff = (evaluate_rotor_curves(rotor_fit, q_grid, 'head', rows=rows, extrapolate=False)
+            - np.interp(q_grid.ravel(), system_q, system_h).reshape(q_grid.shape))
+    diff[q_hi <= q_lo] = np.nan  # Sem faixa comum com a curva do sistema
+    line, q_root = _all_crossings(q_grid, diff)
+    if line.size == 0:
         return intersections
+
+    # Altura e eficiência de todas as raízes em uma avaliação
+    root_rows = rows[line]
+    heads = evaluate_rotor_curves(rotor_fit, q_root, 'head', rows=root_rows, extrapolate=False)
+    effs = evaluate_rotor_curves(rotor_fit, q_root, 'efficiency', rows=root_rows, extrapolate=False)
+    for k, i in enumerate(root_rows):
+        rotor_name = rotor_fit['names'][i]
+        logger.debug("Interseção encontrada para rotor %s: Q=%.2f, H=%.2f, Eff=%.2f",
+                     rotor_name, q_root[k], heads[k], effs[k])
+        intersections.append({
+            'rotor': rotor_name,
+            'vazao': float(q_root[k]),
+            'altura': float(heads[k]),
+            'eficiencia': float(np.nan_to_num(effs[k])),
+        })
     
-    # Para cada rotor, encontrar interseções
-    for rotor_name, points in rotor_data.items():
-        print(f"DEBUG - Processando rotor {rotor_name}")
-        
-        # Extrair pontos do rotor
-        rotor_q = [point['vazao'] for point in points]
-        rotor_h = [point['altura'] for point in points]
-        rotor_eff = [point['efficiency'] for point in points]
-        
-        # Verificar se temos pontos suficientes
-        if len(rotor_q) < 2:
-            print(f"DEBUG - Rotor {rotor_name} não tem pontos suficientes")
+    # Potências de todas as interseções em lote (None onde a eficiência não é positiva)
+    if intersections:
+        hydraulic, shaft = pump_power([p['vazao'] for p in intersections], [p['altura'] for p in intersections],
+                                      [p['eficiencia'] for p in intersections], density)
+        for k, point in enumerate(intersections):
+            point['potencia_hidraulica'] = float(hydraulic[k])
+            point['potencia_mecanica'] = None if np.isnan(shaft[k]) else float(shaft[k])
+    return intersections
+
+def _write_npsh_columns(ws, row, column, point):
+    """Escreve NPSHr, NPSHa, margem, razão e situação de um ponto de operação anotado"""
+    ws.cell(row=row, column=column + 1).value = point['npsha']
+    if point['npshr'] is None:
+        ws.cell(row=row, column=column + 4).value = "Sem curva NPSHr"
+        return
+    ws.cell(row=row, column=column).value = point['npshr']
+    ws.cell(row=row, column=column + 2).value = point['margem_npsh']
+    ws.cell(row=row, column=column + 3).value = point['razao_npsh']
+    ws.cell(row=row, column=column + 4).value = "Sim" if point['npsh_ok'] else "Não (risco de cavitação)"
+
+# Unidade no fim do cabeçalho de uma coluna (ou título de eixo) convertida pelo relatório
+_REPORT_UNIT_PATTERN = re.compile(r'\((m³/h|m|W|kW)\)$')
+_REPORT_UNIT_QUANTITY = {'m³/h': 'vazao', 'm': 'altura', 'W': 'potencia', 'kW': 'potencia'}
+
+def _apply_report_units(wb, units):
+    """
+    Converte o relatório montado nas unidades internas para as unidades escolhidas.
+
+    Cada cabeçalho terminado em '(m³/h)', '(m)', '(W)' ou '(kW)' tem as células numéricas
+    abaixo dele (até o próximo texto da coluna) escaladas como um array e a unidade do
+    rótulo trocada; os títulos dos eixos dos gráficos são renomeados da mesma forma.
+
+    Args:
+        wb: Workbook do openpyxl
+        units: Dicionário {grandeza: unidade} (ver REPORT_UNIT_PRESETS)
+
+    Returns:
+        Número de colunas convertidas
+    """
+    def target(text):
+        match = _REPORT_UNIT_PATTERN.search(text) if isinstance(text, str) else None
+        if not match:
+            return None
+        unit = match.group(1)
+        quantity = _REPORT_UNIT_QUANTITY[unit]
+        new_unit = units.get(quantity, unit)
+        if new_unit == unit:
+            return None
+        scale = unit_factor(quantity, unit) / unit_factor(quantity, new_unit)
+        return text[:match.start()] + f"({new_unit})", scale
+
+    converted = 0
+    for ws in wb.worksheets:
+        headers = []
+        for row in ws.iter_rows():
+            for cell in row:
+                found = target(cell.value)
+                if found:
+                    headers.append((cell,) + found)
+        for header, label, scale in headers:
+            cells = []
+            for (cell,) in ws.iter_rows(min_row=header.row + 1, max_row=ws.max_row,
+                                        min_col=header.column, max_col=header.column):
+                if isinstance(cell.value, str):
+                    break
+                if isinstance(cell.value, (int, float)) and not isinstance(cell.value, bool):
+                    cells.append(cell)
+            if not cells:
+                continue
+            values = np.array([cell.value for cell in cells], dtype=float) * scale
+            for cell, value in zip(cells, values.tolist()):
+                cell.value = value
+            header.value = label
+            converted += 1
+        for chart in ws._charts:
+            for axis in (chart.x_axis, chart.y_axis):
+                try:
+                    text = axis.title.tx.rich.p[0].r[0].t
+                except (AttributeError, IndexError, TypeError):
+                    continue
+                found = target(text)
+                if found:
+                    axis.title = found[0]
+    return converted
+
+# Relatório HTML/JSON: alternativa leve ao Excel com os mesmos dados, tabelas interpoladas,
+# curvas do sistema e interseções; o JSON é escrito em blocos de linhas direto dos arrays
+REPORT_FILE_FILTERS = "Excel Files (*.xlsx);;Relatório HTML (*.html);;Dados JSON (*.json)"
+HTML_REPORT_POINTS = 100  # Pontos interpolados por rotor, como na planilha Interpolados
+HTML_REPORT_SIGNIFICANT = 6  # Algarismos significativos dos valores gravados
+HTML_REPORT_CHUNK_ROWS = 256  # Linhas de cada array 2D serializadas por vez
+# Grandeza de cada array do relatório, para a conversão de unidades
+_HTML_REPORT_QUANTITY = {'vazao': 'vazao', 'por_min': 'vazao', 'por_max': 'vazao',
+                         'altura': 'altura', 'npshr': 'altura',
+                         'potencia_hidraulica': 'potencia', 'potencia_eixo': 'potencia'}
+_HTML_DATA_MARKER = "<!--DADOS-->"
+
+_HTML_REPORT_TEMPLATE = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<style>
+body { font-family: Arial, Helvetica, sans-serif; margin: 16px; color: #222; }
+h1 { font-size: 20px; margin: 0 0 4px; }
+h2 { font-size: 16px; margin: 20px 0 6px; }
+#info { color: #555; font-size: 13px; margin-bottom: 10px; }
+#controles { margin-bottom: 10px; }
+#graficos { display: flex; flex-wrap: wrap; gap: 12px; }
+canvas { border: 1px solid #ccc; background: #fff; }
+table { border-collapse: collapse; font-size: 12px; margin-bottom: 8px; }
+th, td { border: 1px solid #ccc; padding: 2px 6px; text-align: right; }
+th { background: #eee; text-align: center; }
+td:first-child { text-align: left; white-space: nowrap; }
+.cor { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+.aviso { color: #777; font-size: 13px; }
+</style>
+</head>
+<body>
+<h1>{titulo}</h1>
+<div id="info"></div>
+<div id="controles">
+<label>Rotor: <select id="rotor"></select></label>
+<button id="baixar">Baixar JSON</button>
+</div>
+<div id="graficos">
+<canvas id="grafico-altura" width="620" height="420"></canvas>
+<canvas id="grafico-eficiencia" width="620" height="420"></canvas>
+<canvas id="grafico-potencia" width="620" height="420"></canvas>
+</div>
+<div id="tabelas"></div>
+<script type="application/json" id="relatorio-dados">
+<!--DADOS-->
+</script>
+<script>
+"use strict";
+var fonte = document.getElementById("relatorio-dados").textContent;
+var R = JSON.parse(fonte);
+var U = R.unidades;
+var SISTEMAS = ["#000000", "#7a7a7a"];
+
+function cor(i) { return "hsl(" + Math.round((i * 137.508) % 360) + ",70%,42%)"; }
+function fmt(v, casas) { return (v === null || v === undefined) ? "" : v.toFixed(casas === undefined ? 2 : casas); }
+function escapar(t) {
+  return String(t).replace(/[&<>"]/g, function (c) {
+    return {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\\"": "&quot;"}[c];
+  });
+}
+
+function escala(min, max, n) {
+  if (!(max > min)) { max = min + 1; }
+  var passo = Math.pow(10, Math.floor(Math.log10((max - min) / n)));
+  var mult = [1, 2, 5, 10];
+  for (var k = 0; k < mult.length; k++) {
+    if ((max - min) / (passo * mult[k]) <= n) { passo *= mult[k]; break; }
+  }
+  return {min: Math.floor(min / passo) * passo, max: Math.ceil(max / passo) * passo, passo: passo};
+}
+
+// series: [{x, y, cor, largura, tracejado, marcador}]
+function grafico(id, titulo, rotuloX, rotuloY, series) {
+  var c = document.getElementById(id), g = c.getContext("2d");
+  var m = {e: 64, d: 16, t: 30, b: 46}, w = c.width - m.e - m.d, h = c.height - m.t - m.b;
+  var x0 = Infinity, x1 = -Infinity, y0 = Infinity, y1 = -Infinity;
+  series.forEach(function (s) {
+    for (var k = 0; k < s.x.length; k++) {
+      if (s.x[k] === null || s.y[k] === null) { continue; }
+      x0 = Math.min(x0, s.x[k]); x1 = Math.max(x1, s.x[k]);
+      y0 = Math.min(y0, s.y[k]); y1 = Math.max(y1, s.y[k]);
+    }
+  });
+  g.clearRect(0, 0, c.width, c.height);
+  g.font = "13px Arial"; g.fillStyle = "#222"; g.textAlign = "center";
+  g.fillText(titulo, c.width / 2, 18);
+  if (x0 === Infinity) { g.fillText("Sem dados", c.width / 2, c.height / 2); return; }
+  var ex = escala(Math.min(0, x0), x1, 8), ey = escala(Math.min(0, y0), y1, 8);
+  function px(v) { return m.e + (v - ex.min) / (ex.max - ex.min) * w; }
+  function py(v) { return m.t + h - (v - ey.min) / (ey.max - ey.min) * h; }
+  g.font = "11px Arial"; g.strokeStyle = "#e4e4e4"; g.lineWidth = 1;
+  for (var v = ex.min; v <= ex.max + ex.passo / 2; v += ex.passo) {
+    g.beginPath(); g.moveTo(px(v), m.t); g.lineTo(px(v), m.t + h); g.stroke();
+    g.fillText(+v.toPrecision(6), px(v), m.t + h + 14);
+  }
+  g.textAlign = "right";
+  for (v = ey.min; v <= ey.max + ey.passo / 2; v += ey.passo) {
+    g.beginPath(); g.moveTo(m.e, py(v)); g.lineTo(m.e + w, py(v)); g.stroke();
+    g.fillText(+v.toPrecision(6), m.e - 4, py(v) + 4);
+  }
+  g.strokeStyle = "#888"; g.strokeRect(m.e, m.t, w, h);
+  g.textAlign = "center"; g.font = "12px Arial";
+  g.fillText(rotuloX, m.e + w / 2, c.height - 8);
+  g.save(); g.translate(14, m.t + h / 2); g.rotate(-Math.PI / 2); g.fillText(rotuloY, 0, 0); g.restore();
+  g.save(); g.beginPath(); g.rect(m.e, m.t, w, h); g.clip();
+  series.forEach(function (s) {
+    g.strokeStyle = s.cor; g.fillStyle = s.cor; g.lineWidth = s.largura || 1.5;
+    g.setLineDash(s.tracejado ? [6, 4] : []);
+    if (s.marcador) {
+      for (var k = 0; k < s.x.length; k++) {
+        if (s.x[k] === null || s.y[k] === null) { continue; }
+        g.beginPath(); g.arc(px(s.x[k]), py(s.y[k]), s.marcador, 0, 2 * Math.PI); g.fill();
+      }
+      return;
+    }
+    g.beginPath();
+    var aberto = false;
+    for (var k = 0; k < s.x.length; k++) {
+      if (s.x[k] === null || s.y[k] === null) { aberto = false; continue; }
+      if (aberto) { g.lineTo(px(s.x[k]), py(s.y[k])); } else { g.moveTo(px(s.x[k]), py(s.y[k])); aberto = true; }
+    }
+    g.stroke();
+  });
+  g.restore();
+}
+
+function linhasSelecionadas() {
+  var sel = document.getElementById("rotor").value;
+  if (sel === "") { return R.rotores.map(function (_, i) { return i; }); }
+  return [+sel];
+}
+
+function desenhar() {
+  var linhas = linhasSelecionadas(), poucos = linhas.length <= 30;
+  var altura = [], eficiencia = [], potencia = [];
+  linhas.forEach(function (i) {
+    var I = R.interpolados, D = R.dados;
+    altura.push({x: I.vazao[i], y: I.altura[i], cor: cor(i)});
+    eficiencia.push({x: I.vazao[i], y: I.eficiencia[i], cor: cor(i)});
+    potencia.push({x: I.vazao[i], y: I.potencia_eixo[i], cor: cor(i)});
+    if (poucos) {
+      altura.push({x: D.vazao[i], y: D.altura[i], cor: cor(i), marcador: 2.5});
+      eficiencia.push({x: D.vazao[i], y: D.eficiencia[i], cor: cor(i), marcador: 2.5});
+    }
+  });
+  R.sistemas.forEach(function (s, k) {
+    altura.push({x: s.vazao, y: s.altura, cor: SISTEMAS[k % 2], largura: 2, tracejado: true});
+  });
+  R.intersecoes.forEach(function (p) {
+    var x = linhas.map(function (i) { return p.vazao[i]; }), y = linhas.map(function (i) { return p.altura[i]; });
+    altura.push({x: x, y: y, cor: "#d00000", marcador: 4});
+  });
+  grafico("grafico-altura", "Altura x Vazão", "Vazão (" + U.vazao + ")", "Altura (" + U.altura + ")", altura);
+  grafico("grafico-eficiencia", "Eficiência x Vazão", "Vazão (" + U.vazao + ")", "Eficiência (%)", eficiencia);
+  grafico("grafico-potencia", "Potência no Eixo x Vazão", "Vazão (" + U.vazao + ")", "Potência (" + U.potencia + ")", potencia);
+  tabelas(linhas);
+}
+
+function tabela(titulo, cabecalhos, linhas, colunas, casas) {
+  var t = "<h2>" + escapar(titulo) + "</h2><table><tr>";
+  cabecalhos.forEach(function (c) { t += "<th>" + escapar(c) + "</th>"; });
+  t += "</tr>";
+  linhas.forEach(function (l) {
+    t += "<tr>";
+    l.forEach(function (v, k) { t += "<td>" + (k === 0 ? v : (typeof v === "number" ? fmt(v, casas) : escapar(v))) + "</td>"; });
+    t += "</tr>";
+  });
+  return t + "</table>";
+}
+
+function nomeRotor(i) {
+  return "<span class=\\"cor\\" style=\\"background:" + cor(i) + "\\"></span>Rotor " + escapar(R.rotores[i]);
+}
+
+function tabelas(linhas) {
+  var html = "", V = "Vazão (" + U.vazao + ")", H = "Altura (" + U.altura + ")", P = " (" + U.potencia + ")";
+  R.intersecoes.forEach(function (p) {
+    var corpo = [];
+    linhas.forEach(function (i) {
+      if (p.vazao[i] === null) { return; }
+      corpo.push([nomeRotor(i), p.vazao[i], p.altura[i], p.eficiencia[i], p.potencia_hidraulica[i],
+                  p.potencia_eixo[i], p.fracao_bep[i] === null ? "" : p.fracao_bep[i],
+                  p.dentro_por[i] === null ? "" : (p.dentro_por[i] ? "Sim" : "Não")]);
+    });
+    html += tabela("Pontos de Interseção - " + R.sistemas[p.sistema].nome,
+                   ["Rotor", V, H, "Eficiência (%)", "Potência Hidráulica" + P, "Potência Mecânica" + P,
+                    "Vazão / Vazão BEP (%)", "Faixa Preferencial"], corpo, 0);
+  });
+  var bep = [];
+  linhas.forEach(function (i) {
+    if (R.bep.vazao[i] !== null) { bep.push([nomeRotor(i), R.bep.vazao[i], R.bep.altura[i], R.bep.eficiencia[i], R.bep.por_min[i], R.bep.por_max[i]]); }
+  });
+  html += tabela("Ponto de Melhor Eficiência (BEP)", ["Rotor", V, H, "Eficiência (%)", "Faixa Preferencial - Mín. (" + U.vazao + ")",
+                 "Faixa Preferencial - Máx. (" + U.vazao + ")"], bep, 2);
+  if (linhas.length !== 1) {
+    html += "<p class=\\"aviso\\">Selecione um rotor para ver os pontos dos dados e das curvas interpoladas.</p>";
+  } else {
+    var i = linhas[0];
+    [["Dados", R.dados], ["Interpolados", R.interpolados]].forEach(function (secao) {
+      var S = secao[1], corpo = [];
+      for (var k = 0; k < S.vazao[i].length; k++) {
+        if (S.vazao[i][k] === null) { continue; }
+        corpo.push([nomeRotor(i), S.vazao[i][k], S.altura[i][k], S.eficiencia[i][k], S.potencia_hidraulica[i][k], S.potencia_eixo[i][k]]);
+      }
+      html += tabela(secao[0], ["Rotor", V, H, "Eficiência (%)", "Potência Hidráulica" + P, "Potência Mecânica" + P], corpo, 2);
+    });
+  }
+  document.getElementById("tabelas").innerHTML = html;
+}
+
+(function iniciar() {
+  var sel = document.getElementById("rotor");
+  sel.innerHTML = "<option value=\\"\\">Todos (" + R.rotores.length + ")</option>" + R.rotores.map(function (r, i) {
+    return "<option value=\\"" + i + "\\">Rotor " + escapar(r) + "</option>";
+  }).join("");
+  sel.addEventListener("change", desenhar);
+  document.getElementById("info").textContent = "Gerado em " + R.gerado_em + " | Fluido: " +
+    R.fluido.densidade + " kg/m³, " + R.fluido.viscosidade + " cSt | Ajuste: " + R.ajuste.modelo +
+    (R.rotores_combinados.length ? " | Rotores combinados (eficiência equivalente): " + R.rotores_combinados.join(", ") : "");
+  document.getElementById("baixar").addEventListener("click", function () {
+    var a = document.createElement("a");
+    a.href = URL.createObjectURL(new Blob([fonte], {type: "application/json"}));
+    a.download = document.title.replace(/\\.html?$/i, "") + ".json";
+    a.click();
+  });
+  desenhar();
+})();
+</script>
+</body>
+</html>
+"""
+
+def _report_file_name(filename, selected_filter):
+    """Acrescenta a extensão do filtro escolhido quando o nome não traz uma de relatório"""
+    if os.path.splitext(filename)[1].lower() in ('.xlsx', '.html', '.json'):
+        return filename
+    found = re.search(r'\*(\.\w+)', selected_filter or '')
+    return filename + (found.group(1) if found else '.xlsx')
+
+def _json_rows(values):
+    """
+    Linhas de um array NumPy como listas prontas para json.dumps: valores arredondados
+    a HTML_REPORT_SIGNIFICANT algarismos e NaN/infinitos como None (null).
+    """
+    a = np.asarray(values, dtype=float)
+    finite = np.isfinite(a)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        exponent = np.floor(np.log10(np.abs(a)))
+    # Só casas decimais (potências de 10 exatas); valores grandes já são representados inteiros
+    decimals = np.clip(np.where(finite & (a != 0), HTML_REPORT_SIGNIFICANT - 1 - exponent, 0), 0, 15)
+    scale = 10.0 ** decimals
+    rounded = np.where(finite, np.round(np.where(finite, a, 0.0) * scale) / scale, 0.0)
+    rows = rounded.astype(object)
+    rows[~finite] = None
+    return rows.tolist()
+
+def _json_text(value):
+    """Texto JSON de um valor simples, seguro dentro de <script> no HTML"""
+    return json.dumps(value, ensure_ascii=False).replace('<', '\\u003c')
+
+def _write_json_stream(f, value):
+    """
+    Serializa dicionários, listas e arrays NumPy em JSON direto no arquivo aberto.
+
+    Arrays 2D são escritos em blocos de HTML_REPORT_CHUNK_ROWS linhas, sem montar o
+    documento inteiro na memória.
+    """
+    if isinstance(value, np.ndarray):
+        if value.ndim < 2:
+            f.write(json.dumps(_json_rows(value), separators=(',', ':')))
+            return
+        f.write('[')
+        for start in range(0, len(value), HTML_REPORT_CHUNK_ROWS):
+            chunk = json.dumps(_json_rows(value[start:start + HTML_REPORT_CHUNK_ROWS]), separators=(',', ':'))
+            f.write((',' if start else '') + chunk[1:-1])
+        f.write(']')
+    elif isinstance(value, dict):
+        f.write('{')
+        for k, (key, item) in enumerate(value.items()):
+            f.write((',' if k else '') + _json_text(str(key)) + ':')
+            _write_json_stream(f, item)
+        f.write('}')
+    elif isinstance(value, (list, tuple)):
+        f.write('[')
+        for k, item in enumerate(value):
+            if k:
+                f.write(',')
+            _write_json_stream(f, item)
+        f.write(']')
+    else:
+        f.write(_json_text(value))
+
+def _convert_report_section(section, units):
+    """Converte para as unidades do relatório os arrays de uma seção (chave = grandeza)"""
+    for key, quantity in _HTML_REPORT_QUANTITY.items():
+        if key in section and units[quantity] != INTERNAL_UNITS[quantity]:
+            section[key] = from_internal_units(section[key], quantity, units[quantity])
+    return section
+
+def _build_html_report(rotor_data, filename="Curvas_Bomba.html", system_curve_mode=0,
+                       manual_points=None, equation_params=None, max_rotor_q=None,
+                       system_curve_mode_2=0, manual_points_2=None, equation_params_2=None,
+                       curve_model='linear', curve_degree=3, fluid_settings=None, rotor_rpm=None,
+                       report_units=None, timer=None, **excel_only):
+    """
+    Monta e salva o relatório em HTML (visualizador offline com os dados embutidos) ou
+    só em JSON, conforme a extensão do arquivo.
+
+    Traz os dados dos rotores, as curvas interpoladas, as curvas do sistema, os pontos
+    de operação e o BEP, calculados em lote. As seções exclusivas da planilha (famílias
+    de rotação, energia, reservatório, incerteza, NPSH) chegam em excel_only e são ignoradas.
+    """
+    timer = timer or ReportTimer(filename, enabled=False, profiler='')
+    if not rotor_data:
+        QMessageBox.warning(None, "Erro", "Nenhum dado de rotor foi fornecido para gerar o relatório!")
+        return
+    try:
+        rotor_data, _, fluid = fluid_rotor_data(rotor_data, rotor_rpm, fluid_settings)
+    except ValueError as e:
+        QMessageBox.warning(None, "Erro", f"Fluido inválido: {str(e)}")
+        return
+    density = fluid['densidade']
+    units = report_units or INTERNAL_UNITS
+
+    timer.begin("ajuste das curvas")
+    try:
+        rotor_fit = fit_rotor_curves(rotor_data, model=curve_model, degree=curve_degree)
+    except ValueError as e:
+        QMessageBox.warning(None, "Erro de Ajuste", f"Não foi possível ajustar as curvas: {str(e)}\nUsando interpolação linear.")
+        rotor_fit = fit_rotor_curves(rotor_data, model='linear')
+    bep = find_best_efficiency_points(rotor_fit)
+    timer.count('curvas_ajustadas', len(rotor_fit['names']))
+
+    # Dados na ordem dos rotores, em arrays preenchidos com NaN; rotores combinados
+    # entram com a eficiência equivalente do conjunto
+    timer.begin("dados e interpolados")
+    names = [rotor for rotor, points in rotor_data.items() if points]
+    n = len(names)
+    m = max(len(rotor_data[rotor]) for rotor in names) if names else 0
+    Q, H, E = (np.full((n, m), np.nan) for _ in range(3))
+    for i, rotor in enumerate(names):
+        points = rotor_data[rotor]
+        k = len(points)
+        Q[i, :k] = [p['vazao'] for p in points]
+        H[i, :k] = [p['altura'] for p in points]
+        E[i, :k] = _numeric_efficiencies([p['efficiency'] for p in points])
+    hydraulic, shaft = pump_power(Q, H, E, density)
+    data = {'vazao': Q, 'altura': H, 'eficiencia': E, 'potencia_hidraulica': hydraulic, 'potencia_eixo': shaft}
+    combined = [str(rotor) for rotor in names if any(_is_combined_efficiency(p['efficiency']) for p in rotor_data[rotor])]
+
+    # Curvas ajustadas avaliadas no domínio de cada rotor, todas de uma vez
+    rows = np.array([rotor_fit['index'].get(rotor, -1) for rotor in names], dtype=int)
+    fitted = rows >= 0
+    t = np.linspace(0.0, 1.0, HTML_REPORT_POINTS)
+    q_new = rotor_fit['q_min'][:, None] + (rotor_fit['q_max'] - rotor_fit['q_min'])[:, None] * t
+    h_new = np.maximum(evaluate_rotor_curves(rotor_fit, q_new, 'head'), 0)
+    eff_new = np.clip(evaluate_rotor_curves(rotor_fit, q_new, 'efficiency'), 0, 100)
+    hyd_new, shaft_new = pump_power(q_new, h_new, eff_new, density)
+
+    def by_rotor(values):
+        """Arrays por curva ajustada reordenados na ordem de names (NaN sem ajuste)"""
+        out = np.full((n,) + values.shape[1:], np.nan)
+        out[fitted] = values[rows[fitted]]
+        return out
+
+    interpolated = {'vazao': by_rotor(q_new), 'altura': by_rotor(h_new), 'eficiencia': by_rotor(eff_new),
+                    'potencia_hidraulica': by_rotor(hyd_new), 'potencia_eixo': by_rotor(shaft_new)}
+    timer.count('interpolantes', 2 * len(rotor_fit['names']))
+
+    # Curvas do sistema com a mesma faixa de vazão da planilha
+    timer.begin("curvas do sistema")
+    if max_rotor_q is None:
+        max_rotor_q = float(np.nanmax(Q)) if Q.size else 0
+    max_system_q = max_rotor_q * 1.1
+    systems = []
+    for label, mode, points, params in (("Curva do Sistema 1", system_curve_mode, manual_points, equation_params),
+                                        ("Curva do Sistema 2", system_curve_mode_2, manual_points_2, equation_params_2)):
+        if mode <= 0:
             continue
-        
-        # Criar funções de interpolação para o rotor
-        try:
-            rotor_func = interp1d(rotor_q, rotor_h, kind='linear', bounds_error=False, fill_value=np.nan)
-            eff_func = interp1d(rotor_q, rotor_eff, kind='linear', bounds_error=False, fill_value=np.nan)
-        except Exception as e:
-            print(f"DEBUG - Erro ao criar interpolação para rotor {rotor_name}: {e}")
+        curve = _calculate_system_curve(manual_points=points, equation_params=params, max_rotor_q=max_system_q)
+        if curve is None:
+            QMessageBox.warning(None, "Aviso", f"Não foi possível calcular a {label.lower()}. O relatório será gerado sem ela.")
             continue
-        
-        # Definir intervalo de busca
-        q_min = max(min(system_q), min(rotor_q))
-        q_max = min(max(system_q), max(rotor_q))
-        
-        print(f"DEBUG - Intervalo de busca para rotor {rotor_name}: {q_min:.2f} a {q_max:.2f}")
-        
-        # Criar uma grade densa de pontos para buscar interseções
-        q_grid = np.linspace(q_min, q_max, 1000)
-        
-        # Calcular alturas para ambas as curvas
-        h_rotor = [rotor_func(q) for q in q_grid]
-        h_system = [system_func(q) for q in q_grid]
-        
-        # Encontrar onde as curvas se cruzam (diferença próxima de zero)
-        for i in range(len(q_grid)-1):
-            diff1 = h_rotor[i] - h_system[i]
-            diff2 = h_rotor[i+1] - h_system[i+1]
-            
-            # Verificar mudança de sinal (cruzamento)
-            if diff1 * diff2 <= 0:
-                # Encontrar o ponto exato de interseção por interpolação linear
-                q1, q2 = q_grid[i], q_grid[i+1]
-                d1, d2 = diff1, diff2
-                
-                # Evitar divisão por zero
-                if abs(d1 - d2) < 1e-10:
-                    q_intersect = q1
-                else:
-                    # Interpolação linear para encontrar onde diff = 0
-                    q_intersect = q1 - d1 * (q2 - q1) / (d2 - d1)
-                
-                # Calcular altura e eficiência no ponto de interseção
-                h_intersect = float(rotor_func(q_intersect))
-                try:
-                    eff_intersect = float(eff_func(q_intersect))
-                except:
-                    eff_intersect = 0
-                  # Calcular potências no ponto de interseção
-                # Potência hidráulica: P = ρ * g * Q * h
-                vazao_m3s = q_intersect / 3600  # Converte de m³/h para m³/s
-                potencia_hidraulica = 997 * 9.81 * vazao_m3s * h_intersect  # Resultado em W
-                
-                # Potência mecânica: P_mec = P_hidraulica / (eficiência/100)
-                if eff_intersect > 0:
-                    potencia_mecanica = potencia_hidraulica / (eff_intersect / 100)
-                else:
-                    potencia_mecanica = float('inf')  # Infinito para eficiência zero
-                
-                print(f"DEBUG - Interseção encontrada para rotor {rotor_name}: Q={q_intersect:.2f}, H={h_intersect:.2f}, Eff={eff_intersect:.2f}, P_hid={potencia_hidraulica:.2f}W, P_mec={potencia_mecanica:.2f}W")
-                
-                # Adicionar à lista de interseções
-                intersections.append({
-                    'rotor': rotor_name,
-                    'vazao': q_intersect,
-                    'altura': h_intersect,
-                    'eficiencia': eff_intersect,
-                    'potencia_hidraulica': potencia_hidraulica,
-                    'potencia_mecanica': potencia_mecanica
-                })
+        systems.append((label, curve))
+
+    # Pontos de operação de todos os rotores em lote, com potência e posição em relação ao BEP
+    timer.begin("intersecoes")
+    operating = []
+    for k, (label, curve) in enumerate(systems):
+        solved = solve_operating_points(rotor_fit, curve)
+        hyd_op, shaft_op = pump_power(solved['vazao'], solved['altura'], solved['eficiencia'], density)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(bep['q_bep'] > 0, solved['vazao'] / bep['q_bep'] * 100, np.nan)
+        inside = (bep['por_min'] <= solved['vazao']) & (solved['vazao'] <= bep['por_max'])
+        found, fraction = by_rotor(solved['vazao']), by_rotor(fraction)
+        inside = by_rotor(inside.astype(float))
+        timer.count('raizes', int(np.count_nonzero(np.isfinite(found))))
+        operating.append({
+            'sistema': k,
+            'vazao': found,
+            'altura': by_rotor(solved['altura']),
+            'eficiencia': by_rotor(solved['eficiencia']),
+            'npshr': by_rotor(solved['npshr']),
+            'potencia_hidraulica': by_rotor(hyd_op),
+            'potencia_eixo': by_rotor(shaft_op),
+            'fracao_bep': fraction,
+            # Sim/Não só onde há ponto de operação e BEP
+            'dentro_por': [bool(v) if np.isfinite(q) and np.isfinite(f) else None
+                           for q, f, v in zip(found, fraction, inside)],
+        })
+
+    best = {'vazao': by_rotor(bep['q_bep']), 'altura': by_rotor(bep['h_bep']),
+            'eficiencia': by_rotor(bep['eff_bep']), 'por_min': by_rotor(bep['por_min']),
+            'por_max': by_rotor(bep['por_max'])}
+
+    report = {
+        'formato': "relatorio-curvas-bomba",
+        'versao': 1,
+        'gerado_em': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'unidades': dict(units),
+        'fluido': {'densidade': density, 'viscosidade': round(fluid['viscosidade'], 4)},
+        'ajuste': {'modelo': rotor_fit['model'], 'grau': rotor_fit['degree']},
+        'rotores': [str(rotor) for rotor in names],
+        'rotores_combinados': combined,
+        'dados': _convert_report_section(data, units),
+        'interpolados': _convert_report_section(interpolated, units),
+        'sistemas': [_convert_report_section({'nome': label, 'vazao': np.asarray(curve['Q'], dtype=float),
+                                              'altura': np.asarray(curve['H'], dtype=float)}, units)
+                     for label, curve in systems],
+        'intersecoes': [_convert_report_section(point, units) for point in operating],
+        'bep': _convert_report_section(best, units),
+    }
+
+    timer.begin("salvar")
+    as_json = os.path.splitext(filename)[1].lower() == '.json'
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            if as_json:
+                _write_json_stream(f, report)
+            else:
+                import html
+                head, tail = _HTML_REPORT_TEMPLATE.replace("{titulo}", html.escape(os.path.basename(filename))).split(_HTML_DATA_MARKER)
+                f.write(head)
+                _write_json_stream(f, report)
+                f.write(tail)
+        timer.end()  # A mensagem de sucesso aguarda o usuário e não entra na medição
+        QMessageBox.information(None, "Sucesso", f"Relatório '{filename}' gerado com sucesso!")
+    except OSError as e:
+        QMessageBox.critical(None, "Erro ao Salvar", f"Não foi possível salvar o relatório:\n{str(e)}")
+        logger.exception("Erro ao salvar o relatório HTML/JSON")
+
+
+def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", **options):
+    """
+    Gera o relatório completo medindo o tempo de cada etapa: planilha Excel ou,
+    pela extensão .html/.json, o relatório leve de _build_html_report.
     
-    return intersections
+    Com REPORT_INSTRUMENTATION ativo, grava '<planilha>_tempos.json' (e o perfil,
+    se escolhido) ao lado da planilha. As opções são as de _build_excel_report.
+    """
+    timer = ReportTimer(filename)
+    timer.start_profiler()
+    try:
+        if os.path.splitext(filename)[1].lower() in ('.html', '.json'):
+            _build_html_report(rotor_data, filename, timer=timer, **options)
+        else:
+            _build_excel_report(rotor_data, filename, timer=timer, **options)
+    finally:
+        timer.finish()
+
 
-def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curve_mode=0, 
+def _build_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curve_mode=0, 
                           manual_points=None, equation_params=None, max_rotor_q=None,
-                          system_curve_mode_2=0, manual_points_2=None, equation_params_2=None):
-    """Gera o relatório Excel completo a partir dos dados padronizados dos rotores."""
+                          system_curve_mode_2=0, manual_points_2=None, equation_params_2=None,
+                          curve_model='linear', curve_degree=3, speed_families=None, energy_series=None,
+                          tank_settings=None, uncertainty_settings=None, npsh_settings=None,
+                          motor_service_factor=MOTOR_SERVICE_FACTOR, fluid_settings=None, rotor_rpm=None,
+                          report_units=None, timer=None):
+    """Monta e salva o relatório Excel a partir dos dados padronizados dos rotores."""
+    timer = timer or ReportTimer(filename, enabled=False, profiler='')
+    from openpyxl import Workbook
+    from openpyxl.chart import ScatterChart, Reference, Series
+    import openpyxl.styles
+    import openpyxl.utils
     if not rotor_data:
         QMessageBox.warning(None, "Erro", "Nenhum dado de rotor foi fornecido para gerar o relatório!")
         return
@@ -1618,17 +8065,35 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
     # Definir rotor_names aqui, antes de usar
     rotor_names = list(rotor_data.keys())
     
+    # Fluido bombeado: massa específica das potências e correção de viscosidade das curvas
+    # de água de todos os rotores antes do ajuste e das interseções
+    try:
+        rotor_data, viscosity_factors, fluid = fluid_rotor_data(rotor_data, rotor_rpm, fluid_settings)
+    except ValueError as e:
+        QMessageBox.warning(None, "Erro", f"Fluido inválido: {str(e)}")
+        return
+    density = fluid['densidade']
+    
+    # Ajustar as curvas de todos os rotores de uma só vez (linear ou polinomial)
+    timer.begin("ajuste das curvas")
+    try:
+        rotor_fit = fit_rotor_curves(rotor_data, model=curve_model, degree=curve_degree)
+    except ValueError as e:
+        QMessageBox.warning(None, "Erro de Ajuste", f"Não foi possível ajustar as curvas: {str(e)}\nUsando interpolação linear.")
+        rotor_fit = fit_rotor_curves(rotor_data, model='linear')
+    
     # Dicionários para armazenar as funções de interpolação de cada rotor
     rotor_interp_funcs = {}
     rotor_eff_interp_funcs = {}
     
-    # Lista para armazenar pontos de máxima eficiência
-    max_efficiency_points = []
+    # Pontos de melhor eficiência (BEP) localizados nas curvas ajustadas
+    bep = find_best_efficiency_points(rotor_fit)
+    timer.count('curvas_ajustadas', len(rotor_fit['names']))
 
 
 
     # Adicionar depuração para verificar o valor recebido
-    print(f"Valor máximo de vazão recebido: {max_rotor_q}")
+    logger.debug("Valor máximo de vazão recebido: %s", max_rotor_q)
 
     # Se max_rotor_q não foi fornecido, calcular a partir dos dados
     if max_rotor_q is None:
@@ -1637,12 +8102,22 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
             for point in points:
                 if point['vazao'] > max_rotor_q:
                     max_rotor_q = point['vazao']
-        print(f"Valor máximo de vazão calculado: {max_rotor_q}")
+        logger.debug("Valor máximo de vazão calculado: %s", max_rotor_q)
+
+    # Famílias de rotação refeitas das curvas atuais dos rotores base; rotações acima da
+    # base ampliam a faixa de vazão da curva do sistema
+    speed_families = speed_family_arrays(speed_families, rotor_data, rotor_rpm, density)
+    for family in speed_families.values():
+        max_rotor_q = max(max_rotor_q, float(np.nanmax(family['vazao'])))
+    # A demanda da simulação de energia também precisa estar coberta pela curva do sistema
+    if energy_series is not None and 'vazao' in energy_series:
+        max_rotor_q = max(max_rotor_q, float(np.max(energy_series['vazao'])))
       # Aplicar o fator de 1.1 para a vazão máxima da curva do sistema
     max_system_q = max_rotor_q * 1.1
-    print(f"Vazão máxima para curva do sistema (1.1x): {max_system_q}")
+    logger.debug("Vazão máxima para curva do sistema (1.1x): %s", max_system_q)
 
     # Calcular a primeira curva do sistema com o valor ajustado
+    timer.begin("curvas do sistema")
     system_curve = None
     if system_curve_mode > 0:  # Se não for "Nenhuma"
         system_curve = _calculate_system_curve(manual_points=manual_points, 
@@ -1663,6 +8138,7 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
     if system_curve_2 is None and system_curve_mode_2 > 0:
         QMessageBox.warning(None, "Aviso", "Não foi possível calcular a segunda curva do sistema. O relatório será gerado sem ela.")
 
+    timer.begin("intersecoes")
     wb = Workbook()
     ws_data = wb.active
     ws_data.title = "Dados"
@@ -1674,23 +8150,30 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
     ws_intersections = wb.create_sheet("Interseções")
     ws_intersections.cell(row=1, column=1, value="Interseções das Curvas")
     ws_intersections.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
-    ws_intersections.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
+    ws_intersections.merge_cells(start_row=1, start_column=1, end_row=1, end_column=8)
       # Processar a primeira curva do sistema
     if system_curve:
-        print("DEBUG - Processando primeira curva do sistema")
+        logger.debug("Processando primeira curva do sistema")
         ws_intersections.cell(row=1, column=1).value = "Pontos de Interseção - Curva do Sistema 1"
         ws_intersections.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
-        ws_intersections.merge_cells(start_row=1, start_column=1, end_row=1, end_column=6)
+        ws_intersections.merge_cells(start_row=1, start_column=1, end_row=1, end_column=8)
         
         # Cabeçalhos
-        headers = ["Rotor", "Vazão (m³/h)", "Altura (m)", "Eficiência (%)", "Potência Hidráulica (W)", "Potência Mecânica (W)"]
+        headers = ["Rotor", "Vazão (m³/h)", "Altura (m)", "Eficiência (%)", "Potência Hidráulica (W)", "Potência Mecânica (W)",
+                   "Vazão / Vazão BEP (%)", "Faixa Preferencial"]
+        if npsh_settings is not None:
+            headers += ["NPSHr (m)", "NPSHa (m)", "Margem NPSH (m)", "NPSHa / NPSHr", "Margem NPSH Suficiente"]
         for col, header in enumerate(headers, 1):
             cell = ws_intersections.cell(row=2, column=col, value=header)
             cell.font = openpyxl.styles.Font(bold=True)
             cell.alignment = openpyxl.styles.Alignment(horizontal='center')
         
         # Encontrar interseções usando a nova função
-        intersections = find_intersection_points(rotor_data, system_curve)
+        intersections = find_intersection_points(rotor_data, system_curve, rotor_fit=rotor_fit, density=density)
+        _annotate_intersections_with_bep(intersections, bep)
+        if npsh_settings is not None:
+            _annotate_intersections_with_npsh(intersections, rotor_fit, npsh_settings, density)
+        timer.count('raizes', len(intersections))
           # Adicionar interseções à planilha
         current_row = 3
         for point in intersections:
@@ -1700,17 +8183,22 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
             ws_intersections.cell(row=current_row, column=4).value = point['eficiencia']
             ws_intersections.cell(row=current_row, column=5).value = point['potencia_hidraulica']
             ws_intersections.cell(row=current_row, column=6).value = point['potencia_mecanica']
+            if point['fracao_bep'] is not None:
+                ws_intersections.cell(row=current_row, column=7).value = point['fracao_bep'] * 100
+                ws_intersections.cell(row=current_row, column=8).value = "Sim" if point['dentro_por'] else "Não"
+            if npsh_settings is not None:
+                _write_npsh_columns(ws_intersections, current_row, 9, point)
             current_row += 1
-            print(f"DEBUG - Adicionado ponto de interseção na linha {current_row-1}")
+            logger.debug("Adicionado ponto de interseção na linha %s", current_row-1)
       # Processar a segunda curva do sistema
     if system_curve_2:
-        print("DEBUG - Processando segunda curva do sistema")
+        logger.debug("Processando segunda curva do sistema")
         # Adicionar espaço entre as tabelas
         current_row += 2
         
         ws_intersections.cell(row=current_row, column=1).value = "Pontos de Interseção - Curva do Sistema 2"
         ws_intersections.cell(row=current_row, column=1).font = openpyxl.styles.Font(bold=True)
-        ws_intersections.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=6)
+        ws_intersections.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=8)
         current_row += 1
         
         # Cabeçalhos
@@ -1721,7 +8209,11 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
         current_row += 1
         
         # Encontrar interseções usando a nova função
-        intersections = find_intersection_points(rotor_data, system_curve_2)
+        intersections = find_intersection_points(rotor_data, system_curve_2, rotor_fit=rotor_fit, density=density)
+        _annotate_intersections_with_bep(intersections, bep)
+        if npsh_settings is not None:
+            _annotate_intersections_with_npsh(intersections, rotor_fit, npsh_settings, density)
+        timer.count('raizes', len(intersections))
           # Adicionar interseções à planilha
         for point in intersections:
             ws_intersections.cell(row=current_row, column=1).value = f"Rotor {point['rotor']}"
@@ -1730,12 +8222,18 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
             ws_intersections.cell(row=current_row, column=4).value = point['eficiencia']
             ws_intersections.cell(row=current_row, column=5).value = point['potencia_hidraulica']
             ws_intersections.cell(row=current_row, column=6).value = point['potencia_mecanica']
+            if point['fracao_bep'] is not None:
+                ws_intersections.cell(row=current_row, column=7).value = point['fracao_bep'] * 100
+                ws_intersections.cell(row=current_row, column=8).value = "Sim" if point['dentro_por'] else "Não"
+            if npsh_settings is not None:
+                _write_npsh_columns(ws_intersections, current_row, 9, point)
             current_row += 1
-            print(f"DEBUG - Adicionado ponto de interseção na linha {current_row-1}")
+            logger.debug("Adicionado ponto de interseção na linha %s", current_row-1)
 
+    timer.begin("dados e interpolados")
     for rotor, points in rotor_data.items():
         if not points:
-            print(f"Aviso: Rotor '{rotor}' não possui pontos de dados.")
+            logger.warning("Rotor '%s' não possui pontos de dados.", rotor)
             continue # Pula rotores sem pontos        # --- Escreve na planilha "Dados" ---
         ws_data.merge_cells(start_row=current_row_data, start_column=1, end_row=current_row_data, end_column=5)
         header_cell_data = ws_data.cell(row=current_row_data, column=1, value=f"Rotor {rotor}")
@@ -1750,58 +8248,20 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
             cell.alignment = openpyxl.styles.Alignment(horizontal='center')
         current_row_data += 1
 
-        x_values = []
-        y_values = []
-        efficiencies = []
-        
-        # Encontra ponto de máxima eficiência para a curva do sistema (somente para rotores normais)
-        if points:
-            # Verificar se é um rotor combinado (eficiência como string)
-            first_point_eff = points[0]['efficiency']
-            if isinstance(first_point_eff, str) and ":" in first_point_eff:
-                # Rotor combinado - não calcular máxima eficiência
-                print(f"Debug: Rotor combinado '{rotor}' - pulando cálculo de máxima eficiência")
-            else:
-                # Rotor normal - encontrar máxima eficiência
-                try:
-                    max_eff_point_data = max(points, key=lambda p: p['efficiency'] if isinstance(p['efficiency'], (int, float)) else 0)
-                    max_efficiency_points.append((max_eff_point_data['vazao'], max_eff_point_data['altura']))
-                except Exception as e:
-                    print(f"Aviso: Erro ao calcular máxima eficiência para rotor '{rotor}': {e}")
-
-        for point in points:
-            vazao = point['vazao']
-            altura = point['altura']
-            efficiency = point['efficiency']
-            
-            # Calcular a potência hidráulica: P = ρ * g * Q * h
-            # ρ = 997 kg/m³, g = 9.81 m/s², Q em m³/s (vazao/3600), h em m (altura)
-            vazao_m3s = vazao / 3600  # Converte de m³/h para m³/s
-            potencia_hidraulica = 997 * 9.81 * vazao_m3s * altura  # Resultado em W
-            
-            # Calcular a potência mecânica
-            # Para rotores combinados (eficiência como string), usar placeholder
-            if isinstance(efficiency, str) and ":" in efficiency:
-                # Rotor combinado - não calcular potência mecânica
-                potencia_mecanica = 0  # Placeholder para rotores combinados
-                print(f"Debug: Rotor combinado '{rotor}' - potência mecânica definida como 0 (placeholder)")
-            else:
-                # Rotor normal - calcular potência mecânica
-                # Garantir que efficiency é numérico antes da comparação
-                if isinstance(efficiency, (int, float)) and efficiency > 0:
-                    potencia_mecanica = potencia_hidraulica / (efficiency / 100)
-                else:
-                    potencia_mecanica = float('inf')  # Infinito para eficiência zero ou inválida
-            
-            x_values.append(vazao)
-            y_values.append(altura)
-            efficiencies.append(efficiency)
-
+        x_values = [point['vazao'] for point in points]
+        y_values = [point['altura'] for point in points]
+        efficiencies = [point['efficiency'] for point in points]
+        
+        # Potências de todos os pontos do rotor em lote; rotores combinados usam a
+        # eficiência equivalente do conjunto em paralelo
+        hydraulic, shaft = pump_power(x_values, y_values, _numeric_efficiencies(efficiencies), density)
+        for k, (vazao, altura, efficiency) in enumerate(zip(x_values, y_values, efficiencies)):
             ws_data.cell(row=current_row_data, column=1).value = vazao
             ws_data.cell(row=current_row_data, column=2).value = altura
             ws_data.cell(row=current_row_data, column=3).value = efficiency
-            ws_data.cell(row=current_row_data, column=4).value = potencia_hidraulica
-            ws_data.cell(row=current_row_data, column=5).value = potencia_mecanica
+            ws_data.cell(row=current_row_data, column=4).value = float(hydraulic[k])
+            if not np.isnan(shaft[k]):
+                ws_data.cell(row=current_row_data, column=5).value = float(shaft[k])
             current_row_data += 1
 
         current_row_data += 2 # Espaço entre rotores na planilha Dados
@@ -1814,28 +8274,31 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
             
             if is_combined_rotor:
                 # Para rotores combinados, escrever dados originais sem interpolação
-                print(f"Debug: Rotor combinado '{rotor}' - escrevendo dados originais sem interpolação")
+                logger.debug("Rotor combinado '%s' - escrevendo dados originais sem interpolação", rotor)
                 
                 # Escrever cabeçalho na planilha "Interpolados"
-                ws_interp.merge_cells(start_row=current_row_interp, start_column=1, end_row=current_row_interp, end_column=3)
+                ws_interp.merge_cells(start_row=current_row_interp, start_column=1, end_row=current_row_interp, end_column=5)
                 header_cell_interp = ws_interp.cell(row=current_row_interp, column=1, value=f"Rotor {rotor}")
                 header_cell_interp.alignment = openpyxl.styles.Alignment(horizontal='center', vertical='center')
                 header_cell_interp.font = openpyxl.styles.Font(bold=True)
                 current_row_interp += 1
 
-                headers = ["Vazão (m³/h)", "Altura (m)", "Eficiência (%)"]
+                headers = ["Vazão (m³/h)", "Altura (m)", "Eficiência (%)", "Potência Hidráulica (W)", "Potência Mecânica (W)"]
                 for col, header in enumerate(headers, 1):
                     cell = ws_interp.cell(row=current_row_interp, column=col, value=header)
                     cell.font = openpyxl.styles.Font(bold=True)
                     cell.alignment = openpyxl.styles.Alignment(horizontal='center')
                 current_row_interp += 1
 
-                # Escrever dados originais ordenados por vazão
+                # Escrever dados originais ordenados por vazão, com a potência do conjunto
                 sorted_indices = np.argsort(x_values)
                 for idx in sorted_indices:
                     ws_interp.cell(row=current_row_interp, column=1).value = x_values[idx]
                     ws_interp.cell(row=current_row_interp, column=2).value = y_values[idx]
                     ws_interp.cell(row=current_row_interp, column=3).value = efficiencies[idx]
+                    ws_interp.cell(row=current_row_interp, column=4).value = float(hydraulic[idx])
+                    if not np.isnan(shaft[idx]):
+                        ws_interp.cell(row=current_row_interp, column=5).value = float(shaft[idx])
                     current_row_interp += 1
 
                 current_row_interp += 2  # Espaço entre rotores
@@ -1844,7 +8307,7 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
                 # Verificar se todas as eficiências são numéricas antes de proceder
                 numeric_efficiencies = all(isinstance(eff, (int, float)) for eff in efficiencies)
                 if not numeric_efficiencies:
-                    print(f"Aviso: Rotor '{rotor}' contém eficiências não numéricas. Tratando como rotor combinado.")
+                    logger.warning("Rotor '%s' contém eficiências não numéricas. Tratando como rotor combinado.", rotor)
                     # Escrever cabeçalho na planilha "Interpolados"
                     ws_interp.merge_cells(start_row=current_row_interp, start_column=1, end_row=current_row_interp, end_column=3)
                     header_cell_interp = ws_interp.cell(row=current_row_interp, column=1, value=f"Rotor {rotor}")
@@ -1889,35 +8352,25 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
 
                 # Handle duplicates if found
                 if len(unique_x) < len(x_sorted):
-                     print(f"Aviso: Pontos com mesma vazão encontrados para o rotor '{rotor}'. Usando apenas o primeiro ponto para interpolação.")
+                     logger.warning("Pontos com mesma vazão encontrados para o rotor '%s'. Usando apenas o primeiro ponto para interpolação.", rotor)
                      x_unique = x_sorted[unique_indices]
                      y_unique = y_sorted[unique_indices]
                      eff_unique = eff_sorted[unique_indices]
 
                 # Now check minimum points requirement for ALL cases
                 if len(x_unique) < 2:
-                     print(f"Erro: Não há pontos suficientes com vazão única para interpolar o rotor '{rotor}'.")
+                     logger.error("Não há pontos suficientes com vazão única para interpolar o rotor '%s'.", rotor)
                      continue # Pula a interpolação para este rotor
 
-                # Escolhe o tipo de interpolação (linear pode ser mais robusto)
-                interp_kind = 'linear' # Ou 'quadratic'
-                if len(x_unique) < 3 and interp_kind == 'quadratic':
-                     print(f"Aviso: Menos de 3 pontos únicos para rotor '{rotor}', usando interpolação linear.")
-                     interp_kind = 'linear'
-
                 try:
-                     f_vazao = interp1d(x_unique, y_unique, kind=interp_kind, fill_value="extrapolate")
-                     f_eficiencia = interp1d(x_unique, eff_unique, kind=interp_kind, fill_value="extrapolate")
+                     # Curvas ajustadas na etapa vetorizada (linear ou polinomial)
+                     f_vazao = FittedCurve(rotor_fit, rotor)
+                     f_eficiencia = FittedCurve(rotor_fit, rotor, 'efficiency')
                      
                      # Armazenar as funções de interpolação para uso posterior
                      rotor_interp_funcs[rotor] = f_vazao
                      rotor_eff_interp_funcs[rotor] = f_eficiencia
-                     
-                     # Verificar se as funções têm o atributo 'x' (domínio)
-                     if not hasattr(f_vazao, 'x'):
-                         f_vazao.x = x_unique
-                     if not hasattr(f_eficiencia, 'x'):
-                         f_eficiencia.x = x_unique
+                     timer.count('interpolantes', 2)
 
                      # Escreve cabeçalho do rotor na planilha Interpolados
                      ws_interp.merge_cells(start_row=current_row_interp, start_column=1, end_row=current_row_interp, end_column=5)
@@ -1939,7 +8392,7 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
                      
                      # CORREÇÃO: Não usar vazão máxima global - cada rotor tem seu próprio intervalo
                      # O intervalo de interpolação deve respeitar os dados reais do rotor específico
-                     print(f"Intervalo de interpolação para Rotor {rotor}: [{x_min:.2f}, {x_max:.2f}] m³/h")
+                     logger.debug("Intervalo de interpolação para Rotor %s: [%.2f, %.2f] m³/h", rotor, x_min, x_max)
                      
                      # Gerar pontos interpolados respeitando o domínio específico do rotor
                      x_new = np.linspace(x_min, x_max, 100)
@@ -1951,36 +8404,29 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
                      # Limita altura a >= 0
                      y_new = np.maximum(y_new, 0)
 
-                     for x, y, eff in zip(x_new, y_new, eff_new):
-                         # Calcular potência hidráulica: P = ρ * g * Q * h
-                         # ρ = 997 kg/m³, g = 9.81 m/s², Q em m³/s (x/3600), h em m (y)
-                         vazao_m3s = x / 3600  # Converte de m³/h para m³/s
-                         potencia_hidraulica = 997 * 9.81 * vazao_m3s * y  # Resultado em W
-                         
-                         # Calcular potência mecânica: P_mec = P_hidraulica / (eficiência/100)
-                         if eff > 0:
-                             potencia_mecanica = potencia_hidraulica / (eff / 100)
-                         else:
-                             potencia_mecanica = float('inf')  # Infinito para eficiência zero
-                         
+                     # Potências hidráulica e mecânica da curva inteira em lote
+                     p_hyd_new, p_shaft_new = pump_power(x_new, y_new, eff_new, density)
+                     for x, y, eff, p_hyd, p_shaft in zip(x_new, y_new, eff_new, p_hyd_new, p_shaft_new):
                          ws_interp.cell(row=current_row_interp, column=1).value = x
                          ws_interp.cell(row=current_row_interp, column=2).value = y
                          ws_interp.cell(row=current_row_interp, column=3).value = eff
-                         ws_interp.cell(row=current_row_interp, column=4).value = potencia_hidraulica
-                         ws_interp.cell(row=current_row_interp, column=5).value = potencia_mecanica
+                         ws_interp.cell(row=current_row_interp, column=4).value = p_hyd
+                         if not np.isnan(p_shaft):
+                             ws_interp.cell(row=current_row_interp, column=5).value = p_shaft
                          current_row_interp += 1
 
                      current_row_interp += 2 # Espaço entre rotores
 
-                except ValueError as ve:
-                     print(f"Erro de interpolação para o rotor '{rotor}': {ve}. Verifique os dados de entrada.")
+                except (KeyError, ValueError) as ve:
+                     logger.error("Erro de interpolação para o rotor '%s': %s. Verifique os dados de entrada.", rotor, ve)
                      continue # Pula para o próximo rotor
 
         else:
-             print(f"Aviso: Rotor '{rotor}' tem menos de 2 pontos, interpolação não realizada.")
+             logger.warning("Rotor '%s' tem menos de 2 pontos, interpolação não realizada.", rotor)
 
 
     # --- Calcula e escreve as Curvas do Sistema ---
+    timer.begin("planilha curva do sistema")
     ws_system = None
     if system_curve or system_curve_2:
         ws_system = wb.create_sheet("Curva do Sistema")
@@ -2021,13 +8467,403 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
                 ws_system.cell(row=i, column=current_col).value = q
                 ws_system.cell(row=i, column=current_col+1).value = h
     else:
-         print("Curva do sistema não calculada ou inválida.")
+         logger.warning("Curva do sistema não calculada ou inválida.")
+
+
+    # --- Pontos de melhor eficiência (BEP) e faixa de operação preferencial ---
+    timer.begin("planilha BEP")
+    ws_bep = None
+    if bep['names']:
+        ws_bep = wb.create_sheet("BEP")
+        ws_bep.cell(row=1, column=1).value = "Ponto de Melhor Eficiência (BEP) e Faixa de Operação Preferencial"
+        ws_bep.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_bep.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
+
+        por_low, por_high = PREFERRED_OPERATING_REGION
+        headers = ["Rotor", "Vazão BEP (m³/h)", "Altura BEP (m)", "Eficiência BEP (%)",
+                   f"Vazão Mínima POR ({por_low:.0%}) (m³/h)", f"Vazão Máxima POR ({por_high:.0%}) (m³/h)",
+                   "Observação"]
+        for col, header in enumerate(headers, 1):
+            cell = ws_bep.cell(row=2, column=col, value=header)
+            cell.font = openpyxl.styles.Font(bold=True)
+            cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+
+        for i, rotor in enumerate(bep['names']):
+            row = i + 3
+            ws_bep.cell(row=row, column=1).value = f"Rotor {rotor}"
+            ws_bep.cell(row=row, column=2).value = float(bep['q_bep'][i])
+            ws_bep.cell(row=row, column=3).value = float(bep['h_bep'][i])
+            ws_bep.cell(row=row, column=4).value = float(bep['eff_bep'][i])
+            ws_bep.cell(row=row, column=5).value = float(bep['por_min'][i])
+            ws_bep.cell(row=row, column=6).value = float(bep['por_max'][i])
+            if bep['at_boundary'][i]:
+                ws_bep.cell(row=row, column=7).value = "Máximo no limite dos dados"
+
+    # --- Fluido bombeado e fatores de correção de viscosidade ---
+    timer.begin("fluido")
+    ws_fluid = None
+    if fluid_settings:
+        settings = {**FLUID_DEFAULTS, **fluid_settings}
+        ws_fluid = wb.create_sheet("Fluido")
+        ws_fluid.cell(row=1, column=1).value = f"Fluido Bombeado - {settings['fluido']}"
+        ws_fluid.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_fluid.merge_cells(start_row=1, start_column=1, end_row=1, end_column=5)
+        rows = [("Temperatura (°C)", settings['temperatura']),
+                ("Massa específica (kg/m³)", density),
+                ("Viscosidade cinemática (cSt)", fluid['viscosidade']),
+                ("Correção de viscosidade (ANSI/HI 9.6.7)", "Sim" if settings['correcao_viscosidade'] else "Não")]
+        for row, (label, value) in enumerate(rows, 2):
+            ws_fluid.cell(row=row, column=1).value = label
+            ws_fluid.cell(row=row, column=2).value = value
+
+        if viscosity_factors:
+            headers = ["Rotor", "Parâmetro B", "C_Q", "C_H no BEP", "C_η"]
+            for col, header in enumerate(headers, 1):
+                cell = ws_fluid.cell(row=7, column=col, value=header)
+                cell.font = openpyxl.styles.Font(bold=True)
+                cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+            for row, (rotor, (b, c_q, c_eta)) in enumerate(viscosity_factors.items(), 8):
+                ws_fluid.cell(row=row, column=1).value = f"Rotor {rotor}"
+                ws_fluid.cell(row=row, column=2).value = b
+                ws_fluid.cell(row=row, column=3).value = c_q
+                ws_fluid.cell(row=row, column=4).value = c_q
+                ws_fluid.cell(row=row, column=5).value = c_eta
+                if b <= VISCOSITY_B_MIN:
+                    ws_fluid.cell(row=row, column=6).value = "Sem correção (B <= 1)"
+
+    # --- Curvas de potência e dimensionamento do motor em toda a faixa de vazão ---
+    timer.begin("potencia e motor")
+    ws_power = None
+    if rotor_fit['names']:
+        power = compute_power_curves(rotor_fit, service_factor=motor_service_factor, density=density)
+        ws_power = wb.create_sheet("Potência e Motor")
+        ws_power.cell(row=1, column=1).value = (
+            f"Potência e Dimensionamento do Motor (IEC) - fator de serviço {motor_service_factor:.2f}")
+        ws_power.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_power.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
+
+        headers = ["Rotor", "Potência Máxima no Eixo (kW)", "Vazão na Potência Máxima (m³/h)",
+                   "Motor Nominal (kW)", "Carga Máxima (%)", "Rendimento do Motor na Carga Máxima (%)",
+                   "Observação"]
+        for col, header in enumerate(headers, 1):
+            cell = ws_power.cell(row=2, column=col, value=header)
+            cell.font = openpyxl.styles.Font(bold=True)
+            cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+        for i, rotor in enumerate(power['names']):
+            row = i + 3
+            ws_power.cell(row=row, column=1).value = f"Rotor {rotor}"
+            if np.isnan(power['pico'][i]):
+                ws_power.cell(row=row, column=7).value = "Sem eficiência válida"
+                continue
+            ws_power.cell(row=row, column=2).value = float(power['pico'][i]) / 1000
+            ws_power.cell(row=row, column=3).value = float(power['vazao_pico'][i])
+            if np.isnan(power['motor_kw'][i]):
+                ws_power.cell(row=row, column=7).value = "Acima do maior motor padronizado"
+                continue
+            ws_power.cell(row=row, column=4).value = float(power['motor_kw'][i])
+            ws_power.cell(row=row, column=5).value = float(power['carga_max'][i]) * 100
+            ws_power.cell(row=row, column=6).value = float(power['rendimento_motor'][i])
+            if power['carga_max'][i] > 1:
+                ws_power.cell(row=row, column=7).value = "Usa o fator de serviço no fim da curva"
+
+        # Curvas de potência lado a lado: vazão, hidráulica, eixo e entrada do motor de cada rotor
+        header_row = len(power['names']) + 5
+        ws_power.cell(row=header_row - 1, column=1).value = "Curvas de Potência"
+        ws_power.cell(row=header_row - 1, column=1).font = openpyxl.styles.Font(bold=True)
+        last_row = header_row + POWER_CURVE_POINTS
+        power_chart = ScatterChart()
+        power_chart.title = "Curva de Potência"
+        power_chart.x_axis.title = "Vazão (m³/h)"
+        power_chart.y_axis.title = "Potência (kW)"
+        power_chart.x_axis.delete = False
+        power_chart.y_axis.delete = False
+        power_chart.width = 16
+        power_chart.height = 10
+        for i, rotor in enumerate(power['names']):
+            col = 4 * i + 1
+            for offset, header in enumerate(["Vazão (m³/h)", f"Hidráulica {rotor} (kW)", f"Eixo {rotor} (kW)",
+                                             f"Entrada do Motor {rotor} (kW)"]):
+                ws_power.cell(row=header_row, column=col + offset).value = header
+                ws_power.cell(row=header_row, column=col + offset).font = openpyxl.styles.Font(bold=True)
+            for k in range(POWER_CURVE_POINTS):
+                row = header_row + 1 + k
+                ws_power.cell(row=row, column=col).value = float(power['vazao'][i, k])
+                for offset, key in enumerate(('hidraulica', 'eixo', 'motor'), 1):
+                    value = power[key][i, k]
+                    if not np.isnan(value):
+                        ws_power.cell(row=row, column=col + offset).value = float(value) / 1000
+            x_ref = Reference(ws_power, min_col=col, min_row=header_row + 1, max_row=last_row)
+            shaft_series = Series(Reference(ws_power, min_col=col + 2, min_row=header_row, max_row=last_row),
+                                  x_ref, title_from_data=True)
+            motor_series = Series(Reference(ws_power, min_col=col + 3, min_row=header_row, max_row=last_row),
+                                  x_ref, title_from_data=True)
+            motor_series.graphicalProperties.line.dashStyle = "dash"
+            power_chart.series.extend([shaft_series, motor_series])
+        chart_col = openpyxl.utils.get_column_letter(max(4 * len(power['names']), 7) + 2)
+        ws_power.add_chart(power_chart, f"{chart_col}2")
+        timer.count('curvas_potencia', len(power['names']))
+
+    # --- Famílias de rotação: pontos de operação de todas as rotações em lote ---
+    timer.begin("familias de rotacao")
+    ws_family = None
+    active_curves = [(label, curve) for label, curve in (("Curva 1", system_curve), ("Curva 2", system_curve_2)) if curve]
+    if speed_families:
+        ws_family = wb.create_sheet("Famílias de Rotação")
+        family_row = 1
+        for family_name, family in speed_families.items():
+            ws_family.cell(row=family_row, column=1).value = f"Família {family_name} (RPM base {family['base_rpm']:.0f})"
+            ws_family.cell(row=family_row, column=1).font = openpyxl.styles.Font(bold=True)
+            family_row += 1
+
+            headers = ["RPM", "Razão de Rotação", "Vazão Máx. (m³/h)", "Altura Máx. (m)"]
+            for label, _ in active_curves:
+                headers += [f"Vazão {label} (m³/h)", f"Altura {label} (m)", f"Eficiência {label} (%)",
+                            f"Potência Mecânica {label} (W)"]
+            for col, header in enumerate(headers, 1):
+                cell = ws_family.cell(row=family_row, column=col, value=header)
+                cell.font = openpyxl.styles.Font(bold=True)
+                cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+            family_row += 1
+
+            family_fit = fit_speed_family(family_name, family, model=rotor_fit['model'], degree=curve_degree)
+            operating = [solve_operating_points(family_fit, curve) for _, curve in active_curves]
+            timer.count('curvas_ajustadas', len(family_fit['names']))
+            timer.count('raizes', sum(int(np.count_nonzero(~np.isnan(op['vazao']))) for op in operating))
+
+            for k, rpm in enumerate(family['rpms']):
+                ws_family.cell(row=family_row, column=1).value = float(rpm)
+                ws_family.cell(row=family_row, column=2).value = float(family['ratios'][k])
+                ws_family.cell(row=family_row, column=3).value = float(np.nanmax(family['vazao'][k]))
+                ws_family.cell(row=family_row, column=4).value = float(np.nanmax(family['altura'][k]))
+                col = 5
+                for op in operating:
+                    q_op, h_op, eff_op = op['vazao'][k], op['altura'][k], op['eficiencia'][k]
+                    if not np.isnan(q_op):
+                        ws_family.cell(row=family_row, column=col).value = float(q_op)
+                        ws_family.cell(row=family_row, column=col + 1).value = float(h_op)
+                        ws_family.cell(row=family_row, column=col + 2).value = float(eff_op)
+                        # Potência da própria família (P·r³) interpolada na vazão de operação
+                        power = np.interp(q_op, family['vazao'][k], family['potencia_mecanica'][k])
+                        if not np.isnan(power):
+                            ws_family.cell(row=family_row, column=col + 3).value = float(power)
+                    col += 4
+                family_row += 1
+
+            family_row += 2  # Espaço entre famílias
+
+    # --- Simulação de energia sobre a série temporal de operação ---
+    timer.begin("simulacao de energia")
+    ws_energy = None
+    if energy_series is not None and active_curves and rotor_fit['names']:
+        ws_energy = wb.create_sheet("Simulação de Energia")
+        ws_energy.cell(row=1, column=1).value = (
+            f"Simulação de Energia - {len(energy_series['horas'])} passos, "
+            f"{energy_series['horas'].sum():.0f} h, tarifa R$ {energy_series['tarifa']:.4f}/kWh")
+        ws_energy.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_energy.merge_cells(start_row=1, start_column=1, end_row=1, end_column=8)
+        energy_row = 3
+        for label, curve in active_curves:
+            simulation = simulate_energy(rotor_fit, curve, energy_series, tarifa=energy_series['tarifa'],
+                                         density=density)
+            timer.count('passos_simulados', simulation['potencia'].size)
+            ws_energy.cell(row=energy_row, column=1).value = f"Totais - {label}"
+            ws_energy.cell(row=energy_row, column=1).font = openpyxl.styles.Font(bold=True)
+            energy_row += 1
+
+            headers = ["Rotor", "Energia (kWh)", "Custo (R$)", "Volume (m³)", "Energia Específica (kWh/m³)",
+                       "Eficiência Média (%)", "Potência Máxima (W)", "Horas Não Atendidas"]
+            for col, header in enumerate(headers, 1):
+                cell = ws_energy.cell(row=energy_row, column=col, value=header)
+                cell.font = openpyxl.styles.Font(bold=True)
+                cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+            energy_row += 1
+            for i, rotor in enumerate(simulation['names']):
+                ws_energy.cell(row=energy_row, column=1).value = f"Rotor {rotor}"
+                for col, key in enumerate(('energia_total', 'custo', 'volume', 'energia_especifica',
+                                           'eficiencia_media', 'potencia_maxima', 'horas_nao_atendidas'), 2):
+                    value = float(simulation[key][i])
+                    if not np.isnan(value):
+                        ws_energy.cell(row=energy_row, column=col).value = value
+                energy_row += 1
+            energy_row += 1
+
+            # Curva de duração de carga: potência excedida em cada porcentagem do tempo
+            percent, duration = load_duration_curve(simulation['potencia'], simulation['horas'])
+            ws_energy.cell(row=energy_row, column=1).value = f"Curva de Duração de Carga - {label}"
+            ws_energy.cell(row=energy_row, column=1).font = openpyxl.styles.Font(bold=True)
+            energy_row += 1
+            header_row = energy_row
+            ws_energy.cell(row=header_row, column=1).value = "Tempo (%)"
+            for i, rotor in enumerate(simulation['names']):
+                ws_energy.cell(row=header_row, column=i + 2).value = f"Potência {rotor} (W)"
+            for col in range(1, len(simulation['names']) + 2):
+                ws_energy.cell(row=header_row, column=col).font = openpyxl.styles.Font(bold=True)
+            for k, p in enumerate(percent):
+                ws_energy.cell(row=header_row + 1 + k, column=1).value = float(p)
+                for i in range(len(simulation['names'])):
+                    ws_energy.cell(row=header_row + 1 + k, column=i + 2).value = float(duration[i, k])
+            last_row = header_row + len(percent)
+
+            chart = ScatterChart()
+            chart.title = f"Curva de Duração de Carga - {label}"
+            chart.x_axis.title = "Tempo (%)"
+            chart.y_axis.title = "Potência no Eixo (W)"
+            chart.x_axis.delete = False
+            chart.y_axis.delete = False
+            chart.width = 16
+            chart.height = 10
+            x_ref = Reference(ws_energy, min_col=1, min_row=header_row + 1, max_row=last_row)
+            for i in range(len(simulation['names'])):
+                y_ref = Reference(ws_energy, min_col=i + 2, min_row=header_row, max_row=last_row)
+                chart.series.append(Series(y_ref, x_ref, title_from_data=True))
+            ws_energy.add_chart(chart, f"{openpyxl.utils.get_column_letter(len(simulation['names']) + 3)}{header_row}")
+            energy_row = last_row + 3
+
+    # --- Simulação de período estendido do reservatório com controle liga/desliga ---
+    timer.begin("simulacao do reservatorio")
+    ws_tank = None
+    if tank_settings is not None and active_curves and rotor_fit['names']:
+        ws_tank = wb.create_sheet("Simulação do Reservatório")
+        tank = {**TANK_DEFAULTS, **tank_settings['tanque']}
+        ws_tank.cell(row=1, column=1).value = "Simulação do Reservatório com Controle Liga/Desliga por Nível"
+        ws_tank.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_tank.merge_cells(start_row=1, start_column=1, end_row=1, end_column=10)
+        tank_row = 2
+        for key, label in TANK_FIELDS:
+            if key == 'demanda' and tank_settings['demanda'] is not None:
+                ws_tank.cell(row=tank_row, column=1).value = "Padrão de demanda"
+                ws_tank.cell(row=tank_row, column=2).value = os.path.basename(tank_settings['demanda']['arquivo'])
+            else:
+                ws_tank.cell(row=tank_row, column=1).value = label
+                ws_tank.cell(row=tank_row, column=2).value = float(tank[key])
+            tank_row += 1
+        tank_row += 1
+
+        headers = ["Rotor", "Partidas", "Máx. Partidas/Hora", "Horas Ligada", "Energia (kWh)", "Custo (R$)",
+                   "Volume Bombeado (m³)", "Déficit (m³)", "Horas sem Vazão", "Nível Mín. (m)", "Nível Máx. (m)"]
+        for label, curve in active_curves:
+            simulation = simulate_tank(rotor_fit, curve, tank, tank_settings['demanda'],
+                                       tarifa=tank_settings['tarifa'], density=density)
+            timer.count('passos_simulados', simulation['nivel'].size)
+            ws_tank.cell(row=tank_row, column=1).value = (
+                f"{label} - {simulation['passos']} passos, demanda total {simulation['demanda_total']:.0f} m³")
+            ws_tank.cell(row=tank_row, column=1).font = openpyxl.styles.Font(bold=True)
+            tank_row += 1
+            for col, header in enumerate(headers, 1):
+                cell = ws_tank.cell(row=tank_row, column=col, value=header)
+                cell.font = openpyxl.styles.Font(bold=True)
+                cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+            tank_row += 1
+            for i, rotor in enumerate(simulation['names']):
+                ws_tank.cell(row=tank_row, column=1).value = f"Rotor {rotor}"
+                for col, key in enumerate(('partidas', 'partidas_hora_max', 'horas_ligada', 'energia', 'custo',
+                                           'volume_bombeado', 'deficit', 'horas_sem_vazao',
+                                           'nivel_minimo', 'nivel_maximo'), 2):
+                    ws_tank.cell(row=tank_row, column=col).value = float(simulation[key][i])
+                tank_row += 1
+            tank_row += 2
+
+    # --- Análise de incerteza dos pontos de operação (Monte Carlo) ---
+    timer.begin("analise de incerteza")
+    ws_uncertainty = None
+    if uncertainty_settings is not None and active_curves and rotor_fit['names']:
+        ws_uncertainty = wb.create_sheet("Incerteza")
+        settings = {**UNCERTAINTY_DEFAULTS, **uncertainty_settings}
+        distribution = dict((key, label) for label, key in UNCERTAINTY_DISTRIBUTIONS)[settings['distribuicao']]
+        ws_uncertainty.cell(row=1, column=1).value = (
+            f"Análise de Incerteza (Monte Carlo) - {settings['amostras']} amostras, "
+            f"distribuição {distribution.lower()}, semente {settings['semente']}")
+        ws_uncertainty.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_uncertainty.merge_cells(start_row=1, start_column=1, end_row=1, end_column=9)
+        uncertainty_row = 2
+        for key, label in UNCERTAINTY_FIELDS[2:]:
+            ws_uncertainty.cell(row=uncertainty_row, column=1).value = label
+            ws_uncertainty.cell(row=uncertainty_row, column=2).value = float(settings[key])
+            uncertainty_row += 1
+        uncertainty_row += 1
+
+        headers = (["Rotor", "Grandeza", "Nominal"] + [f"P{p}" for p in UNCERTAINTY_PERCENTILES]
+                   + ["Amostras com Interseção (%)"])
+        for label, curve in active_curves:
+            analysis = run_uncertainty_analysis(rotor_data, curve, settings, rotor_fit['model'], curve_degree,
+                                                density=density)
+            timer.count('amostras', analysis['amostras'] * len(analysis['names']))
+            ws_uncertainty.cell(row=uncertainty_row, column=1).value = f"Faixas de Percentis - {label}"
+            ws_uncertainty.cell(row=uncertainty_row, column=1).font = openpyxl.styles.Font(bold=True)
+            uncertainty_row += 1
+            for col, header in enumerate(headers, 1):
+                cell = ws_uncertainty.cell(row=uncertainty_row, column=col, value=header)
+                cell.font = openpyxl.styles.Font(bold=True)
+                cell.alignment = openpyxl.styles.Alignment(horizontal='center')
+            uncertainty_row += 1
+            for i, rotor in enumerate(analysis['names']):
+                for key, quantity in UNCERTAINTY_QUANTITIES:
+                    ws_uncertainty.cell(row=uncertainty_row, column=1).value = f"Rotor {rotor}"
+                    ws_uncertainty.cell(row=uncertainty_row, column=2).value = quantity
+                    values = [analysis['nominal'][key][i]] + list(analysis['faixas'][key][:, i])
+                    for col, value in enumerate(values, 3):
+                        if not np.isnan(value):
+                            ws_uncertainty.cell(row=uncertainty_row, column=col).value = float(value)
+                    ws_uncertainty.cell(row=uncertainty_row, column=len(headers)).value = float(
+                        100 * analysis['taxa_intersecao'][i])
+                    uncertainty_row += 1
+            uncertainty_row += 2
+
+    # --- Resíduos do ajuste das curvas ---
+    timer.begin("residuos do ajuste")
+    ws_fit = None
+    if rotor_fit['model'] != 'linear' and rotor_fit['names']:
+        ws_fit = wb.create_sheet("Ajuste das Curvas")
+        if rotor_fit['model'] == 'poly':
+            fit_title = f"Ajuste Polinomial (grau {rotor_fit['degree']}) por Mínimos Quadrados"
+        else:
+            fit_title = "Ajuste Monótono (Altura Decrescente, Eficiência Unimodal)"
+        ws_fit.cell(row=1, column=1).value = fit_title
+        ws_fit.cell(row=1, column=1).font = openpyxl.styles.Font(bold=True)
+        ws_fit.merge_cells(start_row=1, start_column=1, end_row=1, end_column=7)
+
+        headers = ["Rotor", "RMSE Altura (m)", "Resíduo Máx. Altura (m)", "RMSE Eficiência (%)",
+                   "Resíduo Máx. Eficiência (%)", "Equação H(Q)", "Equação η(Q)"]
+        for col, header in enumerate(headers, 1):
+            cell = ws_fit.cell(row=2, column=col, value=header)
+            cell.font = openpyxl.styles.Font(bold=True)
+            cell.alignment = openpyxl.styles.Alignment(horizontal='center')
 
+        for i, rotor in enumerate(rotor_fit['names']):
+            row = i + 3
+            ws_fit.cell(row=row, column=1).value = f"Rotor {rotor}"
+            ws_fit.cell(row=row, column=2).value = float(rotor_fit['head_rmse'][i])
+            ws_fit.cell(row=row, column=3).value = float(rotor_fit['head_max_residual'][i])
+            ws_fit.cell(row=row, column=4).value = float(rotor_fit['eff_rmse'][i])
+            ws_fit.cell(row=row, column=5).value = float(rotor_fit['eff_max_residual'][i])
+            if rotor_fit['model'] == 'poly':
+                ws_fit.cell(row=row, column=6).value = _format_polynomial(polynomial_coefficients(rotor_fit, rotor, 'head'), "H")
+                ws_fit.cell(row=row, column=7).value = _format_polynomial(polynomial_coefficients(rotor_fit, rotor, 'efficiency'), "η")
+            else:
+                ws_fit.cell(row=row, column=6).value = "Interpolação linear dos valores ajustados"
+                ws_fit.cell(row=row, column=7).value = "Interpolação linear dos valores ajustados"
 
     # --- Ajusta Largura das Colunas ---
+    timer.begin("largura das colunas")
     sheets_to_adjust = [ws_data, ws_interp, ws_intersections]
     if ws_system:
         sheets_to_adjust.append(ws_system)
+    if ws_bep:
+        sheets_to_adjust.append(ws_bep)
+    if ws_fluid:
+        sheets_to_adjust.append(ws_fluid)
+    if ws_power:
+        sheets_to_adjust.append(ws_power)
+    if ws_family:
+        sheets_to_adjust.append(ws_family)
+    if ws_energy:
+        sheets_to_adjust.append(ws_energy)
+    if ws_tank:
+        sheets_to_adjust.append(ws_tank)
+    if ws_uncertainty:
+        sheets_to_adjust.append(ws_uncertainty)
+    if ws_fit:
+        sheets_to_adjust.append(ws_fit)
 
     for sheet in sheets_to_adjust:
         if not sheet: continue
@@ -2051,13 +8887,22 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
                 sheet.column_dimensions[column_letter].width = adjusted_width
 
 
+    timer.count('linhas_escritas', sum(ws.max_row for ws in wb.worksheets))
+
     # --- Cria os Gráficos ---
-    _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=system_curve_2)
+    _create_charts_in_workbook(wb, system_curve, rotor_names, system_curve_2=system_curve_2, timer=timer)
+
+    # --- Unidades do relatório: conversão única das colunas já escritas ---
+    if report_units and report_units != INTERNAL_UNITS:
+        timer.begin("unidades")
+        timer.count('colunas_convertidas', _apply_report_units(wb, report_units))
 
     # --- Salva o Arquivo ---
+    timer.begin("salvar")
     try:
         # Tenta salvar. Se der erro de permissão, sugere outro nome.
         wb.save(filename)
+        timer.end()  # A mensagem de sucesso aguarda o usuário e não entra na medição
         QMessageBox.information(None, "Sucesso", f"Relatório '{filename}' gerado com sucesso!")
     except PermissionError:
          alt_filename = filename.replace(".xlsx", "_copy.xlsx")
@@ -2075,17 +8920,14 @@ def _generate_excel_report(rotor_data, filename="Curvas_Bomba.xlsx", system_curv
 
     except Exception as e:
         QMessageBox.critical(None, "Erro ao Salvar", f"Erro desconhecido ao salvar o arquivo Excel:\n{str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao salvar o relatório Excel")
 
     except Exception as e:
         QMessageBox.critical(None, "Erro na Geração", f"Ocorreu um erro inesperado ao gerar o relatório Excel:\n{str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro ao gerar o relatório Excel")
     except Exception as e:
         QMessageBox.critical(None, "Erro Geral", f"Ocorreu um erro inesperado: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erro inesperado na exportação")
 
 
 # Show the startup dialog first
@@ -2107,6 +8949,9 @@ class StartupDialog(QDialog):
         self.selected_mode = mode
         self.accept()
 
+# Colunas das tabelas de pontos dos rotores (a coluna NPSHr é opcional)
+ROTOR_TABLE_HEADERS = ["Vazão (m³/h)", "Altura (m)", "Eficiência (%)", "NPSHr (m)"]
+
 # Definição da Classe para Entrada Manual (MOVIDA PARA CÁ, FORA DO BLOCO GLOBAL)
 class PumpAnalyzerManual(QMainWindow):
     def __init__(self):
@@ -2122,7 +8967,103 @@ class PumpAnalyzerManual(QMainWindow):
         self.manual_system_points_2 = None
         self.direct_equation_params_2 = None
         self.rotor_rpm = {}  # Dicionário para armazenar RPM de cada rotor
+        self.speed_families = {}  # Famílias de rotação geradas pelas leis de afinidade
+        self.energy_series = None  # Série temporal de operação para a simulação de energia
+        self.tank_settings = None  # Reservatório e demanda para a simulação de período estendido
+        self.pipe_network = None  # Trechos da tubulação usados para gerar a curva do sistema
+        self.uncertainty_settings = None  # Parâmetros da análise de incerteza (Monte Carlo)
+        self.npsh_settings = None  # Condições de sucção para o NPSH disponível
+        self.fluid_settings = None  # Fluido bombeado do projeto (None para água a 25 °C)
+        self.project_file = None  # Projeto aberto, lido sob demanda
+        self.pending_tabs = {}  # Abas de projeto cujas tabelas ainda não foram preenchidas
+        self.table_rotors = {}  # Tabela -> nome do rotor, para o diário de edições
         self.setup_ui()
+        _start_journal(self, "manual", self.replay_journal)
+
+    def closeEvent(self, event):
+        self.journal.discard()
+        super().closeEvent(event)
+
+    def replay_journal(self, events):
+        """Reaplica as edições recuperadas do diário de uma sessão interrompida"""
+        for event in events:
+            kind = event['type']
+            if kind == 'project':
+                try:
+                    self.load_project(ProjectFile(event['path']))
+                except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+                    QMessageBox.warning(self, "Aviso", f"Projeto base não pôde ser aberto: {str(e)}")
+            elif kind == 'set_rotor':
+                tab = self._find_rotor_tab(event['name'])
+                if tab is not None:
+                    self.tab_widget.removeTab(self.tab_widget.indexOf(tab))
+                self.manual_rotor_data[event['name']] = []
+                self.rotor_rpm[event['name']] = event['rpm']
+                self._create_rotor_tab(event['name'], event.get('info'), event['rows'])
+            elif kind == 'cell':
+                tab = self._find_rotor_tab(event['rotor'])
+                if tab is None:
+                    continue
+                table = self._rotor_table(tab)
+                if table.rowCount() <= event['row']:
+                    table.setRowCount(event['row'] + 1)
+                table.setItem(event['row'], event['col'], QTableWidgetItem(event['text']))
+            elif kind == 'remove_rows':
+                tab = self._find_rotor_tab(event['rotor'])
+                if tab is not None:
+                    table = self._rotor_table(tab)
+                    for row in event['rows']:
+                        table.removeRow(row)
+            elif kind == 'remove_rotor':
+                tab = self._find_rotor_tab(event['name'])
+                if tab is not None:
+                    self.tab_widget.removeTab(self.tab_widget.indexOf(tab))
+                    self.pending_tabs.pop(tab, None)
+                    self.manual_rotor_data.pop(event['name'], None)
+
+    def _find_rotor_tab(self, rotor_name):
+        """Retorna a aba do rotor pelo nome ou None"""
+        for i in range(self.tab_widget.count()):
+            if self.tab_widget.tabText(i) == rotor_name:
+                return self.tab_widget.widget(i)
+        return None
+
+    def _add_rotor_tab_widget(self, tab, rotor_name):
+        """Adiciona a aba de um rotor já preenchida e registra seu conteúdo no diário"""
+        self.tab_widget.addTab(tab, rotor_name)
+        table = tab.findChild(QTableWidget)
+        info_label = tab.findChild(QLabel)
+        self.journal.record('set_rotor', name=rotor_name, rpm=self.rotor_rpm.get(rotor_name, 1750),
+                            info=info_label.text() if info_label else None,
+                            rows=[[table.item(row, col).text() if table.item(row, col) else ""
+                                   for col in range(table.columnCount())] for row in range(table.rowCount())])
+        self._watch_table(table, rotor_name)
+
+    def _watch_table(self, table, rotor_name):
+        """Registra no diário cada célula editada da tabela do rotor"""
+        self.table_rotors[table] = rotor_name
+        table.itemChanged.connect(lambda item, table=table: self.journal.record(
+            'cell', rotor=self.table_rotors[table], row=item.row(), col=item.column(), text=item.text()))
+        # Pré-visualização: cada edição atualiza apenas as linhas deste rotor
+        table.itemChanged.connect(lambda item, table=table: self._preview_table(table))
+        table.model().rowsRemoved.connect(lambda *args, table=table: self._preview_table(table))
+        self._preview_table(table)
+
+    def _preview_table(self, table):
+        """Envia para a pré-visualização os pontos válidos da tabela (linhas incompletas são ignoradas)"""
+        rotor_name = self.table_rotors.get(table)
+        if rotor_name is None:
+            return
+        points = []
+        for row in range(table.rowCount()):
+            texts = [table.item(row, col).text().strip() if table.item(row, col) else "" for col in range(3)]
+            try:
+                q, h = (float(text.replace(',', '.')) for text in texts[:2])
+                efficiency = texts[2] if ":" in texts[2] else float(texts[2].replace(',', '.'))
+            except ValueError:
+                continue
+            points.append({'vazao': q, 'altura': h, 'efficiency': efficiency})
+        self.preview.set_rotor(rotor_name, points)
 
     def setup_ui(self):
         main_widget = QWidget()
@@ -2132,6 +9073,18 @@ class PumpAnalyzerManual(QMainWindow):
         control_panel = QWidget()
         control_layout = QHBoxLayout(control_panel)
 
+        # Grupo de arquivo
+        file_group = QGroupBox("Arquivo")
+        file_layout = QVBoxLayout()
+        btn_open_project = QPushButton("Abrir Projeto")
+        btn_open_project.clicked.connect(self.open_project)
+        file_layout.addWidget(btn_open_project)
+        btn_save_project = QPushButton("Salvar Projeto")
+        btn_save_project.clicked.connect(self.save_project)
+        file_layout.addWidget(btn_save_project)
+        file_group.setLayout(file_layout)
+        control_layout.addWidget(file_group)
+
         # Grupo de Gerenciamento de Rotores
         rotor_group = QGroupBox("Gerenciamento de Rotores")
         rotor_layout = QHBoxLayout() # Usar QHBoxLayout para alinhar horizontalmente
@@ -2149,12 +9102,35 @@ class PumpAnalyzerManual(QMainWindow):
         btn_parallel_pump = QPushButton("Criar Bomba em Paralelo")
         btn_parallel_pump.clicked.connect(self.create_parallel_pump)
         rotor_layout.addWidget(btn_parallel_pump)
+        btn_import_curves = QPushButton("Importar Curvas (CSV/Excel)")
+        btn_import_curves.clicked.connect(self.import_rotor_curves)
+        rotor_layout.addWidget(btn_import_curves)
+        
+        # Adicionar botão para resolver a estação de bombeamento com ramais individuais
+        btn_station = QPushButton("Estação de Bombeamento (Ramais Individuais)")
+        btn_station.clicked.connect(self.solve_pump_station)
+        rotor_layout.addWidget(btn_station)
         
         # Adicionar botão para alterar RPM
         btn_change_rpm = QPushButton("Alterar RPM do Rotor")
         btn_change_rpm.clicked.connect(self.change_rotor_rpm)
         rotor_layout.addWidget(btn_change_rpm)
         
+        # Adicionar botão para gerar família de rotações
+        btn_speed_family = QPushButton("Gerar Família de Rotações")
+        btn_speed_family.clicked.connect(self.create_speed_family)
+        rotor_layout.addWidget(btn_speed_family)
+        
+        # Adicionar botão para calcular a rotação necessária para um ponto de trabalho
+        btn_required_speed = QPushButton("Calcular Rotação Necessária")
+        btn_required_speed.clicked.connect(self.calculate_required_speed)
+        rotor_layout.addWidget(btn_required_speed)
+        
+        # Adicionar botão para calcular o corte do rotor (diâmetro necessário)
+        btn_trim = QPushButton("Corte de Rotor (Diâmetro)")
+        btn_trim.clicked.connect(self.calculate_trim_diameter)
+        rotor_layout.addWidget(btn_trim)
+        
         rotor_group.setLayout(rotor_layout)
         control_layout.addWidget(rotor_group)
 
@@ -2166,43 +9142,99 @@ class PumpAnalyzerManual(QMainWindow):
         system_curve_layout.addWidget(QLabel("Curva do Sistema 1:"))
         self.system_curve_mode = QComboBox()
         self.system_curve_mode.addItems(["Pontos Manual", "Equação Direta"])
+        self.system_curve_mode.currentIndexChanged.connect(lambda _: self.preview.refresh_systems())
         system_curve_layout.addWidget(QLabel("Método da Curva do Sistema 1:"))
         system_curve_layout.addWidget(self.system_curve_mode)
 
         btn_set_curve = QPushButton("Configurar Curva do Sistema 1")
         btn_set_curve.clicked.connect(self.configure_system_curve)
+        btn_set_curve.clicked.connect(lambda: self.preview.refresh_systems())
         system_curve_layout.addWidget(btn_set_curve)
 
         # Segunda curva do sistema
         system_curve_layout.addWidget(QLabel("Curva do Sistema 2:"))
         self.system_curve_mode_2 = QComboBox()
         self.system_curve_mode_2.addItems(["Nenhuma", "Pontos Manual", "Equação Direta"])
+        self.system_curve_mode_2.currentIndexChanged.connect(lambda _: self.preview.refresh_systems())
         system_curve_layout.addWidget(QLabel("Método da Curva do Sistema 2:"))
         system_curve_layout.addWidget(self.system_curve_mode_2)
 
         btn_set_curve_2 = QPushButton("Configurar Curva do Sistema 2")
         btn_set_curve_2.clicked.connect(self.configure_system_curve_2)
+        btn_set_curve_2.clicked.connect(lambda: self.preview.refresh_systems())
         system_curve_layout.addWidget(btn_set_curve_2)
 
+        btn_pipe_network = QPushButton("Curva pela Rede de Tubulações")
+        btn_pipe_network.clicked.connect(self.configure_pipe_network)
+        btn_pipe_network.clicked.connect(lambda: self.preview.refresh_systems())
+        system_curve_layout.addWidget(btn_pipe_network)
+
         system_curve_group.setLayout(system_curve_layout)
         control_layout.addWidget(system_curve_group)
 
         # Grupo de Exportação
         export_group = QGroupBox("Exportação")
         export_layout = QVBoxLayout()
+        export_layout.addWidget(QLabel("Ajuste das Curvas:"))
+        self.curve_fit_mode = QComboBox()
+        self.curve_fit_mode.addItems([label for label, _, _ in CURVE_FIT_OPTIONS])
+        export_layout.addWidget(self.curve_fit_mode)
+        export_layout.addWidget(QLabel("Unidades do Relatório:"))
+        self.report_units_mode = QComboBox()
+        self.report_units_mode.addItems([label for label, _ in REPORT_UNIT_PRESETS])
+        export_layout.addWidget(self.report_units_mode)
+        btn_energy = QPushButton("Simulação de Energia (Série Temporal)")
+        btn_energy.clicked.connect(self.configure_energy_simulation)
+        export_layout.addWidget(btn_energy)
+        btn_tank = QPushButton("Simulação do Reservatório (Liga/Desliga)")
+        btn_tank.clicked.connect(self.configure_tank_simulation)
+        export_layout.addWidget(btn_tank)
+        btn_uncertainty = QPushButton("Análise de Incerteza (Monte Carlo)")
+        btn_uncertainty.clicked.connect(self.configure_uncertainty_analysis)
+        export_layout.addWidget(btn_uncertainty)
+        btn_fluid = QPushButton("Fluido Bombeado (Propriedades e Viscosidade)")
+        btn_fluid.clicked.connect(self.configure_fluid)
+        export_layout.addWidget(btn_fluid)
+        btn_npsh = QPushButton("Análise de NPSH (Cavitação)")
+        btn_npsh.clicked.connect(self.configure_npsh_analysis)
+        export_layout.addWidget(btn_npsh)
+        btn_plots = QPushButton("Exportar Gráficos (PNG/SVG/PDF)")
+        btn_plots.clicked.connect(self.export_plots)
+        export_layout.addWidget(btn_plots)
         btn_export = QPushButton("Gerar Relatório Excel")
         btn_export.clicked.connect(self.export_to_excel_manual) # Conectar ao método correto
         export_layout.addWidget(btn_export)
         export_group.setLayout(export_layout)
         control_layout.addWidget(export_group)
 
+        # Grupo do catálogo de bombas
+        catalog_group = QGroupBox("Catálogo de Bombas")
+        catalog_layout = QVBoxLayout()
+        btn_save_catalog = QPushButton("Salvar Rotores no Catálogo")
+        btn_save_catalog.clicked.connect(self.save_to_catalog)
+        catalog_layout.addWidget(btn_save_catalog)
+        btn_search_catalog = QPushButton("Buscar no Catálogo")
+        btn_search_catalog.clicked.connect(self.open_catalog)
+        catalog_layout.addWidget(btn_search_catalog)
+        btn_select_catalog = QPushButton("Seleção pela Curva do Sistema")
+        btn_select_catalog.clicked.connect(self.select_from_catalog)
+        catalog_layout.addWidget(btn_select_catalog)
+        catalog_group.setLayout(catalog_layout)
+        control_layout.addWidget(catalog_group)
+
         main_layout.addWidget(control_panel)
 
         # --- Abas para cada Rotor ---
         self.tab_widget = QTabWidget()
         self.tab_widget.setTabsClosable(True) # Permite fechar abas (opcional)
         self.tab_widget.tabCloseRequested.connect(self.remove_rotor_tab_by_index) # Conectar sinal de fechar aba
-        main_layout.addWidget(self.tab_widget)
+        self.tab_widget.currentChanged.connect(lambda index: self._load_pending_tab(self.tab_widget.widget(index)))
+        # Abas dos rotores lado a lado com a pré-visualização dos gráficos
+        content_layout = QHBoxLayout()
+        content_layout.addWidget(self.tab_widget, 55)
+        self.preview = CurvePreview(lambda max_q: _window_system_curves(self, max_q))
+        content_layout.addWidget(self.preview, 45)
+        main_layout.addLayout(content_layout)
 
         self.setCentralWidget(main_widget)
 
@@ -2234,8 +9266,8 @@ class PumpAnalyzerManual(QMainWindow):
             tab_layout = QVBoxLayout(rotor_tab)
 
             table_widget = QTableWidget()
-            table_widget.setColumnCount(3)
-            table_widget.setHorizontalHeaderLabels(["Vazão (m³/h)", "Altura (m)", "Eficiência (%)"])
+            table_widget.setColumnCount(len(ROTOR_TABLE_HEADERS))
+            table_widget.setHorizontalHeaderLabels(ROTOR_TABLE_HEADERS)
             table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
             table_widget.setSelectionBehavior(QAbstractItemView.SelectRows)
 
@@ -2253,7 +9285,7 @@ class PumpAnalyzerManual(QMainWindow):
             tab_layout.addLayout(table_buttons_layout)
 
             # Adiciona a aba ao QTabWidget
-            self.tab_widget.addTab(rotor_tab, rotor_name)
+            self._add_rotor_tab_widget(rotor_tab, rotor_name)
             self.tab_widget.setCurrentWidget(rotor_tab)
             self.rotor_input.clear()
 
@@ -2272,6 +9304,10 @@ class PumpAnalyzerManual(QMainWindow):
 
             if reply == QMessageBox.Yes:
                 self.tab_widget.removeTab(index)
+                self.pending_tabs.pop(widget, None)
+                self.table_rotors.pop(widget.findChild(QTableWidget), None)
+                self.journal.record('remove_rotor', name=rotor_name)
+                self.preview.remove_rotor(rotor_name)
                 if rotor_name in self.manual_rotor_data:
                     del self.manual_rotor_data[rotor_name]
                 widget.deleteLater() # Limpa a memória
@@ -2280,7 +9316,7 @@ class PumpAnalyzerManual(QMainWindow):
         row_count = table_widget.rowCount()
         table_widget.insertRow(row_count)
         # Opcional: Adicionar itens vazios ou com placeholder
-        for col in range(3):
+        for col in range(table_widget.columnCount()):
              table_widget.setItem(row_count, col, QTableWidgetItem(""))
 
     def remove_selected_table_row(self, table_widget):
@@ -2290,8 +9326,11 @@ class PumpAnalyzerManual(QMainWindow):
             return
 
         # Remove as linhas em ordem reversa para evitar problemas de índice
-        for index in sorted([r.row() for r in selected_rows], reverse=True):
+        rows = sorted([r.row() for r in selected_rows], reverse=True)
+        for index in rows:
             table_widget.removeRow(index)
+        if table_widget in self.table_rotors:
+            self.journal.record('remove_rows', rotor=self.table_rotors[table_widget], rows=rows)
 
     def gather_data_from_tables(self):
         """Coleta os dados de todas as tabelas e retorna um novo dicionário."""
@@ -2301,7 +9340,7 @@ class PumpAnalyzerManual(QMainWindow):
             rotor_name = self.tab_widget.tabText(i)
             tab_content_widget = self.tab_widget.widget(i)
             # Encontra o QTableWidget dentro do layout da aba
-            table_widget = tab_content_widget.findChild(QTableWidget)
+            table_widget = self._rotor_table(tab_content_widget)
             if table_widget:
                 rotor_points = []
                 for row in range(table_widget.rowCount()):
@@ -2322,7 +9361,7 @@ class PumpAnalyzerManual(QMainWindow):
                         # Se contém ":" é uma eficiência combinada, manter como string
                         if ":" in eff_text:
                             efficiency = eff_text  # Manter como string
-                            print(f"Debug: Rotor combinado '{rotor_name}' - eficiência mantida como string: '{efficiency}'")
+                            logger.debug("Rotor combinado '%s' - eficiência mantida como string: '%s'", rotor_name, efficiency)
                         else:
                             # Rotor normal, converter para float
                             efficiency = float(eff_text.replace(',', '.'))
@@ -2330,7 +9369,12 @@ class PumpAnalyzerManual(QMainWindow):
                                 QMessageBox.warning(self, "Dado Inválido", f"Eficiência inválida ({efficiency}%) na linha {row+1} do rotor '{rotor_name}'. Deve estar entre 0 e 100.")
                                 return None # Indica erro
 
-                        rotor_points.append({'vazao': vazao, 'altura': altura, 'efficiency': efficiency})
+                        point = {'vazao': vazao, 'altura': altura, 'efficiency': efficiency}
+                        # NPSHr opcional (coluna vazia = não informado)
+                        npsh_item = table_widget.item(row, 3) if table_widget.columnCount() > 3 else None
+                        if npsh_item and npsh_item.text().strip():
+                            point['npshr'] = float(npsh_item.text().replace(',', '.'))
+                        rotor_points.append(point)
                     except ValueError:
                         QMessageBox.critical(self, "Erro de Formato", f"Valor inválido encontrado na linha {row+1} do rotor '{rotor_name}'. Verifique se são números válidos.")
                         return None # Indica erro
@@ -2432,7 +9476,7 @@ class PumpAnalyzerManual(QMainWindow):
                       self.manual_system_points = None # Clear points if not enough valid ones
                  else:
                       self.manual_system_points = points_buffer # Store valid points
-                      print("Pontos manuais da primeira curva do sistema atualizados:", self.manual_system_points)
+                      logger.debug("Pontos manuais da primeira curva do sistema atualizados: %s", self.manual_system_points)
             else:
                  # If input was invalid, keep the old points (or None if none existed)
                  QMessageBox.information(self, "Entrada Inválida", "Os pontos da primeira curva do sistema não foram atualizados devido a erros na entrada.")
@@ -2641,7 +9685,7 @@ class PumpAnalyzerManual(QMainWindow):
                       self.manual_system_points = None # Limpar pontos se não houver suficientes válidos
                  else:
                       self.manual_system_points = points_buffer # Armazenar pontos válidos
-                      print("Pontos manuais da curva do sistema atualizados:", self.manual_system_points)
+                      logger.debug("Pontos manuais da curva do sistema atualizados: %s", self.manual_system_points)
             else:
                  # Se a entrada foi inválida, manter os pontos antigos (ou None se não existiam)
                  QMessageBox.information(self, "Entrada Inválida", "Os pontos da curva do sistema não foram atualizados devido a erros na entrada.")
@@ -2737,7 +9781,7 @@ class PumpAnalyzerManual(QMainWindow):
                       self.manual_system_points_2 = None # Clear points if not enough valid ones
                  else:
                       self.manual_system_points_2 = points_buffer # Store valid points
-                      print("Pontos manuais da segunda curva do sistema atualizados:", self.manual_system_points_2)
+                      logger.debug("Pontos manuais da segunda curva do sistema atualizados: %s", self.manual_system_points_2)
             else:
                  # If input was invalid, keep the old points (or None if none existed)
                  QMessageBox.information(self, "Entrada Inválida", "Os pontos da segunda curva do sistema não foram atualizados devido a erros na entrada.")
@@ -2807,7 +9851,7 @@ class PumpAnalyzerManual(QMainWindow):
             return
         
         original_tab = self.tab_widget.widget(original_tab_index)
-        original_table = original_tab.findChild(QTableWidget)
+        original_table = self._rotor_table(original_tab)
         
         # Verificar se a tabela original tem dados
         if original_table.rowCount() == 0:
@@ -2822,6 +9866,420 @@ class PumpAnalyzerManual(QMainWindow):
             f"Rotor '{new_rotor_name}' criado com RPM {new_rpm}!"
         )
 
+    def create_speed_family(self):
+        """Gera uma família de curvas para várias rotações de um rotor"""
+        if self.tab_widget.count() == 0:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        # Rotores combinados não possuem eficiência numérica para as leis de afinidade
+        rotors = [self.tab_widget.tabText(i) for i in range(self.tab_widget.count())
+                  if "- Paralelo" not in self.tab_widget.tabText(i)]
+        if not rotors:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor básico (não paralelo) disponível!")
+            return
+        
+        selection = _show_speed_family_dialog(self, rotors, self.rotor_rpm, self.speed_families)
+        if selection is None:
+            return
+        rotor, rpms = selection
+        
+        points = self.get_rotor_data(rotor)
+        if not points or len(points) < 2:
+            QMessageBox.warning(self, "Erro", f"O rotor '{rotor}' precisa de pelo menos 2 pontos válidos!")
+            return
+        
+        try:
+            generate_speed_family(points, self.rotor_rpm.get(rotor, 1750), rpms, _fluid_density(self))
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro", f"Não foi possível gerar a família: {str(e)}")
+            return
+        
+        # Apenas a especificação: as curvas são refeitas do rotor base atual em cada relatório
+        family_name = f"{rotor} ({rpms[0]:.0f}-{rpms[-1]:.0f} RPM)"
+        self.speed_families[family_name] = {'rotor': rotor, 'rpms': np.asarray(rpms, dtype=float)}
+        QMessageBox.information(self, "Sucesso",
+            f"Família '{family_name}' criada com {len(rpms)} rotações.\n"
+            f"Os pontos de operação de cada rotação serão incluídos no relatório.")
+
+    def calculate_required_speed(self):
+        """Calcula a rotação de cada rotor que atinge o ponto de trabalho desejado"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        _show_required_speed_dialog(self, rotor_data, self.rotor_rpm, _system_curve_settings(self))
+
+    def solve_pump_station(self):
+        """Resolve as vazões de bombas em paralelo com perdas individuais nos ramais"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        _show_pump_station_dialog(self, rotor_data, _system_curve_settings(self))
+
+    def configure_energy_simulation(self):
+        """Carrega a série temporal de operação e simula o consumo de energia dos rotores"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        self.energy_series = _show_energy_simulation_dialog(self, rotor_data, _system_curve_settings(self),
+                                                            self.energy_series)
+
+    def configure_tank_simulation(self):
+        """Configura e simula o reservatório elevado com controle liga/desliga por nível"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        self.tank_settings = _show_tank_simulation_dialog(self, rotor_data, _system_curve_settings(self),
+                                                          self.tank_settings)
+
+    def configure_uncertainty_analysis(self):
+        """Configura a análise de incerteza dos pontos de operação por Monte Carlo"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        self.uncertainty_settings = _show_uncertainty_dialog(self, rotor_data, _system_curve_settings(self),
+                                                             self.uncertainty_settings, self.curve_fit_mode)
+
+    def configure_npsh_analysis(self):
+        """Configura as condições de sucção e avalia a margem de NPSH nos pontos de operação"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        self.npsh_settings = _show_npsh_dialog(self, rotor_data, _system_curve_settings(self), self.npsh_settings)
+
+    def export_plots(self):
+        """Exporta gráficos estáticos (PNG/SVG/PDF) das curvas dos rotores e das curvas do sistema"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        _show_plot_export_dialog(self, rotor_data, self.rotor_rpm, self.speed_families, self.curve_fit_mode)
+
+    def configure_fluid(self):
+        """Escolhe o fluido bombeado do projeto e mostra os fatores de correção de viscosidade"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        self.fluid_settings = _show_fluid_dialog(self, rotor_data, self.rotor_rpm, self.fluid_settings)
+
+    def configure_pipe_network(self):
+        """Monta a curva do sistema a partir dos trechos da tubulação"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        network = _show_pipe_network_dialog(self, rotor_data, self.pipe_network)
+        if network is not None:
+            _apply_pipe_network(self, network)
+
+    def calculate_trim_diameter(self):
+        """Calcula o diâmetro de rotor que atinge o ponto de trabalho e adiciona sua curva"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        
+        selection = _show_trim_dialog(self, rotor_data, rotor_data.keys())
+        if selection is None:
+            return
+        new_rotor_name, points = selection
+        
+        # Corte a rotação constante: usar o RPM dos rotores existentes
+        base_rotor = next(iter(rotor_data))
+        self.rotor_rpm[new_rotor_name] = self.rotor_rpm.get(base_rotor, 1750)
+        self.add_rotor_tab_with_points(new_rotor_name, points,
+                                       "Rotor cortado: curva obtida dos diâmetros conhecidos")
+        QMessageBox.information(self, "Sucesso", f"Rotor '{new_rotor_name}' adicionado!")
+
+    def save_to_catalog(self):
+        """Grava os rotores atuais no catálogo de bombas"""
+        rotor_data = self.gather_data_from_tables()
+        if rotor_data is None:
+            return
+        if not rotor_data:
+            QMessageBox.warning(self, "Erro", "Nenhum rotor disponível!")
+            return
+        _save_to_catalog(self, rotor_data, self.rotor_rpm, self.curve_fit_mode)
+
+    def open_catalog(self):
+        """Busca rotores no catálogo e importa os selecionados como novas abas"""
+        self.import_catalog_rotors(_show_catalog_dialog(self))
+
+    def select_from_catalog(self):
+        """Classifica os rotores do catálogo pela curva do sistema 1 e importa os selecionados"""
+        self.import_catalog_rotors(_show_selection_dialog(self, _system_curve_settings(self)))
+
+    def import_catalog_rotors(self, selection):
+        """Adiciona como novas abas os rotores retornados pelos diálogos do catálogo"""
+        if selection is None:
+            return
+        rotor_data, rotor_rpm = selection
+        existing = {self.tab_widget.tabText(i) for i in range(self.tab_widget.count())}
+        imported = 0
+        for rotor, points in rotor_data.items():
+            if rotor in existing:
+                continue
+            self.rotor_rpm[rotor] = rotor_rpm.get(rotor, 1750)
+            self.add_rotor_tab_with_points(rotor, points, "Rotor importado do catálogo")
+            imported += 1
+        QMessageBox.information(self, "Catálogo", f"{imported} rotor(es) importado(s).")
+
+    def import_rotor_curves(self):
+        """Importa curvas de rotores de um arquivo CSV/Excel, com unidades dos cabeçalhos"""
+        filename, _ = QFileDialog.getOpenFileName(self, "Importar Curvas de Rotores", "", ROTOR_CURVE_FILE_FILTER)
+        if not filename:
+            return
+        try:
+            rotor_data = load_rotor_curves(filename)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Erro", f"Não foi possível ler as curvas: {str(e)}")
+            return
+        rpm, ok = QInputDialog.getDouble(self, "RPM dos Rotores", "RPM das curvas importadas:",
+                                         value=1750, min=1, max=10000, decimals=0)
+        if not ok:
+            return
+        existing = {self.tab_widget.tabText(i) for i in range(self.tab_widget.count())}
+        skipped = [rotor for rotor in rotor_data if rotor in existing]
+        for rotor, data in rotor_data.items():
+            if rotor in existing:
+                continue
+            npshr = data.get('npshr', [None] * len(data['vazao']))
+            points = [{'vazao': q, 'altura': h, 'efficiency': eta, 'npshr': n}
+                      for q, h, eta, n in zip(data['vazao'], data['altura'], data['eficiencia'], npshr)]
+            self.rotor_rpm[rotor] = rpm
+            self.add_rotor_tab_with_points(rotor, points, f"Rotor importado de {os.path.basename(filename)}")
+        message = f"{len(rotor_data) - len(skipped)} rotor(es) importado(s)."
+        if skipped:
+            message += "\nJá existentes (ignorados): " + ", ".join(skipped)
+        QMessageBox.information(self, "Importar Curvas", message)
+
+    def add_rotor_tab_with_points(self, rotor_name, points, info_text):
+        """Cria uma nova tab com os pontos (vazão, altura, eficiência, NPSHr opcional) fornecidos"""
+        tab = self._create_rotor_tab(rotor_name, info_text,
+                                     [(p['vazao'], p['altura'], p['efficiency'], p.get('npshr')) for p in points])
+        self.tab_widget.setCurrentWidget(tab)
+
+    def _create_rotor_tab(self, rotor_name, info_text=None, rows=()):
+        """Cria e adiciona a aba de um rotor preenchida com as linhas fornecidas"""
+        tab = QWidget()
+        table = self._build_rotor_tab_contents(tab, info_text)
+        self._fill_rotor_table(table, rows)
+        self._add_rotor_tab_widget(tab, rotor_name)
+        return tab
+
+    def _build_rotor_tab_contents(self, tab, info_text=None):
+        """Monta tabela e botões de controle dentro da aba e retorna a tabela"""
+        layout = QVBoxLayout()
+        
+        if info_text:
+            info_label = QLabel(info_text)
+            info_label.setStyleSheet("QLabel { color: blue; font-weight: bold; }")
+            layout.addWidget(info_label)
+        
+        table = QTableWidget(0, len(ROTOR_TABLE_HEADERS))
+        table.setHorizontalHeaderLabels(ROTOR_TABLE_HEADERS)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        
+        # Adiciona botões de controle da tabela
+        table_buttons_layout = QHBoxLayout()
+        btn_add_row = QPushButton("Adicionar Ponto")
+        btn_add_row.clicked.connect(lambda _, table=table: self.add_table_row(table))
+        btn_remove_row = QPushButton("Remover Ponto Selecionado")
+        btn_remove_row.clicked.connect(lambda _, table=table: self.remove_selected_table_row(table))
+        table_buttons_layout.addWidget(btn_add_row)
+        table_buttons_layout.addWidget(btn_remove_row)
+        table_buttons_layout.addStretch()
+        
+        layout.addWidget(table)
+        layout.addLayout(table_buttons_layout)
+        tab.setLayout(layout)
+        return table
+
+    def _fill_rotor_table(self, table, rows):
+        """Preenche a tabela com linhas (vazão, altura, eficiência[, NPSHr]); eficiência pode ser texto"""
+        def fmt(value, digits):
+            if isinstance(value, str):
+                return value
+            if value is None or np.isnan(value):
+                return ""
+            return str(round(float(value), digits)).replace('.', ',')
+        
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            q, h, e = values[:3]
+            table.setItem(row, 0, QTableWidgetItem(fmt(q, 2)))
+            table.setItem(row, 1, QTableWidgetItem(fmt(h, 2)))
+            table.setItem(row, 2, QTableWidgetItem(fmt(e, 1)))
+            table.setItem(row, 3, QTableWidgetItem(fmt(values[3] if len(values) > 3 else None, 2)))
+
+    def _rotor_table(self, tab):
+        """Retorna a tabela da aba, preenchendo-a antes se ainda estiver pendente do projeto"""
+        self._load_pending_tab(tab)
+        return tab.findChild(QTableWidget)
+
+    def _load_pending_tab(self, tab):
+        """Monta e preenche uma aba de projeto na primeira vez que é acessada"""
+        rotor = self.pending_tabs.pop(tab, None)
+        if rotor is None:
+            return
+        values = self.project_file.rotor_rows(rotor)
+        efficiency_text = rotor.get('efficiency_text')
+        npshr = rotor.get('npshr') or [None] * len(values)
+        rows = [(q, h, efficiency_text[i] if efficiency_text else e, npshr[i]) for i, (q, h, e) in enumerate(values)]
+        table = self._build_rotor_tab_contents(tab, rotor.get('info'))
+        self._fill_rotor_table(table, rows)
+        self._watch_table(table, rotor['name'])
+        if not self.pending_tabs:
+            self.project_file.close()
+            self.project_file = None
+
+    def save_project(self):
+        """Grava rotores, RPMs e curvas do sistema em um arquivo de projeto"""
+        filename, _ = QFileDialog.getSaveFileName(self, "Salvar Projeto", "Projeto.bproj", PROJECT_FILE_FILTER)
+        if not filename:
+            return
+        
+        def cell_value(table, row, col):
+            item = table.item(row, col)
+            try:
+                return float(item.text().replace(',', '.'))
+            except (AttributeError, ValueError):
+                return np.nan
+        
+        rotors = []
+        for i in range(self.tab_widget.count()):
+            rotor_name = self.tab_widget.tabText(i)
+            tab = self.tab_widget.widget(i)
+            table = self._rotor_table(tab)
+            values = [[cell_value(table, row, col) for col in range(3)] for row in range(table.rowCount())]
+            entry = {'name': rotor_name, 'rpm': self.rotor_rpm.get(rotor_name, 1750)}
+            
+            # Rotores combinados guardam a eficiência como texto ("a%:b%")
+            efficiency_text = [table.item(row, 2).text() if table.item(row, 2) else ""
+                               for row in range(table.rowCount())]
+            if any(":" in text for text in efficiency_text):
+                entry['efficiency_text'] = efficiency_text
+            npshr = [cell_value(table, row, 3) for row in range(table.rowCount())]
+            if not np.all(np.isnan(npshr)):
+                entry['npshr'] = [None if np.isnan(n) else n for n in npshr]
+            info_label = tab.findChild(QLabel)
+            if info_label:
+                entry['info'] = info_label.text()
+            rotors.append((entry, values))
+        
+        rotors, points = _pack_project_rotors(rotors)
+        arrays = {"rotores.npy": points}
+        manifest = {
+            'mode': 'manual',
+            'rotors': rotors,
+            'system_curves': _system_curve_state(self),
+            'fluid': self.fluid_settings,
+            'speed_families': _speed_families_state(self.speed_families),
+        }
+        try:
+            save_project(filename, manifest, arrays)
+            self.journal.start(base={'type': 'project', 'path': filename})
+            QMessageBox.information(self, "Sucesso", f"Projeto salvo em:\n{filename}")
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao salvar projeto: {str(e)}")
+
+    def open_project(self):
+        """Carrega um projeto; as tabelas dos rotores são preenchidas ao serem exibidas"""
+        filename, _ = QFileDialog.getOpenFileName(self, "Abrir Projeto", "", PROJECT_FILE_FILTER)
+        if not filename:
+            return
+        
+        try:
+            project = ProjectFile(filename)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao abrir projeto: {str(e)}")
+            return
+        if project.manifest.get('mode') != 'manual':
+            project.close()
+            QMessageBox.critical(self, "Erro", "O projeto foi criado no modo de importação de imagem.")
+            return
+        
+        try:
+            self.load_project(project)
+        except (KeyError, ValueError) as e:
+            QMessageBox.critical(self, "Erro", f"Erro ao abrir projeto: {str(e)}")
+            return
+        self.journal.start(base={'type': 'project', 'path': filename})
+        QMessageBox.information(self, "Sucesso", f"Projeto carregado com {self.tab_widget.count()} rotor(es)!")
+
+    def load_project(self, project):
+        """Substitui a sessão atual pelo conteúdo de um ProjectFile aberto"""
+        # Descartar a sessão atual
+        self.pending_tabs = {}
+        self.table_rotors = {}
+        if self.project_file is not None:
+            self.project_file.close()
+        self.project_file = project
+        self.tab_widget.blockSignals(True)
+        while self.tab_widget.count():
+            widget = self.tab_widget.widget(0)
+            self.tab_widget.removeTab(0)
+            widget.deleteLater()
+        self.manual_rotor_data = {}
+        self.rotor_rpm = {}
+        
+        # Abas criadas vazias; tabela e pontos são montados quando a aba é exibida
+        for rotor in project.manifest['rotors']:
+            self.manual_rotor_data[rotor['name']] = []
+            self.rotor_rpm[rotor['name']] = rotor['rpm']
+            tab = QWidget()
+            self.tab_widget.addTab(tab, rotor['name'])
+            self.pending_tabs[tab] = rotor
+        self.tab_widget.blockSignals(False)
+        
+        _restore_system_curve_state(self, project.manifest.get('system_curves', {}))
+        self.fluid_settings = project.manifest.get('fluid')
+        self.speed_families = _load_speed_families(project)
+        
+        # Pré-visualização de todos os rotores direto do arquivo, sem montar as abas pendentes
+        preview_data = {}
+        for rotor in project.manifest['rotors']:
+            efficiency_text = rotor.get('efficiency_text')
+            preview_data[rotor['name']] = [
+                {'vazao': q, 'altura': h, 'efficiency': efficiency_text[i] if efficiency_text else e}
+                for i, (q, h, e) in enumerate(project.rotor_rows(rotor))]
+        self.preview.set_rotors(preview_data)
+        
+        if self.tab_widget.count():
+            self.tab_widget.setCurrentIndex(0)
+            self._load_pending_tab(self.tab_widget.widget(0))
+        else:
+            project.close()
+            self.project_file = None
+
     def convert_br_float(self, text):
         """Converte string no formato brasileiro (vírgula decimal) para float"""
         try:
@@ -2840,8 +10298,8 @@ class PumpAnalyzerManual(QMainWindow):
         tab = QWidget()
         layout = QVBoxLayout()
         
-        table = QTableWidget(original_table.rowCount(), 3)
-        table.setHorizontalHeaderLabels(["Vazão (m³/h)", "Altura (m)", "Eficiência (%)"])
+        table = QTableWidget(original_table.rowCount(), len(ROTOR_TABLE_HEADERS))
+        table.setHorizontalHeaderLabels(ROTOR_TABLE_HEADERS)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         
         # Copiar e modificar dados aplicando leis de afinidade
@@ -2867,9 +10325,15 @@ class PumpAnalyzerManual(QMainWindow):
                 eff_item = original_table.item(row, 2)
                 if eff_item and eff_item.text().strip():
                     table.setItem(row, 2, QTableWidgetItem(eff_item.text()))
+                
+                # NPSHr: NPSH2/NPSH1 = (N2/N1)²
+                npsh_item = original_table.item(row, 3)
+                if npsh_item and npsh_item.text().strip():
+                    new_npsh = self.convert_br_float(npsh_item.text()) * rpm_ratio ** NPSH_AFFINITY_EXPONENT
+                    table.setItem(row, 3, QTableWidgetItem(str(round(new_npsh, 2)).replace('.', ',')))
                     
             except (ValueError, AttributeError) as e:
-                print(f"Erro ao processar linha {row}: {e}")
+                logger.error("Erro ao processar linha %s: %s", row, e)
                 # Pular esta linha se houver erro
                 continue
         
@@ -2887,7 +10351,7 @@ class PumpAnalyzerManual(QMainWindow):
         layout.addLayout(table_buttons_layout)
         tab.setLayout(layout)
         
-        self.tab_widget.addTab(tab, rotor_name)
+        self._add_rotor_tab_widget(tab, rotor_name)
         self.tab_widget.setCurrentWidget(tab)
         
     def export_to_excel_manual(self):
@@ -2895,12 +10359,13 @@ class PumpAnalyzerManual(QMainWindow):
         if rotor_data is None:
             return # Erro ao coletar dados
 
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Salvar Relatório", "Curvas_Bomba.xlsx", "Excel Files (*.xlsx)"
+        filename, selected_filter = QFileDialog.getSaveFileName(
+            self, "Salvar Relatório", "Curvas_Bomba.xlsx", REPORT_FILE_FILTERS
         )
         
         if not filename:
             return
+        filename = _report_file_name(filename, selected_filter)
 
         try:
             # Configuração da curva do sistema 1
@@ -2929,13 +10394,26 @@ class PumpAnalyzerManual(QMainWindow):
                  QMessageBox.warning(self, "Aviso", "Modo 'Equação Direta' selecionado para Curva 2, mas os parâmetros H0 e K não foram configurados.")
                  return
 
+            # Modelo de ajuste das curvas dos rotores
+            _, curve_model, curve_degree = CURVE_FIT_OPTIONS[self.curve_fit_mode.currentIndex()]
+
             # Generate the report
             _generate_excel_report(rotor_data, filename=filename, system_curve_mode=mode,
                                  manual_points=manual_points,
                                  equation_params=equation_params,
                                  system_curve_mode_2=mode_2,
                                  manual_points_2=manual_points_2,
-                                 equation_params_2=equation_params_2)                                 
+                                 equation_params_2=equation_params_2,
+                                 curve_model=curve_model,
+                                 curve_degree=curve_degree,
+                                 speed_families=self.speed_families,
+                                 energy_series=self.energy_series,
+                                 tank_settings=self.tank_settings,
+                                 uncertainty_settings=self.uncertainty_settings,
+                                 npsh_settings=self.npsh_settings,
+                                 fluid_settings=self.fluid_settings,
+                                 rotor_rpm=self.rotor_rpm,
+                                 report_units=REPORT_UNIT_PRESETS[self.report_units_mode.currentIndex()][1])
         except Exception as e:
             QMessageBox.critical(self, "Erro", f"Erro ao salvar relatório: {str(e)}")
 
@@ -3013,7 +10491,7 @@ class PumpAnalyzerManual(QMainWindow):
             return
         
         original_tab = self.tab_widget.widget(original_tab_index)
-        original_table = original_tab.findChild(QTableWidget)
+        original_table = self._rotor_table(original_tab)
         
         # Verificar se a tabela original tem dados
         if original_table.rowCount() == 0:
@@ -3152,7 +10630,7 @@ class PumpAnalyzerManual(QMainWindow):
         for i in range(self.tab_widget.count()):
             if self.tab_widget.tabText(i) == rotor_name:
                 tab = self.tab_widget.widget(i)
-                table = tab.findChild(QTableWidget)
+                table = self._rotor_table(tab)
                 if table and table.rowCount() > 0:
                     data = []
                     for row in range(table.rowCount()):
@@ -3174,27 +10652,20 @@ class PumpAnalyzerManual(QMainWindow):
     def combine_rotor_curves(self, rotor1_data, rotor2_data, rotor1_name, rotor2_name):
         """Combina duas curvas de rotor para operação em paralelo"""
         try:
-            # Extrair dados dos rotores
-            q1 = [point['vazao'] for point in rotor1_data]
-            h1 = [point['altura'] for point in rotor1_data]
-            eff1 = [point['efficiency'] for point in rotor1_data]
-            
-            q2 = [point['vazao'] for point in rotor2_data]
-            h2 = [point['altura'] for point in rotor2_data]
-            eff2 = [point['efficiency'] for point in rotor2_data]
-            
-            # Criar funções de interpolação
-            from scipy.interpolate import interp1d
-            
-            interp1_h = interp1d(q1, h1, kind='linear', bounds_error=False, fill_value='extrapolate')
-            interp1_eff = interp1d(q1, eff1, kind='linear', bounds_error=False, fill_value='extrapolate')
+            # Ajuste monótono das duas curvas: altura não crescente permite inverter H(Q)
+            # sem ambiguidade mesmo com pontos digitalizados ruidosos
+            fit = fit_rotor_curves({rotor1_name: rotor1_data, rotor2_name: rotor2_data}, model='monotone')
+            if rotor1_name not in fit['index'] or rotor2_name not in fit['index']:
+                QMessageBox.warning(None, "Aviso", "Os rotores não possuem pontos suficientes para operação em paralelo!")
+                return None
             
-            interp2_h = interp1d(q2, h2, kind='linear', bounds_error=False, fill_value='extrapolate')
-            interp2_eff = interp1d(q2, eff2, kind='linear', bounds_error=False, fill_value='extrapolate')
+            rows = [fit['index'][rotor1_name], fit['index'][rotor2_name]]
+            q_fit = [fit['Q'][r, :fit['counts'][r]] for r in rows]
+            h_fit = [fit['head_knots'][r, :fit['counts'][r]] for r in rows]
             
             # Determinar faixa de alturas comum
-            h_min = max(min(h1), min(h2))
-            h_max = min(max(h1), max(h2))
+            h_min = max(min(h_fit[0]), min(h_fit[1]))
+            h_max = min(max(h_fit[0]), max(h_fit[1]))
             
             if h_min >= h_max:
                 QMessageBox.warning(None, "Aviso", "Os rotores não possuem faixa de altura compatível para operação em paralelo!")
@@ -3204,47 +10675,31 @@ class PumpAnalyzerManual(QMainWindow):
             num_points = 20
             h_combined = np.linspace(h_min, h_max, num_points)
             
-            combined_points = []
+            # Para cada altura, a vazão de cada rotor vem da inversão da curva monótona
+            # (np.interp exige abscissas crescentes, por isso as curvas são invertidas)
+            q1_for_h = np.interp(h_combined, h_fit[0][::-1], q_fit[0][::-1])
+            q2_for_h = np.interp(h_combined, h_fit[1][::-1], q_fit[1][::-1])
             
-            for h in h_combined:
-                try:
-                    # Para cada altura, encontrar as vazões correspondentes em cada rotor
-                    # Resolver H = f(Q) para Q, ou seja, encontrar Q tal que f(Q) = H
-                    
-                    # Função para encontrar vazão que resulta na altura desejada
-                    def find_flow_for_height(interp_func, target_height, flow_range):
-                        from scipy.optimize import minimize_scalar
-                        
-                        def height_diff(q):
-                            return abs(interp_func(q) - target_height)
-                        
-                        result = minimize_scalar(height_diff, bounds=flow_range, method='bounded')
-                        return result.x if result.success else None
-                    
-                    # Encontrar vazões para a altura h
-                    q1_for_h = find_flow_for_height(interp1_h, h, (min(q1), max(q1)))
-                    q2_for_h = find_flow_for_height(interp2_h, h, (min(q2), max(q2)))
-                    
-                    if q1_for_h is not None and q2_for_h is not None:
-                        # Vazão combinada = soma das vazões individuais
-                        q_combined = q1_for_h + q2_for_h
-                        
-                        # Eficiência combinada como string mostrando ambas
-                        eff1_at_q = float(interp1_eff(q1_for_h))
-                        eff2_at_q = float(interp2_eff(q2_for_h))
-                        
-                        # Criar string de eficiência combinada
-                        eff_combined_str = f"{eff1_at_q:.1f}%:{eff2_at_q:.1f}%"
-                        
-                        combined_points.append({
-                            'vazao': q_combined,
-                            'altura': h,
-                            'efficiency': eff_combined_str  # String, não float!
-                        })
-                        
-                except Exception as e:
-                    print(f"Erro ao calcular ponto para altura {h}: {e}")
-                    continue
+            eff1_at_q = evaluate_rotor_curves(fit, q1_for_h[None, :], 'efficiency', rows=[rows[0]])[0]
+            eff2_at_q = evaluate_rotor_curves(fit, q2_for_h[None, :], 'efficiency', rows=[rows[1]])[0]
+            
+            # Eficiência equivalente do conjunto: mesma potência total no eixo
+            # (Qa + Qb) / η = Qa / ηa + Qb / ηb
+            with np.errstate(invalid='ignore', divide='ignore'):
+                eff_equivalent = (q1_for_h + q2_for_h) / (q1_for_h / eff1_at_q + q2_for_h / eff2_at_q)
+            
+            combined_points = []
+            for h, qa, qb, ea, eb, eq in zip(h_combined, q1_for_h, q2_for_h, eff1_at_q, eff2_at_q, eff_equivalent):
+                # Vazão combinada = soma das vazões individuais
+                # Eficiência combinada como string mostrando ambas e a equivalente
+                efficiency = f"{ea:.1f}%:{eb:.1f}%"  # String, não float!
+                if np.isfinite(eq) and eq > 0:
+                    efficiency += f" ({eq:.1f}%)"
+                combined_points.append({
+                    'vazao': float(qa + qb),
+                    'altura': float(h),
+                    'efficiency': efficiency
+                })
             
             # Ordenar por vazão
             combined_points.sort(key=lambda x: x['vazao'])
@@ -3252,7 +10707,7 @@ class PumpAnalyzerManual(QMainWindow):
             return combined_points
             
         except Exception as e:
-            print(f"Erro ao combinar curvas: {e}")
+            logger.error("Erro ao combinar curvas: %s", e)
             return None
     
     def add_combined_parallel_tab(self, combined_name, combined_points, rotor1_name, rotor2_name):
@@ -3272,8 +10727,8 @@ class PumpAnalyzerManual(QMainWindow):
         info_label.setStyleSheet("QLabel { color: blue; font-weight: bold; }")
         layout.addWidget(info_label)
         
-        table = QTableWidget(len(combined_points), 3)
-        table.setHorizontalHeaderLabels(["Vazão (m³/h)", "Altura (m)", "Eficiência (%)"])
+        table = QTableWidget(len(combined_points), len(ROTOR_TABLE_HEADERS))
+        table.setHorizontalHeaderLabels(ROTOR_TABLE_HEADERS)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         # Preencher tabela com dados combinados
@@ -3289,7 +10744,7 @@ class PumpAnalyzerManual(QMainWindow):
                     table.setItem(row, 2, QTableWidgetItem(str(round(point['efficiency'], 1)).replace('.', ',')))
                     
             except Exception as e:
-                print(f"Erro ao preencher linha {row}: {e}")
+                logger.error("Erro ao preencher linha %s: %s", row, e)
                 continue
         
         # Adiciona botões de controle da tabela
@@ -3306,7 +10761,7 @@ class PumpAnalyzerManual(QMainWindow):
         layout.addLayout(table_buttons_layout)
         tab.setLayout(layout)
         
-        self.tab_widget.addTab(tab, combined_name)
+        self._add_rotor_tab_widget(tab, combined_name)
         self.tab_widget.setCurrentWidget(tab)
 
     def add_parallel_pump_tab(self, parallel_rotor_name, original_table, base_rotor_name):
@@ -3324,8 +10779,8 @@ class PumpAnalyzerManual(QMainWindow):
         info_label.setStyleSheet("QLabel { color: blue; font-weight: bold; }")
         layout.addWidget(info_label)
         
-        table = QTableWidget(original_table.rowCount(), 3)
-        table.setHorizontalHeaderLabels(["Vazão (m³/h)", "Altura (m)", "Eficiência (%)"])
+        table = QTableWidget(original_table.rowCount(), len(ROTOR_TABLE_HEADERS))
+        table.setHorizontalHeaderLabels(ROTOR_TABLE_HEADERS)
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         
         # Copiar e modificar dados para bomba em paralelo
@@ -3347,9 +10802,14 @@ class PumpAnalyzerManual(QMainWindow):
                 eff_item = original_table.item(row, 2)
                 if eff_item and eff_item.text().strip():
                     table.setItem(row, 2, QTableWidgetItem(eff_item.text()))
-                    
+
+                # NPSHr: cada bomba opera com metade da vazão total, mesmo NPSHr da linha original
+                npsh_item = original_table.item(row, 3)
+                if npsh_item and npsh_item.text().strip():
+                    table.setItem(row, 3, QTableWidgetItem(npsh_item.text()))
+
             except (ValueError, AttributeError) as e:
-                print(f"Erro ao processar linha {row}: {e}")
+                logger.error("Erro ao processar linha %s: %s", row, e)
                 continue
         
         # Adiciona botões de controle da tabela
@@ -3366,12 +10826,29 @@ class PumpAnalyzerManual(QMainWindow):
         layout.addLayout(table_buttons_layout)
         tab.setLayout(layout)
         
-        self.tab_widget.addTab(tab, parallel_rotor_name)
+        self._add_rotor_tab_widget(tab, parallel_rotor_name)
         self.tab_widget.setCurrentWidget(tab)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    import argparse
+    parser = argparse.ArgumentParser(description="Análise de Curvas de Bomba")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="Nível das mensagens de registro (padrão: WARNING)")
+    parser.add_argument("--log-file", help="Grava as mensagens em um arquivo com rotação por tamanho")
+    parser.add_argument("--timing", action="store_true",
+                        help="Grava o tempo de cada etapa do relatório em '<planilha>_tempos.json'")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"],
+                        help="Gera também o perfil da geração do relatório ao lado da planilha")
+    args, qt_args = parser.parse_known_args()
+    configure_logging(args.log_level, args.log_file)
+    if args.timing:
+        REPORT_INSTRUMENTATION['tempos'] = True
+    if args.profile:
+        REPORT_INSTRUMENTATION['perfil'] = args.profile
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     dialog = StartupDialog()
+    warm_up_imports()
     if dialog.exec_():
         if dialog.selected_mode == "import":
             window = PumpAnalyzer()
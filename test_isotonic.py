@@ -0,0 +1,75 @@
+"""
+Regressão do ajuste monótono ('monotone'): compara o PAVA em lote de main.py com uma
+implementação de referência direta em dados ruidosos.
+
+Uso:
+    python -m pytest -q test_isotonic.py   (ou python test_isotonic.py)
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+
+import main
+
+
+def reference_isotonic(y):
+    """Regressão isotônica crescente: junta pares adjacentes fora de ordem até não haver mais"""
+    blocks = [[float(v), 1] for v in y]
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(blocks) - 1):
+            if blocks[i][0] > blocks[i + 1][0]:
+                (m0, w0), (m1, w1) = blocks[i], blocks[i + 1]
+                blocks[i:i + 2] = [[(m0 * w0 + m1 * w1) / (w0 + w1), w0 + w1]]
+                merged = True
+                break
+    return np.array([m for m, w in blocks for _ in range(w)], dtype=float)
+
+
+def reference_unimodal(y):
+    """Regressão unimodal testando todas as posições do pico com a referência isotônica"""
+    best, best_sse = None, np.inf
+    for peak in range(len(y)):
+        fitted = np.concatenate([reference_isotonic(y[:peak + 1]), -reference_isotonic(-y[peak + 1:])])
+        sse = float(((fitted - y) ** 2).sum())
+        if sse < best_sse - 1e-9:
+            best, best_sse = fitted, sse
+    return best
+
+
+def noisy_rotors(n=30, m=25, seed=7):
+    """Curvas de eficiência ruidosas com número de pontos diferente em cada rotor"""
+    rng = np.random.default_rng(seed)
+    counts = rng.integers(2, m + 1, n)
+    y = np.full((n, m), np.nan)
+    for r in range(n):
+        q = np.linspace(0.0, 1.0, counts[r])
+        y[r, :counts[r]] = 80 - 300 * (q - 0.5) ** 2 + rng.normal(0, 8, counts[r])
+    return y, ~np.isnan(y), counts
+
+
+def test_isotonic_matches_reference():
+    y, valid, counts = noisy_rotors()
+    start = np.zeros(len(y), dtype=int)
+    increasing = main._batch_isotonic(y, valid, start, counts - 1, increasing=True)
+    decreasing = main._batch_isotonic(y, valid, start, counts - 1, increasing=False)
+    for r, k in enumerate(counts):
+        np.testing.assert_allclose(increasing[r, :k], reference_isotonic(y[r, :k]), atol=1e-9)
+        np.testing.assert_allclose(decreasing[r, :k], -reference_isotonic(-y[r, :k]), atol=1e-9)
+        assert np.isnan(increasing[r, k:]).all()
+
+
+def test_unimodal_matches_reference():
+    y, valid, counts = noisy_rotors()
+    fitted = main._batch_unimodal(y, valid, counts)
+    for r, k in enumerate(counts):
+        np.testing.assert_allclose(fitted[r, :k], reference_unimodal(y[r, :k]), atol=1e-9)
+
+
+if __name__ == "__main__":
+    test_isotonic_matches_reference()
+    test_unimodal_matches_reference()
+    print("OK")